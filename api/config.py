@@ -33,6 +33,31 @@ class Settings(BaseSettings):
 
     # WebSocket
     ws_heartbeat_interval: int = 30
+    ws_queue_maxsize: int = 256       # 클라이언트별 outbound 큐 크기
+    ws_send_timeout: float = 10.0     # 전송 타임아웃 (초과 시 연결 정리)
+    ws_frame_window_ms: int = 250     # frame 배칭 window
+    ws_per_message_deflate: bool = True  # permessage-deflate 협상 여부
+
+    # Multi-worker broadcast (memory | redis)
+    broadcast_backend: str = "memory"
+    redis_url: str = "redis://localhost:6379/0"
+    broadcast_channel_prefix: str = "mes"
+
+    # 시계열 파티션 (mes_realtime_production / mes_equipment_status)
+    partition_raw_retention_days: int = 0   # N일 이전 일자 파티션 detach (0이면 보존)
+    partition_archive: bool = False         # True: archive 스키마로 이동, False: DROP
+    rollup_enabled: bool = True             # 1분/1시간 집계 롤업 (retention 전 다운샘플링)
+    rollup_minute_retention_days: int = 90  # 1분 집계 보존 일수 (0이면 보존, 1시간 집계는 영구)
+    rollup_max_chunks_per_run: int = 4      # 1회 실행당 집계 테이블별 최대 롤업 구간 수 (밀린 구간은 다음 실행에서, 0이면 무제한)
+
+    # SPC 관리도 (X̄-R/X̄-S 부분군 크기, 관리한계 고정까지의 부분군 수)
+    spc_subgroup_size: int = 5
+    spc_baseline_subgroups: int = 25
+
+    # 재고 분석 (출고 집계 기간, 과잉재고 판정 재고일수, 당일 스냅샷 캐시 초)
+    inventory_lookback_days: int = 365
+    inventory_excess_days: int = 180
+    inventory_analytics_cache_ttl: int = 300
 
     # Pagination
     default_page_size: int = 20
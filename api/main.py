@@ -25,7 +25,11 @@ from api.routers.erp.accounting import router as accounting_router
 from api.routers.erp.hr import router as hr_router
 from api.routers.dashboard import router as dashboard_router
 from api.routers.generator import router as generator_router
-from api.websocket.handlers import router as websocket_router
+from api.routers.generator.simulation import publish_simulation_event
+from api.websocket.handlers import router as websocket_router, publish_simulation_records
+from api.websocket.frames import frame_batcher
+from api.websocket.backend import get_broadcast_backend
+from api.simulation.engine import get_simulation_engine
 
 
 @asynccontextmanager
@@ -33,8 +37,22 @@ async def lifespan(app: FastAPI):
     """Application lifespan handler"""
     # Startup
     # await init_db()  # Uncomment to auto-create tables
+    backend = get_broadcast_backend()
+    await backend.start()
+    await frame_batcher.start()
+
+    engine = get_simulation_engine()
+    engine.attach_backend(backend)
+    engine.add_record_listener(publish_simulation_records)
+    engine.add_event_listener(publish_simulation_event)
     yield
     # Shutdown
+    engine.remove_event_listener(publish_simulation_event)
+    engine.remove_record_listener(publish_simulation_records)
+    if engine.is_leader:
+        await engine.stop()
+    await frame_batcher.stop()
+    await backend.stop()
     await close_db()
 
 
@@ -204,4 +222,5 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=settings.debug,
+        ws_per_message_deflate=settings.ws_per_message_deflate,
     )
@@ -16,7 +16,10 @@ from api.models.mes.quality import (
     DefectDetail,
     InspectionResult,
     SPCData,
+    SPCChartState,
+    SPCViolation,
     DefectType,
+    LotGenealogy,
 )
 
 __all__ = [
@@ -37,5 +40,8 @@ __all__ = [
     "DefectDetail",
     "InspectionResult",
     "SPCData",
+    "SPCChartState",
+    "SPCViolation",
     "DefectType",
+    "LotGenealogy",
 ]
@@ -9,7 +9,7 @@ from typing import Optional
 
 from sqlalchemy import (
     Column, String, Integer, DateTime, Date, Boolean, Text,
-    ForeignKey, Enum, Numeric, JSON
+    ForeignKey, Enum, Numeric, JSON, UniqueConstraint
 )
 from sqlalchemy.orm import relationship
 
@@ -155,8 +155,11 @@ class VoucherDetail(Base):
 # ============== 장부 관리 ==============
 
 class GeneralLedger(Base):
-    """총계정원장"""
+    """총계정원장 (계정별 행 = 자기 계정 + 하위 계정 합계)"""
     __tablename__ = "erp_general_ledger"
+    __table_args__ = (
+        UniqueConstraint("fiscal_year", "fiscal_period", "account_code", name="uq_erp_general_ledger_period_account"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     fiscal_year = Column(String(4), nullable=False, comment="회계연도")
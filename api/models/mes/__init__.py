@@ -15,7 +15,10 @@ from api.models.mes.quality import (
     DefectDetail,
     InspectionResult,
     SPCData,
+    SPCChartState,
+    SPCViolation,
     DefectType,
+    LotGenealogy,
 )
 from api.models.mes.material import (
     FeederSetup,
@@ -60,7 +63,10 @@ __all__ = [
     "DefectDetail",
     "InspectionResult",
     "SPCData",
+    "SPCChartState",
+    "SPCViolation",
     "DefectType",
+    "LotGenealogy",
     # Material
     "FeederSetup",
     "MaterialConsumption",
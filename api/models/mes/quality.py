@@ -6,7 +6,7 @@ from decimal import Decimal
 from typing import Optional
 from uuid import UUID
 
-from sqlalchemy import String, Integer, Numeric, Text, DateTime, Date, Boolean, CheckConstraint, Index
+from sqlalchemy import String, Integer, Numeric, Text, DateTime, Date, Boolean, CheckConstraint, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.dialects.postgresql import UUID as PGUUID, JSONB, ARRAY
 
@@ -117,6 +117,53 @@ class SPCData(BaseModel):
     )
 
 
+class SPCChartState(BaseModel):
+    """SPC 관리도 상태 (mes_spc_chart_state) - 측정 저장 시 갱신되는 running 통계/관리한계"""
+    __tablename__ = "mes_spc_chart_state"
+    __table_args__ = {"extend_existing": True}
+
+    line_code: Mapped[str] = mapped_column(String(20), nullable=False)
+    product_code: Mapped[str] = mapped_column(String(30), nullable=False)
+    measurement_type: Mapped[str] = mapped_column(String(30), nullable=False)
+    subgroup_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    sample_count: Mapped[int] = mapped_column(Integer, default=0)
+
+    mean: Mapped[Optional[Decimal]] = mapped_column(Numeric(15, 6))
+    std_dev: Mapped[Optional[Decimal]] = mapped_column(Numeric(15, 6))
+    center_line: Mapped[Optional[Decimal]] = mapped_column(Numeric(15, 6))
+    control_lower: Mapped[Optional[Decimal]] = mapped_column(Numeric(15, 6))  # LCL
+    control_upper: Mapped[Optional[Decimal]] = mapped_column(Numeric(15, 6))  # UCL
+    limits_frozen: Mapped[bool] = mapped_column(Boolean, default=False)
+    cpk_value: Mapped[Optional[Decimal]] = mapped_column(Numeric(8, 4))
+    ppk_value: Mapped[Optional[Decimal]] = mapped_column(Numeric(8, 4))
+
+    # Welford / 부분군 / Nelson 규칙 링버퍼 (generators.core.spc.SPCChart.to_dict)
+    state: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    last_measurement_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+
+
+class SPCViolation(BaseModel):
+    """SPC 규칙 위반 (mes_spc_violation)"""
+    __tablename__ = "mes_spc_violation"
+    __table_args__ = (
+        Index("idx_mes_spc_violation_chart", "line_code", "product_code", "measurement_type", "measurement_datetime"),
+        {"extend_existing": True},
+    )
+
+    spc_data_id: Mapped[Optional[UUID]] = mapped_column(PGUUID(as_uuid=True))
+    line_code: Mapped[str] = mapped_column(String(20), nullable=False)
+    product_code: Mapped[str] = mapped_column(String(30), nullable=False)
+    measurement_type: Mapped[str] = mapped_column(String(30), nullable=False)
+    measurement_datetime: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    rule_no: Mapped[int] = mapped_column(Integer, nullable=False)
+    rule_code: Mapped[str] = mapped_column(String(40), nullable=False)
+    measured_value: Mapped[Decimal] = mapped_column(Numeric(15, 6), nullable=False)
+    center_line: Mapped[Optional[Decimal]] = mapped_column(Numeric(15, 6))
+    sigma: Mapped[Optional[Decimal]] = mapped_column(Numeric(15, 6))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+
+
 class Traceability(BaseModel):
     """추적성 (mes_traceability)"""
     __tablename__ = "mes_traceability"
@@ -181,3 +228,29 @@ class Traceability(BaseModel):
         DateTime(timezone=True),
         default=datetime.utcnow,
     )
+
+
+class LotGenealogy(BaseModel):
+    """로트 계보 (mes_lot_genealogy) - 투입 로트(parent) → 산출 로트(child)"""
+    __tablename__ = "mes_lot_genealogy"
+    __table_args__ = (
+        CheckConstraint(
+            "relation_type IN ('consume', 'split', 'merge', 'rework')",
+            name="ck_mes_genealogy_relation"
+        ),
+        UniqueConstraint("tenant_id", "parent_lot_no", "child_lot_no", name="uq_mes_genealogy_edge"),
+        Index("idx_mes_genealogy_child", "tenant_id", "child_lot_no", "parent_lot_no"),
+        {"extend_existing": True},
+    )
+
+    parent_lot_no: Mapped[str] = mapped_column(String(50), nullable=False)
+    child_lot_no: Mapped[str] = mapped_column(String(50), nullable=False)
+    relation_type: Mapped[str] = mapped_column(String(20), nullable=False, default="consume")
+    parent_item_code: Mapped[Optional[str]] = mapped_column(String(30))
+    child_item_code: Mapped[Optional[str]] = mapped_column(String(30))
+    production_order_no: Mapped[Optional[str]] = mapped_column(String(50))
+    line_code: Mapped[Optional[str]] = mapped_column(String(20))
+    qty: Mapped[Optional[Decimal]] = mapped_column(Numeric(15, 4))
+    linked_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    source: Mapped[Optional[str]] = mapped_column(String(30))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
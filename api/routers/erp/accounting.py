@@ -15,7 +15,7 @@ from api.database import get_db
 from api.schemas.erp.accounting import (
     AccountCodeCreate, AccountCodeResponse, AccountCodeTreeResponse,
     VoucherCreate, VoucherUpdate, VoucherResponse, VoucherListResponse,
-    VoucherDetailResponse, VoucherApproval,
+    VoucherDetailResponse, VoucherApproval, VoucherPostBatch,
     GeneralLedgerResponse, GeneralLedgerListResponse,
     LedgerTransactionResponse, LedgerTransactionListResponse,
     SubsidiaryLedgerResponse,
@@ -33,8 +33,10 @@ from api.models.erp.accounting import (
     AccountCode, Voucher, VoucherDetail,
     GeneralLedger, SubsidiaryLedger,
     CostCenter, ProductCost, CostAllocation,
-    FiscalPeriod, ClosingEntry, FinancialStatement
+    FiscalPeriod, ClosingEntry
 )
+from api.services.closing import get_closing_service
+from api.services.ledger import get_ledger_service
 
 router = APIRouter(prefix="/accounting", tags=["ERP Accounting"])
 
@@ -301,6 +303,7 @@ async def create_account(
         db.add(account)
         await db.commit()
         await db.refresh(account)
+        get_ledger_service().invalidate()
 
         return AccountCodeResponse(**account_to_dict(account))
     except HTTPException:
@@ -553,6 +556,30 @@ async def approve_voucher(
         raise HTTPException(status_code=500, detail=f"전표 승인/반려 실패: {str(e)}")
 
 
+@router.post("/vouchers/post-batch", summary="전표 일괄 전기")
+async def post_vouchers(
+    data: VoucherPostBatch,
+    db: AsyncSession = Depends(get_db)
+):
+    """승인된 전표를 일괄 전기합니다. (전표번호 생략 시 조건에 맞는 모든 승인 전표)"""
+    try:
+        posting = await get_ledger_service().post(
+            db, data.voucher_nos, data.fiscal_year, data.fiscal_period
+        )
+        await db.commit()
+
+        return {
+            "message": f"전표 {len(posting['posted'])}건이 전기되었습니다.",
+            "posted_count": len(posting["posted"]),
+            "ledger_rows": posting["ledger_rows"],
+            "posted_at": datetime.now()
+        }
+    except Exception as e:
+        await db.rollback()
+        print(f"Error posting vouchers: {e}")
+        raise HTTPException(status_code=500, detail=f"전표 일괄 전기 실패: {str(e)}")
+
+
 @router.post("/vouchers/{voucher_no}/post", summary="전표 전기")
 async def post_voucher(
     voucher_no: str,
@@ -568,9 +595,14 @@ async def post_voucher(
             if voucher.status != VoucherStatus.APPROVED:
                 raise HTTPException(status_code=400, detail="승인된 전표만 전기할 수 있습니다.")
 
-            voucher.status = VoucherStatus.POSTED
-            voucher.posted_at = datetime.now()
-            voucher.updated_at = datetime.now()
+            ledger = get_ledger_service()
+            if await ledger.is_closed(db, voucher.fiscal_year, voucher.fiscal_period):
+                raise HTTPException(status_code=409, detail="마감된 회계기간에는 전기할 수 없습니다.")
+
+            # 상태 전환과 총계정원장 반영을 같은 트랜잭션에서 처리
+            posting = await ledger.post(db, [voucher_no])
+            if not posting["posted"]:
+                raise HTTPException(status_code=409, detail="이미 전기된 전표입니다.")
             await db.commit()
 
         return {
@@ -592,13 +624,20 @@ async def cancel_voucher(
     reason: str = Query(..., description="취소 사유"),
     db: AsyncSession = Depends(get_db)
 ):
-    """전표를 취소합니다."""
+    """전표를 취소합니다. (전기된 전표는 총계정원장 반영을 되돌림)"""
     try:
-        query = select(Voucher).where(Voucher.voucher_no == voucher_no)
+        # 동시 취소 시 원장 차감이 두 번 일어나지 않도록 전표 행 잠금
+        query = select(Voucher).where(Voucher.voucher_no == voucher_no).with_for_update()
         result = await db.execute(query)
         voucher = result.scalar_one_or_none()
 
         if voucher:
+            if voucher.status == VoucherStatus.POSTED:
+                ledger = get_ledger_service()
+                if await ledger.is_closed(db, voucher.fiscal_year, voucher.fiscal_period):
+                    raise HTTPException(status_code=409, detail="마감된 회계기간의 전기 전표는 취소할 수 없습니다.")
+                await ledger.unpost(db, voucher_no)
+
             voucher.status = VoucherStatus.CANCELLED
             voucher.cancel_reason = reason
             voucher.cancelled_at = datetime.now()
@@ -611,6 +650,9 @@ async def cancel_voucher(
             "cancel_reason": reason,
             "cancelled_at": datetime.now()
         }
+    except HTTPException:
+        await db.rollback()
+        raise
     except Exception as e:
         await db.rollback()
         print(f"Error cancelling voucher: {e}")
@@ -649,15 +691,19 @@ async def get_general_ledger(
         account_codes = list(set(l.account_code for l in ledgers))
         account_query = select(AccountCode).where(AccountCode.account_code.in_(account_codes))
         account_result = await db.execute(account_query)
-        accounts = {a.account_code: a.account_name for a in account_result.scalars().all()}
+        accounts = {a.account_code: a for a in account_result.scalars().all()}
 
         items = []
         total_debit = Decimal("0")
         total_credit = Decimal("0")
 
         for ledger in ledgers:
-            ledger_dict = ledger_to_dict(ledger, accounts.get(ledger.account_code))
+            account = accounts.get(ledger.account_code)
+            ledger_dict = ledger_to_dict(ledger, account.account_name if account else None)
             items.append(GeneralLedgerResponse(**ledger_dict))
+            # 원장 행은 하위 계정 합계를 포함하므로 상위 계정이 함께 조회된 행은 합계에서 제외
+            if account and account.parent_code in accounts:
+                continue
             total_debit += ledger.debit_total or Decimal("0")
             total_credit += ledger.credit_total or Decimal("0")
 
@@ -1062,14 +1108,18 @@ async def close_fiscal_period(
         period = result.scalar_one_or_none()
 
         if period:
+            closing = get_closing_service()
             if data.action == "close":
                 period.status = ClosingStatus.CLOSED
                 period.closed_at = datetime.now()
                 period.closed_by = "current_user"
+                # 잔액 이월 재계산 + 시산표/재무상태표/손익계산서 확정 스냅샷
+                await closing.close(db, fiscal_year, fiscal_period, generated_by="current_user")
             else:
                 period.status = ClosingStatus.REOPENED
                 period.reopened_at = datetime.now()
                 period.reopened_by = "current_user"
+                await closing.invalidate(db, [(fiscal_year, fiscal_period)])
 
             await db.commit()
 
@@ -1222,85 +1272,15 @@ async def get_balance_sheet(
 ):
     """재무상태표를 조회합니다."""
     try:
-        # 저장된 재무제표 조회
-        query = select(FinancialStatement).where(
-            and_(
-                FinancialStatement.fiscal_year == fiscal_year,
-                FinancialStatement.fiscal_period == fiscal_period,
-                FinancialStatement.statement_type == "BS"
-            )
-        )
-        result = await db.execute(query)
-        statement = result.scalar_one_or_none()
-
-        if statement and statement.statement_data:
-            return BalanceSheetResponse(**statement.statement_data)
-
-        # 총계정원장에서 계정 유형별 잔액 집계
-        ledger_query = select(
-            AccountCode.account_type,
-            func.sum(GeneralLedger.closing_balance)
-        ).join(
-            AccountCode, GeneralLedger.account_code == AccountCode.account_code
-        ).where(
-            and_(
-                GeneralLedger.fiscal_year == fiscal_year,
-                GeneralLedger.fiscal_period == fiscal_period
-            )
-        ).group_by(AccountCode.account_type)
-
-        ledger_result = await db.execute(ledger_query)
-        balances = {row[0]: row[1] or Decimal("0") for row in ledger_result}
-
-        total_assets = balances.get(AccountType.ASSET, Decimal("0"))
-        total_liabilities = balances.get(AccountType.LIABILITY, Decimal("0"))
-        total_equity = balances.get(AccountType.EQUITY, Decimal("0"))
-
-        if total_assets == 0 and total_liabilities == 0 and total_equity == 0:
-            # 데이터 없음 - 빈 응답 반환
-            return BalanceSheetResponse(
-                fiscal_year=fiscal_year,
-                fiscal_period=fiscal_period,
-                as_of_date=date(int(fiscal_year), int(fiscal_period), 28),
-                assets={
-                    "current_assets": {"total": Decimal("0")},
-                    "non_current_assets": {"total": Decimal("0")}
-                },
-                liabilities={
-                    "current_liabilities": {"total": Decimal("0")},
-                    "non_current_liabilities": {"total": Decimal("0")}
-                },
-                equity={
-                    "capital_stock": Decimal("0"),
-                    "retained_earnings": Decimal("0"),
-                    "total": Decimal("0")
-                },
-                total_assets=Decimal("0"),
-                total_liabilities=Decimal("0"),
-                total_equity=Decimal("0")
-            )
-
-        return BalanceSheetResponse(
-            fiscal_year=fiscal_year,
-            fiscal_period=fiscal_period,
-            as_of_date=date(int(fiscal_year), int(fiscal_period), 28),
-            assets={
-                "current_assets": {"total": total_assets},
-                "non_current_assets": {"total": Decimal("0")}
-            },
-            liabilities={
-                "current_liabilities": {"total": total_liabilities},
-                "non_current_liabilities": {"total": Decimal("0")}
-            },
-            equity={
-                "capital_stock": total_equity,
-                "retained_earnings": Decimal("0"),
-                "total": total_equity
-            },
-            total_assets=total_assets,
-            total_liabilities=total_liabilities,
-            total_equity=total_equity
-        )
+        # 마감된 기간은 저장된 재무제표
+        closing = get_closing_service()
+        statement_data = await closing.snapshot(db, fiscal_year, fiscal_period, "BS")
+        if statement_data:
+            return BalanceSheetResponse(**statement_data)
+
+        # 총계정원장 최상위/2레벨 계정 행에서 계산
+        statements = await closing.build(db, fiscal_year, fiscal_period)
+        return statements["BS"]
     except Exception as e:
         print(f"Error fetching balance sheet: {e}")
         raise HTTPException(status_code=500, detail=f"재무상태표 조회 실패: {str(e)}")
@@ -1314,78 +1294,15 @@ async def get_income_statement(
 ):
     """손익계산서를 조회합니다."""
     try:
-        # 저장된 재무제표 조회
-        query = select(FinancialStatement).where(
-            and_(
-                FinancialStatement.fiscal_year == fiscal_year,
-                FinancialStatement.fiscal_period == fiscal_period,
-                FinancialStatement.statement_type == "IS"
-            )
-        )
-        result = await db.execute(query)
-        statement = result.scalar_one_or_none()
-
-        if statement and statement.statement_data:
-            return IncomeStatementResponse(**statement.statement_data)
-
-        # 총계정원장에서 수익/비용 계정 집계
-        ledger_query = select(
-            AccountCode.account_type,
-            func.sum(GeneralLedger.closing_balance)
-        ).join(
-            AccountCode, GeneralLedger.account_code == AccountCode.account_code
-        ).where(
-            and_(
-                GeneralLedger.fiscal_year == fiscal_year,
-                GeneralLedger.fiscal_period == fiscal_period,
-                AccountCode.account_type.in_([AccountType.REVENUE, AccountType.EXPENSE])
-            )
-        ).group_by(AccountCode.account_type)
-
-        ledger_result = await db.execute(ledger_query)
-        balances = {row[0]: row[1] or Decimal("0") for row in ledger_result}
-
-        total_revenue = balances.get(AccountType.REVENUE, Decimal("0"))
-        total_expense = balances.get(AccountType.EXPENSE, Decimal("0"))
-
-        period_end = date(int(fiscal_year), int(fiscal_period), 28)
-        period_start = date(int(fiscal_year), int(fiscal_period), 1)
-
-        if total_revenue == 0 and total_expense == 0:
-            # 데이터 없음 - 빈 응답 반환
-            return IncomeStatementResponse(
-                fiscal_year=fiscal_year,
-                fiscal_period=fiscal_period,
-                period_start=period_start,
-                period_end=period_end,
-                revenue={"total": Decimal("0")},
-                cost_of_sales={"total": Decimal("0")},
-                gross_profit=Decimal("0"),
-                operating_expenses={"total": Decimal("0")},
-                operating_income=Decimal("0"),
-                non_operating={"total": Decimal("0")},
-                income_before_tax=Decimal("0"),
-                tax_expense=Decimal("0"),
-                net_income=Decimal("0")
-            )
-
-        net_income = total_revenue - total_expense
-
-        return IncomeStatementResponse(
-            fiscal_year=fiscal_year,
-            fiscal_period=fiscal_period,
-            period_start=period_start,
-            period_end=period_end,
-            revenue={"total": total_revenue},
-            cost_of_sales={"total": Decimal("0")},
-            gross_profit=total_revenue,
-            operating_expenses={"total": total_expense},
-            operating_income=net_income,
-            non_operating={"total": Decimal("0")},
-            income_before_tax=net_income,
-            tax_expense=Decimal("0"),
-            net_income=net_income
-        )
+        # 마감된 기간은 저장된 재무제표
+        closing = get_closing_service()
+        statement_data = await closing.snapshot(db, fiscal_year, fiscal_period, "IS")
+        if statement_data:
+            return IncomeStatementResponse(**statement_data)
+
+        # 수익/비용 최상위 계정의 당기 발생액
+        statements = await closing.build(db, fiscal_year, fiscal_period)
+        return statements["IS"]
     except Exception as e:
         print(f"Error fetching income statement: {e}")
         raise HTTPException(status_code=500, detail=f"손익계산서 조회 실패: {str(e)}")
@@ -1399,63 +1316,36 @@ async def get_trial_balance(
 ):
     """시산표를 조회합니다."""
     try:
-        # 총계정원장에서 계정별 잔액 조회
-        query = select(
-            GeneralLedger.account_code,
-            AccountCode.account_name,
-            GeneralLedger.debit_total,
-            GeneralLedger.credit_total
-        ).join(
-            AccountCode, GeneralLedger.account_code == AccountCode.account_code
-        ).where(
-            and_(
-                GeneralLedger.fiscal_year == fiscal_year,
-                GeneralLedger.fiscal_period == fiscal_period
-            )
-        ).order_by(GeneralLedger.account_code)
-
-        result = await db.execute(query)
-        rows = result.all()
-
-        if not rows:
-            # 데이터 없음 - 빈 응답 반환
-            return TrialBalanceResponse(
-                fiscal_year=fiscal_year,
-                fiscal_period=fiscal_period,
-                as_of_date=date(int(fiscal_year), int(fiscal_period), 28),
-                items=[],
-                total_debit=Decimal("0"),
-                total_credit=Decimal("0"),
-                is_balanced=True
-            )
-
-        items = []
-        total_debit = Decimal("0")
-        total_credit = Decimal("0")
-
-        for row in rows:
-            debit = row[2] or Decimal("0")
-            credit = row[3] or Decimal("0")
+        # 마감된 기간은 저장된 시산표
+        closing = get_closing_service()
+        statement_data = await closing.snapshot(db, fiscal_year, fiscal_period, "TB")
+        if statement_data:
+            return TrialBalanceResponse(**statement_data)
+
+        # 말단 계정의 원장 행 (상위 계정 행은 하위 합계라 중복 집계됨)
+        statements = await closing.build(db, fiscal_year, fiscal_period)
+        return statements["TB"]
+    except Exception as e:
+        print(f"Error fetching trial balance: {e}")
+        raise HTTPException(status_code=500, detail=f"시산표 조회 실패: {str(e)}")
 
-            items.append({
-                "account_code": row[0],
-                "account_name": row[1],
-                "debit": debit,
-                "credit": credit
-            })
 
-            total_debit += debit
-            total_credit += credit
+@router.post("/statements/rebuild", summary="재무제표 스냅샷 재생성")
+async def rebuild_statements(
+    db: AsyncSession = Depends(get_db),
+    fiscal_year: Optional[str] = Query(None, description="회계연도 (생략 시 전체)")
+):
+    """마감된 회계기간의 재무제표 스냅샷을 원장에서 다시 생성합니다."""
+    try:
+        count = await get_closing_service().rebuild(db, fiscal_year)
+        await db.commit()
 
-        return TrialBalanceResponse(
-            fiscal_year=fiscal_year,
-            fiscal_period=fiscal_period,
-            as_of_date=date(int(fiscal_year), int(fiscal_period), 28),
-            items=items,
-            total_debit=total_debit,
-            total_credit=total_credit,
-            is_balanced=total_debit == total_credit
-        )
+        return {
+            "message": f"재무제표 {count}건이 재생성되었습니다.",
+            "statement_count": count,
+            "generated_at": datetime.now()
+        }
     except Exception as e:
-        print(f"Error fetching trial balance: {e}")
-        raise HTTPException(status_code=500, detail=f"시산표 조회 실패: {str(e)}")
+        await db.rollback()
+        print(f"Error rebuilding statements: {e}")
+        raise HTTPException(status_code=500, detail=f"재무제표 재생성 실패: {str(e)}")
@@ -16,6 +16,7 @@ from sqlalchemy import select, func, and_, or_
 
 from api.database import get_db
 from api.models.erp.inventory import Warehouse, InventoryStock, InventoryTransaction
+from api.services.inventory_analytics import get_inventory_analytics
 
 router = APIRouter(prefix="/inventory", tags=["ERP Inventory"])
 
@@ -259,54 +260,75 @@ async def get_transactions(
 # ==================== Summary API ====================
 
 @router.get("/summary")
-async def get_inventory_summary(db: AsyncSession = Depends(get_db)):
+async def get_inventory_summary(
+    db: AsyncSession = Depends(get_db),
+    refresh: bool = Query(False, description="분석 스냅샷 재계산"),
+):
     """재고 요약"""
-    total_warehouses = await db.execute(
-        select(func.count(Warehouse.id)).where(Warehouse.tenant_id == DEFAULT_TENANT_ID)
-    )
-    active_warehouses = await db.execute(
-        select(func.count(Warehouse.id)).where(
-            and_(Warehouse.tenant_id == DEFAULT_TENANT_ID, Warehouse.is_active == True)
+    counts = await db.execute(
+        select(
+            select(func.count(Warehouse.id))
+            .where(Warehouse.tenant_id == DEFAULT_TENANT_ID).scalar_subquery(),
+            select(func.count(Warehouse.id))
+            .where(and_(Warehouse.tenant_id == DEFAULT_TENANT_ID, Warehouse.is_active == True))
+            .scalar_subquery(),
+            select(func.count(InventoryTransaction.id))
+            .where(InventoryTransaction.tenant_id == DEFAULT_TENANT_ID).scalar_subquery(),
         )
     )
-    total_transactions = await db.execute(
-        select(func.count(InventoryTransaction.id)).where(InventoryTransaction.tenant_id == DEFAULT_TENANT_ID)
-    )
+    total_warehouses, active_warehouses, total_transactions = counts.one()
+
+    analytics = get_inventory_analytics()
+    snapshot = await analytics.snapshot(db, DEFAULT_TENANT_ID, refresh)
+    analysis = analytics.analysis(snapshot)
+    statuses = {row["status"]: row["count"] for row in analysis["by_status"]}
 
     return {
-        "total_warehouses": total_warehouses.scalar() or 0,
-        "active_warehouses": active_warehouses.scalar() or 0,
-        "total_transactions": total_transactions.scalar() or 0,
+        "total_warehouses": total_warehouses or 0,
+        "active_warehouses": active_warehouses or 0,
+        "total_transactions": total_transactions or 0,
+        "total_items": analysis["total_items"],
+        "total_value": analysis["total_value"],
+        "by_type": analysis["by_type"],
+        "alerts": {
+            "below_safety": statuses.get("below_safety", 0),
+            "excess": statuses.get("excess", 0),
+            "out_of_stock": statuses.get("out_of_stock", 0),
+        },
+        "snapshot_date": analysis["snapshot_date"],
     }
 
 
 # ==================== Analysis API (프론트엔드 호환) ====================
 
 @router.get("/analysis")
-async def get_inventory_analysis(db: AsyncSession = Depends(get_db)):
-    """재고 분석 - 프론트엔드 호환"""
-    total_transactions = await db.execute(
-        select(func.count(InventoryTransaction.id)).where(InventoryTransaction.tenant_id == DEFAULT_TENANT_ID)
-    )
-
-    return {
-        "total_items": total_transactions.scalar() or 0,
-        "total_value": 0,
-        "by_type": [],
-        "by_status": [],
-        "turnover_rate": 0,
-        "slow_moving_items": 0,
-        "aging_analysis": [],
-    }
+async def get_inventory_analysis(
+    db: AsyncSession = Depends(get_db),
+    refresh: bool = Query(False, description="분석 스냅샷 재계산"),
+):
+    """재고 분석 - ABC / 회전율 / 에이징 (당일 스냅샷 캐시)"""
+    analytics = get_inventory_analytics()
+    snapshot = await analytics.snapshot(db, DEFAULT_TENANT_ID, refresh)
+    return analytics.analysis(snapshot)
 
 
 @router.get("/below-safety")
-async def get_below_safety_stock(db: AsyncSession = Depends(get_db)):
-    """안전재고 미달 품목 - 프론트엔드 호환"""
-    return []
+async def get_below_safety_stock(
+    db: AsyncSession = Depends(get_db),
+    refresh: bool = Query(False, description="분석 스냅샷 재계산"),
+):
+    """안전재고 미달 품목 (품절 포함, 부족수량 큰 순)"""
+    analytics = get_inventory_analytics()
+    snapshot = await analytics.snapshot(db, DEFAULT_TENANT_ID, refresh)
+    return analytics.below_safety(snapshot)
 
 
 @router.get("/excess")
-async def get_excess_stock(db: AsyncSession = Depends(get_db)):
-    """과잉재고 품목 - 프론트엔드 호환"""
-    return []
+async def get_excess_stock(
+    db: AsyncSession = Depends(get_db),
+    refresh: bool = Query(False, description="분석 스냅샷 재계산"),
+):
+    """과잉재고 품목 (재고일수 초과 / 무출고, 재고금액 큰 순)"""
+    analytics = get_inventory_analytics()
+    snapshot = await analytics.snapshot(db, DEFAULT_TENANT_ID, refresh)
+    return analytics.excess(snapshot)
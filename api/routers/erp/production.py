@@ -19,6 +19,7 @@ from api.models.erp.master import (
     ProductMaster, UnitOfMeasure as DBUnitOfMeasure,
 )
 from api.models.mes.production import ProductionOrder
+from api.services.bom import get_bom_service
 
 router = APIRouter(prefix="/production", tags=["ERP Production"])
 
@@ -314,6 +315,47 @@ async def get_bom_list(
         raise HTTPException(status_code=500, detail=f"BOM 목록 조회 실패: {str(e)}")
 
 
+@router.get("/bom/where-used")
+async def get_bom_where_used(
+    codes: str = Query(..., description="구성품 코드 (콤마 구분)"),
+    db: AsyncSession = Depends(get_db),
+):
+    """BOM 역전개 (일괄) - 구성품별 직접 상위품목 / 최상위 제품"""
+    graph = await get_bom_service().refresh(db)
+    component_codes = [c.strip() for c in codes.split(",") if c.strip()]
+    return {"items": graph.where_used(component_codes)}
+
+
+@router.get("/bom/requirements")
+async def get_bom_requirements(
+    db: AsyncSession = Depends(get_db),
+    product_codes: Optional[str] = Query(None, description="제품 코드 (콤마 구분, 없으면 전체 완제품)"),
+    qty: float = Query(1, gt=0, description="제품별 수요량"),
+):
+    """MRP 총소요량 - 제품별 수요량을 최하위 자재까지 전개해 합산"""
+    graph = await get_bom_service().refresh(db)
+    if product_codes:
+        products = [c.strip() for c in product_codes.split(",") if c.strip()]
+    else:
+        products = graph.top_level()
+    totals = graph.mrp({code: qty for code in products})
+
+    return {
+        "products": products,
+        "qty": qty,
+        "items": [
+            {
+                "item_code": code,
+                "item_name": graph.names.get(code, code),
+                "required_qty": round(required, 4),
+                "unit_cost": graph.standard_costs.get(code, 0.0),
+            }
+            for code, required in sorted(totals.items())
+        ],
+        "total_cost": round(sum(graph.rolled_cost(code) * qty for code in products), 2),
+    }
+
+
 @router.get("/bom/{bom_id}", response_model=BOMResponse)
 async def get_bom(
     bom_id: int,
@@ -345,53 +387,33 @@ async def get_bom_explosion(
     product_code: str,
     db: AsyncSession = Depends(get_db),
     level: int = Query(99, ge=1),
+    qty: float = Query(1, gt=0, description="전개 기준 수량"),
 ):
-    """BOM 전개 (다단계)"""
+    """BOM 전개 (다단계) - 스크랩 포함 누적 소요량과 롤업 표준원가"""
     try:
-        # 제품 코드로 BOM 조회
-        product_query = select(ProductMaster).where(ProductMaster.product_code == product_code)
-        product_result = await db.execute(product_query)
-        product = product_result.scalar_one_or_none()
+        graph = await get_bom_service().refresh(db)
+        items = graph.explode(product_code, max_level=level, quantity=qty)
+        total_components = 0
+        depth = 0
+        cycles = set()
+        stack = list(items)
+        while stack:
+            node = stack.pop()
+            total_components += 1
+            depth = max(depth, node["level"])
+            if node.get("cycle"):
+                cycles.add(node["item_code"])
+            stack.extend(node["children"])
 
-        if product:
-            bom_query = select(BOMHeader).options(
-                selectinload(BOMHeader.details)
-            ).where(
-                and_(BOMHeader.product_id == product.id, BOMHeader.is_active == True)
-            )
-            bom_result = await db.execute(bom_query)
-            bom = bom_result.scalar_one_or_none()
-
-            if bom:
-                items = []
-                for detail in bom.details:
-                    items.append({
-                        "level": 1,
-                        "item_code": detail.component_code,
-                        "item_name": detail.component_name or detail.component_code,
-                        "qty_per": float(detail.quantity),
-                        "unit": detail.unit.value if detail.unit else "EA",
-                        "total_qty": float(detail.quantity),
-                        "children": []  # 실제 다단계 전개 구현 필요
-                    })
-
-                return {
-                    "product_code": product_code,
-                    "product_name": product.product_name,
-                    "explosion_level": level,
-                    "items": items,
-                    "total_components": len(items),
-                    "total_cost": 0,  # 원가 계산 필요
-                }
-
-        # DB에 없으면 빈 응답 반환
         return {
             "product_code": product_code,
-            "product_name": "",
+            "product_name": graph.names.get(product_code, "") if items else "",
             "explosion_level": level,
-            "items": [],
-            "total_components": 0,
-            "total_cost": 0,
+            "max_depth": depth,
+            "items": items,
+            "total_components": total_components,
+            "total_cost": round(graph.rolled_cost(product_code) * qty, 2) if items else 0,
+            "cycles": sorted(cycles),  # 순환 참조로 전개를 중단한 품목
         }
     except Exception as e:
         print(f"Error in BOM explosion: {e}")
@@ -22,6 +22,7 @@ from sqlalchemy import text
 from enum import Enum
 
 from api.database import get_db
+from api.services.genealogy import get_genealogy_service
 
 router = APIRouter(prefix="/scenario-modifier", tags=["Scenario Modifier"])
 
@@ -1914,6 +1915,12 @@ async def modify_lot_contamination(
 
     await db.commit()
 
+    # 영향 범위: 오염 로트의 투입 자재 로트 → 같은 자재가 들어간 다른 로트
+    contaminated_lots = {value['lot_no'] for value in original_values if value['lot_no']}
+    blast_radius = await get_genealogy_service().blast_radius(
+        db, uuid.UUID(TENANT_ID), contaminated_lots
+    ) if contaminated_lots else {'source_lots': [], 'affected_lots': [], 'truncated': False}
+
     _modification_history[modification_id] = ModificationHistory(
         id=modification_id,
         timestamp=datetime.now(),
@@ -1928,7 +1935,9 @@ async def modify_lot_contamination(
         'modification_id': modification_id,
         'records_modified': modified_count,
         'lots_contaminated': modified_count,
-        'average_contamination_rate': f"{(0.5 + intensity * 0.5) * 100:.0f}%"
+        'average_contamination_rate': f"{(0.5 + intensity * 0.5) * 100:.0f}%",
+        'suspect_material_lots': blast_radius['source_lots'],
+        'affected_lots': blast_radius['affected_lots'],
     }
 
 
@@ -14,8 +14,9 @@ API Endpoints:
 """
 
 from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, Depends
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
+from datetime import datetime
 import asyncio
 import logging
 
@@ -29,15 +30,39 @@ from ...simulation.generators import (
     ERPTransactionGenerator,
 )
 from ...database import get_db_pool
+from ...websocket.backend import get_broadcast_backend
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/simulation", tags=["Simulation"])
 
-# WebSocket 연결 관리
+# WebSocket 연결 관리 (이 워커의 연결)
 active_websockets: List[WebSocket] = []
 
 
+async def publish_simulation_event(event: Dict[str, Any]):
+    """
+    엔진 이벤트를 모든 워커로 발행
+
+    SimulationEngine.add_event_listener()로 등록 (리더 워커에서 이벤트 발생)
+    """
+    await get_broadcast_backend().publish("simulation", "events", event)
+
+
+async def _deliver_simulation_event(channel: str, event: Dict[str, Any]):
+    """Backend에서 수신한 엔진 이벤트를 이 워커의 WebSocket으로 전송"""
+    if channel != "events":
+        return
+    for ws in list(active_websockets):
+        try:
+            await ws.send_json(event)
+        except Exception as e:
+            logger.error(f"Failed to send WebSocket message: {e}")
+
+
+get_broadcast_backend().add_handler("simulation", _deliver_simulation_event)
+
+
 class SimulationConfigUpdate(BaseModel):
     """시뮬레이션 설정 업데이트 모델"""
     tenant_id: Optional[str] = None
@@ -52,6 +77,12 @@ class SimulationConfigUpdate(BaseModel):
     production_variance: Optional[float] = None
     auto_gap_fill: Optional[bool] = None
     min_gap_seconds: Optional[int] = None
+    clock_mode: Optional[str] = Field(None, pattern="^(realtime|accelerated|max_speed)$")
+    speed_multiplier: Optional[float] = Field(None, gt=0)
+    virtual_start: Optional[datetime] = None
+    virtual_until: Optional[datetime] = None
+    max_speed_batch_size: Optional[int] = Field(None, gt=0)
+    event_throttle_seconds: Optional[float] = Field(None, ge=0)
 
 
 class SimulationStartRequest(BaseModel):
@@ -314,19 +345,7 @@ async def websocket_endpoint(websocket: WebSocket):
     active_websockets.append(websocket)
     logger.info(f"WebSocket connected. Total: {len(active_websockets)}")
 
-    # 엔진에 이벤트 리스너 등록
-    engine = get_simulation_engine()
-
-    async def broadcast_handler(event: Dict[str, Any]):
-        """이벤트를 WebSocket으로 전송"""
-        for ws in active_websockets:
-            try:
-                await ws.send_json(event)
-            except Exception as e:
-                logger.error(f"Failed to send WebSocket message: {e}")
-
-    engine.add_event_listener(broadcast_handler)
-
+    # 엔진 이벤트는 publish_simulation_event -> backend -> _deliver_simulation_event 경로로 전달
     try:
         # 연결 유지 및 메시지 수신
         while True:
@@ -340,5 +359,4 @@ async def websocket_endpoint(websocket: WebSocket):
         logger.error(f"WebSocket error: {e}")
     finally:
         active_websockets.remove(websocket)
-        engine.remove_event_listener(broadcast_handler)
         logger.info(f"WebSocket removed. Total: {len(active_websockets)}")
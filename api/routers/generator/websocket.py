@@ -8,18 +8,30 @@ from datetime import datetime
 from typing import Dict, Set, Any
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from api.schemas.generator import WSMessageType
+from api.websocket.backend import get_broadcast_backend
 
 router = APIRouter()
 
 
+# Backend channel for broadcast to all connections
+ALL_CHANNEL = "*"
+
+
 class ConnectionManager:
-    """WebSocket connection manager for generator progress"""
+    """
+    WebSocket connection manager for generator progress
+
+    Messages are published through the broadcast backend ("generator"
+    namespace) so subscribers connected to any worker receive them.
+    """
 
     def __init__(self):
         # job_id -> set of websocket connections
         self.active_connections: Dict[str, Set[WebSocket]] = {}
         # All connections (for broadcast)
         self.all_connections: Set[WebSocket] = set()
+        self.backend = get_broadcast_backend()
+        self.backend.add_handler("generator", self._on_backend_message)
 
     async def connect(self, websocket: WebSocket, job_id: str = None):
         """Accept and register a WebSocket connection"""
@@ -41,7 +53,21 @@ class ConnectionManager:
                 del self.active_connections[job_id]
 
     async def send_to_job(self, job_id: str, message: Dict[str, Any]):
-        """Send message to all connections watching a specific job"""
+        """Send message to all connections watching a specific job (on every worker)"""
+        await self.backend.publish("generator", job_id, message)
+
+    async def broadcast(self, message: Dict[str, Any]):
+        """Broadcast message to all connections (on every worker)"""
+        await self.backend.publish("generator", ALL_CHANNEL, message)
+
+    async def _on_backend_message(self, channel: str, message: Dict[str, Any]):
+        if channel == ALL_CHANNEL:
+            await self._broadcast_local(message)
+        else:
+            await self._send_to_job_local(channel, message)
+
+    async def _send_to_job_local(self, job_id: str, message: Dict[str, Any]):
+        """Send message to local connections watching a specific job"""
         if job_id in self.active_connections:
             disconnected = set()
             for connection in self.active_connections[job_id]:
@@ -54,8 +80,8 @@ class ConnectionManager:
             for conn in disconnected:
                 self.disconnect(conn, job_id)
 
-    async def broadcast(self, message: Dict[str, Any]):
-        """Broadcast message to all connections"""
+    async def _broadcast_local(self, message: Dict[str, Any]):
+        """Broadcast message to all local connections"""
         disconnected = set()
         for connection in self.all_connections:
             try:
@@ -35,6 +35,7 @@ from api.schemas.mes.equipment import (
     EquipmentStatusValue,
 )
 from api.services.mock_data import MockDataService
+from api.simulation.downsampling import fetch_raw, fetch_rollup, resolve_resolution
 
 
 router = APIRouter(prefix="/equipment", tags=["MES - Equipment"])
@@ -107,6 +108,26 @@ async def get_all_equipment_status(
         return MockDataService.get_all_equipment_status_formatted(line_code)
 
 
+@router.get("/status/history")
+async def get_equipment_status_history(
+    start: datetime,
+    db: AsyncSession = Depends(get_db),
+    equipment_code: Optional[str] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    resolution: str = Query("auto", pattern="^(auto|raw|1m|1h)$"),
+):
+    """Get equipment status history (raw, or 1-minute / 1-hour rollups for older or longer ranges)"""
+    tenant_id = UUID(settings.default_tenant_id)
+    end = end or datetime.now(start.tzinfo)
+
+    if resolution == "auto":
+        resolution = await resolve_resolution(db, "mes_equipment_status", tenant_id, start, end)
+    if resolution == "raw":
+        return await fetch_raw(db, "mes_equipment_status", tenant_id, start, end, equipment_code, limit)
+    return await fetch_rollup(db, "mes_equipment_status", resolution, tenant_id, start, end, equipment_code, limit)
+
+
 # ==================== OEE - Static Routes ====================
 
 @router.get("/oee")
@@ -25,6 +25,7 @@ from api.schemas.mes.production import (
     LineProductionStatus,
 )
 from api.services.mock_data import MockDataService
+from api.simulation.downsampling import fetch_rollup, resolve_resolution
 
 
 router = APIRouter(prefix="/production", tags=["MES - Production"])
@@ -240,15 +241,35 @@ async def get_realtime_production(
     db: AsyncSession = Depends(get_db),
     line_code: Optional[str] = None,
     limit: int = Query(100, ge=1, le=500),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    resolution: str = Query("auto", pattern="^(auto|raw|1m|1h)$"),
 ):
-    """Get realtime production data (with mock data fallback)"""
+    """Get realtime production data (with mock data fallback)
+
+    With start/end, older or longer ranges are served from the 1-minute / 1-hour
+    rollups (resolution=auto picks the finest one still retained for the range).
+    """
     try:
         tenant_id = UUID(settings.default_tenant_id)
 
+        if start and resolution != "raw":
+            end = end or datetime.now(start.tzinfo)
+            if resolution == "auto":
+                resolution = await resolve_resolution(db, "mes_realtime_production", tenant_id, start, end)
+            if resolution != "raw":
+                return await fetch_rollup(
+                    db, "mes_realtime_production", resolution, tenant_id, start, end, line_code, limit
+                )
+
         query = select(RealtimeProduction).where(RealtimeProduction.tenant_id == tenant_id)
 
         if line_code:
             query = query.where(RealtimeProduction.line_code == line_code)
+        if start:
+            query = query.where(RealtimeProduction.timestamp >= start)
+        if end:
+            query = query.where(RealtimeProduction.timestamp < end)
 
         query = query.order_by(RealtimeProduction.timestamp.desc()).limit(limit)
 
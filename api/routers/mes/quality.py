@@ -16,6 +16,7 @@ from api.models.mes.quality import (
     DefectType,
     InspectionResult,
     SPCData,
+    SPCViolation,
     Traceability,
 )
 from api.schemas.mes.quality import (
@@ -30,9 +31,13 @@ from api.schemas.mes.quality import (
     SPCDataCreate,
     SPCDataResponse,
     SPCChartData,
+    SPCViolationResponse,
     QualitySummary,
 )
 from api.services.mock_data import MockDataService
+from api.services.genealogy import DOWNSTREAM, UPSTREAM, get_genealogy_service
+from api.services.spc import get_spc_service
+from generators.core.spc import NELSON_RULES, SPCChart
 
 
 router = APIRouter(prefix="/quality", tags=["MES - Quality"])
@@ -359,6 +364,30 @@ async def get_spc_data(
     return [SPCDataResponse.model_validate(d) for d in data]
 
 
+@router.post("/spc/data", response_model=SPCDataResponse)
+async def create_spc_data(
+    data: SPCDataCreate,
+    db: AsyncSession = Depends(get_db),
+):
+    """Record an SPC measurement and update its control chart"""
+    tenant_id = UUID(settings.default_tenant_id)
+
+    spc = SPCData(
+        id=uuid4(),
+        tenant_id=tenant_id,
+        spc_no=f"SPC-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}-{str(uuid4())[:4].upper()}",
+        measurement_datetime=datetime.utcnow(),
+        **data.model_dump(exclude={"control_lower", "control_upper"})
+    )
+    # 관리도 상태 갱신 (관리한계/Cpk/out_of_control 기록 + 규칙 위반 저장)
+    await get_spc_service().record(db, spc)
+    db.add(spc)
+    await db.commit()
+    await db.refresh(spc)
+
+    return SPCDataResponse.model_validate(spc)
+
+
 @router.get("/spc/chart/{measurement_type}", response_model=SPCChartData)
 async def get_spc_chart_data(
     measurement_type: str,
@@ -367,60 +396,63 @@ async def get_spc_chart_data(
     product_code: Optional[str] = None,
     limit: int = Query(100, ge=1, le=500),
 ):
-    """Get SPC chart data with control limits"""
-    tenant_id = UUID(settings.default_tenant_id)
+    """Get SPC chart data with control limits
 
-    query = select(SPCData).where(
-        and_(
-            SPCData.tenant_id == tenant_id,
-            SPCData.measurement_type == measurement_type,
-        )
-    )
-
-    if line_code:
-        query = query.where(SPCData.line_code == line_code)
-    if product_code:
-        query = query.where(SPCData.product_code == product_code)
-
-    query = query.order_by(SPCData.measurement_datetime.desc()).limit(limit)
-
-    result = await db.execute(query)
-    data = result.scalars().all()
+    Limits, statistics and capability come from the precomputed chart state;
+    only the latest points are read for plotting. Without line/product the
+    chart of the most recent matching measurement is returned.
+    """
+    tenant_id = UUID(settings.default_tenant_id)
 
-    if not data:
+    state = await get_spc_service().get_state(db, tenant_id, measurement_type, line_code, product_code)
+    if state is None:
         raise HTTPException(status_code=404, detail="No SPC data found")
 
-    # Calculate statistics
-    values = [float(d.measured_value) for d in data]
-    mean = sum(values) / len(values)
-    variance = sum((x - mean) ** 2 for x in values) / len(values)
-    std_dev = variance ** 0.5
-
-    # Control limits (3 sigma)
-    ucl = mean + 3 * std_dev
-    lcl = mean - 3 * std_dev
+    key = (
+        SPCData.tenant_id == tenant_id,
+        SPCData.line_code == state.line_code,
+        SPCData.product_code == state.product_code,
+        SPCData.measurement_type == measurement_type,
+    )
+    result = await db.execute(
+        select(SPCData).where(*key).order_by(SPCData.measurement_datetime.desc()).limit(limit)
+    )
+    data = result.scalars().all()
 
-    # Get spec limits from first record
-    usl = float(data[0].spec_upper) if data[0].spec_upper else None
-    lsl = float(data[0].spec_lower) if data[0].spec_lower else None
+    violations = await db.execute(
+        select(SPCViolation).where(
+            SPCViolation.tenant_id == tenant_id,
+            SPCViolation.line_code == state.line_code,
+            SPCViolation.product_code == state.product_code,
+            SPCViolation.measurement_type == measurement_type,
+        ).order_by(SPCViolation.measurement_datetime.desc()).limit(limit)
+    )
 
-    # Calculate Cpk
-    cpk = None
-    if usl is not None and lsl is not None and std_dev > 0:
-        cpu = (usl - mean) / (3 * std_dev)
-        cpl = (mean - lsl) / (3 * std_dev)
-        cpk = min(cpu, cpl)
+    chart = SPCChart.from_dict(state.state)
+    limits = chart.subgroups.limits()
+    capability = chart.capability()
 
     return SPCChartData(
         measurement_type=measurement_type,
         measurements=[SPCDataResponse.model_validate(d) for d in data],
-        mean=mean,
-        std_dev=std_dev,
-        ucl=ucl,
-        lcl=lcl,
-        usl=usl,
-        lsl=lsl,
-        cpk=cpk,
+        mean=chart.stats.mean,
+        std_dev=chart.stats.std,
+        ucl=chart.ucl if chart.ucl is not None else chart.stats.mean,
+        lcl=chart.lcl if chart.lcl is not None else chart.stats.mean,
+        usl=chart.usl,
+        lsl=chart.lsl,
+        cpk=capability["cpk"],
+        line_code=state.line_code,
+        product_code=state.product_code,
+        sample_count=chart.stats.n,
+        subgroup_size=chart.subgroups.size,
+        center_line=chart.center,
+        limits_frozen=chart.frozen,
+        ppk=capability["ppk"],
+        xbar_r=limits["xbar_r"],
+        xbar_s=limits["xbar_s"],
+        violation_counts={NELSON_RULES[rule]: count for rule, count in sorted(chart.violations.items())},
+        violations=[SPCViolationResponse.model_validate(v) for v in violations.scalars().all()],
     )
 
 
@@ -469,3 +501,38 @@ async def get_traceability(
         ],
         "material_traceability": traces[0].material_lots if traces else None,
     }
+
+
+@router.get("/traceability/{lot_no}/genealogy")
+async def get_lot_genealogy(
+    lot_no: str,
+    direction: str = Query("both", pattern="^(upstream|downstream|both)$"),
+    depth: int = Query(5, ge=1, le=20),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    로트 계보 조회
+
+    - upstream: 이 로트에 투입된 자재/반제품 로트
+    - downstream: 이 로트가 투입된 하위 로트 (오염 릴 → 완제품 로트)
+    """
+    tenant_id = UUID(settings.default_tenant_id)
+    service = get_genealogy_service()
+
+    response = {"lot_no": lot_no, "depth": depth}
+    for name in (UPSTREAM, DOWNSTREAM):
+        if direction in (name, "both"):
+            response[name] = await service.trace(db, tenant_id, [lot_no], name, depth)
+    return response
+
+
+@router.get("/traceability/{lot_no}/blast-radius")
+async def get_lot_blast_radius(
+    lot_no: str,
+    depth: int = Query(10, ge=1, le=20),
+    db: AsyncSession = Depends(get_db),
+):
+    """오염 영향 범위 - 투입 자재 로트와, 같은 자재 로트가 들어간 모든 로트"""
+    tenant_id = UUID(settings.default_tenant_id)
+    result = await get_genealogy_service().blast_radius(db, tenant_id, [lot_no], depth)
+    return {"lot_no": lot_no, **result}
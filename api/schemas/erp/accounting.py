@@ -150,6 +150,13 @@ class VoucherApproval(BaseModel):
     comment: Optional[str] = Field(None, description="코멘트")
 
 
+class VoucherPostBatch(BaseModel):
+    """전표 일괄 전기"""
+    voucher_nos: Optional[List[str]] = Field(None, description="전표번호 목록 (생략 시 모든 승인 전표)")
+    fiscal_year: Optional[str] = Field(None, description="회계연도")
+    fiscal_period: Optional[str] = Field(None, description="회계기간")
+
+
 # ============== 장부 관리 ==============
 
 class GeneralLedgerResponse(BaseModel):
@@ -263,6 +263,23 @@ class SPCDataResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class SPCViolationResponse(BaseModel):
+    """Response schema for an SPC (Nelson) rule violation"""
+    id: UUID
+    spc_data_id: Optional[UUID] = None
+    line_code: str
+    product_code: str
+    measurement_type: str
+    measurement_datetime: datetime
+    rule_no: int
+    rule_code: str
+    measured_value: Decimal
+    center_line: Optional[Decimal] = None
+    sigma: Optional[Decimal] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class SPCChartData(BaseModel):
     """SPC chart data"""
     measurement_type: str
@@ -274,6 +291,18 @@ class SPCChartData(BaseModel):
     usl: Optional[float] = None
     lsl: Optional[float] = None
     cpk: Optional[float] = None
+    # Precomputed chart state
+    line_code: Optional[str] = None
+    product_code: Optional[str] = None
+    sample_count: int = 0
+    subgroup_size: Optional[int] = None
+    center_line: Optional[float] = None
+    limits_frozen: bool = False
+    ppk: Optional[float] = None
+    xbar_r: Optional[Dict[str, float]] = None
+    xbar_s: Optional[Dict[str, float]] = None
+    violation_counts: Dict[str, int] = {}
+    violations: List[SPCViolationResponse] = []
 
 
 # ==================== Quality Summary ====================
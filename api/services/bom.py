@@ -0,0 +1,352 @@
+"""
+BOM Service - 메모리 BOM 그래프 기반 다단계 전개 / 원가 롤업 / 역전개
+
+- erp_bom_header/erp_bom_detail을 제품코드 → 구성품 인접 리스트로 적재하고
+  구성품 → 상위품목 역인덱스(where-used)를 함께 유지
+- 전개는 스택 기반 반복(재귀 없음)으로 N레벨까지, 경로상 순환은 감지 후 중단
+- 소요량은 상위 누적수량 × qty_per × (1 + scrap_rate)로 누적
+- 롤업 표준원가/단위 소요량은 (제품, BOM 버전)별로 메모이즈하고,
+  BOM 또는 품목 표준원가가 바뀌면 해당 품목과 모든 상위품목만 무효화
+- 변경 감지는 요청마다 집계 쿼리 1회(건수/최종 수정시각)로 수행
+"""
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.models.erp.master import BOMDetail, BOMHeader, ProductMaster
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class BOMLine:
+    """BOM 구성품 1행"""
+    item_seq: int
+    component_code: str
+    component_name: str
+    qty_per: float
+    scrap_rate: float  # 비율 (0.02 = 2%)
+    uom: str
+
+    @property
+    def gross_qty(self) -> float:
+        """스크랩 포함 소요량"""
+        return self.qty_per * (1 + self.scrap_rate)
+
+
+@dataclass(frozen=True)
+class BOMNode:
+    """제품 1개의 유효 BOM"""
+    bom_id: int
+    product_code: str
+    version: str
+    lines: Tuple[BOMLine, ...] = field(default_factory=tuple)
+
+
+class BOMGraph:
+    """BOM 인접 리스트 + 역인덱스 + 메모이즈된 롤업"""
+
+    def __init__(self):
+        self.boms: Dict[str, BOMNode] = {}
+        self.parents: Dict[str, Set[str]] = {}
+        self.standard_costs: Dict[str, float] = {}
+        self.names: Dict[str, str] = {}
+        self._costs: Dict[Tuple[str, str], float] = {}
+        self._requirements: Dict[Tuple[str, str], Dict[str, float]] = {}
+        self.cycles: Set[Tuple[str, str]] = set()
+
+    # ---------- 적재 / 무효화 ----------
+
+    def load(self, boms: Dict[str, BOMNode], standard_costs: Dict[str, float], names: Dict[str, str]) -> Set[str]:
+        """
+        그래프 교체. 변경된 품목과 그 상위품목의 캐시만 무효화하고
+        무효화된 품목코드를 반환
+        """
+        changed = {
+            code for code in set(self.boms) | set(boms)
+            if self.boms.get(code) != boms.get(code)
+        }
+        changed |= {
+            code for code in set(self.standard_costs) | set(standard_costs)
+            if self.standard_costs.get(code) != standard_costs.get(code)
+        }
+        # 상위품목 탐색은 이전 그래프 기준 (삭제된 연결도 포함되도록)
+        stale = self.ancestors(changed)
+
+        self.boms = boms
+        self.standard_costs = standard_costs
+        self.names = names
+        self.parents = {}
+        for node in boms.values():
+            for line in node.lines:
+                self.parents.setdefault(line.component_code, set()).add(node.product_code)
+
+        stale |= self.ancestors(changed)
+        self._forget(stale)
+        return stale
+
+    def invalidate(self, product_codes: Optional[Iterable[str]] = None) -> Set[str]:
+        """품목(과 모든 상위품목)의 캐시 무효화. 인자가 없으면 전체"""
+        if product_codes is None:
+            stale = set(self.boms)
+            self._costs.clear()
+            self._requirements.clear()
+            self.cycles.clear()
+            return stale
+        stale = self.ancestors(product_codes)
+        self._forget(stale)
+        return stale
+
+    def _forget(self, product_codes: Set[str]) -> None:
+        if not product_codes:
+            return
+        for cache in (self._costs, self._requirements):
+            for key in [key for key in cache if key[0] in product_codes]:
+                del cache[key]
+        self.cycles = {edge for edge in self.cycles if edge[0] not in product_codes}
+
+    def ancestors(self, product_codes: Iterable[str]) -> Set[str]:
+        """품목 자신 + 직/간접 상위품목 전체"""
+        seen = set(product_codes)
+        stack = list(seen)
+        while stack:
+            for parent in self.parents.get(stack.pop(), ()):
+                if parent not in seen:
+                    seen.add(parent)
+                    stack.append(parent)
+        return seen
+
+    # ---------- 전개 ----------
+
+    def explode(self, product_code: str, max_level: int = 99, quantity: float = 1.0) -> List[Dict[str, Any]]:
+        """
+        다단계 정전개 (트리)
+
+        각 노드의 total_qty는 상위 누적수량 × 스크랩 포함 소요량.
+        경로상 이미 있는 품목이 다시 나오면 cycle=True로 표시하고 더 내려가지 않음
+        """
+        root = self.boms.get(product_code)
+        if root is None:
+            return []
+
+        items: List[Dict[str, Any]] = []
+        # (구성품 목록, 부모 children 리스트, 레벨, 상위 누적수량, 경로)
+        stack = [(root.lines, items, 1, quantity, (product_code,))]
+        while stack:
+            lines, siblings, level, parent_qty, path = stack.pop()
+            for line in lines:
+                code = line.component_code
+                total_qty = parent_qty * line.gross_qty
+                node = {
+                    "level": level,
+                    "item_code": code,
+                    "item_name": line.component_name or self.names.get(code, code),
+                    "qty_per": line.qty_per,
+                    "scrap_rate": line.scrap_rate * 100,  # 비율을 백분율로
+                    "unit": line.uom,
+                    "total_qty": round(total_qty, 6),
+                    "unit_cost": round(self.rolled_cost(code), 4),
+                    "children": [],
+                }
+                if code in path:
+                    node["cycle"] = True
+                    self.cycles.add((path[-1], code))
+                elif code in self.boms and level < max_level:
+                    stack.append((self.boms[code].lines, node["children"], level + 1, total_qty, path + (code,)))
+                siblings.append(node)
+        return items
+
+    def _rollup(self, product_code: str) -> None:
+        """후위순회(반복)로 원가/단위 소요량을 하위부터 메모이즈"""
+        if product_code not in self.boms:
+            return
+        on_path: Set[str] = set()
+        stack: List[Tuple[str, bool]] = [(product_code, False)]
+        while stack:
+            code, expanded = stack.pop()
+            node = self.boms[code]
+            key = (code, node.version)
+            if expanded:
+                on_path.discard(code)
+                cost = 0.0
+                requirements: Dict[str, float] = {}
+                for line in node.lines:
+                    child = line.component_code
+                    child_node = self.boms.get(child)
+                    if child_node is None:
+                        cost += line.gross_qty * self.standard_costs.get(child, 0.0)
+                        requirements[child] = requirements.get(child, 0.0) + line.gross_qty
+                        continue
+                    child_key = (child, child_node.version)
+                    if child_key not in self._costs:
+                        # 순환 연결 → 원가/소요량에서 제외
+                        self.cycles.add((code, child))
+                        continue
+                    cost += line.gross_qty * self._costs[child_key]
+                    for leaf, qty in self._requirements[child_key].items():
+                        requirements[leaf] = requirements.get(leaf, 0.0) + line.gross_qty * qty
+                self._costs[key] = cost
+                self._requirements[key] = requirements
+                continue
+            if key in self._costs or code in on_path:
+                continue
+            on_path.add(code)
+            stack.append((code, True))
+            for line in node.lines:
+                child_node = self.boms.get(line.component_code)
+                if child_node is not None and line.component_code not in on_path \
+                        and (line.component_code, child_node.version) not in self._costs:
+                    stack.append((line.component_code, False))
+
+    def rolled_cost(self, product_code: str) -> float:
+        """롤업 표준원가 (BOM이 없으면 품목 표준원가)"""
+        node = self.boms.get(product_code)
+        if node is None:
+            return self.standard_costs.get(product_code, 0.0)
+        key = (product_code, node.version)
+        if key not in self._costs:
+            self._rollup(product_code)
+        return self._costs[key]
+
+    def requirements(self, product_code: str) -> Dict[str, float]:
+        """제품 1단위당 최하위 자재 소요량 (스크랩 포함)"""
+        node = self.boms.get(product_code)
+        if node is None:
+            return {}
+        key = (product_code, node.version)
+        if key not in self._requirements:
+            self._rollup(product_code)
+        return self._requirements[key]
+
+    def top_level(self) -> List[str]:
+        """어떤 BOM의 구성품도 아닌 제품 (완제품)"""
+        return sorted(code for code in self.boms if code not in self.parents)
+
+    def mrp(self, demand: Dict[str, float]) -> Dict[str, float]:
+        """제품별 수요량 → 자재별 총소요량"""
+        totals: Dict[str, float] = {}
+        for product_code, qty in demand.items():
+            for leaf, per_unit in self.requirements(product_code).items():
+                totals[leaf] = totals.get(leaf, 0.0) + qty * per_unit
+        return totals
+
+    # ---------- 역전개 ----------
+
+    def where_used(self, component_codes: Iterable[str]) -> Dict[str, Dict[str, List[str]]]:
+        """구성품별 직접 상위품목 / 최상위 제품 (일괄)"""
+        result = {}
+        for code in component_codes:
+            ancestors = self.ancestors([code]) - {code}
+            result[code] = {
+                "parents": sorted(self.parents.get(code, ())),
+                "top_level": sorted(a for a in ancestors if a not in self.parents),
+            }
+        return result
+
+
+class BOMService:
+    """BOM 그래프 적재 / 변경 감지"""
+
+    def __init__(self):
+        self.graph = BOMGraph()
+        self._signature: Optional[Tuple] = None
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    async def _fetch_signature(db: AsyncSession) -> Tuple:
+        """BOM/품목 변경 감지용 (건수, 최종 생성/수정시각)"""
+        headers = (await db.execute(
+            select(func.count(BOMHeader.id), func.max(BOMHeader.created_at), func.max(BOMHeader.updated_at))
+        )).one()
+        details = (await db.execute(
+            select(func.count(BOMDetail.id), func.max(BOMDetail.created_at), func.max(BOMDetail.updated_at))
+        )).one()
+        products = (await db.execute(
+            select(func.count(ProductMaster.id), func.max(ProductMaster.updated_at))
+        )).one()
+        return tuple(headers) + tuple(details) + tuple(products)
+
+    async def _load(self, db: AsyncSession) -> Tuple[Dict[str, BOMNode], Dict[str, float], Dict[str, str]]:
+        today = date.today()
+        headers = (await db.execute(
+            select(BOMHeader.id, BOMHeader.product_code, BOMHeader.product_id, BOMHeader.bom_version,
+                   BOMHeader.effective_date, BOMHeader.expiry_date)
+            .where(BOMHeader.is_active == True)
+            .order_by(BOMHeader.effective_date.nulls_first(), BOMHeader.id)
+        )).all()
+        products = (await db.execute(
+            select(ProductMaster.id, ProductMaster.product_code, ProductMaster.product_name, ProductMaster.standard_cost)
+        )).all()
+        codes_by_id = {p.id: p.product_code for p in products}
+
+        # 제품별 유효 BOM 1개 (유효기간 내 가장 최근 적용분)
+        effective: Dict[str, Any] = {}
+        for h in headers:
+            if h.effective_date and h.effective_date > today:
+                continue
+            if h.expiry_date and h.expiry_date < today:
+                continue
+            code = h.product_code or codes_by_id.get(h.product_id)
+            if code:
+                effective[code] = h
+
+        lines: Dict[int, List[BOMLine]] = {h.id: [] for h in effective.values()}
+        if lines:
+            details = (await db.execute(
+                select(BOMDetail.header_id, BOMDetail.item_seq, BOMDetail.component_code,
+                       BOMDetail.component_name, BOMDetail.quantity, BOMDetail.scrap_rate, BOMDetail.uom)
+                .where(BOMDetail.header_id.in_(list(lines)))
+                .order_by(BOMDetail.header_id, BOMDetail.item_seq)
+            )).all()
+            for d in details:
+                lines[d.header_id].append(BOMLine(
+                    item_seq=d.item_seq,
+                    component_code=d.component_code,
+                    component_name=d.component_name or "",
+                    qty_per=float(d.quantity or 0),
+                    scrap_rate=float(d.scrap_rate or 0),
+                    uom=d.uom or "EA",
+                ))
+
+        boms = {
+            code: BOMNode(bom_id=h.id, product_code=code, version=h.bom_version or "1.0", lines=tuple(lines[h.id]))
+            for code, h in effective.items()
+        }
+        standard_costs = {p.product_code: float(p.standard_cost) for p in products if p.standard_cost is not None}
+        names = {p.product_code: p.product_name for p in products}
+        return boms, standard_costs, names
+
+    async def refresh(self, db: AsyncSession) -> BOMGraph:
+        """변경이 있으면 그래프를 다시 적재하고 반환"""
+        signature = await self._fetch_signature(db)
+        if signature == self._signature:
+            return self.graph
+        async with self._lock:
+            if signature != self._signature:
+                boms, standard_costs, names = await self._load(db)
+                stale = self.graph.load(boms, standard_costs, names)
+                self._signature = signature
+                logger.info("BOM 그래프 적재: BOM %d건, 캐시 무효화 %d품목", len(boms), len(stale))
+        return self.graph
+
+    def invalidate(self, product_codes: Optional[Iterable[str]] = None) -> None:
+        """BOM 변경 직후 호출 (다음 refresh에서 다시 적재)"""
+        self.graph.invalidate(product_codes)
+        self._signature = None
+
+
+# 싱글톤 인스턴스
+_bom_service: Optional[BOMService] = None
+
+
+def get_bom_service() -> BOMService:
+    """BOMService 싱글톤 인스턴스 반환"""
+    global _bom_service
+    if _bom_service is None:
+        _bom_service = BOMService()
+    return _bom_service
@@ -0,0 +1,322 @@
+"""
+Fiscal Close Service - 결산 시 재무제표 스냅샷 생성
+
+- 총계정원장 행(자기 계정 + 하위 계정 합계)을 기간별로 한 번에 읽어
+  시산표(TB) / 재무상태표(BS) / 손익계산서(IS)를 계산 → 계정 수에 비례
+- 마감 시 원장 잔액을 해당 기간부터 이월 재계산(roll forward)한 뒤
+  erp_financial_statement에 확정 스냅샷 저장 (잔액이 바뀐 이후 마감 기간도 재생성),
+  재개설 시 삭제
+- 마감된 기간의 재무제표 조회는 스냅샷 1행 읽기
+- 과거 마감 기간 전체 재생성: python -m api.services.closing [--year 2024]
+"""
+import asyncio
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.models.erp.accounting import (
+    AccountCode, AccountType, ClosingStatus, FinancialStatement, FiscalPeriod, GeneralLedger
+)
+from api.schemas.erp.accounting import (
+    BalanceSheetResponse, IncomeStatementResponse, TrialBalanceResponse
+)
+from api.services.ledger import get_ledger_service
+
+STATEMENT_NAMES = {
+    "TB": "시산표",
+    "BS": "재무상태표",
+    "IS": "손익계산서",
+}
+
+ZERO = Decimal("0")
+
+
+class _LedgerRow:
+    """원장 행 + 트리 위치"""
+    __slots__ = ("account_code", "account_name", "account_type", "debit_total",
+                 "credit_total", "closing_balance", "level", "is_leaf")
+
+    def __init__(self, row: Any, level: int, is_leaf: bool):
+        self.account_code = row.account_code
+        self.account_name = row.account_name
+        self.account_type = row.account_type
+        self.debit_total = row.debit_total
+        self.credit_total = row.credit_total
+        self.closing_balance = row.closing_balance
+        self.level = level
+        self.is_leaf = is_leaf
+
+
+def _balance_accounts(rows: List[Any], account_type: AccountType) -> List[Dict[str, Any]]:
+    """계정 유형의 2레벨 계정별 잔액"""
+    return [
+        {"account_code": row.account_code, "account_name": row.account_name, "balance": row.closing_balance or ZERO}
+        for row in rows
+        if row.account_type == account_type and row.level == 2
+    ]
+
+
+def _activity_accounts(rows: List[Any], account_type: AccountType, sign: int) -> List[Dict[str, Any]]:
+    """계정 유형의 2레벨 계정별 당기 발생액"""
+    return [
+        {
+            "account_code": row.account_code,
+            "account_name": row.account_name,
+            "amount": sign * ((row.debit_total or ZERO) - (row.credit_total or ZERO)),
+        }
+        for row in rows
+        if row.account_type == account_type and row.level == 2
+    ]
+
+
+class FiscalCloseService:
+    """재무제표 계산 / 스냅샷 관리"""
+
+    async def _ledger_rows(
+        self, db: AsyncSession, periods: Optional[Iterable[Tuple[str, str]]] = None
+    ) -> Dict[Tuple[str, str], List[Any]]:
+        """기간별 원장 행 + 계정 트리 위치 (level: 1=최상위, 2=직속 하위, ...)"""
+        query = select(
+            GeneralLedger.fiscal_year,
+            GeneralLedger.fiscal_period,
+            GeneralLedger.account_code,
+            AccountCode.account_name,
+            AccountCode.account_type,
+            GeneralLedger.debit_total,
+            GeneralLedger.credit_total,
+            GeneralLedger.closing_balance,
+        ).join(
+            AccountCode, GeneralLedger.account_code == AccountCode.account_code
+        ).order_by(GeneralLedger.account_code)
+        if periods is not None:
+            query = query.where(tuple_(GeneralLedger.fiscal_year, GeneralLedger.fiscal_period).in_(list(periods)))
+
+        paths = await get_ledger_service().account_paths(db)
+        parents = {path[1] for path in paths.values() if len(path) > 1}
+
+        grouped: Dict[Tuple[str, str], List[Any]] = defaultdict(list)
+        for row in (await db.execute(query)).all():
+            level = len(paths.get(row.account_code, (row.account_code,)))
+            is_leaf = row.account_code not in parents
+            grouped[(row.fiscal_year, row.fiscal_period)].append(_LedgerRow(row, level, is_leaf))
+        return grouped
+
+    @staticmethod
+    def _compute(fiscal_year: str, fiscal_period: str, rows: List[Any]) -> Dict[str, BaseModel]:
+        """한 기간의 원장 행 → TB/BS/IS"""
+        as_of = date(int(fiscal_year), int(fiscal_period), 28)
+
+        items = []
+        total_debit = ZERO
+        total_credit = ZERO
+        for row in rows:
+            # 말단 계정만 (상위 계정 행은 하위 합계라 중복 집계됨)
+            if not row.is_leaf:
+                continue
+            debit = row.debit_total or ZERO
+            credit = row.credit_total or ZERO
+            items.append({
+                "account_code": row.account_code,
+                "account_name": row.account_name,
+                "debit": debit,
+                "credit": credit,
+            })
+            total_debit += debit
+            total_credit += credit
+
+        balances: Dict[AccountType, Decimal] = defaultdict(lambda: ZERO)
+        activity: Dict[AccountType, Decimal] = defaultdict(lambda: ZERO)
+        for row in rows:
+            if row.level == 1:
+                balances[row.account_type] += row.closing_balance or ZERO
+                activity[row.account_type] += (row.debit_total or ZERO) - (row.credit_total or ZERO)
+
+        total_assets = balances[AccountType.ASSET]
+        total_liabilities = balances[AccountType.LIABILITY]
+        total_equity = balances[AccountType.EQUITY]
+        # 손익은 당기 발생액 (수익: 대변 - 차변, 비용: 차변 - 대변)
+        total_revenue = -activity[AccountType.REVENUE]
+        total_expense = activity[AccountType.EXPENSE]
+        net_income = total_revenue - total_expense
+
+        return {
+            "TB": TrialBalanceResponse(
+                fiscal_year=fiscal_year,
+                fiscal_period=fiscal_period,
+                as_of_date=as_of,
+                items=items,
+                total_debit=total_debit,
+                total_credit=total_credit,
+                is_balanced=total_debit == total_credit,
+            ),
+            "BS": BalanceSheetResponse(
+                fiscal_year=fiscal_year,
+                fiscal_period=fiscal_period,
+                as_of_date=as_of,
+                assets={
+                    "current_assets": {"total": total_assets},
+                    "non_current_assets": {"total": ZERO},
+                    "accounts": _balance_accounts(rows, AccountType.ASSET),
+                },
+                liabilities={
+                    "current_liabilities": {"total": total_liabilities},
+                    "non_current_liabilities": {"total": ZERO},
+                    "accounts": _balance_accounts(rows, AccountType.LIABILITY),
+                },
+                equity={
+                    "capital_stock": total_equity,
+                    "retained_earnings": ZERO,
+                    "total": total_equity,
+                    "accounts": _balance_accounts(rows, AccountType.EQUITY),
+                },
+                total_assets=total_assets,
+                total_liabilities=total_liabilities,
+                total_equity=total_equity,
+            ),
+            "IS": IncomeStatementResponse(
+                fiscal_year=fiscal_year,
+                fiscal_period=fiscal_period,
+                period_start=date(int(fiscal_year), int(fiscal_period), 1),
+                period_end=as_of,
+                revenue={"total": total_revenue, "accounts": _activity_accounts(rows, AccountType.REVENUE, -1)},
+                cost_of_sales={"total": ZERO},
+                gross_profit=total_revenue,
+                operating_expenses={"total": total_expense, "accounts": _activity_accounts(rows, AccountType.EXPENSE, 1)},
+                operating_income=net_income,
+                non_operating={"total": ZERO},
+                income_before_tax=net_income,
+                tax_expense=ZERO,
+                net_income=net_income,
+            ),
+        }
+
+    async def build(self, db: AsyncSession, fiscal_year: str, fiscal_period: str) -> Dict[str, BaseModel]:
+        """원장에서 한 기간의 재무제표 계산 (마감 전 기간 조회용)"""
+        grouped = await self._ledger_rows(db, [(fiscal_year, fiscal_period)])
+        return self._compute(fiscal_year, fiscal_period, grouped.get((fiscal_year, fiscal_period), []))
+
+    async def snapshot(
+        self, db: AsyncSession, fiscal_year: str, fiscal_period: str, statement_type: str
+    ) -> Optional[Dict[str, Any]]:
+        """저장된 재무제표 데이터 (없으면 None)"""
+        result = await db.execute(
+            select(FinancialStatement.statement_data).where(
+                FinancialStatement.fiscal_year == fiscal_year,
+                FinancialStatement.fiscal_period == fiscal_period,
+                FinancialStatement.statement_type == statement_type,
+            ).limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    async def invalidate(self, db: AsyncSession, periods: Iterable[Tuple[str, str]]):
+        """기간들의 스냅샷 삭제 (재개설 / 재생성 전)"""
+        periods = list(periods)
+        if periods:
+            await db.execute(
+                delete(FinancialStatement).where(
+                    tuple_(FinancialStatement.fiscal_year, FinancialStatement.fiscal_period).in_(periods)
+                )
+            )
+
+    async def materialize(
+        self, db: AsyncSession, periods: Iterable[Tuple[str, str]], generated_by: Optional[str] = None
+    ) -> int:
+        """
+        기간들의 TB/BS/IS를 원장 조회 1회로 계산해 확정 스냅샷으로 저장 (커밋은 호출자)
+
+        Returns:
+            저장한 재무제표 수
+        """
+        periods = sorted(set(periods))
+        if not periods:
+            return 0
+        grouped = await self._ledger_rows(db, periods)
+        await self.invalidate(db, periods)
+
+        now = datetime.now()
+        statements = []
+        for fiscal_year, fiscal_period in periods:
+            computed = self._compute(fiscal_year, fiscal_period, grouped.get((fiscal_year, fiscal_period), []))
+            for statement_type, statement in computed.items():
+                statements.append(FinancialStatement(
+                    fiscal_year=fiscal_year,
+                    fiscal_period=fiscal_period,
+                    statement_type=statement_type,
+                    statement_name=STATEMENT_NAMES[statement_type],
+                    statement_data=statement.model_dump(mode="json"),
+                    generated_at=now,
+                    generated_by=generated_by,
+                    is_final=True,
+                    finalized_at=now,
+                    finalized_by=generated_by,
+                ))
+        db.add_all(statements)
+        return len(statements)
+
+    async def closed_periods(
+        self, db: AsyncSession, periods: Optional[Iterable[Tuple[str, str]]] = None
+    ) -> List[Tuple[str, str]]:
+        """마감된 기간 (periods 지정 시 그중 마감된 기간만)"""
+        query = select(FiscalPeriod.fiscal_year, FiscalPeriod.fiscal_period).where(
+            FiscalPeriod.status == ClosingStatus.CLOSED
+        )
+        if periods is not None:
+            periods = list(periods)
+            if not periods:
+                return []
+            query = query.where(tuple_(FiscalPeriod.fiscal_year, FiscalPeriod.fiscal_period).in_(periods))
+        return sorted(tuple(row) for row in (await db.execute(query)).all())
+
+    async def close(self, db: AsyncSession, fiscal_year: str, fiscal_period: str,
+                    generated_by: Optional[str] = None) -> int:
+        """
+        마감: 해당 기간부터 잔액 이월 재계산 후 확정 스냅샷 저장 (커밋은 호출자)
+        이월로 잔액이 바뀐 이후의 마감 기간 스냅샷도 함께 재생성
+        """
+        changed = await get_ledger_service().roll_forward(db, fiscal_year, fiscal_period)
+        later = [p for p in await self.closed_periods(db, changed) if p > (fiscal_year, fiscal_period)]
+        return await self.materialize(db, [(fiscal_year, fiscal_period)] + later, generated_by)
+
+    async def rebuild(self, db: AsyncSession, fiscal_year: Optional[str] = None) -> int:
+        """마감된 모든(또는 해당 연도) 기간의 잔액 이월 재계산 + 스냅샷 재생성"""
+        periods = await self.closed_periods(db)
+        if fiscal_year:
+            periods = [p for p in periods if p[0] == fiscal_year]
+        if periods:
+            await get_ledger_service().roll_forward(db, *periods[0])
+        return await self.materialize(db, periods, generated_by="rebuild")
+
+
+# 싱글톤 인스턴스
+_closing_service: Optional[FiscalCloseService] = None
+
+
+def get_closing_service() -> FiscalCloseService:
+    """FiscalCloseService 싱글톤 인스턴스 반환"""
+    global _closing_service
+    if _closing_service is None:
+        _closing_service = FiscalCloseService()
+    return _closing_service
+
+
+async def _rebuild_main(fiscal_year: Optional[str]):
+    from api.database import async_session_factory
+
+    async with async_session_factory() as db:
+        count = await get_closing_service().rebuild(db, fiscal_year)
+        await db.commit()
+    print(f"재무제표 스냅샷 {count}건 재생성")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="마감 기간 재무제표 스냅샷 재생성")
+    parser.add_argument("--year", type=str, help="회계연도 (생략 시 전체)")
+    args = parser.parse_args()
+    asyncio.run(_rebuild_main(args.year))
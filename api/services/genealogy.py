@@ -0,0 +1,127 @@
+"""
+Lot Genealogy Service - mes_lot_genealogy 기반 정/역 추적
+
+- 정전개(downstream): 투입 로트 → 산출 로트 (오염 릴이 들어간 완제품 로트)
+- 역전개(upstream): 산출 로트 → 투입 로트 (불량 로트에 들어간 자재 릴)
+- 레벨 단위 BFS: 레벨당 인덱스 조회 1회 (parent_lot_no / child_lot_no = ANY(frontier)),
+  방문 집합으로 공유 릴/순환을 한 번만 확장 → 경로 수가 아니라 로트 수에 비례
+"""
+from typing import Any, Dict, Iterable, List, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.models.mes.quality import LotGenealogy
+
+DOWNSTREAM = "downstream"
+UPSTREAM = "upstream"
+
+
+def _edge_to_dict(edge: LotGenealogy) -> Dict[str, Any]:
+    return {
+        "parent_lot_no": edge.parent_lot_no,
+        "child_lot_no": edge.child_lot_no,
+        "relation_type": edge.relation_type,
+        "parent_item_code": edge.parent_item_code,
+        "child_item_code": edge.child_item_code,
+        "production_order_no": edge.production_order_no,
+        "line_code": edge.line_code,
+        "qty": float(edge.qty) if edge.qty is not None else None,
+        "linked_at": edge.linked_at,
+    }
+
+
+class LotGenealogyService:
+    """로트 계보 탐색"""
+
+    def __init__(self, max_lots: int = 10000):
+        self.max_lots = max_lots
+
+    async def trace(
+        self,
+        db: AsyncSession,
+        tenant_id: UUID,
+        lot_nos: Iterable[str],
+        direction: str = DOWNSTREAM,
+        max_depth: int = 10,
+    ) -> Dict[str, Any]:
+        """
+        시작 로트들로부터 한 방향으로 max_depth 레벨까지 탐색
+
+        Returns:
+            lots: {로트번호: 최초 도달 깊이}, edges: 탐색한 연결, truncated: max_lots 초과 여부
+        """
+        if direction == DOWNSTREAM:
+            near, far = LotGenealogy.parent_lot_no, LotGenealogy.child_lot_no
+        else:
+            near, far = LotGenealogy.child_lot_no, LotGenealogy.parent_lot_no
+        far_attr = far.key
+
+        seeds = set(lot_nos)
+        depths: Dict[str, int] = {lot: 0 for lot in seeds}
+        edges: List[LotGenealogy] = []
+        frontier = list(seeds)
+        depth = 0
+        truncated = False
+        while frontier and depth < max_depth:
+            depth += 1
+            result = await db.execute(
+                select(LotGenealogy).where(
+                    LotGenealogy.tenant_id == tenant_id,
+                    near.in_(frontier),
+                )
+            )
+            next_frontier = []
+            for edge in result.scalars():
+                edges.append(edge)
+                lot = getattr(edge, far_attr)
+                if lot not in depths:
+                    depths[lot] = depth
+                    next_frontier.append(lot)
+            if len(depths) > self.max_lots:
+                truncated = True
+                break
+            frontier = next_frontier
+
+        return {
+            "lots": {lot: d for lot, d in depths.items() if lot not in seeds},
+            "edges": [_edge_to_dict(edge) for edge in edges],
+            "truncated": truncated,
+        }
+
+    async def blast_radius(
+        self,
+        db: AsyncSession,
+        tenant_id: UUID,
+        lot_nos: Iterable[str],
+        max_depth: int = 10,
+    ) -> Dict[str, Any]:
+        """
+        오염 로트의 영향 범위
+
+        역전개로 투입 자재 로트(의심 원인)를 찾고, 그 자재 로트가 들어간
+        모든 하위 로트를 정전개로 수집
+        """
+        seeds = set(lot_nos)
+        upstream = await self.trace(db, tenant_id, seeds, UPSTREAM, max_depth)
+        sources = set(upstream["lots"])
+        downstream = await self.trace(db, tenant_id, sources | seeds, DOWNSTREAM, max_depth)
+        affected = set(downstream["lots"]) - seeds - sources
+        return {
+            "source_lots": sorted(sources),
+            "affected_lots": sorted(affected),
+            "truncated": upstream["truncated"] or downstream["truncated"],
+        }
+
+
+# 싱글톤 인스턴스
+_genealogy_service: Optional[LotGenealogyService] = None
+
+
+def get_genealogy_service() -> LotGenealogyService:
+    """LotGenealogyService 싱글톤 인스턴스 반환"""
+    global _genealogy_service
+    if _genealogy_service is None:
+        _genealogy_service = LotGenealogyService()
+    return _genealogy_service
@@ -0,0 +1,351 @@
+"""
+Inventory Analytics Service - 재고 분석 (ABC / 회전율 / 에이징 / 안전재고 / 과잉재고)
+
+- erp_inventory_transaction: 분석 기간(기본 365일)을 품목별 GROUP BY 1회로 출고량·출고금액 집계
+- erp_inventory_stock: (품목, 창고)별 GROUP BY + 품목 마스터 FULL JOIN 1회를
+  서버 사이드 커서(yield_per)로 스트리밍하며 품목별 누적 → 메모리는 품목 수에 비례
+- ABC는 연간 출고금액 누적 비중(A ≤ 80%, B ≤ 95%, 그 외 C)
+- 결과는 (테넌트, 스냅샷 일자)별 캐시, 당일 스냅샷은 TTL 경과 시 재계산
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.config import settings
+from api.models.erp.inventory import InventoryStock, InventoryTransaction, TransactionType
+from api.models.erp.master import ProductMaster
+
+# 소비(출고)로 보는 트랜잭션 유형
+OUTBOUND_TYPES = (TransactionType.ISSUE.value, TransactionType.PRODUCTION_OUT.value)
+
+ABC_THRESHOLDS = (("A", 0.80), ("B", 0.95))
+SLOW_MOVING_DAYS = 90
+
+# (라벨, 상한 일수) - 마지막 입출고 후 경과일
+AGING_BUCKETS = (
+    ("0-30일", 30),
+    ("31-60일", 60),
+    ("61-90일", 90),
+    ("91-180일", 180),
+    ("180일 초과", None),
+)
+
+
+def _float(value) -> float:
+    return float(value) if value is not None else 0.0
+
+
+def _age_days(moved_at: Optional[datetime], today: date) -> Optional[int]:
+    if moved_at is None:
+        return None
+    moved = moved_at.date() if isinstance(moved_at, datetime) else moved_at
+    return max((today - moved).days, 0)
+
+
+def _aging_bucket(age: Optional[int]) -> str:
+    if age is None:
+        return AGING_BUCKETS[-1][0]
+    for label, limit in AGING_BUCKETS:
+        if limit is None or age <= limit:
+            return label
+    return AGING_BUCKETS[-1][0]
+
+
+@dataclass
+class ItemStats:
+    """품목별 누적값"""
+    item_code: str
+    item_name: Optional[str] = None
+    item_type: Optional[str] = None
+    unit: Optional[str] = None
+    safety_stock: float = 0.0
+    qty: float = 0.0
+    value: float = 0.0
+    warehouses: List[str] = field(default_factory=list)
+    last_movement: Optional[datetime] = None
+    issue_qty: float = 0.0
+    issue_value: float = 0.0
+    last_issue: Optional[datetime] = None
+    abc_class: str = "C"
+    status: str = "normal"
+
+    def to_dict(self, lookback_days: int) -> Dict[str, Any]:
+        daily_usage = self.issue_qty / lookback_days if lookback_days else 0.0
+        return {
+            "item_code": self.item_code,
+            "item_name": self.item_name,
+            "item_type": self.item_type,
+            "warehouse_code": self.warehouses[0] if self.warehouses else None,
+            "warehouses": self.warehouses,
+            "qty": self.qty,
+            "unit": self.unit,
+            "unit_cost": round(self.value / self.qty, 2) if self.qty else 0.0,
+            "total_value": round(self.value, 2),
+            "safety_stock": self.safety_stock,
+            "shortage_qty": max(self.safety_stock - self.qty, 0.0),
+            "status": self.status,
+            "abc_class": self.abc_class,
+            "annual_issue_qty": self.issue_qty,
+            "annual_issue_value": round(self.issue_value, 2),
+            "turnover": round(self.issue_value / self.value, 2) if self.value > 0 else None,
+            "days_of_supply": round(self.qty / daily_usage, 1) if daily_usage > 0 else None,
+            "last_movement_date": self.last_movement.isoformat() if self.last_movement else None,
+        }
+
+
+@dataclass
+class InventorySnapshot:
+    """스냅샷 일자 기준 분석 결과"""
+    snapshot_date: date
+    computed_at: datetime
+    lookback_days: int
+    items: Dict[str, ItemStats]
+    aging: Dict[str, List[float]]
+    total_value: float
+    total_issue_value: float
+
+    def items_with_status(self, *statuses: str) -> List[ItemStats]:
+        return [item for item in self.items.values() if item.status in statuses]
+
+
+class InventoryAnalyticsService:
+    """재고 분석 스냅샷 계산 / 캐시"""
+
+    def __init__(self, lookback_days: int = 365, excess_days: int = 180, cache_ttl: int = 300):
+        self.lookback_days = lookback_days
+        self.excess_days = excess_days
+        self.cache_ttl = cache_ttl
+        self._cache: Dict[Tuple[UUID, date], Tuple[float, InventorySnapshot]] = {}
+        self._lock = asyncio.Lock()
+
+    async def _usage(self, db: AsyncSession, tenant_id: UUID, since: datetime) -> Dict[str, Tuple]:
+        """품목별 분석 기간 출고량 / 출고금액 / 최종 출고일"""
+        outbound = InventoryTransaction.transaction_type.in_(OUTBOUND_TYPES)
+        issue_value = func.abs(func.coalesce(
+            InventoryTransaction.total_cost,
+            InventoryTransaction.quantity * InventoryTransaction.unit_cost,
+        ))
+        result = await db.execute(
+            select(
+                InventoryTransaction.item_code,
+                func.sum(func.abs(InventoryTransaction.quantity)).filter(outbound),
+                func.sum(issue_value).filter(outbound),
+                func.max(InventoryTransaction.transaction_date).filter(outbound),
+            )
+            .where(
+                InventoryTransaction.tenant_id == tenant_id,
+                InventoryTransaction.transaction_date >= since,
+            )
+            .group_by(InventoryTransaction.item_code)
+        )
+        return {row[0]: row[1:] for row in result}
+
+    async def compute(self, db: AsyncSession, tenant_id: UUID, snapshot_date: Optional[date] = None) -> InventorySnapshot:
+        """스냅샷 계산 (캐시 미사용)"""
+        today = snapshot_date or date.today()
+        since = datetime.combine(today - timedelta(days=self.lookback_days), datetime.min.time(), timezone.utc)
+        usage = await self._usage(db, tenant_id, since)
+
+        stock = (
+            select(
+                InventoryStock.item_code,
+                InventoryStock.warehouse_code,
+                func.max(InventoryStock.item_name).label("item_name"),
+                func.sum(InventoryStock.quantity).label("qty"),
+                func.sum(InventoryStock.quantity * func.coalesce(InventoryStock.unit_cost, 0)).label("value"),
+                func.max(InventoryStock.last_movement_date).label("last_movement"),
+            )
+            .where(InventoryStock.tenant_id == tenant_id)
+            .group_by(InventoryStock.item_code, InventoryStock.warehouse_code)
+            .subquery()
+        )
+        products = (
+            select(
+                ProductMaster.product_code,
+                ProductMaster.product_name,
+                ProductMaster.product_type,
+                ProductMaster.uom,
+                ProductMaster.safety_stock,
+            )
+            .where(ProductMaster.tenant_id == tenant_id, ProductMaster.is_active.isnot(False))
+            .subquery()
+        )
+        rows = await db.stream(
+            select(
+                func.coalesce(stock.c.item_code, products.c.product_code),
+                stock.c.warehouse_code,
+                func.coalesce(products.c.product_name, stock.c.item_name),
+                products.c.product_type,
+                products.c.uom,
+                products.c.safety_stock,
+                stock.c.qty,
+                stock.c.value,
+                stock.c.last_movement,
+            )
+            .select_from(stock.join(products, products.c.product_code == stock.c.item_code, full=True))
+            .execution_options(yield_per=5000)
+        )
+
+        items: Dict[str, ItemStats] = {}
+        aging: Dict[str, List[float]] = {label: [0, 0.0] for label, _ in AGING_BUCKETS}
+        async for code, warehouse, name, item_type, unit, safety, qty, value, moved_at in rows:
+            item = items.get(code)
+            if item is None:
+                item = items[code] = ItemStats(
+                    item_code=code, item_name=name, item_type=item_type, unit=unit,
+                    safety_stock=_float(safety),
+                )
+            if warehouse is None:
+                continue
+            qty, value = _float(qty), _float(value)
+            item.qty += qty
+            item.value += value
+            item.warehouses.append(warehouse)
+            if moved_at is not None and (item.last_movement is None or moved_at > item.last_movement):
+                item.last_movement = moved_at
+            if qty > 0:
+                bucket = aging[_aging_bucket(_age_days(moved_at, today))]
+                bucket[0] += 1
+                bucket[1] += value
+
+        for code, (issue_qty, issue_value, last_issue) in usage.items():
+            item = items.get(code)
+            if item is None:
+                item = items[code] = ItemStats(item_code=code)
+            item.issue_qty = _float(issue_qty)
+            item.issue_value = _float(issue_value)
+            item.last_issue = last_issue
+
+        # ABC: 출고금액 큰 순으로, 앞선 품목들의 누적 비중이 경계 미만이면 해당 등급
+        total_issue_value = sum(item.issue_value for item in items.values())
+        cumulative = 0.0
+        for item in sorted(items.values(), key=lambda i: i.issue_value, reverse=True):
+            if item.issue_value <= 0:
+                break
+            share = cumulative / total_issue_value
+            item.abc_class = next((cls for cls, limit in ABC_THRESHOLDS if share < limit), "C")
+            cumulative += item.issue_value
+
+        for item in items.values():
+            daily_usage = item.issue_qty / self.lookback_days
+            if item.qty <= 0:
+                item.status = "out_of_stock"
+            elif item.safety_stock > 0 and item.qty < item.safety_stock:
+                item.status = "below_safety"
+            elif daily_usage == 0 or item.qty / daily_usage > self.excess_days:
+                item.status = "excess"
+
+        return InventorySnapshot(
+            snapshot_date=today,
+            computed_at=datetime.now(),
+            lookback_days=self.lookback_days,
+            items=items,
+            aging=aging,
+            total_value=sum(item.value for item in items.values()),
+            total_issue_value=total_issue_value,
+        )
+
+    async def snapshot(self, db: AsyncSession, tenant_id: UUID, refresh: bool = False) -> InventorySnapshot:
+        """오늘 스냅샷 (캐시, 당일분은 TTL 경과 시 재계산)"""
+        key = (tenant_id, date.today())
+        cached = self._cache.get(key)
+        if cached and not refresh and time.monotonic() - cached[0] < self.cache_ttl:
+            return cached[1]
+
+        async with self._lock:
+            cached = self._cache.get(key)
+            if cached and not refresh and time.monotonic() - cached[0] < self.cache_ttl:
+                return cached[1]
+            snapshot = await self.compute(db, tenant_id, key[1])
+            # 지난 일자 스냅샷 정리
+            for old in [k for k in self._cache if k[0] == tenant_id and k[1] != key[1]]:
+                del self._cache[old]
+            self._cache[key] = (time.monotonic(), snapshot)
+            return snapshot
+
+    def analysis(self, snapshot: InventorySnapshot) -> Dict[str, Any]:
+        """재고 분석 요약 (/inventory/analysis)"""
+        by_type: Dict[str, List[float]] = {}
+        by_status: Dict[str, int] = {}
+        by_class: Dict[str, List[float]] = {}
+        slow_moving = 0
+        stocked = 0
+        for item in snapshot.items.values():
+            by_status[item.status] = by_status.get(item.status, 0) + 1
+            if item.qty <= 0:
+                continue
+            stocked += 1
+            type_acc = by_type.setdefault(item.item_type or "UNKNOWN", [0, 0.0])
+            type_acc[0] += 1
+            type_acc[1] += item.value
+            class_acc = by_class.setdefault(item.abc_class, [0, 0.0, 0.0])
+            class_acc[0] += 1
+            class_acc[1] += item.value
+            class_acc[2] += item.issue_value
+            last_issue_age = _age_days(item.last_issue, snapshot.snapshot_date)
+            if last_issue_age is None or last_issue_age > SLOW_MOVING_DAYS:
+                slow_moving += 1
+
+        total_issue = snapshot.total_issue_value
+        return {
+            "snapshot_date": snapshot.snapshot_date.isoformat(),
+            "computed_at": snapshot.computed_at.isoformat(),
+            "total_items": stocked,
+            "total_value": round(snapshot.total_value, 2),
+            "by_type": [
+                {"type": t, "count": acc[0], "value": round(acc[1], 2)} for t, acc in sorted(by_type.items())
+            ],
+            "by_status": [{"status": s, "count": c} for s, c in sorted(by_status.items())],
+            "turnover_rate": round(total_issue / snapshot.total_value, 2) if snapshot.total_value > 0 else 0,
+            "slow_moving_items": slow_moving,
+            "aging_analysis": [
+                {"period": label, "count": snapshot.aging[label][0], "value": round(snapshot.aging[label][1], 2)}
+                for label, _ in AGING_BUCKETS
+            ],
+            "abc_analysis": [
+                {
+                    "class": cls,
+                    "count": acc[0],
+                    "value": round(acc[1], 2),
+                    "issue_share": round(acc[2] / total_issue, 4) if total_issue > 0 else 0,
+                }
+                for cls, acc in sorted(by_class.items())
+            ],
+        }
+
+    def below_safety(self, snapshot: InventorySnapshot) -> List[Dict[str, Any]]:
+        """안전재고 미달 품목 (부족수량 큰 순)"""
+        items = [
+            item for item in snapshot.items_with_status("below_safety", "out_of_stock")
+            if item.safety_stock > 0
+        ]
+        items.sort(key=lambda i: i.safety_stock - i.qty, reverse=True)
+        return [item.to_dict(snapshot.lookback_days) for item in items]
+
+    def excess(self, snapshot: InventorySnapshot) -> List[Dict[str, Any]]:
+        """과잉재고 품목 (재고금액 큰 순)"""
+        items = snapshot.items_with_status("excess")
+        items.sort(key=lambda i: i.value, reverse=True)
+        return [item.to_dict(snapshot.lookback_days) for item in items]
+
+
+# 싱글톤 인스턴스
+_inventory_analytics: Optional[InventoryAnalyticsService] = None
+
+
+def get_inventory_analytics() -> InventoryAnalyticsService:
+    """InventoryAnalyticsService 싱글톤 인스턴스 반환"""
+    global _inventory_analytics
+    if _inventory_analytics is None:
+        _inventory_analytics = InventoryAnalyticsService(
+            settings.inventory_lookback_days,
+            settings.inventory_excess_days,
+            settings.inventory_analytics_cache_ttl,
+        )
+    return _inventory_analytics
@@ -0,0 +1,329 @@
+"""
+Ledger Posting Service - 전표 전기 시 총계정원장 증분 반영
+
+- 전기 대상 전표를 UPDATE ... RETURNING 한 번으로 APPROVED → POSTED 전환
+  (이미 전기된 전표는 조건에서 빠지므로 중복 전기 없음,
+   마감(CLOSED)된 회계기간의 전표는 건너뜀 → 확정 재무제표 스냅샷 보호)
+- 전기 취소(unpost)는 같은 경로로 차/대변을 음수 증분으로 반영
+- 과거 기간 전기로 어긋난 이후 기간의 기초/기말잔액은 마감 시 roll_forward로 재계산
+- 전표 상세를 (회계연도, 회계기간, 계정) 단위로 집계한 뒤 계정 트리를 따라 상위 계정까지 누적
+- erp_general_ledger에 INSERT ... ON CONFLICT DO UPDATE로 차/대변 증분을 더함
+  → 행 잠금은 키 순서대로 잡히므로 동시 전기끼리 교착 없이 직렬화
+- 모든 원장 행은 자기 계정 + 하위 계정 합계(부분합) → 재무제표는 최상위/말단 계정 행만 읽음
+- 호출자의 트랜잭션 안에서 실행 (커밋은 호출자)
+"""
+import asyncio
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import String, and_, any_, bindparam, exists, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.models.erp.accounting import (
+    AccountCode, AccountType, ClosingStatus, FiscalPeriod, GeneralLedger, Voucher, VoucherDetail,
+    VoucherStatus
+)
+
+# 차변 잔액 계정 (그 외는 대변 잔액)
+DEBIT_NORMAL_TYPES = (AccountType.ASSET, AccountType.EXPENSE)
+
+LEDGER_KEY = ["fiscal_year", "fiscal_period", "account_code"]
+
+
+def previous_period(fiscal_year: str, fiscal_period: str) -> Tuple[str, str]:
+    """직전 회계기간 (01월 → 전년 12월)"""
+    if int(fiscal_period) <= 1:
+        return str(int(fiscal_year) - 1), "12"
+    return fiscal_year, f"{int(fiscal_period) - 1:02d}"
+
+
+def next_period(fiscal_year: str, fiscal_period: str) -> Tuple[str, str]:
+    """다음 회계기간 (12월 → 다음 해 01월)"""
+    if int(fiscal_period) >= 12:
+        return str(int(fiscal_year) + 1), "01"
+    return fiscal_year, f"{int(fiscal_period) + 1:02d}"
+
+
+class LedgerPostingService:
+    """전표 전기 / 총계정원장 갱신"""
+
+    def __init__(self, batch_size: int = 1000):
+        self.batch_size = batch_size
+        self._paths: Optional[Dict[str, Tuple[str, ...]]] = None
+        self._signs: Dict[str, int] = {}
+        self._lock = asyncio.Lock()
+
+    def invalidate(self):
+        """계정과목 변경 시 계정 트리 캐시 무효화"""
+        self._paths = None
+
+    async def account_paths(self, db: AsyncSession) -> Dict[str, Tuple[str, ...]]:
+        """계정코드 → (자기 자신, 상위 계정, ..., 최상위 계정)"""
+        if self._paths is not None:
+            return self._paths
+        async with self._lock:
+            if self._paths is None:
+                result = await db.execute(
+                    select(AccountCode.account_code, AccountCode.parent_code, AccountCode.account_type)
+                )
+                parents: Dict[str, Optional[str]] = {}
+                signs: Dict[str, int] = {}
+                for code, parent_code, account_type in result:
+                    parents[code] = parent_code
+                    signs[code] = 1 if account_type in DEBIT_NORMAL_TYPES else -1
+
+                paths = {}
+                for code in parents:
+                    path, current = [], code
+                    # 잘못된 parent_code로 생긴 순환은 한 바퀴에서 끊음
+                    while current in parents and current not in path:
+                        path.append(current)
+                        current = parents[current]
+                    paths[code] = tuple(path)
+                self._signs = signs
+                self._paths = paths
+        return self._paths
+
+    @staticmethod
+    def _closed_period():
+        """전표의 회계기간이 마감됨 (Voucher 상관 서브쿼리)"""
+        return exists().where(and_(
+            FiscalPeriod.fiscal_year == Voucher.fiscal_year,
+            FiscalPeriod.fiscal_period == Voucher.fiscal_period,
+            FiscalPeriod.status == ClosingStatus.CLOSED,
+        ))
+
+    async def is_closed(self, db: AsyncSession, fiscal_year: str, fiscal_period: str) -> bool:
+        """회계기간 마감 여부"""
+        result = await db.execute(
+            select(FiscalPeriod.id).where(
+                FiscalPeriod.fiscal_year == fiscal_year,
+                FiscalPeriod.fiscal_period == fiscal_period,
+                FiscalPeriod.status == ClosingStatus.CLOSED,
+            ).limit(1)
+        )
+        return result.scalar_one_or_none() is not None
+
+    async def _aggregate(self, db: AsyncSession, voucher_nos: List[str]) -> List[Any]:
+        """전기한 전표 상세를 (연도, 기간, 계정)별 차/대변 합계로 집계"""
+        posted = bindparam("posted", voucher_nos, type_=ARRAY(String))
+        result = await db.execute(
+            select(
+                Voucher.fiscal_year,
+                Voucher.fiscal_period,
+                VoucherDetail.account_code,
+                func.coalesce(func.sum(VoucherDetail.debit_amount), 0),
+                func.coalesce(func.sum(VoucherDetail.credit_amount), 0),
+                func.count(),
+            )
+            .join(Voucher, VoucherDetail.voucher_no == Voucher.voucher_no)
+            .where(Voucher.voucher_no == any_(posted))
+            .group_by(Voucher.fiscal_year, Voucher.fiscal_period, VoucherDetail.account_code)
+        )
+        return result.all()
+
+    async def _opening_balances(
+        self, db: AsyncSession, keys: Sequence[Tuple[str, str, str]]
+    ) -> Dict[Tuple[str, str, str], Decimal]:
+        """새로 생길 원장 행의 기초잔액 = 직전 기간 기말잔액"""
+        previous = {key: previous_period(key[0], key[1]) + (key[2],) for key in keys}
+        periods = {prev[:2] for prev in previous.values()}
+        codes = {key[2] for key in keys}
+        result = await db.execute(
+            select(
+                GeneralLedger.fiscal_year,
+                GeneralLedger.fiscal_period,
+                GeneralLedger.account_code,
+                GeneralLedger.closing_balance,
+            ).where(
+                tuple_(GeneralLedger.fiscal_year, GeneralLedger.fiscal_period).in_(list(periods)),
+                GeneralLedger.account_code.in_(list(codes)),
+            )
+        )
+        closing = {(y, p, code): balance or Decimal("0") for y, p, code, balance in result}
+        return {key: closing.get(prev, Decimal("0")) for key, prev in previous.items()}
+
+    async def post(
+        self,
+        db: AsyncSession,
+        voucher_nos: Optional[Sequence[str]] = None,
+        fiscal_year: Optional[str] = None,
+        fiscal_period: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        승인 전표 일괄 전기 (voucher_nos 생략 시 조건에 맞는 모든 승인 전표)
+        마감된 회계기간의 전표는 승인 상태로 남김
+
+        Returns:
+            posted: 전기된 전표번호, ledger_rows: 갱신된 원장 행 수
+        """
+        now = datetime.now()
+        stmt = update(Voucher).where(Voucher.status == VoucherStatus.APPROVED, ~self._closed_period())
+        if voucher_nos is not None:
+            stmt = stmt.where(Voucher.voucher_no == any_(bindparam("targets", list(voucher_nos), type_=ARRAY(String))))
+        if fiscal_year:
+            stmt = stmt.where(Voucher.fiscal_year == fiscal_year)
+        if fiscal_period:
+            stmt = stmt.where(Voucher.fiscal_period == fiscal_period)
+        result = await db.execute(
+            stmt.values(status=VoucherStatus.POSTED, posted_at=now, updated_at=now)
+            .returning(Voucher.voucher_no)
+            .execution_options(synchronize_session=False)
+        )
+        posted = list(result.scalars())
+        if not posted:
+            return {"posted": [], "ledger_rows": 0}
+
+        ledger_rows = await self._apply(db, await self._aggregate(db, posted), 1, now)
+        return {"posted": posted, "ledger_rows": ledger_rows}
+
+    async def unpost(self, db: AsyncSession, voucher_no: str) -> int:
+        """
+        전기된 전표의 원장 반영 취소 (차/대변을 음수 증분으로 반영, 상태 변경은 호출자)
+        마감된 회계기간의 전표는 호출 전에 거부해야 함
+
+        Returns:
+            갱신된 원장 행 수
+        """
+        return await self._apply(db, await self._aggregate(db, [voucher_no]), -1, datetime.now())
+
+    async def roll_forward(self, db: AsyncSession, fiscal_year: str, fiscal_period: str) -> List[Tuple[str, str]]:
+        """
+        해당 기간부터 원장의 마지막 기간까지 기초/기말잔액 재계산 (커밋은 호출자)
+
+        계정별로 직전 잔액을 이어받아 기초잔액 = 이전 기말잔액,
+        기말잔액 = 기초잔액 ± (차변 - 대변). 잔액이 있는데 행이 없는 기간에는
+        발생액 0인 행을 만들어 재무상태표에 잔액이 빠지지 않게 함
+
+        Returns:
+            잔액이 바뀐 기간 목록 (확정 스냅샷 재생성 대상)
+        """
+        await self.account_paths(db)
+        start = (fiscal_year, fiscal_period)
+        period_key = tuple_(GeneralLedger.fiscal_year, GeneralLedger.fiscal_period)
+
+        # 계정별 직전 기말잔액 (시작 기간 이전의 마지막 행)
+        result = await db.execute(
+            select(GeneralLedger.account_code, GeneralLedger.closing_balance)
+            .where(period_key < start)
+            .order_by(GeneralLedger.fiscal_year, GeneralLedger.fiscal_period)
+        )
+        carried: Dict[str, Decimal] = {code: balance or Decimal("0") for code, balance in result}
+
+        result = await db.execute(
+            select(GeneralLedger).where(period_key >= start)
+            .order_by(GeneralLedger.fiscal_year, GeneralLedger.fiscal_period)
+        )
+        by_period: Dict[Tuple[str, str], Dict[str, GeneralLedger]] = defaultdict(dict)
+        for row in result.scalars():
+            by_period[(row.fiscal_year, row.fiscal_period)][row.account_code] = row
+        last = max(by_period) if by_period else start
+
+        now = datetime.now()
+        inserts, changed = [], []
+        period = start
+        while period <= last:
+            rows = by_period.get(period, {})
+            dirty = False
+            for code in sorted(set(carried) | set(rows)):
+                opening = carried.get(code, Decimal("0"))
+                row = rows.get(code)
+                if row is None:
+                    if opening:
+                        inserts.append({
+                            "fiscal_year": period[0],
+                            "fiscal_period": period[1],
+                            "account_code": code,
+                            "opening_balance": opening,
+                            "debit_total": Decimal("0"),
+                            "credit_total": Decimal("0"),
+                            "closing_balance": opening,
+                            "transaction_count": 0,
+                            "created_at": now,
+                            "updated_at": now,
+                        })
+                        dirty = True
+                    continue
+                activity = (row.debit_total or Decimal("0")) - (row.credit_total or Decimal("0"))
+                closing = opening + self._signs.get(code, 1) * activity
+                if row.opening_balance != opening or row.closing_balance != closing:
+                    # 세션 객체 갱신 → 다음 조회 전 autoflush
+                    row.opening_balance = opening
+                    row.closing_balance = closing
+                    row.updated_at = now
+                    dirty = True
+                carried[code] = closing
+            if dirty:
+                changed.append(period)
+            period = next_period(*period)
+
+        for start_at in range(0, len(inserts), self.batch_size):
+            await db.execute(pg_insert(GeneralLedger), inserts[start_at:start_at + self.batch_size])
+        return changed
+
+    async def _apply(self, db: AsyncSession, aggregated: List[Any], sign: int, now: datetime) -> int:
+        """집계된 전표 상세를 계정 트리를 따라 원장에 증분 반영 (sign=-1이면 차감)"""
+        if not aggregated:
+            return 0
+        paths = await self.account_paths(db)
+        # (연도, 기간, 계정) → [차변, 대변, 건수]
+        deltas: Dict[Tuple[str, str, str], List[Any]] = defaultdict(lambda: [Decimal("0"), Decimal("0"), 0])
+        for year, period, account_code, debit, credit, count in aggregated:
+            for code in paths.get(account_code, (account_code,)):
+                delta = deltas[(year, period, code)]
+                delta[0] += sign * debit
+                delta[1] += sign * credit
+                delta[2] += sign * count
+
+        keys = sorted(deltas)
+        openings = await self._opening_balances(db, keys)
+        rows = []
+        for key in keys:
+            debit, credit, count = deltas[key]
+            opening = openings[key]
+            rows.append({
+                "fiscal_year": key[0],
+                "fiscal_period": key[1],
+                "account_code": key[2],
+                "opening_balance": opening,
+                "debit_total": debit,
+                "credit_total": credit,
+                "closing_balance": opening + self._signs.get(key[2], 1) * (debit - credit),
+                "transaction_count": count,
+                "created_at": now,
+                "updated_at": now,
+            })
+
+        upsert = pg_insert(GeneralLedger)
+        excluded = upsert.excluded
+        upsert = upsert.on_conflict_do_update(
+            index_elements=LEDGER_KEY,
+            set_={
+                "debit_total": func.coalesce(GeneralLedger.debit_total, 0) + excluded.debit_total,
+                "credit_total": func.coalesce(GeneralLedger.credit_total, 0) + excluded.credit_total,
+                "closing_balance": func.coalesce(GeneralLedger.closing_balance, 0)
+                + excluded.closing_balance - excluded.opening_balance,
+                "transaction_count": func.coalesce(GeneralLedger.transaction_count, 0) + excluded.transaction_count,
+                "updated_at": excluded.updated_at,
+            },
+        )
+        for start in range(0, len(rows), self.batch_size):
+            await db.execute(upsert, rows[start:start + self.batch_size])
+
+        return len(rows)
+
+
+# 싱글톤 인스턴스
+_ledger_service: Optional[LedgerPostingService] = None
+
+
+def get_ledger_service() -> LedgerPostingService:
+    """LedgerPostingService 싱글톤 인스턴스 반환"""
+    global _ledger_service
+    if _ledger_service is None:
+        _ledger_service = LedgerPostingService()
+    return _ledger_service
@@ -0,0 +1,273 @@
+"""
+SPC Service - 측정값 저장 시 관리도 상태를 갱신하는 streaming SPC
+
+- (라인, 제품, 측정항목)별 SPCChart(Welford + X̄-R/X̄-S 부분군 + Nelson 규칙 링버퍼)를
+  mes_spc_chart_state에 JSONB로 유지 → 측정 1건당 상태 1행 읽기/쓰기 (O(1))
+- Nelson rule 1~8 위반은 mes_spc_violation에 저장
+- 상태 행을 SELECT ... FOR UPDATE로 잠그므로 멀티 워커에서도 순서대로 갱신
+- 상태가 없는 관리도는 최초 1회 기존 측정값을 시간순으로 재생해 구성
+- 조회 시 측정 테이블보다 뒤처진 상태는 최종 측정시각 이후 꼬리만 재생해 갱신
+"""
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.config import settings
+from api.models.mes.quality import SPCChartState, SPCData, SPCViolation
+from generators.core.spc import NELSON_RULES, SPCChart
+
+
+def _decimal(value: Optional[float], places: int = 6) -> Optional[Decimal]:
+    return round(Decimal(str(value)), places) if value is not None else None
+
+
+def _float(value: Optional[Decimal]) -> Optional[float]:
+    return float(value) if value is not None else None
+
+
+class SPCService:
+    """관리도 상태 갱신 / 조회"""
+
+    def __init__(self, subgroup_size: int = 5, baseline_subgroups: int = 25):
+        self.subgroup_size = subgroup_size
+        self.baseline_subgroups = baseline_subgroups
+
+    @staticmethod
+    def _key_filter(model, tenant_id: UUID, line_code: str, product_code: str, measurement_type: str):
+        return (
+            model.tenant_id == tenant_id,
+            model.line_code == line_code,
+            model.product_code == product_code,
+            model.measurement_type == measurement_type,
+        )
+
+    async def _lock_state(self, db: AsyncSession, key: Tuple) -> Optional[SPCChartState]:
+        result = await db.execute(
+            select(SPCChartState).where(*self._key_filter(SPCChartState, *key)).with_for_update()
+        )
+        return result.scalar_one_or_none()
+
+    async def _replay(
+        self, db: AsyncSession, key: Tuple, usl=None, lsl=None, target=None,
+        chart: Optional[SPCChart] = None, after: Optional[datetime] = None,
+    ) -> SPCChart:
+        """
+        기존 측정값을 시간순으로 재생해 관리도 구성 (상태가 없을 때 1회)
+
+        chart/after를 주면 after 이후 측정값만 이어서 재생 (꼬리 재생)
+        """
+        if chart is None:
+            chart = SPCChart(
+                subgroup_size=self.subgroup_size,
+                baseline_subgroups=self.baseline_subgroups,
+                usl=usl, lsl=lsl, target=target,
+            )
+        query = select(SPCData.measured_value).where(*self._key_filter(SPCData, *key))
+        if after is not None:
+            query = query.where(SPCData.measurement_datetime > after)
+        values = await db.stream_scalars(
+            query.order_by(SPCData.measurement_datetime).execution_options(yield_per=5000)
+        )
+        async for value in values:
+            chart.push(float(value))
+        return chart
+
+    async def _load(self, db: AsyncSession, key: Tuple, usl=None, lsl=None, target=None) -> SPCChartState:
+        """상태 행을 잠그고 반환 (없으면 재생 후 생성)"""
+        state = await self._lock_state(db, key)
+        if state is not None:
+            return state
+
+        chart = await self._replay(db, key, usl, lsl, target)
+        tenant_id, line_code, product_code, measurement_type = key
+        inserted = await db.execute(
+            pg_insert(SPCChartState)
+            .values(
+                tenant_id=tenant_id, line_code=line_code, product_code=product_code,
+                measurement_type=measurement_type, subgroup_size=self.subgroup_size,
+                state=chart.to_dict(),
+            )
+            .on_conflict_do_nothing(
+                index_elements=["tenant_id", "line_code", "product_code", "measurement_type"]
+            )
+        )
+        state = await self._lock_state(db, key)
+        if inserted.rowcount:
+            self._apply(state, chart, None)
+        return state
+
+    @staticmethod
+    def _apply(state: SPCChartState, chart: SPCChart, measured_at: Optional[datetime]):
+        """관리도 → 상태 행 컬럼"""
+        capability = chart.capability()
+        state.state = chart.to_dict()
+        state.sample_count = chart.stats.n
+        state.mean = _decimal(chart.stats.mean) if chart.stats.n else None
+        state.std_dev = _decimal(chart.stats.std) if chart.stats.n else None
+        state.center_line = _decimal(chart.center)
+        state.control_lower = _decimal(chart.lcl)
+        state.control_upper = _decimal(chart.ucl)
+        state.limits_frozen = chart.frozen
+        state.cpk_value = _decimal(capability["cpk"], 4)
+        state.ppk_value = _decimal(capability["ppk"], 4)
+        if measured_at is not None:
+            state.last_measurement_at = measured_at
+        state.updated_at = datetime.utcnow()
+
+    async def record(self, db: AsyncSession, spc: SPCData) -> List[SPCViolation]:
+        """
+        측정값 1건 반영 (db.add(spc) 전에 호출, 커밋은 호출자)
+
+        spc의 관리한계/Cpk/out_of_control을 채우고 위반 레코드를 세션에 추가
+        """
+        key = (spc.tenant_id, spc.line_code, spc.product_code, spc.measurement_type)
+        usl, lsl, target = _float(spc.spec_upper), _float(spc.spec_lower), _float(spc.target_value)
+        state = await self._load(db, key, usl, lsl, target)
+
+        chart = SPCChart.from_dict(state.state)
+        if usl is not None and lsl is not None:
+            chart.usl, chart.lsl = usl, lsl
+        if target is not None:
+            chart.target = target
+
+        value = float(spc.measured_value)
+        violated = chart.push(value)
+        self._apply(state, chart, spc.measurement_datetime)
+
+        spc.control_lower = state.control_lower
+        spc.control_upper = state.control_upper
+        spc.cpk_value = state.cpk_value
+        spc.out_of_control = bool(violated)
+        spc.out_of_spec = (usl is not None and value > usl) or (lsl is not None and value < lsl)
+
+        violations = [
+            SPCViolation(
+                tenant_id=spc.tenant_id,
+                spc_data_id=spc.id,
+                line_code=spc.line_code,
+                product_code=spc.product_code,
+                measurement_type=spc.measurement_type,
+                measurement_datetime=spc.measurement_datetime,
+                rule_no=rule,
+                rule_code=NELSON_RULES[rule],
+                measured_value=spc.measured_value,
+                center_line=_decimal(chart.center),
+                sigma=_decimal(chart.sigma),
+            )
+            for rule in violated
+        ]
+        db.add_all(violations)
+        return violations
+
+    async def get_state(
+        self,
+        db: AsyncSession,
+        tenant_id: UUID,
+        measurement_type: str,
+        line_code: Optional[str] = None,
+        product_code: Optional[str] = None,
+    ) -> Optional[SPCChartState]:
+        """
+        관리도 상태 조회
+
+        라인/제품을 생략하면 조건에 맞는 가장 최근 측정의 관리도.
+        상태가 없고 측정값만 있으면 재생해서 생성 (최초 1회),
+        상태가 측정 테이블보다 뒤처져 있으면 꼬리 측정값을 재생해 갱신
+        """
+        query = select(SPCChartState).where(
+            SPCChartState.tenant_id == tenant_id,
+            SPCChartState.measurement_type == measurement_type,
+        )
+        if line_code:
+            query = query.where(SPCChartState.line_code == line_code)
+        if product_code:
+            query = query.where(SPCChartState.product_code == product_code)
+        query = query.order_by(SPCChartState.last_measurement_at.desc().nulls_last()).limit(1)
+        state = (await db.execute(query)).scalar_one_or_none()
+        if state is not None:
+            return await self._catch_up(db, state)
+
+        latest = select(SPCData).where(
+            SPCData.tenant_id == tenant_id,
+            SPCData.measurement_type == measurement_type,
+        )
+        if line_code:
+            latest = latest.where(SPCData.line_code == line_code)
+        if product_code:
+            latest = latest.where(SPCData.product_code == product_code)
+        latest = (await db.execute(latest.order_by(SPCData.measurement_datetime.desc()).limit(1))).scalar_one_or_none()
+        if latest is None:
+            return None
+
+        key = (tenant_id, latest.line_code, latest.product_code, measurement_type)
+        state = await self._load(
+            db, key, _float(latest.spec_upper), _float(latest.spec_lower), _float(latest.target_value)
+        )
+        state.last_measurement_at = latest.measurement_datetime
+        return state
+
+    async def _catch_up(self, db: AsyncSession, state: SPCChartState) -> SPCChartState:
+        """
+        record()를 거치지 않고 적재된 측정값(일괄 적재, 시뮬레이터 등)만큼 뒤처진 상태 갱신
+
+        측정 테이블의 건수/최종 측정시각이 상태와 같으면 그대로 반환.
+        last_measurement_at 이후 측정값만 이어서 재생하고, 그 이전 시각으로
+        끼어든 측정값이 있어 건수가 맞지 않으면 처음부터 재생 (커밋은 호출자)
+        """
+        key = (state.tenant_id, state.line_code, state.product_code, state.measurement_type)
+        stats = select(func.count(), func.max(SPCData.measurement_datetime)).where(
+            *self._key_filter(SPCData, *key)
+        )
+        total, latest = (await db.execute(stats)).one()
+        if self._is_current(state, total, latest):
+            return state
+
+        # 잠근 뒤 다시 읽어 record()와 동시에 갱신되지 않도록 함
+        state = (await db.execute(
+            select(SPCChartState)
+            .where(*self._key_filter(SPCChartState, *key))
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )).scalar_one()
+        if self._is_current(state, total, latest):
+            return state
+
+        chart = SPCChart.from_dict(state.state)
+        after = state.last_measurement_at
+        if after is not None:
+            tail = await db.scalar(stats.with_only_columns(func.count()).where(
+                SPCData.measurement_datetime > after
+            ))
+            if (state.sample_count or 0) + tail != total:
+                after = None
+        if after is None:
+            chart = await self._replay(db, key, chart.usl, chart.lsl, chart.target)
+        else:
+            chart = await self._replay(db, key, chart=chart, after=after)
+
+        self._apply(state, chart, latest)
+        return state
+
+    @staticmethod
+    def _is_current(state: SPCChartState, total: int, latest: Optional[datetime]) -> bool:
+        return total == (state.sample_count or 0) and (
+            latest is None
+            or (state.last_measurement_at is not None and latest <= state.last_measurement_at)
+        )
+
+
+# 싱글톤 인스턴스
+_spc_service: Optional[SPCService] = None
+
+
+def get_spc_service() -> SPCService:
+    """SPCService 싱글톤 인스턴스 반환"""
+    global _spc_service
+    if _spc_service is None:
+        _spc_service = SPCService(settings.spc_subgroup_size, settings.spc_baseline_subgroups)
+    return _spc_service
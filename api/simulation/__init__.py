@@ -7,11 +7,17 @@ Realtime Factory Simulator
 Architecture:
 - SimulationEngine: 시뮬레이션 상태 관리 (STOPPED/RUNNING/PAUSED)
 - Ticker: 주기적 데이터 생성 스케줄러
+- SimulationClock: 실시간/배속/최대 속도 가상 시계
 - Generators: 각 데이터 타입별 생성기
 - ScenarioInjector: 시나리오 기반 이상 패턴 주입
+- PartitionManager: 시뮬레이션 시계 기준 시계열 파티션 사전 생성 / retention
+- Downsampler: 고빈도 raw → 1분/1시간 집계 롤업 (raw 파티션 삭제 전)
 """
 
+from .clock import AcceleratedClock, ClockMode, MaxSpeedClock, SimulationClock, WallClock, create_clock
+from .downsampling import Downsampler
 from .engine import SimulationEngine, SimulationState
+from .partitions import PartitionManager, PartitionPolicy
 from .ticker import Ticker, TickerConfig
 
 __all__ = [
@@ -19,4 +25,13 @@ __all__ = [
     'SimulationState',
     'Ticker',
     'TickerConfig',
+    'SimulationClock',
+    'ClockMode',
+    'WallClock',
+    'AcceleratedClock',
+    'MaxSpeedClock',
+    'create_clock',
+    'PartitionManager',
+    'PartitionPolicy',
+    'Downsampler',
 ]
@@ -0,0 +1,218 @@
+"""
+SimulationClock - 시뮬레이션 시간 추상화
+
+Engine, Ticker, Generator가 datetime.now()/asyncio.sleep() 대신 사용
+- WallClock: 실제 시간 (기본값)
+- AcceleratedClock: 배속 가상 시간 (예: speed=3600 -> 실제 1초 = 가상 1시간)
+- MaxSpeedClock: 이산 사건 방식 - 모든 Ticker가 대기 상태가 되면
+  가장 먼저 깨어날 Ticker의 시각으로 가상 시간을 점프하여 tick을 연속 실행
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class ClockMode:
+    """시계 모드"""
+    REALTIME = "realtime"
+    ACCELERATED = "accelerated"
+    MAX_SPEED = "max_speed"
+
+
+class SimulationClock(ABC):
+    """시뮬레이션 시계 인터페이스"""
+
+    mode: str = ClockMode.REALTIME
+
+    @property
+    def speed(self) -> Optional[float]:
+        """실제 1초당 가상 초 (max_speed는 None)"""
+        return 1.0
+
+    @property
+    def is_virtual(self) -> bool:
+        return self.mode != ClockMode.REALTIME
+
+    @abstractmethod
+    def now_utc(self) -> datetime:
+        """현재 (가상) 시각 - timezone-aware UTC"""
+        pass
+
+    def now(self) -> datetime:
+        """현재 (가상) 시각 - naive 로컬 시간 (datetime.now() 대체)"""
+        return self.now_utc().astimezone().replace(tzinfo=None)
+
+    def utcnow(self) -> datetime:
+        """현재 (가상) 시각 - naive UTC"""
+        return self.now_utc().replace(tzinfo=None)
+
+    @abstractmethod
+    async def sleep(self, seconds: float):
+        """가상 시간 기준 대기"""
+        pass
+
+    def register(self):
+        """Ticker 참여 등록 (MaxSpeedClock 전용)"""
+        pass
+
+    def unregister(self):
+        """Ticker 참여 해제 (MaxSpeedClock 전용)"""
+        pass
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "speed": self.speed,
+            "now": self.now_utc().isoformat(),
+        }
+
+
+class WallClock(SimulationClock):
+    """실제 시간"""
+
+    mode = ClockMode.REALTIME
+
+    def now_utc(self) -> datetime:
+        return datetime.now(timezone.utc)
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+
+class AcceleratedClock(SimulationClock):
+    """
+    배속 가상 시계
+
+    가상 시각 = start + (경과 실제 시간 × speed)
+    """
+
+    mode = ClockMode.ACCELERATED
+
+    def __init__(self, speed: float, start: Optional[datetime] = None):
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        self._speed = speed
+        self._start = _as_utc(start) if start else datetime.now(timezone.utc)
+        self._anchor = time.monotonic()
+
+    @property
+    def speed(self) -> float:
+        return self._speed
+
+    def now_utc(self) -> datetime:
+        elapsed = (time.monotonic() - self._anchor) * self._speed
+        return self._start + timedelta(seconds=elapsed)
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds / self._speed)
+
+
+class MaxSpeedClock(SimulationClock):
+    """
+    최대 속도 가상 시계 (이산 사건 시뮬레이션)
+
+    등록된 모든 Ticker가 sleep()에서 대기 중일 때만 시간을 진행하므로
+    tick 순서/간격은 실시간 모드와 동일하게 유지된다.
+    until이 주어지면 해당 시각에 도달한 뒤로는 더 이상 깨우지 않는다.
+    """
+
+    mode = ClockMode.MAX_SPEED
+
+    def __init__(self, start: Optional[datetime] = None, until: Optional[datetime] = None):
+        self._now = _as_utc(start) if start else datetime.now(timezone.utc)
+        self._until = _as_utc(until) if until else None
+        self._participants = 0
+        self._waiters: List[Tuple[datetime, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._ticks = 0
+        # until 도달 시 set (Engine 자동 정지용)
+        self.finished = asyncio.Event()
+
+    @property
+    def speed(self) -> Optional[float]:
+        return None
+
+    @property
+    def reached_until(self) -> bool:
+        return self._until is not None and self._now >= self._until
+
+    def now_utc(self) -> datetime:
+        return self._now
+
+    def register(self):
+        self._participants += 1
+
+    def unregister(self):
+        self._participants = max(0, self._participants - 1)
+        self._advance()
+
+    async def sleep(self, seconds: float):
+        wake_at = self._now + timedelta(seconds=seconds)
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (wake_at, next(self._seq), future))
+        self._advance()
+        await future
+
+    def _advance(self):
+        """모든 참여자가 대기 중이면 가장 이른 waiter를 깨움"""
+        # 취소된 waiter 정리
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+
+        active = sum(1 for _, _, f in self._waiters if not f.done())
+        if not self._waiters or active < self._participants:
+            return
+
+        wake_at, _, future = self._waiters[0]
+        if self._until is not None and wake_at > self._until:
+            self._now = max(self._now, self._until)
+            self.finished.set()
+            return
+
+        heapq.heappop(self._waiters)
+        self._now = max(self._now, wake_at)
+        self._ticks += 1
+        # 다음 이벤트 루프 반복에서 재개 (재귀 방지)
+        future.get_loop().call_soon(_resolve, future)
+
+    def get_status(self) -> Dict[str, Any]:
+        status = super().get_status()
+        status.update({
+            "until": self._until.isoformat() if self._until else None,
+            "ticks": self._ticks,
+            "participants": self._participants,
+        })
+        return status
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def create_clock(
+    mode: str = ClockMode.REALTIME,
+    speed: float = 1.0,
+    start: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> SimulationClock:
+    """설정에 따른 시계 생성"""
+    if mode == ClockMode.ACCELERATED:
+        return AcceleratedClock(speed, start)
+    if mode == ClockMode.MAX_SPEED:
+        return MaxSpeedClock(start, until)
+    return WallClock()
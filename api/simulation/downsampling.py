@@ -0,0 +1,375 @@
+"""
+Downsampler - 고빈도 시계열 다운샘플링 (raw → 1분 → 1시간)
+
+- mes_realtime_production (라인별 5초), mes_equipment_status (설비별 10초)를
+  {table}_1m / {table}_1h 집계 테이블로 롤업
+  (카운터는 합계, 게이지는 min/max/avg, 상태는 running 비율 + 마지막 상태)
+- 1분 집계는 raw에서, 1시간 집계는 1분 집계에서 계산 (ON CONFLICT upsert → 재실행 안전)
+- 1회 실행은 집계 테이블별 최대 N개 구간만 처리 (밀린 이력은 이후 실행에서 이어서 롤업)
+- 롤업이 끝난 구간(covered_until)까지만 PartitionManager가 raw 파티션을 retire
+- 조회 API는 resolve_resolution() 후 fetch_raw() / fetch_rollup()으로 기간에 맞는 해상도를 읽음
+
+Engine의 partition_maintenance Ticker가 롤업 → 파티션 생성/retention 순으로 호출
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# 해상도: (date_trunc 단위, 1회 롤업 최대 구간)
+RESOLUTIONS: Dict[str, Tuple[str, timedelta]] = {
+    "1m": ("minute", timedelta(hours=6)),
+    "1h": ("hour", timedelta(days=7)),
+}
+
+# 조회 기간별 최대 해상도 (이보다 긴 기간은 한 단계 거친 해상도)
+RAW_MAX_SPAN = timedelta(hours=6)
+MINUTE_MAX_SPAN = timedelta(days=7)
+
+
+@dataclass(frozen=True)
+class RollupSpec:
+    """원천 테이블별 롤업 정의"""
+    source: str
+    time_column: str
+    key: str                          # 집계 단위 (라인 / 설비)
+    status_column: str
+    counters: Tuple[str, ...] = ()    # 합계
+    gauges: Tuple[str, ...] = ()      # min / max / avg
+
+    def table(self, resolution: str) -> str:
+        return f"{self.source}_{resolution}"
+
+
+ROLLUPS: Dict[str, RollupSpec] = {
+    "mes_realtime_production": RollupSpec(
+        "mes_realtime_production", "timestamp", "line_code", "equipment_status",
+        counters=("takt_count", "good_count", "defect_count"),
+        gauges=("cycle_time_ms", "speed_rpm", "temperature_celsius", "pressure_bar"),
+    ),
+    "mes_equipment_status": RollupSpec(
+        "mes_equipment_status", "status_timestamp", "equipment_code", "status",
+        gauges=("speed_rpm", "temperature", "pressure"),
+    ),
+}
+
+
+def floor_time(ts: datetime, resolution: str) -> datetime:
+    """ts가 속한 버킷 시작 (UTC)"""
+    ts = ts.astimezone(timezone.utc)
+    if resolution == "1h":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(second=0, microsecond=0)
+
+
+def rollup_ddl(spec: RollupSpec, resolution: str) -> List[str]:
+    table = spec.table(resolution)
+    columns = [
+        "tenant_id UUID NOT NULL",
+        f"{spec.key} VARCHAR(50) NOT NULL",
+        "bucket_start TIMESTAMPTZ NOT NULL",
+        "samples INTEGER NOT NULL",
+        "running_samples INTEGER NOT NULL",
+        "last_status VARCHAR(20)",
+    ]
+    columns += [f"{c}_sum BIGINT" for c in spec.counters]
+    for g in spec.gauges:
+        columns += [f"{g}_min NUMERIC", f"{g}_max NUMERIC", f"{g}_avg NUMERIC", f"{g}_count INTEGER"]
+    columns.append(f"PRIMARY KEY (tenant_id, {spec.key}, bucket_start)")
+    return [
+        f"CREATE TABLE IF NOT EXISTS {table} (\n    " + ",\n    ".join(columns) + "\n)",
+        f"CREATE INDEX IF NOT EXISTS idx_{table}_bucket ON {table}(bucket_start)",
+    ]
+
+
+def _rollup_columns(spec: RollupSpec) -> List[str]:
+    columns = ["tenant_id", spec.key, "bucket_start", "samples", "running_samples", "last_status"]
+    columns += [f"{c}_sum" for c in spec.counters]
+    for g in spec.gauges:
+        columns += [f"{g}_min", f"{g}_max", f"{g}_avg", f"{g}_count"]
+    return columns
+
+
+def rollup_sql(spec: RollupSpec, resolution: str) -> str:
+    """[$1, $2) 구간 롤업 upsert (1m: raw 기준, 1h: 1m 기준)"""
+    unit = RESOLUTIONS[resolution][0]
+    if resolution == "1m":
+        ts = spec.time_column
+        source = spec.source
+        select = [
+            "tenant_id", spec.key, f"date_trunc('{unit}', {ts}, 'UTC')",
+            "COUNT(*)",
+            f"COUNT(*) FILTER (WHERE lower({spec.status_column}) = 'running')",
+            f"(array_agg({spec.status_column} ORDER BY {ts} DESC))[1]",
+        ]
+        select += [f"SUM({c})" for c in spec.counters]
+        for g in spec.gauges:
+            select += [f"MIN({g})", f"MAX({g})", f"AVG({g})", f"COUNT({g})"]
+        where = f" AND {spec.key} IS NOT NULL"
+    else:
+        ts = "bucket_start"
+        source = spec.table("1m")
+        select = [
+            "tenant_id", spec.key, f"date_trunc('{unit}', bucket_start, 'UTC')",
+            "SUM(samples)", "SUM(running_samples)",
+            "(array_agg(last_status ORDER BY bucket_start DESC))[1]",
+        ]
+        select += [f"SUM({c}_sum)" for c in spec.counters]
+        for g in spec.gauges:
+            select += [
+                f"MIN({g}_min)", f"MAX({g}_max)",
+                f"SUM({g}_avg * {g}_count) / NULLIF(SUM({g}_count), 0)", f"SUM({g}_count)",
+            ]
+        where = ""
+
+    columns = _rollup_columns(spec)
+    updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in columns[3:])
+    return f"""
+        INSERT INTO {spec.table(resolution)} ({", ".join(columns)})
+        SELECT {", ".join(select)}
+        FROM {source}
+        WHERE {ts} >= $1 AND {ts} < $2{where}
+        GROUP BY 1, 2, 3
+        ON CONFLICT (tenant_id, {spec.key}, bucket_start) DO UPDATE SET {updates}
+    """
+
+
+class Downsampler:
+    """
+    raw → 1분 → 1시간 롤업 관리자
+
+    해상도별 롤업 완료 시각(watermark)을 메모리에 유지하고 완료된 버킷만 집계
+    """
+
+    def __init__(self, db_pool, rollups: Optional[Dict[str, RollupSpec]] = None):
+        self.db_pool = db_pool
+        self.rollups = rollups if rollups is not None else ROLLUPS
+        self.minute_retention_days = settings.rollup_minute_retention_days or None
+        self.max_chunks_per_run = settings.rollup_max_chunks_per_run or None
+
+        self._rolled_until: Dict[Tuple[str, str], Optional[datetime]] = {}
+        self._ready: set = set()
+        self._lock = asyncio.Lock()
+
+        self.buckets_written: int = 0
+        self.last_run: Optional[datetime] = None
+
+    async def _ensure_tables(self, conn, spec: RollupSpec):
+        if spec.source in self._ready:
+            return
+        for resolution in RESOLUTIONS:
+            for ddl in rollup_ddl(spec, resolution):
+                await conn.execute(ddl)
+        self._ready.add(spec.source)
+
+    async def _watermark(self, conn, spec: RollupSpec, resolution: str) -> Optional[datetime]:
+        """롤업 시작 시각 (최초 1회: 마지막 버킷부터 재계산, 없으면 원천의 최초 시각)"""
+        key = (spec.source, resolution)
+        if self._rolled_until.get(key) is not None:
+            return self._rolled_until[key]
+
+        last = await conn.fetchval(f"SELECT MAX(bucket_start) FROM {spec.table(resolution)}")
+        if last is None:
+            if resolution == "1m":
+                last = await conn.fetchval(f"SELECT MIN({spec.time_column}) FROM {spec.source}")
+            else:
+                last = await conn.fetchval(f"SELECT MIN(bucket_start) FROM {spec.table('1m')}")
+        watermark = floor_time(last, resolution) if last else None
+        self._rolled_until[key] = watermark
+        return watermark
+
+    async def run(self, now: datetime) -> Dict[str, int]:
+        """완료된 버킷 롤업 + 1분 집계 retention (집계 테이블별 max_chunks_per_run 구간까지)
+
+        최초 실행처럼 watermark가 한참 뒤처져 있으면 이후 실행에서 이어서 롤업하므로
+        유지보수 tick 1회의 작업량이 전체 raw 이력에 비례하지 않는다.
+
+        Returns:
+            {집계 테이블: upsert된 버킷 수}
+        """
+        if not self.db_pool:
+            return {}
+        if now.tzinfo is None:
+            now = now.replace(tzinfo=timezone.utc)
+        written: Dict[str, int] = {}
+        async with self._lock:
+            async with self.db_pool.acquire() as conn:
+                for spec in self.rollups.values():
+                    await self._ensure_tables(conn, spec)
+                    for resolution, (_, chunk) in RESOLUTIONS.items():
+                        upper = floor_time(now, resolution)
+                        if resolution == "1h":
+                            # 1시간 집계는 1분 롤업이 끝난 구간까지만
+                            minute_until = self._rolled_until.get((spec.source, "1m"))
+                            if minute_until is None:
+                                continue
+                            upper = min(upper, floor_time(minute_until, resolution))
+
+                        lower = await self._watermark(conn, spec, resolution)
+                        if lower is None:
+                            continue
+                        table = spec.table(resolution)
+                        sql = rollup_sql(spec, resolution)
+                        chunks = 0
+                        while lower < upper and (self.max_chunks_per_run is None or chunks < self.max_chunks_per_run):
+                            chunk_end = min(lower + chunk, upper)
+                            status = await conn.execute(sql, lower, chunk_end)
+                            written[table] = written.get(table, 0) + int(status.split()[-1])
+                            lower = chunk_end
+                            self._rolled_until[(spec.source, resolution)] = lower
+                            chunks += 1
+
+                    await self._expire_minutes(conn, spec, now)
+
+        self.buckets_written += sum(written.values())
+        self.last_run = now
+        if written:
+            logger.debug(f"[Downsample] {written}")
+        return written
+
+    async def _expire_minutes(self, conn, spec: RollupSpec, now: datetime):
+        """1시간 집계로 넘어간 오래된 1분 집계 삭제"""
+        hour_until = self._rolled_until.get((spec.source, "1h"))
+        if not self.minute_retention_days or hour_until is None:
+            return
+        cutoff = min(now - timedelta(days=self.minute_retention_days), hour_until)
+        await conn.execute(f"DELETE FROM {spec.table('1m')} WHERE bucket_start < $1", cutoff)
+
+    def covered_until(self) -> Dict[str, Optional[datetime]]:
+        """원천 테이블별 raw를 삭제해도 되는 시각 (1분 롤업 완료 시각)"""
+        return {source: self._rolled_until.get((source, "1m")) for source in self.rollups}
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "tables": {
+                spec.table(resolution): (
+                    self._rolled_until[(spec.source, resolution)].isoformat()
+                    if self._rolled_until.get((spec.source, resolution)) else None
+                )
+                for spec in self.rollups.values()
+                for resolution in RESOLUTIONS
+            },
+            "minute_retention_days": self.minute_retention_days,
+            "max_chunks_per_run": self.max_chunks_per_run,
+            "buckets_written": self.buckets_written,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+        }
+
+
+# ==================== 조회 (API 라우터용) ====================
+
+def pick_resolution(start: datetime, end: datetime,
+                    raw_since: Optional[datetime], minute_since: Optional[datetime]) -> str:
+    """조회 구간에 맞는 해상도 (남아 있는 가장 세밀한 데이터 중 기간이 허용하는 것)"""
+    span = end - start
+    if raw_since is not None and start >= raw_since and span <= RAW_MAX_SPAN:
+        return "raw"
+    if minute_since is not None and start >= minute_since and span <= MINUTE_MAX_SPAN:
+        return "1m"
+    return "1h"
+
+
+async def resolve_resolution(db, source: str, tenant_id, start: datetime, end: datetime) -> str:
+    """raw / 1분 집계의 보존 시작 시각을 조회해 해상도 결정"""
+    spec = ROLLUPS[source]
+    raw_since = (await db.execute(
+        text(f"SELECT MIN({spec.time_column}) FROM {spec.source} WHERE tenant_id = :tenant_id"),
+        {"tenant_id": tenant_id},
+    )).scalar()
+    minute_since = None
+    if raw_since is None or start < raw_since:
+        try:
+            minute_since = (await db.execute(
+                text(f"SELECT MIN(bucket_start) FROM {spec.table('1m')} WHERE tenant_id = :tenant_id"),
+                {"tenant_id": tenant_id},
+            )).scalar()
+        except Exception:
+            # 집계 테이블 미생성 (Downsampler 미실행)
+            await db.rollback()
+    return pick_resolution(start, end, raw_since, minute_since)
+
+
+async def fetch_raw(
+    db,
+    source: str,
+    tenant_id,
+    start: datetime,
+    end: datetime,
+    key_value: Optional[str] = None,
+    limit: int = 100,
+) -> List[Dict[str, Any]]:
+    """raw 행 중 롤업 대상 컬럼만 반환 (fetch_rollup과 같은 형태)"""
+    spec = ROLLUPS[source]
+    select = [spec.time_column, spec.key, spec.status_column, *spec.counters, *spec.gauges]
+    rows = (await db.execute(text(f"""
+        SELECT {", ".join(select)}
+        FROM {spec.source}
+        WHERE tenant_id = :tenant_id
+        AND {spec.time_column} >= :start AND {spec.time_column} < :end
+        AND (CAST(:key_value AS VARCHAR) IS NULL OR {spec.key} = :key_value)
+        ORDER BY {spec.time_column} DESC
+        LIMIT :limit
+    """), {
+        "tenant_id": tenant_id, "start": start, "end": end,
+        "key_value": key_value, "limit": limit,
+    })).mappings().all()
+    return [{**row, "resolution": "raw"} for row in rows]
+
+
+async def fetch_rollup(
+    db,
+    source: str,
+    resolution: str,
+    tenant_id,
+    start: datetime,
+    end: datetime,
+    key_value: Optional[str] = None,
+    limit: int = 100,
+) -> List[Dict[str, Any]]:
+    """
+    집계 행을 raw와 같은 컬럼명으로 반환 (최신 버킷 우선)
+
+    카운터는 버킷 합계, 게이지는 평균 (+ _min/_max), 상태 컬럼은 버킷의 마지막 상태
+    """
+    spec = ROLLUPS[source]
+    select = [
+        f"bucket_start AS {spec.time_column}", spec.key, "samples", "running_samples",
+        f"last_status AS {spec.status_column}",
+    ]
+    select += [f"{c}_sum AS {c}" for c in spec.counters]
+    for g in spec.gauges:
+        select += [f"{g}_avg AS {g}", f"{g}_min", f"{g}_max"]
+
+    rows = (await db.execute(text(f"""
+        SELECT {", ".join(select)}
+        FROM {spec.table(resolution)}
+        WHERE tenant_id = :tenant_id
+        AND bucket_start >= :start AND bucket_start < :end
+        AND (CAST(:key_value AS VARCHAR) IS NULL OR {spec.key} = :key_value)
+        ORDER BY bucket_start DESC
+        LIMIT :limit
+    """), {
+        "tenant_id": tenant_id, "start": start, "end": end,
+        "key_value": key_value, "limit": limit,
+    })).mappings().all()
+    return [{**row, "resolution": resolution} for row in rows]
+
+
+# 싱글톤 인스턴스
+_downsampler: Optional[Downsampler] = None
+
+
+def get_downsampler(db_pool=None) -> Optional[Downsampler]:
+    """Downsampler 싱글톤 인스턴스 반환"""
+    global _downsampler
+    if _downsampler is None and db_pool:
+        _downsampler = Downsampler(db_pool)
+    return _downsampler
@@ -3,16 +3,23 @@ SimulationEngine - 실시간 시뮬레이션 엔진
 
 상태 관리 및 전체 시뮬레이션 조율
 Gap-Fill 기능으로 데이터 공백 자동 채우기 지원
+clock_mode로 실시간/배속/최대 속도(가상 시간) 실행 지원
 """
 
 import asyncio
+import time
 from enum import Enum
 from datetime import datetime
 from typing import Dict, List, Optional, Any, Callable
 from dataclasses import dataclass, field
 import logging
 
+from ..config import settings
+from .clock import ClockMode, MaxSpeedClock, SimulationClock, WallClock, create_clock
+from .downsampling import ROLLUPS, Downsampler, get_downsampler
 from .gap_fill import GapFillService, GapFillState
+from .leader import SimulationLeader
+from .partitions import PartitionManager, get_partition_manager
 
 logger = logging.getLogger(__name__)
 
@@ -48,6 +55,17 @@ class SimulationConfig:
     auto_gap_fill: bool = True       # 시작 시 자동 Gap-Fill
     min_gap_seconds: int = 60        # 최소 gap 임계값 (초)
 
+    # 시계 설정 (realtime / accelerated / max_speed)
+    clock_mode: str = ClockMode.REALTIME
+    speed_multiplier: float = 1.0              # accelerated: 실제 1초당 가상 초
+    virtual_start: Optional[datetime] = None   # 가상 시작 시각 (None이면 현재)
+    virtual_until: Optional[datetime] = None   # max_speed: 도달 시 자동 정지
+    max_speed_batch_size: int = 5000           # max_speed: COPY/저장 배치 행 수
+    event_throttle_seconds: float = 1.0        # 가상 모드: data_generated 이벤트 최소 간격 (실제 초)
+
+    # 파티션 관리 주기 (가상 시간 기준 초)
+    partition_maintenance_interval: int = 600
+
 
 @dataclass
 class SimulationStats:
@@ -81,6 +99,9 @@ class SimulationEngine:
         # 이벤트 리스너들 (WebSocket 브로드캐스트용)
         self._event_listeners: List[Callable] = []
 
+        # 레코드 리스너들 (생성된 레코드 전달, WebSocket frame 배칭용)
+        self._record_listeners: List[Callable] = []
+
         # 메인 루프 태스크
         self._main_task: Optional[asyncio.Task] = None
 
@@ -90,6 +111,26 @@ class SimulationEngine:
         # Gap-Fill 서비스
         self._gap_fill_service: Optional[GapFillService] = None
 
+        # 시계열 파티션 관리 (시뮬레이션 시계 기준 사전 생성 / retention)
+        self._partitions: Optional[PartitionManager] = get_partition_manager(db_pool)
+        self._downsampler: Optional[Downsampler] = (
+            get_downsampler(db_pool) if settings.rollup_enabled else None
+        )
+
+        # 멀티 워커: Ticker 소유권 (advisory lock) + 제어 명령 전달용 broadcast backend
+        self._leader: Optional[SimulationLeader] = SimulationLeader(db_pool) if db_pool else None
+        self._backend = None
+
+        # 시뮬레이션 시계 (start 시 clock_mode에 따라 생성)
+        self._clock: SimulationClock = WallClock()
+        self._until_task: Optional[asyncio.Task] = None
+
+        # 가상 모드: Phase 2 레코드 저장 버퍼 / 이벤트·레코드 발행 throttle
+        self._pending_records: Dict[str, List[Dict[str, Any]]] = {}
+        self._pending_counts: Dict[str, int] = {}
+        self._latest_records: Dict[str, List[Dict[str, Any]]] = {}
+        self._last_emit: Dict[str, float] = {}
+
     @property
     def state(self) -> SimulationState:
         return self._state
@@ -106,6 +147,63 @@ class SimulationEngine:
     def is_running(self) -> bool:
         return self._state == SimulationState.RUNNING
 
+    @property
+    def clock(self) -> SimulationClock:
+        return self._clock
+
+    @property
+    def is_leader(self) -> bool:
+        """이 워커가 Ticker를 소유하는지 여부"""
+        return self._leader is not None and self._leader.is_leader
+
+    def set_db_pool(self, db_pool):
+        """DB 풀 지정 (리더 선출 포함)"""
+        self._db_pool = db_pool
+        if self._leader is None:
+            self._leader = SimulationLeader(db_pool)
+        if self._partitions is None:
+            self._partitions = get_partition_manager(db_pool)
+        if self._downsampler is None and settings.rollup_enabled:
+            self._downsampler = get_downsampler(db_pool)
+
+    def attach_backend(self, backend):
+        """
+        Broadcast backend 연결
+
+        다른 워커에서 받은 stop/pause/resume 요청을 리더 워커가 실행하도록
+        "simulation" namespace의 "control" 채널을 구독한다.
+        """
+        self._backend = backend
+        backend.add_handler("simulation", self._on_backend_message)
+
+    async def _on_backend_message(self, channel: str, data: Dict[str, Any]):
+        """리더 워커에서만 제어 명령 실행"""
+        if channel != "control" or not self.is_leader:
+            return
+        command = data.get("command")
+        logger.info(f"Received forwarded simulation command: {command}")
+        if command == "stop":
+            await self.stop()
+        elif command == "pause":
+            await self.pause()
+        elif command == "resume":
+            await self.resume()
+
+    async def _forward_control(self, command: str) -> bool:
+        """
+        Ticker를 다른 워커가 소유 중이면 제어 명령을 전달
+
+        Returns:
+            전달했으면 True
+        """
+        if self.is_leader or self._backend is None or not self._backend.is_distributed:
+            return False
+        if self._leader is None or not await self._leader.is_held_elsewhere():
+            return False
+        await self._backend.publish("simulation", "control", {"command": command})
+        logger.info(f"Simulation command forwarded to leader worker: {command}")
+        return True
+
     def add_event_listener(self, listener: Callable):
         """이벤트 리스너 추가 (WebSocket 브로드캐스트용)"""
         self._event_listeners.append(listener)
@@ -115,6 +213,26 @@ class SimulationEngine:
         if listener in self._event_listeners:
             self._event_listeners.remove(listener)
 
+    def add_record_listener(self, listener: Callable):
+        """레코드 리스너 추가 - listener(generator_name, records)"""
+        self._record_listeners.append(listener)
+
+    def remove_record_listener(self, listener: Callable):
+        """레코드 리스너 제거"""
+        if listener in self._record_listeners:
+            self._record_listeners.remove(listener)
+
+    async def _publish_records(self, generator_name: str, records: List[Dict[str, Any]]):
+        """생성된 레코드를 리스너에게 전달"""
+        for listener in self._record_listeners:
+            try:
+                if asyncio.iscoroutinefunction(listener):
+                    await listener(generator_name, records)
+                else:
+                    listener(generator_name, records)
+            except Exception as e:
+                logger.error(f"Error publishing records: {e}")
+
     async def _broadcast_event(self, event_type: str, data: Dict[str, Any]):
         """모든 리스너에게 이벤트 브로드캐스트"""
         event = {
@@ -155,8 +273,25 @@ class SimulationEngine:
 
         logger.info("Starting simulation...")
 
-        # Gap-Fill 처리 (설정에 따라)
-        if self._config.auto_gap_fill and not skip_gap_fill and self._db_pool:
+        # Ticker 소유권 획득 (다른 워커가 실행 중이면 시작하지 않음)
+        if self._leader and not await self._leader.acquire():
+            logger.warning("Simulation is already running on another worker")
+            return False
+
+        try:
+            self._setup_clock()
+        except ValueError as e:
+            logger.error(f"Invalid clock configuration: {e}")
+            if self._leader:
+                await self._leader.release()
+            return False
+
+        # 시작 시각 기준 파티션 준비 (이후 partition_maintenance Ticker가 유지)
+        await self._maintain_partitions()
+
+        # Gap-Fill 처리 (설정에 따라) - 가상 시계는 현재 시각과 무관하므로 생략
+        if (self._config.auto_gap_fill and not skip_gap_fill and self._db_pool
+                and not self._clock.is_virtual):
             await self._handle_gap_fill()
 
         self._state = SimulationState.RUNNING
@@ -170,12 +305,65 @@ class SimulationEngine:
             "config": {
                 "tenant_id": self._config.tenant_id,
                 "enabled_scenarios": self._config.enabled_scenarios,
-            }
+            },
+            "clock": self._clock.get_status(),
         })
 
-        logger.info("Simulation started successfully")
+        # max_speed + virtual_until: 목표 시각 도달 시 자동 정지
+        if isinstance(self._clock, MaxSpeedClock):
+            self._until_task = asyncio.create_task(self._stop_when_finished(self._clock))
+
+        logger.info(f"Simulation started successfully (clock: {self._clock.mode})")
         return True
 
+    def _setup_clock(self):
+        """clock_mode에 따른 시계 생성 후 Generator에 연결"""
+        config = self._config
+        self._clock = create_clock(
+            mode=config.clock_mode,
+            speed=config.speed_multiplier,
+            start=config.virtual_start,
+            until=config.virtual_until,
+        )
+        batch_rows = config.max_speed_batch_size if self._clock.mode == ClockMode.MAX_SPEED else 0
+        for generator in self._generators.values():
+            generator.clock = self._clock
+            generator.write_batch_rows = batch_rows
+
+        self._pending_records.clear()
+        self._pending_counts.clear()
+        self._latest_records.clear()
+        self._last_emit.clear()
+
+    async def _maintain_partitions(self):
+        """시뮬레이션 시계 기준 다운샘플링 + 파티션 사전 생성 + retention"""
+        if not self._partitions:
+            return
+        try:
+            now = self._clock.now_utc()
+            covered_until = None
+            if self._downsampler:
+                # 버퍼(max_speed)에 남은 raw 행을 먼저 저장해야 완료된 버킷만 롤업됨
+                for generator in self._generators.values():
+                    for table in ROLLUPS:
+                        await generator.flush_writes(self._db_pool, table)
+                await self._downsampler.run(now)
+                covered_until = self._downsampler.covered_until()
+            result = await self._partitions.maintain(now, covered_until)
+            if result["removed"]:
+                logger.info(f"Partitions retired: {', '.join(result['removed'])}")
+        except Exception as e:
+            logger.error(f"Partition maintenance failed: {e}")
+            self._stats.errors += 1
+            self._stats.last_error = f"[partitions] {e}"
+
+    async def _stop_when_finished(self, clock: MaxSpeedClock):
+        """가상 시계가 virtual_until에 도달하면 정지"""
+        await clock.finished.wait()
+        logger.info(f"Virtual clock reached {clock.now_utc().isoformat()}, stopping simulation")
+        self._until_task = None
+        await self.stop()
+
     async def _handle_gap_fill(self):
         """Gap-Fill 처리"""
         logger.info("Checking for data gaps...")
@@ -186,6 +374,7 @@ class SimulationEngine:
             self._config.tenant_id
         )
         self._gap_fill_service.min_gap_seconds = self._config.min_gap_seconds
+        self._gap_fill_service.partitions = self._partitions
 
         # Generator들 등록
         for name, generator in self._generators.items():
@@ -234,16 +423,28 @@ class SimulationEngine:
     async def stop(self) -> bool:
         """시뮬레이션 정지"""
         if self._state == SimulationState.STOPPED:
+            if await self._forward_control("stop"):
+                return True
             logger.warning("Simulation is already stopped")
             return False
 
         logger.info("Stopping simulation...")
 
+        if self._until_task and self._until_task is not asyncio.current_task():
+            self._until_task.cancel()
+        self._until_task = None
+
         # Ticker들 정지
         await self._stop_tickers()
 
+        # 가상 모드에서 버퍼링된 데이터/이벤트 마무리
+        await self._flush_pending()
+
         self._state = SimulationState.STOPPED
 
+        if self._leader:
+            await self._leader.release()
+
         await self._broadcast_event("simulation_stopped", {
             "state": self._state.value,
             "stats": self._get_stats_dict()
@@ -255,6 +456,8 @@ class SimulationEngine:
     async def pause(self) -> bool:
         """시뮬레이션 일시정지"""
         if self._state != SimulationState.RUNNING:
+            if self._state == SimulationState.STOPPED and await self._forward_control("pause"):
+                return True
             logger.warning("Cannot pause: simulation is not running")
             return False
 
@@ -275,6 +478,8 @@ class SimulationEngine:
     async def resume(self) -> bool:
         """시뮬레이션 재개"""
         if self._state != SimulationState.PAUSED:
+            if self._state == SimulationState.STOPPED and await self._forward_control("resume"):
+                return True
             logger.warning("Cannot resume: simulation is not paused")
             return False
 
@@ -339,7 +544,8 @@ class SimulationEngine:
                 ticker = Ticker(
                     config=config,
                     callback=self._create_ticker_callback(name, generator),
-                    on_error=self._on_ticker_error
+                    on_error=self._on_ticker_error,
+                    clock=self._clock
                 )
                 self._tickers[name] = ticker
                 await ticker.start()
@@ -347,6 +553,19 @@ class SimulationEngine:
             else:
                 logger.warning(f"No generator registered for: {name}")
 
+        if self._partitions:
+            ticker = Ticker(
+                config=TickerConfig(
+                    name="partition_maintenance",
+                    interval_seconds=self._config.partition_maintenance_interval
+                ),
+                callback=self._maintain_partitions,
+                on_error=self._on_ticker_error,
+                clock=self._clock
+            )
+            self._tickers["partition_maintenance"] = ticker
+            await ticker.start()
+
     async def _stop_tickers(self):
         """모든 Ticker 정지"""
         for name, ticker in self._tickers.items():
@@ -354,6 +573,59 @@ class SimulationEngine:
             logger.info(f"Ticker stopped: {name}")
         self._tickers.clear()
 
+    async def _flush_pending(self):
+        """버퍼에 남은 레코드 저장 + 보류된 레코드/이벤트 발행"""
+        for name, generator in self._generators.items():
+            try:
+                if self._db_pool:
+                    # persist() 버퍼 행은 Phase 1 tick에서 이미 집계됨 → 저장만
+                    await generator.flush_writes(self._db_pool)
+                    # Phase 2는 save 시점에 집계하므로 보류분 저장 건수를 여기서 반영
+                    records = self._pending_records.pop(name, None)
+                    saved = await generator.save(records, self._db_pool) if records else 0
+                    self._stats.total_records_generated += saved
+                    if saved:
+                        self._stats.records_by_generator[name] = (
+                            self._stats.records_by_generator.get(name, 0) + saved
+                        )
+            except Exception as e:
+                logger.error(f"Error flushing buffered records [{name}]: {e}")
+                self._stats.errors += 1
+                self._stats.last_error = str(e)
+
+        for name in list(self._latest_records):
+            await self._emit_generated(name, force=True)
+        self._pending_records.clear()
+
+    async def _emit_generated(self, generator_name: str, force: bool = False):
+        """
+        레코드/data_generated 이벤트 발행
+
+        가상 시계 모드에서는 tick이 실제 시간보다 훨씬 자주 발생하므로
+        generator별로 event_throttle_seconds마다 최신 레코드와 누적 count만 발행
+        """
+        if self._clock.is_virtual and not force:
+            now = time.monotonic()
+            last = self._last_emit.get(generator_name, 0.0)
+            if now - last < self._config.event_throttle_seconds:
+                return
+            self._last_emit[generator_name] = now
+
+        records = self._latest_records.pop(generator_name, None)
+        count = self._pending_counts.pop(generator_name, 0)
+        if records is None:
+            return
+
+        if records:
+            await self._publish_records(generator_name, records)
+
+        await self._broadcast_event("data_generated", {
+            "generator": generator_name,
+            "count": count,
+            "total": self._stats.total_records_generated,
+            "virtual_time": self._clock.now_utc().isoformat() if self._clock.is_virtual else None,
+        })
+
     def _create_ticker_callback(self, generator_name: str, generator):
         """Ticker 콜백 생성"""
         async def callback():
@@ -375,10 +647,7 @@ class SimulationEngine:
                 else:
                     # Phase 2 패턴: generate 후 save 호출
                     records = await generator.generate()
-                    if records and self._db_pool:
-                        count = await generator.save(records, self._db_pool)
-                    else:
-                        count = 0
+                    count = await self._save_phase2(generator_name, generator, records)
 
                 self._stats.total_records_generated += count
 
@@ -386,11 +655,9 @@ class SimulationEngine:
                     self._stats.records_by_generator[generator_name] = 0
                 self._stats.records_by_generator[generator_name] += count
 
-                await self._broadcast_event("data_generated", {
-                    "generator": generator_name,
-                    "count": count,
-                    "total": self._stats.total_records_generated
-                })
+                self._latest_records[generator_name] = records or []
+                self._pending_counts[generator_name] = self._pending_counts.get(generator_name, 0) + count
+                await self._emit_generated(generator_name)
 
             except Exception as e:
                 logger.error(f"Error in generator {generator_name}: {e}")
@@ -400,6 +667,24 @@ class SimulationEngine:
 
         return callback
 
+    async def _save_phase2(self, generator_name: str, generator, records: List[Dict[str, Any]]) -> int:
+        """
+        Phase 2 레코드 저장
+
+        max_speed 모드에서는 max_speed_batch_size만큼 모아서 save 1회 호출
+        """
+        if not records or not self._db_pool:
+            return 0
+        if generator.write_batch_rows <= 0:
+            return await generator.save(records, self._db_pool)
+
+        pending = self._pending_records.setdefault(generator_name, [])
+        pending.extend(records)
+        if len(pending) < generator.write_batch_rows:
+            return 0
+        self._pending_records[generator_name] = []
+        return await generator.save(pending, self._db_pool)
+
     async def _on_ticker_error(self, ticker_name: str, error: Exception):
         """Ticker 에러 핸들러"""
         logger.error(f"Ticker error [{ticker_name}]: {error}")
@@ -444,17 +729,23 @@ class SimulationEngine:
 
         return {
             "state": self._state.value,
+            "is_leader": self.is_leader,
             "config": {
                 "tenant_id": self._config.tenant_id,
                 "enabled_scenarios": self._config.enabled_scenarios,
                 "base_defect_rate": self._config.base_defect_rate,
                 "production_variance": self._config.production_variance,
-                "auto_gap_fill": self._config.auto_gap_fill
+                "auto_gap_fill": self._config.auto_gap_fill,
+                "clock_mode": self._config.clock_mode,
+                "speed_multiplier": self._config.speed_multiplier,
             },
+            "clock": self._clock.get_status(),
             "stats": self._get_stats_dict(),
             "elapsed_seconds": elapsed,
             "tickers": ticker_status,
-            "gap_fill": gap_fill_status
+            "gap_fill": gap_fill_status,
+            "partitions": self._partitions.get_status() if self._partitions else None,
+            "downsampling": self._downsampler.get_status() if self._downsampler else None,
         }
 
     async def detect_gaps(self) -> List[Dict[str, Any]]:
@@ -487,11 +778,15 @@ class SimulationEngine:
         if not self._db_pool:
             return {"success": False, "error": "No database connection"}
 
+        if self._leader and await self._leader.is_held_elsewhere():
+            return {"success": False, "error": "Simulation is running on another worker"}
+
         # Gap-Fill 서비스 초기화
         self._gap_fill_service = GapFillService(
             self._db_pool,
             self._config.tenant_id
         )
+        self._gap_fill_service.partitions = self._partitions
 
         for name, generator in self._generators.items():
             self._gap_fill_service.register_generator(name, generator)
@@ -529,5 +824,5 @@ def get_simulation_engine(db_pool=None) -> SimulationEngine:
     if _engine_instance is None:
         _engine_instance = SimulationEngine(db_pool=db_pool)
     elif db_pool is not None and _engine_instance._db_pool is None:
-        _engine_instance._db_pool = db_pool
+        _engine_instance.set_db_pool(db_pool)
     return _engine_instance
@@ -103,6 +103,9 @@ class GapFillService:
         self._generators: Dict[str, Any] = {}
         self._cancel_requested = False
 
+        # PartitionManager (Engine이 지정) - 채우기 전 gap 구간 파티션 생성
+        self.partitions = None
+
         # 설정
         self.min_gap_seconds = 60  # 최소 gap (이 이상이면 채움)
         self.batch_size = 100  # 한 번에 생성할 레코드 수
@@ -221,6 +224,9 @@ class GapFillService:
 
                 print(f"[GapFill] Filling {gap.table_name}: {current_time} -> {now}")
 
+                if self.partitions:
+                    await self.partitions.ensure_range(current_time, now, [config['table']])
+
                 # 시간을 진행하면서 데이터 생성
                 records_batch = []
                 tick_count = 0
@@ -10,6 +10,8 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple
 import logging
 
+from ..clock import SimulationClock, WallClock
+
 logger = logging.getLogger(__name__)
 
 
@@ -95,6 +97,13 @@ class BaseRealtimeGenerator(ABC):
         self._last_generated = None
         self._master_loaded = False
 
+        # 시뮬레이션 시계 (Engine이 가상 시계로 교체 가능)
+        self.clock: SimulationClock = WallClock()
+
+        # 버퍼링 저장 (max_speed 모드) - 0이면 tick마다 즉시 저장
+        self.write_batch_rows: int = 0
+        self._write_buffer: Dict[str, Tuple[List[str], List[Tuple]]] = {}
+
         # Phase 2 속성
         self.lines: List[Dict] = []
         self.equipments: List[Dict] = []
@@ -204,6 +213,52 @@ class BaseRealtimeGenerator(ABC):
         """진행 중인 생산지시 목록"""
         return [dict(o) for o in self._master_data.get('active_orders', [])]
 
+    @staticmethod
+    async def bulk_insert(conn, table: str, columns: List[str], rows: List[Tuple]) -> int:
+        """
+        다중 행 일괄 저장 (COPY)
+
+        tick 당 한 번의 round-trip으로 저장하므로 라인/설비 수가 늘어도 비용이 거의 일정
+
+        Returns:
+            저장된 행 수
+        """
+        if not rows:
+            return 0
+        await conn.copy_records_to_table(table, records=rows, columns=columns)
+        return len(rows)
+
+    async def persist(self, db_pool, table: str, columns: List[str], rows: List[Tuple]) -> int:
+        """
+        tick 결과 저장
+
+        write_batch_rows > 0이면 버퍼에 모아 임계치 도달 시 한 번에 COPY
+
+        Returns:
+            실제로 DB에 저장된 행 수
+        """
+        if self.write_batch_rows <= 0:
+            async with db_pool.acquire() as conn:
+                return await self.bulk_insert(conn, table, columns, rows)
+
+        _, buffered = self._write_buffer.setdefault(table, (columns, []))
+        buffered.extend(rows)
+        if len(buffered) < self.write_batch_rows:
+            return 0
+        return await self.flush_writes(db_pool, table)
+
+    async def flush_writes(self, db_pool, table: Optional[str] = None) -> int:
+        """버퍼에 남은 행 저장"""
+        tables = [t for t in ([table] if table else list(self._write_buffer)) if t in self._write_buffer]
+        if not tables:
+            return 0
+        saved = 0
+        async with db_pool.acquire() as conn:
+            for name in tables:
+                columns, buffered = self._write_buffer.pop(name, (None, []))
+                saved += await self.bulk_insert(conn, name, columns, buffered)
+        return saved
+
     # ============ Phase 2 패턴 지원 메서드들 ============
 
     async def _ensure_master_data(self):
@@ -3,7 +3,7 @@ Defect Detail Generator (120초 주기)
 불량 상세 데이터 생성 - 개별 불량 건 기록
 """
 import random
-from datetime import datetime, timezone
+from datetime import datetime
 from typing import Any
 from uuid import uuid4
 
@@ -91,8 +91,8 @@ class DefectDetailGenerator(BaseRealtimeGenerator):
             if now.tzinfo is not None:
                 now = now.replace(tzinfo=None)
         else:
-            # 현재 UTC 시간 사용
-            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            # 현재 UTC 시간 사용 (시뮬레이션 시계 기준)
+            now = self.clock.utcnow()
         records = []
 
         # 불량 발생 수 결정 (0~5개)
@@ -242,37 +242,3 @@ class DefectDetailGenerator(BaseRealtimeGenerator):
                     print(f"[DefectDetail] Insert error: {e}")
 
             return count
-
-    async def _ensure_partition(self, conn, table_name: str, timestamp_column: str, timestamp_value: str):
-        """필요한 파티션이 있는지 확인하고 없으면 생성"""
-        ts = datetime.fromisoformat(timestamp_value.replace('Z', '+00:00'))
-        year = ts.year
-        half = "h1" if ts.month <= 6 else "h2"
-
-        partition_name = f"{table_name}_{year}_{half}"
-
-        if half == "h1":
-            start_date = f"{year}-01-01"
-            end_date = f"{year}-07-01"
-        else:
-            start_date = f"{year}-07-01"
-            end_date = f"{year + 1}-01-01"
-
-        exists = await conn.fetchval("""
-            SELECT EXISTS (
-                SELECT 1 FROM pg_tables
-                WHERE tablename = $1
-            )
-        """, partition_name)
-
-        if not exists:
-            try:
-                await conn.execute(f"""
-                    CREATE TABLE IF NOT EXISTS {partition_name}
-                    PARTITION OF {table_name}
-                    FOR VALUES FROM ('{start_date}') TO ('{end_date}')
-                """)
-                print(f"[{self.name}] Created partition: {partition_name}")
-            except Exception as e:
-                if "already exists" not in str(e):
-                    print(f"[{self.name}] Partition creation warning: {e}")
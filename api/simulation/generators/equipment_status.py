@@ -5,31 +5,73 @@ EquipmentStatusGenerator - 설비 상태 데이터 생성
 테이블: mes_equipment_status
 """
 
-import random
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import logging
 
+import numpy as np
+
 from .base import BaseRealtimeGenerator, EQUIPMENT_STATUS_CODES
 
 logger = logging.getLogger(__name__)
 
 
+# 상태 전이 확률 (마르코프 체인) - 행: 현재 상태, 열: 다음 상태 (STATUS_ORDER 순)
+STATUS_ORDER = ['RUNNING', 'IDLE', 'SETUP', 'MAINTENANCE', 'BREAKDOWN', 'CLEANING']
+STATUS_INDEX = {status: i for i, status in enumerate(STATUS_ORDER)}
+
+_TRANSITIONS = {
+    'RUNNING': {'RUNNING': 0.95, 'IDLE': 0.03, 'SETUP': 0.01, 'BREAKDOWN': 0.005, 'MAINTENANCE': 0.005},
+    'IDLE': {'IDLE': 0.7, 'RUNNING': 0.25, 'SETUP': 0.03, 'MAINTENANCE': 0.02},
+    'SETUP': {'SETUP': 0.6, 'RUNNING': 0.35, 'IDLE': 0.05},
+    'MAINTENANCE': {'MAINTENANCE': 0.8, 'IDLE': 0.15, 'RUNNING': 0.05},
+    'BREAKDOWN': {'BREAKDOWN': 0.7, 'MAINTENANCE': 0.2, 'IDLE': 0.1},
+    'CLEANING': {'CLEANING': 0.5, 'IDLE': 0.3, 'RUNNING': 0.2},
+}
+
+TRANSITION_CDF = np.cumsum(
+    np.array([[_TRANSITIONS[src].get(dst, 0.0) for dst in STATUS_ORDER] for src in STATUS_ORDER]),
+    axis=1,
+)
+
+_RUNNING = STATUS_INDEX['RUNNING']
+_IDLE = STATUS_INDEX['IDLE']
+_SETUP = STATUS_INDEX['SETUP']
+_BREAKDOWN = STATUS_INDEX['BREAKDOWN']
+
+
 class EquipmentStatusGenerator(BaseRealtimeGenerator):
     """
     설비 상태 Generator
 
     - 각 설비별 현재 상태, 온도, 압력 등 생성
     - 10초 주기로 실행
+    - 설비 상태는 배열로 유지하고 전 설비를 numpy로 한 번에 갱신, 저장은 tick당 1회 COPY
     """
 
+    INSERT_COLUMNS = [
+        'tenant_id', 'equipment_id', 'equipment_code', 'status_timestamp', 'status',
+        'previous_status', 'production_order_no', 'product_code',
+        'speed_rpm', 'temperature', 'pressure', 'alarm_code', 'alarm_message',
+        'operator_id', 'created_at',
+    ]
+
     def __init__(self, tenant_id: str = None):
         super().__init__("equipment_status")
         if tenant_id:
             self.tenant_id = tenant_id
 
-        # 설비별 상태 추적
-        self._equipment_states: Dict[str, Dict[str, Any]] = {}
+        self._rng = np.random.default_rng()
+
+        # 설비별 상태 추적 (equipment 목록 순서의 배열)
+        self._equipment_codes: List[str] = []
+        self._status: Optional[np.ndarray] = None
+        self._previous_status: Optional[np.ndarray] = None
+        self._base_temperature: Optional[np.ndarray] = None
+        self._base_pressure: Optional[np.ndarray] = None
+        self._temperature: Optional[np.ndarray] = None
+        self._pressure: Optional[np.ndarray] = None
+        self._operating_hours: Optional[np.ndarray] = None
 
     async def generate(self, db_pool, config) -> List[Dict[str, Any]]:
         """설비 상태 데이터 생성"""
@@ -46,195 +88,195 @@ class EquipmentStatusGenerator(BaseRealtimeGenerator):
             logger.warning(f"[{self.name}] No equipments found")
             return []
 
+        codes = [e['equipment_code'] for e in equipments]
+        if codes != self._equipment_codes:
+            self._init_equipment_states(codes)
+
+        now = self.clock.now()
+        n = len(codes)
+        rng = self._rng
+
+        # 상태 전이 (확률적) - 행별 누적분포에서 1회 추첨
+        previous = self._status
+        u = rng.random(n)
+        status = (u[:, None] > TRANSITION_CDF[previous]).sum(axis=1)
+        status = np.minimum(status, len(STATUS_ORDER) - 1)
+        self._status = status
+
+        running = status == _RUNNING
+        breakdown = status == _BREAKDOWN
+
+        # 센서 값 생성
+        temperature = self._generate_temperature(running, breakdown)
+        pressure = self._generate_pressure(running, breakdown)
+        vibration = self._generate_vibration(running, breakdown)
+        power_consumption = self._generate_power(status)
+
+        self._temperature = temperature
+        self._pressure = pressure
+
+        # 알람 상태 결정
+        critical = (temperature > 95) | (pressure > 8) | (vibration > 12)
+        warning = ~critical & ((temperature > 85) | (pressure > 6.5) | (vibration > 8))
+        temp_high = warning & (temperature > 85)
+
+        operating_hours = self._operating_hours.tolist()
+        # 가동 중이면 운전시간 증가
+        self._operating_hours = self._operating_hours + np.where(running, 10 / 3600, 0.0)
+
+        status_l = status.tolist()
+        prev_l = self._previous_status.tolist()
+        temp_l = temperature.tolist()
+        pres_l = pressure.tolist()
+        vib_l = vibration.tolist()
+        power_l = power_consumption.tolist()
+        critical_l = critical.tolist()
+        warning_l = warning.tolist()
+        temp_high_l = temp_high.tolist()
+
         records = []
-        now = datetime.now()
-
-        async with db_pool.acquire() as conn:
-            for equipment in equipments:
-                equipment_code = equipment['equipment_code']
-
-                # 설비 상태 초기화 또는 업데이트
-                if equipment_code not in self._equipment_states:
-                    self._equipment_states[equipment_code] = self._init_equipment_state(equipment)
-
-                state = self._equipment_states[equipment_code]
-
-                # 상태 전이 (확률적)
-                new_status = self._transition_status(state['status'])
-                state['status'] = new_status
-
-                # 센서 값 생성
-                temperature = self._generate_temperature(state, new_status)
-                pressure = self._generate_pressure(state, new_status)
-                vibration = self._generate_vibration(state, new_status)
-                power_consumption = self._generate_power(state, new_status)
-
-                state['temperature'] = temperature
-                state['pressure'] = pressure
-
-                # 알람 상태 결정
-                alarm_status = self._check_alarm(temperature, pressure, vibration)
-
-                record = {
-                    'tenant_id': config.tenant_id,
-                    'equipment_id': equipment['id'],
-                    'equipment_code': equipment_code,
-                    'line_code': equipment['line_code'],
-                    'status_timestamp': now,
-                    'status': new_status,
-                    'temperature': temperature,
-                    'pressure': pressure,
-                    'vibration': vibration,
-                    'power_consumption': power_consumption,
-                    'operating_hours': state['operating_hours'],
-                    'alarm_status': alarm_status,
-                    'alarm_code': 'TEMP_HIGH' if alarm_status == 'WARNING' and temperature > 85 else None,
-                }
-
-                # 가동 중이면 운전시간 증가
-                if new_status == 'RUNNING':
-                    state['operating_hours'] += 10 / 3600  # 10초를 시간으로 환산
-
-                # DB 저장 (기존 스키마에 맞춤: mes_equipment_status)
-                # 스키마: status VARCHAR(20) CHECK (status IN ('running', 'idle', 'setup', 'breakdown', 'maintenance', 'off'))
-                try:
-                    await conn.execute("""
-                        INSERT INTO mes_equipment_status
-                        (tenant_id, equipment_id, equipment_code, status_timestamp, status,
-                         previous_status, production_order_no, product_code,
-                         speed_rpm, temperature, pressure, alarm_code, alarm_message,
-                         operator_id, created_at)
-                        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15)
-                    """,
-                        record['tenant_id'],
-                        record['equipment_id'],
-                        record['equipment_code'],
-                        record['status_timestamp'],
-                        record['status'].lower(),  # 소문자로 저장
-                        state.get('previous_status', '').lower() if state.get('previous_status') else None,
-                        None,  # production_order_no
-                        None,  # product_code
-                        None,  # speed_rpm
-                        record['temperature'],
-                        record['pressure'],
-                        record['alarm_code'],
-                        f"Temperature: {record['temperature']}C, Pressure: {record['pressure']} bar" if record['alarm_code'] else None,
-                        None,  # operator_id
-                        now
-                    )
-                    # 이전 상태 업데이트
-                    state['previous_status'] = new_status
-                    records.append(record)
-                except Exception as e:
-                    logger.error(f"[{self.name}] Failed to insert record for {equipment_code}: {e}")
+        rows = []
+        for i, equipment in enumerate(equipments):
+            status_name = STATUS_ORDER[status_l[i]]
+            alarm_status = 'CRITICAL' if critical_l[i] else ('WARNING' if warning_l[i] else 'NORMAL')
+            alarm_code = 'TEMP_HIGH' if temp_high_l[i] else None
+
+            record = {
+                'tenant_id': config.tenant_id,
+                'equipment_id': equipment['id'],
+                'equipment_code': codes[i],
+                'line_code': equipment['line_code'],
+                'status_timestamp': now,
+                'status': status_name,
+                'temperature': temp_l[i],
+                'pressure': pres_l[i],
+                'vibration': vib_l[i],
+                'power_consumption': power_l[i],
+                'operating_hours': operating_hours[i],
+                'alarm_status': alarm_status,
+                'alarm_code': alarm_code,
+            }
+            records.append(record)
+
+            # 기존 스키마에 맞춤: mes_equipment_status
+            # status CHECK (status IN ('running', 'idle', 'setup', 'breakdown', 'maintenance', 'off'))
+            previous_status = STATUS_ORDER[prev_l[i]].lower() if prev_l[i] >= 0 else None
+            rows.append((
+                record['tenant_id'],
+                record['equipment_id'],
+                record['equipment_code'],
+                record['status_timestamp'],
+                status_name.lower(),  # 소문자로 저장
+                previous_status,
+                None,  # production_order_no
+                None,  # product_code
+                None,  # speed_rpm
+                record['temperature'],
+                record['pressure'],
+                alarm_code,
+                f"Temperature: {record['temperature']}C, Pressure: {record['pressure']} bar" if alarm_code else None,
+                None,  # operator_id
+                now,
+            ))
+
+        # DB 저장 (tick당 1회 COPY, max_speed 모드에서는 여러 tick을 모아서 저장)
+        try:
+            await self.persist(db_pool, 'mes_equipment_status', self.INSERT_COLUMNS, rows)
+        except Exception as e:
+            logger.error(f"[{self.name}] Failed to insert {len(rows)} records: {e}")
+            return []
+
+        # 이전 상태 업데이트
+        self._previous_status = status.copy()
 
         logger.debug(f"[{self.name}] Generated {len(records)} records")
         return records
 
-    def _init_equipment_state(self, equipment: Dict) -> Dict[str, Any]:
-        """설비 초기 상태 설정"""
+    def _init_equipment_states(self, codes: List[str]):
+        """설비 초기 상태 설정 (기존 설비의 상태는 유지)"""
+        rng = self._rng
+        n = len(codes)
+        old_index = {code: i for i, code in enumerate(self._equipment_codes)}
+
         # 초기 상태는 대부분 가동 중
-        initial_status = self.weighted_choice({
-            'RUNNING': 0.7,
-            'IDLE': 0.2,
-            'SETUP': 0.05,
-            'MAINTENANCE': 0.05
-        })
-
-        return {
-            'equipment_code': equipment['equipment_code'],
-            'status': initial_status,
-            'base_temperature': random.uniform(40, 60),  # 기준 온도
-            'base_pressure': random.uniform(2, 5),       # 기준 압력 (bar)
-            'temperature': None,
-            'pressure': None,
-            'operating_hours': random.uniform(0, 1000),  # 초기 운전시간
-        }
-
-    def _transition_status(self, current_status: str) -> str:
-        """상태 전이 (마르코프 체인 방식)"""
-        transitions = {
-            'RUNNING': {'RUNNING': 0.95, 'IDLE': 0.03, 'SETUP': 0.01, 'BREAKDOWN': 0.005, 'MAINTENANCE': 0.005},
-            'IDLE': {'IDLE': 0.7, 'RUNNING': 0.25, 'SETUP': 0.03, 'MAINTENANCE': 0.02},
-            'SETUP': {'SETUP': 0.6, 'RUNNING': 0.35, 'IDLE': 0.05},
-            'MAINTENANCE': {'MAINTENANCE': 0.8, 'IDLE': 0.15, 'RUNNING': 0.05},
-            'BREAKDOWN': {'BREAKDOWN': 0.7, 'MAINTENANCE': 0.2, 'IDLE': 0.1},
-            'CLEANING': {'CLEANING': 0.5, 'IDLE': 0.3, 'RUNNING': 0.2},
-        }
-
-        probs = transitions.get(current_status, {'IDLE': 1.0})
-        return self.weighted_choice(probs)
-
-    def _generate_temperature(self, state: Dict, status: str) -> float:
+        status = rng.choice(
+            [_RUNNING, _IDLE, _SETUP, STATUS_INDEX['MAINTENANCE']],
+            size=n,
+            p=[0.7, 0.2, 0.05, 0.05],
+        )
+        previous_status = np.full(n, -1)
+        base_temperature = rng.uniform(40, 60, n)   # 기준 온도
+        base_pressure = rng.uniform(2, 5, n)        # 기준 압력 (bar)
+        temperature = np.full(n, np.nan)
+        pressure = np.full(n, np.nan)
+        operating_hours = rng.uniform(0, 1000, n)   # 초기 운전시간
+
+        for i, code in enumerate(codes):
+            j = old_index.get(code)
+            if j is None:
+                continue
+            status[i] = self._status[j]
+            previous_status[i] = self._previous_status[j]
+            base_temperature[i] = self._base_temperature[j]
+            base_pressure[i] = self._base_pressure[j]
+            temperature[i] = self._temperature[j]
+            pressure[i] = self._pressure[j]
+            operating_hours[i] = self._operating_hours[j]
+
+        self._equipment_codes = list(codes)
+        self._status = status
+        self._previous_status = previous_status
+        self._base_temperature = base_temperature
+        self._base_pressure = base_pressure
+        self._temperature = temperature
+        self._pressure = pressure
+        self._operating_hours = operating_hours
+
+    def _generate_temperature(self, running: np.ndarray, breakdown: np.ndarray) -> np.ndarray:
         """온도 생성"""
-        base = state['base_temperature']
-
-        if status == 'RUNNING':
-            # 가동 중: 기준 온도 + 20~40도
-            temp = base + random.uniform(20, 40)
-        elif status == 'BREAKDOWN':
-            # 고장: 높은 온도 가능
-            temp = base + random.uniform(30, 60)
-        else:
-            # 기타: 기준 온도 근처
-            temp = base + random.uniform(-5, 10)
+        n = len(running)
+        # 가동 중: 기준 온도 + 20~40도 / 고장: 높은 온도 가능 / 기타: 기준 온도 근처
+        low = np.where(running, 20, np.where(breakdown, 30, -5))
+        high = np.where(running, 40, np.where(breakdown, 60, 10))
+        temp = self._base_temperature + self._rng.uniform(low, high, n)
 
         # 이전 온도와 급격한 변화 방지 (이동 평균)
-        if state['temperature'] is not None:
-            temp = state['temperature'] * 0.7 + temp * 0.3
+        prev = self._temperature
+        temp = np.where(np.isnan(prev), temp, prev * 0.7 + temp * 0.3)
 
-        return round(temp, 1)
+        return np.round(temp, 1)
 
-    def _generate_pressure(self, state: Dict, status: str) -> float:
+    def _generate_pressure(self, running: np.ndarray, breakdown: np.ndarray) -> np.ndarray:
         """압력 생성 (bar)"""
-        base = state['base_pressure']
-
-        if status == 'RUNNING':
-            pressure = base + random.uniform(0.5, 2)
-        elif status == 'BREAKDOWN':
-            # 고장 시 압력 불안정
-            pressure = base + random.uniform(-1, 3)
-        else:
-            pressure = base + random.uniform(-0.5, 0.5)
+        n = len(running)
+        # 고장 시 압력 불안정
+        low = np.where(running, 0.5, np.where(breakdown, -1, -0.5))
+        high = np.where(running, 2, np.where(breakdown, 3, 0.5))
+        pressure = self._base_pressure + self._rng.uniform(low, high, n)
 
         # 이전 압력과 급격한 변화 방지
-        if state['pressure'] is not None:
-            pressure = state['pressure'] * 0.7 + pressure * 0.3
+        prev = self._pressure
+        pressure = np.where(np.isnan(prev), pressure, prev * 0.7 + pressure * 0.3)
 
-        return round(max(0, pressure), 2)
+        return np.round(np.maximum(0, pressure), 2)
 
-    def _generate_vibration(self, state: Dict, status: str) -> float:
+    def _generate_vibration(self, running: np.ndarray, breakdown: np.ndarray) -> np.ndarray:
         """진동 생성 (mm/s)"""
-        if status == 'RUNNING':
-            vibration = random.uniform(1, 5)
-        elif status == 'BREAKDOWN':
-            # 고장 시 높은 진동
-            vibration = random.uniform(5, 15)
-        else:
-            vibration = random.uniform(0, 1)
-
-        return round(vibration, 2)
+        n = len(running)
+        # 고장 시 높은 진동
+        low = np.where(running, 1, np.where(breakdown, 5, 0))
+        high = np.where(running, 5, np.where(breakdown, 15, 1))
+        return np.round(self._rng.uniform(low, high, n), 2)
 
-    def _generate_power(self, state: Dict, status: str) -> float:
+    def _generate_power(self, status: np.ndarray) -> np.ndarray:
         """전력 소비량 생성 (kW)"""
-        if status == 'RUNNING':
-            power = random.uniform(10, 50)
-        elif status in ('IDLE', 'SETUP'):
-            power = random.uniform(1, 5)
-        else:
-            power = random.uniform(0, 2)
-
-        return round(power, 2)
-
-    def _check_alarm(self, temperature: float, pressure: float, vibration: float) -> str:
-        """알람 상태 확인"""
-        if temperature > 95 or pressure > 8 or vibration > 12:
-            return 'CRITICAL'
-        elif temperature > 85 or pressure > 6.5 or vibration > 8:
-            return 'WARNING'
-        else:
-            return 'NORMAL'
+        n = len(status)
+        standby = (status == _IDLE) | (status == _SETUP)
+        low = np.where(status == _RUNNING, 10, np.where(standby, 1, 0))
+        high = np.where(status == _RUNNING, 50, np.where(standby, 5, 2))
+        return np.round(self._rng.uniform(low, high, n), 2)
 
     def reset_states(self):
         """설비 상태 리셋"""
-        self._equipment_states.clear()
+        self._equipment_codes = []
+        self._status = None
@@ -3,12 +3,13 @@ ERP Transaction Generator (1800초 주기)
 ERP 거래 데이터 생성 - 수주/발주/재고 트랜잭션
 """
 import random
-from datetime import datetime, timezone, date, timedelta
+from datetime import datetime, date, timedelta
 from typing import Any
 from uuid import uuid4
 import json
 
 from .base import BaseRealtimeGenerator
+from ..partitions import get_partition_manager
 
 
 class ERPTransactionGenerator(BaseRealtimeGenerator):
@@ -60,7 +61,7 @@ class ERPTransactionGenerator(BaseRealtimeGenerator):
     def _get_next_sequence(self, prefix: str) -> str:
         """순번 생성"""
         self.sequence_counters[prefix] = self.sequence_counters.get(prefix, 1000) + 1
-        today = datetime.now().strftime("%Y%m%d")
+        today = self.clock.now().strftime("%Y%m%d")
         return f"{prefix}{today}-{self.sequence_counters[prefix]:04d}"
 
     async def generate(self) -> list[dict[str, Any]]:
@@ -70,7 +71,7 @@ class ERPTransactionGenerator(BaseRealtimeGenerator):
         if not self.products:
             return []
 
-        now = datetime.now(timezone.utc)
+        now = self.clock.now_utc()
         today = now.date()
         records = {
             "sales_orders": [],
@@ -236,13 +237,16 @@ class ERPTransactionGenerator(BaseRealtimeGenerator):
         data = records[0]
         count = 0
 
+        # 파티션 확인 (캐시된 준비 범위 밖일 때만 DDL 실행)
+        partitions = get_partition_manager(pool)
+        if partitions:
+            for txn_date in {txn["transaction_date"] for txn in data.get("inventory_transactions", [])}:
+                await partitions.ensure(datetime.fromisoformat(txn_date), ["erp_inventory_transaction"])
+
         async with pool.acquire() as conn:
             # 재고 트랜잭션 저장
             for txn in data.get("inventory_transactions", []):
                 try:
-                    # 파티션 확인
-                    await self._ensure_partition(conn, "erp_inventory_transaction", "transaction_date", txn["transaction_date"])
-
                     await conn.execute("""
                         INSERT INTO erp_inventory_transaction (
                             id, tenant_id, transaction_no, transaction_date, posting_date,
@@ -400,37 +404,3 @@ class ERPTransactionGenerator(BaseRealtimeGenerator):
                     print(f"[ERPTransaction] Purchase order insert error: {e}")
 
         return count
-
-    async def _ensure_partition(self, conn, table_name: str, timestamp_column: str, date_value: str):
-        """필요한 파티션이 있는지 확인하고 없으면 생성"""
-        ts = datetime.fromisoformat(date_value)
-        year = ts.year
-        half = "h1" if ts.month <= 6 else "h2"
-
-        partition_name = f"{table_name}_{year}_{half}"
-
-        if half == "h1":
-            start_date = f"{year}-01-01"
-            end_date = f"{year}-07-01"
-        else:
-            start_date = f"{year}-07-01"
-            end_date = f"{year + 1}-01-01"
-
-        exists = await conn.fetchval("""
-            SELECT EXISTS (
-                SELECT 1 FROM pg_tables
-                WHERE tablename = $1
-            )
-        """, partition_name)
-
-        if not exists:
-            try:
-                await conn.execute(f"""
-                    CREATE TABLE IF NOT EXISTS {partition_name}
-                    PARTITION OF {table_name}
-                    FOR VALUES FROM ('{start_date}') TO ('{end_date}')
-                """)
-                print(f"[{self.name}] Created partition: {partition_name}")
-            except Exception as e:
-                if "already exists" not in str(e):
-                    print(f"[{self.name}] Partition creation warning: {e}")
@@ -3,7 +3,7 @@ OEE Calculator Generator (3600초 주기)
 설비 OEE 계산 및 저장 - 시간당 OEE 지표
 """
 import random
-from datetime import datetime, timezone, date
+from datetime import datetime, date
 from typing import Any
 from uuid import uuid4
 import json
@@ -66,7 +66,7 @@ class OEECalculator(BaseRealtimeGenerator):
         if not self.equipments or not self.lines:
             return []
 
-        now = datetime.now(timezone.utc)
+        now = self.clock.now_utc()
         calculation_date = now.date()
         shift_code = self._get_shift_code(now)
         records = []
@@ -3,7 +3,7 @@ Production Result Generator (60초 주기)
 생산 실적 데이터 생성 - 공정별 생산 결과
 """
 import random
-from datetime import datetime, timezone
+from datetime import datetime
 from typing import Any
 from uuid import uuid4
 
@@ -21,6 +21,10 @@ class ProductionResultGenerator(BaseRealtimeGenerator):
         # 생산지시 상태 추적 (라인별)
         self.line_production_state: dict[str, dict] = {}
 
+        # 라인별 장착 자재 릴 로트 (피더 슬롯 순서) - 교체 전까지 여러 제품 로트에 투입
+        self.line_reels: dict[str, list[str]] = {}
+        self.reel_slots = 8
+
         # 공정 정의
         self.operations = [
             (10, "Solder Paste Print"),
@@ -48,17 +52,31 @@ class ProductionResultGenerator(BaseRealtimeGenerator):
         else:
             return "3"  # 야간
 
+    def _new_reel_lot(self) -> str:
+        return f"RL{self.clock.now().strftime('%Y%m%d')}{random.randint(10000, 99999)}"
+
+    def _current_reels(self, line_code: str) -> list[str]:
+        """라인에 장착된 릴 로트 (틱마다 5% 확률로 한 슬롯 릴 교체)"""
+        reels = self.line_reels.get(line_code)
+        if reels is None:
+            reels = [self._new_reel_lot() for _ in range(self.reel_slots)]
+            self.line_reels[line_code] = reels
+        elif random.random() < 0.05:
+            reels[random.randrange(len(reels))] = self._new_reel_lot()
+        return reels
+
     def _init_line_state(self, line_code: str, product_code: str) -> dict:
         """라인별 생산 상태 초기화"""
         return {
-            "production_order_no": f"PO{datetime.now().strftime('%Y%m%d')}-{line_code[-3:]}",
+            "production_order_no": f"PO{self.clock.now().strftime('%Y%m%d')}-{line_code[-3:]}",
             "product_code": product_code,
-            "lot_no": f"LOT{datetime.now().strftime('%Y%m%d%H%M')}-{random.randint(100, 999)}",
+            "lot_no": f"LOT{self.clock.now().strftime('%Y%m%d%H%M')}-{random.randint(100, 999)}",
             "current_operation_idx": 0,
             "cumulative_input": 0,
             "cumulative_output": 0,
             "cumulative_good": 0,
             "cumulative_defect": 0,
+            "linked_reels": set(),
         }
 
     async def generate(self, timestamp: datetime = None) -> list[dict[str, Any]]:
@@ -82,8 +100,8 @@ class ProductionResultGenerator(BaseRealtimeGenerator):
             if now.tzinfo is not None:
                 now = now.replace(tzinfo=None)
         else:
-            # 현재 UTC 시간 사용
-            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            # 현재 UTC 시간 사용 (시뮬레이션 시계 기준)
+            now = self.clock.utcnow()
         shift_code = self._get_shift_code(now)
         records = []
 
@@ -162,7 +180,10 @@ class ProductionResultGenerator(BaseRealtimeGenerator):
                 "operator_name": operator_name,
                 "result_type": "normal",
                 "reported_by": operator_code,
+                # 이 로트에 새로 투입된 릴 로트 (로트 계보)
+                "material_lots": [r for r in self._current_reels(line_code) if r not in state["linked_reels"]],
             }
+            state["linked_reels"].update(record["material_lots"])
 
             records.append(record)
 
@@ -172,9 +193,13 @@ class ProductionResultGenerator(BaseRealtimeGenerator):
             state["cumulative_good"] += good_qty
             state["cumulative_defect"] += defect_qty
 
-            # 다음 공정으로 이동 (10% 확률로)
+            # 다음 공정으로 이동 (10% 확률로), 마지막 공정을 마치면 새 로트 시작
             if random.random() < 0.1:
                 state["current_operation_idx"] = (state["current_operation_idx"] + 1) % len(self.operations)
+                if state["current_operation_idx"] == 0:
+                    self.line_production_state[line_code] = self._init_line_state(
+                        line_code, state["product_code"]
+                    )
 
         return records
 
@@ -227,4 +252,29 @@ class ProductionResultGenerator(BaseRealtimeGenerator):
                 except Exception as e:
                     print(f"[ProductionResult] Insert error: {e}")
 
+            # 로트 계보: 릴 로트 → 제품 로트 (재시작 등으로 중복된 쌍은 무시)
+            edges = {
+                (reel_lot, record["lot_no"]): record
+                for record in records
+                for reel_lot in record.get("material_lots", [])
+            }
+            if edges:
+                try:
+                    await conn.executemany("""
+                        INSERT INTO mes_lot_genealogy (
+                            tenant_id, parent_lot_no, child_lot_no, relation_type,
+                            child_item_code, production_order_no, line_code, linked_at, source
+                        ) VALUES ($1, $2, $3, 'consume', $4, $5, $6, $7, 'realtime')
+                        ON CONFLICT (tenant_id, parent_lot_no, child_lot_no) DO NOTHING
+                    """, [
+                        (
+                            record["tenant_id"], parent_lot_no, child_lot_no,
+                            record["product_code"], record["production_order_no"],
+                            record["line_code"], record["result_timestamp"],
+                        )
+                        for (parent_lot_no, child_lot_no), record in edges.items()
+                    ])
+                except Exception as e:
+                    print(f"[ProductionResult] Genealogy insert error: {e}")
+
             return count
@@ -10,6 +10,8 @@ from datetime import datetime
 from typing import List, Dict, Any
 import logging
 
+import numpy as np
+
 from .base import BaseRealtimeGenerator
 
 logger = logging.getLogger(__name__)
@@ -21,13 +23,23 @@ class RealtimeProductionGenerator(BaseRealtimeGenerator):
 
     - 각 라인별 현재 생산 상태 생성
     - 5초 주기로 실행
+    - 전체 라인 추첨은 numpy 벡터 연산, 저장은 tick당 1회 COPY
     """
 
+    INSERT_COLUMNS = [
+        'tenant_id', 'timestamp', 'line_code', 'equipment_code', 'production_order_no',
+        'product_code', 'takt_count', 'good_count', 'defect_count',
+        'cycle_time_ms', 'target_cycle_time_ms', 'equipment_status',
+        'speed_rpm', 'temperature_celsius', 'pressure_bar', 'created_at',
+    ]
+
     def __init__(self, tenant_id: str = None):
         super().__init__("realtime_production")
         if tenant_id:
             self.tenant_id = tenant_id
 
+        self._rng = np.random.default_rng()
+
         # 라인별 상태 추적 (시뮬레이션 상태 유지)
         self._line_states: Dict[str, Dict[str, Any]] = {}
 
@@ -46,96 +58,94 @@ class RealtimeProductionGenerator(BaseRealtimeGenerator):
             logger.warning(f"[{self.name}] No production lines found")
             return []
 
+        now = self.clock.now()
+
+        # 라인 상태 초기화
+        line_codes = [line['line_code'] for line in lines]
+        for line_code in line_codes:
+            if line_code not in self._line_states:
+                self._line_states[line_code] = self._init_line_state(line_code)
+        states = [self._line_states[line_code] for line_code in line_codes]
+
+        # 전체 라인을 한 번에 추첨 (라인 수와 무관하게 tick당 numpy 호출 수 일정)
+        n = len(line_codes)
+        rng = self._rng
+
+        # 생산 상태 결정 (90% 가동, 10% 비가동)
+        is_running = rng.random(n) < 0.9
+
+        # 생산량: 기준 생산율(분당) ± 편차 -> 5초당 생산량
+        base_rates = np.array([state['base_rate'] for state in states])
+        variance = config.production_variance
+        production_rate = base_rates * (1 + rng.uniform(-variance, variance, n))
+        produced = np.where(is_running, np.maximum(1, (production_rate / 12).astype(np.int64)), 0)
+
+        # 불량: 생산 수량당 베르누이 시행 -> 라인별 이항분포 1회 추첨
+        defects = rng.binomial(produced, config.base_defect_rate)
+        good = produced - defects
+        cycle_times = np.round(rng.uniform(8, 15, n), 2)
+
+        produced_l = produced.tolist()
+        defects_l = defects.tolist()
+        good_l = good.tolist()
+        running_l = is_running.tolist()
+        cycle_l = cycle_times.tolist()
+
         records = []
-        now = datetime.now()
-
-        async with db_pool.acquire() as conn:
-            for line in lines:
-                line_code = line['line_code']
-
-                # 라인 상태 초기화 또는 업데이트
-                if line_code not in self._line_states:
-                    self._line_states[line_code] = self._init_line_state(line_code)
-
-                state = self._line_states[line_code]
-
-                # 생산 상태 결정 (90% 가동, 10% 비가동)
-                is_running = random.random() < 0.9
-
-                if is_running:
-                    # 생산량 증가
-                    production_rate = self.apply_variance(
-                        state['base_rate'],
-                        config.production_variance * 100
-                    )
-                    produced = max(1, int(production_rate / 12))  # 5초당 생산량
-
-                    # 불량 발생 여부
-                    defect_rate = config.base_defect_rate
-                    defects = 0
-                    for _ in range(produced):
-                        if random.random() < defect_rate:
-                            defects += 1
-
-                    good_qty = produced - defects
-                    state['produced_qty'] += produced
-                    state['good_qty'] += good_qty
-                    state['defect_qty'] += defects
-
-                else:
-                    produced = 0
-                    good_qty = 0
-                    defects = 0
-
-                # 데이터 저장
-                record = {
-                    'tenant_id': config.tenant_id,
-                    'line_code': line_code,
-                    'record_timestamp': now,
-                    'status': 'RUNNING' if is_running else 'IDLE',
-                    'current_product': state.get('current_product'),
-                    'current_order': state.get('current_order'),
-                    'produced_qty': produced,
-                    'good_qty': good_qty,
-                    'defect_qty': defects,
-                    'cumulative_produced': state['produced_qty'],
-                    'cumulative_good': state['good_qty'],
-                    'cumulative_defect': state['defect_qty'],
-                    'cycle_time': round(random.uniform(8, 15), 2) if is_running else None,
-                    'target_rate': state['target_rate'],
-                    'actual_rate': round(produced * 12, 2) if is_running else 0,  # 분당 환산
-                }
-
-                # DB 저장 (기존 스키마에 맞춤: mes_realtime_production)
-                try:
-                    await conn.execute("""
-                        INSERT INTO mes_realtime_production
-                        (tenant_id, timestamp, line_code, equipment_code, production_order_no,
-                         product_code, takt_count, good_count, defect_count,
-                         cycle_time_ms, target_cycle_time_ms, equipment_status,
-                         speed_rpm, temperature_celsius, pressure_bar, created_at)
-                        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16)
-                    """,
-                        record['tenant_id'],
-                        record['record_timestamp'],
-                        record['line_code'],
-                        None,  # equipment_code
-                        record['current_order'],
-                        record['current_product'],
-                        record['produced_qty'],  # takt_count
-                        record['good_qty'],  # good_count
-                        record['defect_qty'],  # defect_count
-                        int(record['cycle_time'] * 1000) if record['cycle_time'] else None,  # cycle_time_ms
-                        10000,  # target_cycle_time_ms (10초)
-                        record['status'].lower(),  # equipment_status (소문자)
-                        None,  # speed_rpm
-                        None,  # temperature_celsius
-                        None,  # pressure_bar
-                        now
-                    )
-                    records.append(record)
-                except Exception as e:
-                    logger.error(f"[{self.name}] Failed to insert record for {line_code}: {e}")
+        rows = []
+        for i, line_code in enumerate(line_codes):
+            state = states[i]
+            running = running_l[i]
+
+            state['produced_qty'] += produced_l[i]
+            state['good_qty'] += good_l[i]
+            state['defect_qty'] += defects_l[i]
+
+            record = {
+                'tenant_id': config.tenant_id,
+                'line_code': line_code,
+                'record_timestamp': now,
+                'status': 'RUNNING' if running else 'IDLE',
+                'current_product': state.get('current_product'),
+                'current_order': state.get('current_order'),
+                'produced_qty': produced_l[i],
+                'good_qty': good_l[i],
+                'defect_qty': defects_l[i],
+                'cumulative_produced': state['produced_qty'],
+                'cumulative_good': state['good_qty'],
+                'cumulative_defect': state['defect_qty'],
+                'cycle_time': cycle_l[i] if running else None,
+                'target_rate': state['target_rate'],
+                'actual_rate': round(produced_l[i] * 12, 2) if running else 0,  # 분당 환산
+            }
+            records.append(record)
+
+            # 기존 스키마에 맞춤: mes_realtime_production
+            rows.append((
+                record['tenant_id'],
+                record['record_timestamp'],
+                record['line_code'],
+                None,  # equipment_code
+                record['current_order'],
+                record['current_product'],
+                record['produced_qty'],  # takt_count
+                record['good_qty'],  # good_count
+                record['defect_qty'],  # defect_count
+                int(record['cycle_time'] * 1000) if record['cycle_time'] else None,  # cycle_time_ms
+                10000,  # target_cycle_time_ms (10초)
+                record['status'].lower(),  # equipment_status (소문자)
+                None,  # speed_rpm
+                None,  # temperature_celsius
+                None,  # pressure_bar
+                now,
+            ))
+
+        # DB 저장 (tick당 1회 COPY, max_speed 모드에서는 여러 tick을 모아서 저장)
+        try:
+            await self.persist(db_pool, 'mes_realtime_production', self.INSERT_COLUMNS, rows)
+        except Exception as e:
+            logger.error(f"[{self.name}] Failed to insert {len(rows)} records: {e}")
+            return []
 
         logger.debug(f"[{self.name}] Generated {len(records)} records")
         return records
@@ -157,7 +167,7 @@ class RealtimeProductionGenerator(BaseRealtimeGenerator):
             'produced_qty': 0,
             'good_qty': 0,
             'defect_qty': 0,
-            'shift_start': datetime.now(),
+            'shift_start': self.clock.now(),
         }
 
     def reset_line_states(self):
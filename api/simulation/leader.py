@@ -0,0 +1,78 @@
+"""
+SimulationLeader - 멀티 워커 환경의 시뮬레이션 Ticker 소유권
+
+PostgreSQL session-level advisory lock으로 리더를 선출
+- 락을 획득한 워커만 Ticker/Gap-Fill 실행
+- 락은 전용 커넥션에 유지되며, 워커 프로세스가 죽으면 커넥션 종료와 함께 자동 해제
+"""
+
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# pg_try_advisory_lock 키 (bigint)
+DEFAULT_LOCK_KEY = 727_001
+
+
+class SimulationLeader:
+    """Advisory lock 기반 리더 선출"""
+
+    def __init__(self, db_pool, lock_key: int = DEFAULT_LOCK_KEY):
+        self._db_pool = db_pool
+        self._lock_key = lock_key
+        self._conn = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._conn is not None
+
+    async def acquire(self) -> bool:
+        """리더십 획득 시도 (non-blocking)"""
+        if self._conn is not None:
+            return True
+        if not self._db_pool:
+            return False
+
+        conn = await self._db_pool.acquire()
+        try:
+            acquired = await conn.fetchval("SELECT pg_try_advisory_lock($1)", self._lock_key)
+        except Exception:
+            await self._db_pool.release(conn)
+            raise
+
+        if acquired:
+            self._conn = conn
+            logger.info(f"Simulation leadership acquired (lock key {self._lock_key})")
+            return True
+
+        await self._db_pool.release(conn)
+        logger.info("Simulation leadership held by another worker")
+        return False
+
+    async def release(self):
+        """리더십 반납"""
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+        try:
+            await conn.execute("SELECT pg_advisory_unlock($1)", self._lock_key)
+        except Exception as e:
+            logger.warning(f"Failed to release simulation advisory lock: {e}")
+        finally:
+            await self._db_pool.release(conn)
+        logger.info("Simulation leadership released")
+
+    async def is_held_elsewhere(self) -> Optional[bool]:
+        """다른 워커가 락을 보유 중인지 조회 (pg_locks)"""
+        if self._conn is not None:
+            return False
+        if not self._db_pool:
+            return None
+        async with self._db_pool.acquire() as conn:
+            return await conn.fetchval("""
+                SELECT EXISTS (
+                    SELECT 1 FROM pg_locks
+                    WHERE locktype = 'advisory' AND objid::bigint = $1 AND granted
+                )
+            """, self._lock_key)
@@ -0,0 +1,387 @@
+"""
+PartitionManager - 시계열 테이블 rolling 파티션 관리
+
+- 시뮬레이션 시계(실시간/가상) 기준으로 앞으로 쓸 파티션을 미리 생성
+  (고빈도 테이블은 일 단위, 나머지는 주/월/반기 단위)
+- 알려진 파티션 범위를 메모리에 캐시 → 저장 경로에서 pg_tables 조회 없음
+- retention 밖의 파티션은 DETACH 후 archive 스키마로 이동하거나 DROP
+  (다운샘플링 대상 테이블은 롤업이 끝난 구간까지만)
+- 기존 수기 파티션(예: *_2024_h2)과 겹치는 구간은 비어 있는 부분만 생성
+- retention은 관리자가 만든 파티션(테이블 COMMENT 표식)에만 적용 → 수기 파티션은 삭제 안 함
+
+Engine의 partition_maintenance Ticker와 Gap-Fill이 호출
+"""
+
+import asyncio
+import logging
+import re
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = ("day", "week", "month", "half")
+
+# pg_get_expr(relpartbound) 예: FOR VALUES FROM ('2024-07-01 00:00:00+09') TO ('2025-01-01 00:00:00+09')
+_BOUND_RE = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+# 관리자가 생성한 파티션 표식 (COMMENT ON TABLE) - retention 대상 판별용
+MANAGED_COMMENT = "managed by PartitionManager"
+
+
+@dataclass(frozen=True)
+class PartitionPolicy:
+    """테이블별 파티션 정책"""
+    table: str
+    column: str                           # 파티션 키 (timestamptz 또는 date)
+    granularity: str = "month"            # day / week / month / half
+    premake: int = 2                      # 현재 구간 이후 미리 만들 파티션 수
+    retention_days: Optional[int] = None  # None이면 보존 (삭제 안 함)
+    archive: bool = False                 # True면 DROP 대신 archive 스키마로 이동
+
+    def __post_init__(self):
+        if self.granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown partition granularity: {self.granularity}")
+
+
+def default_policies() -> Dict[str, PartitionPolicy]:
+    """기본 정책 (고빈도 테이블 retention은 설정값)"""
+    retention = settings.partition_raw_retention_days or None
+    archive = settings.partition_archive
+    policies = [
+        PartitionPolicy("mes_realtime_production", "timestamp", "day", premake=3,
+                        retention_days=retention, archive=archive),
+        PartitionPolicy("mes_equipment_status", "status_timestamp", "day", premake=3,
+                        retention_days=retention, archive=archive),
+        PartitionPolicy("mes_production_result", "result_timestamp", "week", premake=2),
+        PartitionPolicy("mes_defect_detail", "defect_timestamp", "month", premake=1),
+        PartitionPolicy("erp_inventory_transaction", "transaction_date", "half", premake=1),
+    ]
+    return {p.table: p for p in policies}
+
+
+def period_start(ts: datetime, granularity: str) -> datetime:
+    """ts가 속한 구간의 시작 (UTC 자정)"""
+    d = ts.astimezone(timezone.utc).date() if isinstance(ts, datetime) else ts
+    if granularity == "week":
+        d -= timedelta(days=d.weekday())
+    elif granularity == "month":
+        d = d.replace(day=1)
+    elif granularity == "half":
+        d = d.replace(month=1 if d.month <= 6 else 7, day=1)
+    return datetime.combine(d, time.min, tzinfo=timezone.utc)
+
+
+def next_period(start: datetime, granularity: str) -> datetime:
+    if granularity == "day":
+        return start + timedelta(days=1)
+    if granularity == "week":
+        return start + timedelta(days=7)
+    months = 1 if granularity == "month" else 6
+    month = start.month - 1 + months
+    return start.replace(year=start.year + month // 12, month=month % 12 + 1)
+
+
+def partition_name(table: str, start: datetime, granularity: str) -> str:
+    """기존 스키마 명명 규칙: {table}_2024_h2 / {table}_2024_07 (+ 일/주 단위 확장)"""
+    if start != period_start(start, granularity):
+        # 기존 파티션 사이를 채우는 구간 (구간 경계와 어긋남)
+        return f"{table}_{start:%Y_%m_%d}_{granularity[0]}"
+    if granularity == "half":
+        return f"{table}_{start.year}_h{1 if start.month <= 6 else 2}"
+    if granularity == "month":
+        return f"{table}_{start:%Y_%m}"
+    if granularity == "week":
+        return f"{table}_{start:%Y_%m_%d}_w"
+    return f"{table}_{start:%Y_%m_%d}"
+
+
+def _parse_bound(value: str) -> Optional[datetime]:
+    """파티션 경계 리터럴 → UTC datetime (MINVALUE/MAXVALUE는 None)"""
+    value = value.strip()
+    if value.upper() in ("MINVALUE", "MAXVALUE"):
+        return None
+    value = value.strip("'")
+    if re.search(r"[+-]\d{2}$", value):
+        value += ":00"
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+@dataclass
+class PartitionInfo:
+    name: str
+    start: Optional[datetime]   # None = MINVALUE
+    end: Optional[datetime]     # None = MAXVALUE
+    managed: bool = False       # 관리자가 생성 (retention 대상)
+
+
+class PartitionManager:
+    """
+    Rolling 파티션 관리자
+
+    ensure()는 메모리의 '준비 완료 시각'만 비교하므로 tick마다 호출해도 비용이 없고,
+    구간이 넘어갈 때만 카탈로그 조회/DDL을 실행
+    """
+
+    def __init__(self, db_pool, policies: Optional[Dict[str, PartitionPolicy]] = None):
+        self.db_pool = db_pool
+        self.policies = policies if policies is not None else default_policies()
+        self.archive_schema = "archive"
+
+        self._partitions: Dict[str, List[PartitionInfo]] = {}
+        self._column_types: Dict[str, str] = {}
+        self._has_default: Dict[str, bool] = {}
+        self._ready_until: Dict[str, datetime] = {}
+        self._disabled: set = set()   # 파티션 테이블이 아닌 경우
+        self._lock = asyncio.Lock()
+
+        self.created: int = 0
+        self.detached: int = 0
+        self.last_maintained: Optional[datetime] = None
+
+    # ==================== Catalog cache ====================
+
+    async def _load(self, conn, table: str) -> Optional[List[PartitionInfo]]:
+        """파티션 목록 로드 (테이블별 최초 1회)"""
+        if table in self._partitions:
+            return self._partitions[table]
+        if table in self._disabled:
+            return None
+
+        policy = self.policies[table]
+        column_type = await conn.fetchval("""
+            SELECT format_type(a.atttypid, a.atttypmod)
+            FROM pg_partitioned_table pt
+            JOIN pg_attribute a ON a.attrelid = pt.partrelid AND a.attname = $2
+            WHERE pt.partrelid = to_regclass($1)
+        """, table, policy.column)
+        if column_type is None:
+            logger.warning(f"[Partition] {table} is not range-partitioned by {policy.column}, skipping")
+            self._disabled.add(table)
+            return None
+
+        rows = await conn.fetch("""
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) AS bound,
+                   obj_description(c.oid, 'pg_class') AS comment
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass($1)
+        """, table)
+
+        partitions = []
+        has_default = False
+        for row in rows:
+            bound = row["bound"] or ""
+            if bound.strip().upper() == "DEFAULT":
+                has_default = True
+                continue
+            match = _BOUND_RE.search(bound)
+            if match:
+                partitions.append(PartitionInfo(row["relname"], _parse_bound(match.group(1)),
+                                                _parse_bound(match.group(2)),
+                                                managed=row["comment"] == MANAGED_COMMENT))
+
+        partitions.sort(key=lambda p: p.start or datetime.min.replace(tzinfo=timezone.utc))
+        self._partitions[table] = partitions
+        self._column_types[table] = column_type
+        self._has_default[table] = has_default
+        return partitions
+
+    def covers(self, table: str, ts: datetime) -> bool:
+        """캐시 기준 ts를 담을 파티션 존재 여부"""
+        return any(
+            (p.start is None or p.start <= ts) and (p.end is None or ts < p.end)
+            for p in self._partitions.get(table, [])
+        )
+
+    def _gaps(self, table: str, start: datetime, end: datetime) -> List[Tuple[datetime, datetime]]:
+        """[start, end) 중 기존 파티션이 덮지 않는 구간"""
+        gaps = []
+        cursor = start
+        for p in self._partitions.get(table, []):
+            p_start = p.start or datetime.min.replace(tzinfo=timezone.utc)
+            p_end = p.end or datetime.max.replace(tzinfo=timezone.utc)
+            if p_end <= cursor or p_start >= end:
+                continue
+            if p_start > cursor:
+                gaps.append((cursor, p_start))
+            cursor = max(cursor, p_end)
+            if cursor >= end:
+                break
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+
+    # ==================== Create ====================
+
+    def _literal(self, table: str, ts: datetime) -> str:
+        if self._column_types.get(table) == "date":
+            return f"'{ts.date().isoformat()}'"
+        return f"'{ts.isoformat()}'"
+
+    async def _create(self, conn, table: str, start: datetime, end: datetime) -> int:
+        """[start, end)의 비어 있는 구간마다 파티션 생성"""
+        policy = self.policies[table]
+        created = 0
+        segments = []
+        for gap_start, gap_end in self._gaps(table, start, end):
+            # 빈 구간을 granularity 경계로 분할
+            seg_start = gap_start
+            while seg_start < gap_end:
+                seg_end = min(next_period(period_start(seg_start, policy.granularity), policy.granularity), gap_end)
+                segments.append((seg_start, seg_end))
+                seg_start = seg_end
+
+        for gap_start, gap_end in segments:
+            name = partition_name(table, gap_start, policy.granularity)
+            try:
+                async with conn.transaction():
+                    await conn.execute(f"""
+                        CREATE TABLE IF NOT EXISTS {name}
+                        PARTITION OF {table}
+                        FOR VALUES FROM ({self._literal(table, gap_start)}) TO ({self._literal(table, gap_end)})
+                    """)
+                    await conn.execute(f"COMMENT ON TABLE {name} IS '{MANAGED_COMMENT}'")
+            except Exception as e:
+                # DEFAULT 파티션에 이미 해당 구간 데이터가 있는 경우 등 - DEFAULT가 계속 수용
+                # (캐시에 넣지 않음 → 없는 파티션을 retention이 detach하지 않도록)
+                logger.warning(f"[Partition] Cannot create {name}: {e}")
+                continue
+            created += 1
+            logger.info(f"[Partition] Created {name} [{gap_start.date()} ~ {gap_end.date()})")
+            self._partitions[table].append(PartitionInfo(name, gap_start, gap_end, managed=True))
+        self._partitions[table].sort(key=lambda p: p.start or datetime.min.replace(tzinfo=timezone.utc))
+        self.created += created
+        return created
+
+    async def ensure(self, ts: datetime, tables: Optional[Iterable[str]] = None) -> int:
+        """ts 구간 + premake 구간까지 파티션 보장"""
+        if ts.tzinfo is None:
+            ts = ts.replace(tzinfo=timezone.utc)
+        targets = [t for t in (tables or self.policies) if t in self.policies and t not in self._disabled]
+        pending = [t for t in targets if self._ready_until.get(t) is None or ts >= self._ready_until[t]]
+        if not pending:
+            return 0
+        return await self.ensure_range(ts, ts, pending)
+
+    async def ensure_range(self, start: datetime, end: datetime,
+                           tables: Optional[Iterable[str]] = None) -> int:
+        """[start, end] 전체 + premake 구간 파티션 보장 (Gap-Fill용)"""
+        if not self.db_pool:
+            return 0
+        created = 0
+        async with self._lock:
+            async with self.db_pool.acquire() as conn:
+                for table in (tables or list(self.policies)):
+                    policy = self.policies.get(table)
+                    if policy is None or await self._load(conn, table) is None:
+                        continue
+                    first = period_start(start, policy.granularity)
+                    last = next_period(period_start(end, policy.granularity), policy.granularity)
+                    horizon = last
+                    for _ in range(policy.premake):
+                        horizon = next_period(horizon, policy.granularity)
+                    created += await self._create(conn, table, first, horizon)
+                    # 다음 확인 시점: premake 구간의 절반이 지났을 때
+                    ready = self._ready_until.get(table)
+                    lead = last if policy.premake == 0 else horizon - (horizon - last) / 2
+                    if ready is None or lead > ready:
+                        self._ready_until[table] = lead
+        return created
+
+    # ==================== Retention ====================
+
+    async def enforce_retention(self, now: datetime,
+                                covered_until: Optional[Dict[str, Optional[datetime]]] = None) -> List[str]:
+        """
+        retention_days 이전 구간의 파티션 detach 후 archive/drop
+
+        Args:
+            covered_until: 테이블별 삭제 가능 상한 (다운샘플링 완료 시각, None이면 보류)
+        """
+        if not self.db_pool:
+            return []
+        if now.tzinfo is None:
+            now = now.replace(tzinfo=timezone.utc)
+        removed = []
+        async with self._lock:
+            async with self.db_pool.acquire() as conn:
+                for table, policy in self.policies.items():
+                    if not policy.retention_days or await self._load(conn, table) is None:
+                        continue
+                    cutoff = now - timedelta(days=policy.retention_days)
+                    if covered_until is not None and table in covered_until:
+                        if covered_until[table] is None:
+                            continue
+                        cutoff = min(cutoff, covered_until[table])
+                    expired = [
+                        p for p in self._partitions[table]
+                        if p.managed and p.end is not None and p.end <= cutoff
+                    ]
+                    for p in expired:
+                        try:
+                            await self._retire(conn, table, policy, p)
+                        except Exception as e:
+                            # 한 파티션 실패가 나머지 테이블의 retention을 막지 않도록
+                            logger.warning(f"[Partition] Cannot retire {p.name}: {e}")
+                            continue
+                        self._partitions[table].remove(p)
+                        removed.append(p.name)
+        self.detached += len(removed)
+        return removed
+
+    async def _retire(self, conn, table: str, policy: PartitionPolicy, partition: PartitionInfo):
+        """파티션 하나 detach + archive/drop"""
+        async with conn.transaction():
+            await conn.execute(f"ALTER TABLE {table} DETACH PARTITION {partition.name}")
+            if policy.archive:
+                await conn.execute(f"CREATE SCHEMA IF NOT EXISTS {self.archive_schema}")
+                await conn.execute(f"ALTER TABLE {partition.name} SET SCHEMA {self.archive_schema}")
+            else:
+                await conn.execute(f"DROP TABLE {partition.name}")
+        action = f"archived to {self.archive_schema}" if policy.archive else "dropped"
+        logger.info(f"[Partition] {partition.name} detached and {action}")
+
+    async def maintain(self, now: datetime,
+                       covered_until: Optional[Dict[str, Optional[datetime]]] = None) -> Dict[str, Any]:
+        """주기 작업: 앞으로 쓸 파티션 생성 + retention 적용"""
+        created = await self.ensure(now)
+        removed = await self.enforce_retention(now, covered_until)
+        self.last_maintained = now
+        return {"created": created, "removed": removed}
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "tables": {
+                table: {
+                    "granularity": policy.granularity,
+                    "partitions": len(self._partitions.get(table, [])),
+                    "ready_until": self._ready_until[table].isoformat() if table in self._ready_until else None,
+                    "retention_days": policy.retention_days,
+                    "has_default": self._has_default.get(table, False),
+                    "enabled": table not in self._disabled,
+                }
+                for table, policy in self.policies.items()
+            },
+            "created": self.created,
+            "detached": self.detached,
+            "last_maintained": self.last_maintained.isoformat() if self.last_maintained else None,
+        }
+
+
+# 싱글톤 인스턴스
+_partition_manager: Optional[PartitionManager] = None
+
+
+def get_partition_manager(db_pool=None) -> Optional[PartitionManager]:
+    """PartitionManager 싱글톤 인스턴스 반환"""
+    global _partition_manager
+    if _partition_manager is None and db_pool:
+        _partition_manager = PartitionManager(db_pool)
+    return _partition_manager
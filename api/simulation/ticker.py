@@ -10,6 +10,8 @@ from typing import Callable, Optional, Awaitable
 from dataclasses import dataclass
 import logging
 
+from .clock import SimulationClock, WallClock
+
 logger = logging.getLogger(__name__)
 
 
@@ -26,7 +28,7 @@ class Ticker:
     """
     주기적 데이터 생성 스케줄러
 
-    - 설정된 간격으로 콜백 실행
+    - 설정된 간격으로 콜백 실행 (간격은 SimulationClock 기준 가상 시간)
     - 일시정지/재개 지원
     - 에러 핸들링 및 재시도
     """
@@ -35,11 +37,13 @@ class Ticker:
         self,
         config: TickerConfig,
         callback: Callable[[], Awaitable[None]],
-        on_error: Optional[Callable[[str, Exception], Awaitable[None]]] = None
+        on_error: Optional[Callable[[str, Exception], Awaitable[None]]] = None,
+        clock: Optional[SimulationClock] = None
     ):
         self._config = config
         self._callback = callback
         self._on_error = on_error
+        self._clock = clock or WallClock()
 
         self._is_running = False
         self._is_paused = False
@@ -82,11 +86,13 @@ class Ticker:
 
         self._is_running = True
         self._is_paused = False
+        self._clock.register()
         self._task = asyncio.create_task(self._run_loop())
         logger.info(f"Ticker [{self._config.name}] started (interval: {self._config.interval_seconds}s)")
 
     async def stop(self):
         """Ticker 정지"""
+        was_running = self._is_running
         self._is_running = False
         self._is_paused = False
 
@@ -98,6 +104,9 @@ class Ticker:
                 pass
             self._task = None
 
+        if was_running:
+            self._clock.unregister()
+
         logger.info(f"Ticker [{self._config.name}] stopped")
 
     def pause(self):
@@ -126,8 +135,8 @@ class Ticker:
                 # 콜백 실행 (재시도 로직 포함)
                 await self._execute_with_retry()
 
-                # 다음 실행까지 대기
-                await asyncio.sleep(self._config.interval_seconds)
+                # 다음 실행까지 대기 (가상 시간 기준)
+                await self._clock.sleep(self._config.interval_seconds)
 
             except asyncio.CancelledError:
                 logger.info(f"Ticker [{self._config.name}] loop cancelled")
@@ -142,7 +151,7 @@ class Ticker:
             try:
                 await self._callback()
 
-                self._last_run = datetime.now()
+                self._last_run = self._clock.now()
                 self._run_count += 1
                 self._consecutive_errors = 0
 
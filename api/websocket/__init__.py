@@ -1,5 +1,8 @@
 # WebSocket Module
 from api.websocket.manager import ConnectionManager
+from api.websocket.outbound import ClientConnection, OutboundQueue
+from api.websocket.frames import FrameBatcher, frame_batcher
 from api.websocket.handlers import router as websocket_router
 
-__all__ = ["ConnectionManager", "websocket_router"]
+__all__ = ["ConnectionManager", "ClientConnection", "OutboundQueue",
+           "FrameBatcher", "frame_batcher", "websocket_router"]
@@ -0,0 +1,306 @@
+"""
+Broadcast backends for multi-worker WebSocket fan-out
+
+uvicorn 워커/레플리카가 여러 개일 때 각 워커의 ConnectionManager는
+자기 프로세스의 연결만 알고 있으므로, 브로드캐스트를 백엔드를 통해 발행하고
+모든 워커가 구독하여 로컬 연결로 전달한다.
+
+- InMemoryBroadcastBackend: 단일 프로세스 (기본값)
+- RedisBroadcastBackend: Redis 프로토콜(RESP) PUBLISH/PSUBSCRIBE
+  외부 라이브러리 없이 asyncio 스트림으로 구현 - Redis, Valkey, KeyDB 등
+  RESP 호환 서버 또는 로컬 stand-in(api.websocket.resp_server)에서 동작
+
+Namespaces:
+- "ws": api.websocket ConnectionManager 채널 브로드캐스트
+- "frames": 실시간 레코드 -> FrameBatcher 상태 갱신
+- "generator": 데이터 생성 Job 진행 상황
+- "simulation": SimulationEngine 이벤트 / 제어 명령
+"""
+import asyncio
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+from uuid import uuid4
+
+from api.config import settings
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[str, Any], Awaitable[None]]
+
+# 워커 식별자 (로그/디버깅용)
+WORKER_ID = uuid4().hex[:12]
+
+
+def _json_default(value: Any) -> Any:
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+class BroadcastBackend(ABC):
+    """
+    Pub/sub backend interface
+
+    publish(namespace, channel, data)는 모든 워커(자기 자신 포함)의
+    namespace 핸들러에 handler(channel, data)로 전달된다.
+    """
+
+    def __init__(self):
+        self._handlers: Dict[str, List[MessageHandler]] = {}
+
+    def add_handler(self, namespace: str, handler: MessageHandler):
+        """namespace 메시지 핸들러 등록"""
+        self._handlers.setdefault(namespace, []).append(handler)
+
+    def remove_handler(self, namespace: str, handler: MessageHandler):
+        if handler in self._handlers.get(namespace, []):
+            self._handlers[namespace].remove(handler)
+
+    async def _dispatch(self, namespace: str, channel: str, data: Any):
+        for handler in list(self._handlers.get(namespace, [])):
+            try:
+                await handler(channel, data)
+            except Exception as e:
+                logger.error(f"Broadcast handler error [{namespace}:{channel}]: {e}")
+
+    @property
+    def is_distributed(self) -> bool:
+        """다른 워커와 메시지를 공유하는지 여부"""
+        return False
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": type(self).__name__, "worker_id": WORKER_ID}
+
+    @abstractmethod
+    async def publish(self, namespace: str, channel: str, data: Any):
+        pass
+
+
+class InMemoryBroadcastBackend(BroadcastBackend):
+    """단일 프로세스 백엔드 - 즉시 로컬 핸들러로 전달"""
+
+    async def publish(self, namespace: str, channel: str, data: Any):
+        await self._dispatch(namespace, channel, data)
+
+
+class RedisProtocolError(Exception):
+    """RESP error reply"""
+    pass
+
+
+class RESPConnection:
+    """최소 RESP2 클라이언트 연결"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def open(cls, host: str, port: int, password: Optional[str] = None,
+                   username: Optional[str] = None) -> "RESPConnection":
+        reader, writer = await asyncio.open_connection(host, port)
+        conn = cls(reader, writer)
+        if password:
+            args = ["AUTH", username, password] if username else ["AUTH", password]
+            await conn.execute(*args)
+        return conn
+
+    @staticmethod
+    def encode(*args: Any) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    async def send(self, *args: Any):
+        self.writer.write(self.encode(*args))
+        await self.writer.drain()
+
+    async def read_reply(self) -> Any:
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by server")
+        prefix, body = line[:1], line[1:-2]
+        if prefix == b"+":
+            return body.decode()
+        if prefix == b"-":
+            raise RedisProtocolError(body.decode())
+        if prefix == b":":
+            return int(body)
+        if prefix == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = await self.reader.readexactly(length + 2)
+            return data[:-2]
+        if prefix == b"*":
+            count = int(body)
+            if count < 0:
+                return None
+            return [await self.read_reply() for _ in range(count)]
+        raise RedisProtocolError(f"Unknown reply prefix: {prefix!r}")
+
+    async def execute(self, *args: Any) -> Any:
+        await self.send(*args)
+        return await self.read_reply()
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except Exception:
+            pass
+
+
+class RedisBroadcastBackend(BroadcastBackend):
+    """
+    Redis 프로토콜 pub/sub 백엔드
+
+    - 발행 전용 연결 1개 + 구독 전용 연결 1개 (PSUBSCRIBE {prefix}:*)
+    - 자기 자신이 발행한 메시지도 구독 연결을 통해 수신 (로컬 직접 전달 없음)
+    - 구독 연결이 끊기면 지수 백오프로 재연결
+    - 발행은 best-effort: Redis 장애 중에는 경고 로그 + failed 집계 후 메시지를 버리고
+      다음 발행에서 다시 연결 (호출자에게 예외를 전파하지 않음)
+    """
+
+    def __init__(self, url: str, prefix: Optional[str] = None, connect_timeout: float = 5.0):
+        super().__init__()
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.username = parsed.username or None
+        self.password = parsed.password or None
+        self.prefix = prefix or settings.broadcast_channel_prefix
+        self.connect_timeout = connect_timeout
+
+        self._pub: Optional[RESPConnection] = None
+        self._pub_lock = asyncio.Lock()
+        self._reader_task: Optional[asyncio.Task] = None
+        self._subscribed = asyncio.Event()
+
+        # Metrics
+        self.published = 0
+        self.received = 0
+        self.reconnects = 0
+        self.failed = 0
+
+    @property
+    def is_distributed(self) -> bool:
+        return True
+
+    async def _open(self) -> RESPConnection:
+        return await asyncio.wait_for(
+            RESPConnection.open(self.host, self.port, self.password, self.username),
+            timeout=self.connect_timeout,
+        )
+
+    async def start(self):
+        if self._reader_task is None:
+            self._reader_task = asyncio.create_task(self._reader_loop())
+            await asyncio.wait_for(self._subscribed.wait(), timeout=10)
+        logger.info(f"Redis broadcast backend started ({self.host}:{self.port}, worker={WORKER_ID})")
+
+    async def stop(self):
+        if self._reader_task:
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except asyncio.CancelledError:
+                pass
+            self._reader_task = None
+        if self._pub:
+            await self._pub.close()
+            self._pub = None
+
+    async def publish(self, namespace: str, channel: str, data: Any):
+        """
+        발행 (best-effort)
+
+        끊긴 연결은 한 번 재연결해 재시도하고, 그래도 실패하면 메시지를 버린다.
+        """
+        payload = json.dumps(
+            {"channel": channel, "data": data, "origin": WORKER_ID},
+            default=_json_default,
+        )
+        async with self._pub_lock:
+            for attempt in range(2):
+                try:
+                    if self._pub is None:
+                        self._pub = await self._open()
+                    await self._pub.execute("PUBLISH", f"{self.prefix}:{namespace}", payload)
+                    self.published += 1
+                    return
+                except (ConnectionError, OSError, asyncio.TimeoutError) as e:
+                    logger.warning(f"Redis publish failed (attempt {attempt + 1}): {e!r}")
+                    if self._pub:
+                        await self._pub.close()
+                    self._pub = None
+            self.failed += 1
+            logger.error(f"Redis publish dropped [{namespace}:{channel}]")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **super().get_stats(),
+            "published": self.published,
+            "received": self.received,
+            "reconnects": self.reconnects,
+            "failed": self.failed,
+        }
+
+    async def _reader_loop(self):
+        backoff = 0.5
+        while True:
+            sub: Optional[RESPConnection] = None
+            try:
+                sub = await self._open()
+                await sub.execute("PSUBSCRIBE", f"{self.prefix}:*")
+                self._subscribed.set()
+                backoff = 0.5
+
+                while True:
+                    reply = await sub.read_reply()
+                    if not isinstance(reply, list) or reply[0] != b"pmessage":
+                        continue
+                    _, _, redis_channel, payload = reply
+                    namespace = redis_channel.decode()[len(self.prefix) + 1:]
+                    message = json.loads(payload)
+                    self.received += 1
+                    await self._dispatch(namespace, message["channel"], message["data"])
+
+            except asyncio.CancelledError:
+                if sub:
+                    await sub.close()
+                raise
+            except Exception as e:
+                logger.error(f"Redis subscriber error: {e}, reconnecting in {backoff}s")
+                self.reconnects += 1
+                if sub:
+                    await sub.close()
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+
+
+# 싱글톤 인스턴스
+_backend_instance: Optional[BroadcastBackend] = None
+
+
+def get_broadcast_backend() -> BroadcastBackend:
+    """설정(MES_BROADCAST_BACKEND)에 따른 백엔드 싱글톤 반환"""
+    global _backend_instance
+    if _backend_instance is None:
+        if settings.broadcast_backend == "redis":
+            _backend_instance = RedisBroadcastBackend(settings.redis_url)
+        else:
+            _backend_instance = InMemoryBroadcastBackend()
+    return _backend_instance
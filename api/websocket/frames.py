@@ -0,0 +1,305 @@
+"""
+Delta-encoded, batched WebSocket frames
+
+window_ms 동안 들어온 상태 갱신/이벤트를 채널별 하나의 frame으로 묶어 전송
+상태는 클라이언트에게 마지막으로 보낸 frame/snapshot 대비 필드 단위 delta로 인코딩
+
+Protocol (server -> client):
+- {"type": "snapshot", "channel", "seq", "data": {key: record}}
+    구독 시 / resync 요청 시 / 기준 스냅샷을 정할 수 없는 경우
+- {"type": "frame", "channel", "seq", "base_seq", "delta": {key: {field: value}},
+   "removed": [key], "events": [...]}
+    delta는 base_seq 스냅샷 기준 (클라이언트는 base 스냅샷 사본에 적용)
+    base_seq는 보통 직전에 보낸 frame/snapshot의 seq이므로 순서대로 적용하는
+    클라이언트는 ack 없이도 delta만 받음. 클라이언트 큐에서 메시지가 버려지면
+    마지막 ack seq를 기준으로 하고, ack가 없거나 만료되었으면 스냅샷을 다시 보냄
+
+Protocol (client -> server):
+- {"type": "ack", "channel", "seq"}   수신한 frame/snapshot 적용 완료 (선택)
+- {"type": "resync", "channel"}        전체 스냅샷 재요청
+"""
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from api.config import settings
+from api.websocket.manager import manager
+
+logger = logging.getLogger(__name__)
+
+
+def to_jsonable(value: Any) -> Any:
+    """프레임 값 직렬화 (datetime/Decimal/UUID)"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def compute_delta(
+    base: Dict[str, Dict[str, Any]],
+    current: Dict[str, Dict[str, Any]],
+) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+    """
+    필드 단위 delta 계산
+
+    Returns:
+        (delta, removed) - delta: {key: {변경된 field: value}}, removed: 사라진 key 목록
+    """
+    delta: Dict[str, Dict[str, Any]] = {}
+    for key, record in current.items():
+        prev = base.get(key)
+        if prev is None:
+            delta[key] = record
+            continue
+        changed = {f: v for f, v in record.items() if prev.get(f) != v}
+        changed.update({f: None for f in prev.keys() - record.keys()})
+        if changed:
+            delta[key] = changed
+    removed = [key for key in base if key not in current]
+    return delta, removed
+
+
+class ChannelState:
+    """채널별 현재 상태 + seq별 스냅샷 이력"""
+
+    def __init__(self, history_size: int):
+        self.current: Dict[str, Dict[str, Any]] = {}
+        self.seq = 0
+        self.history: "OrderedDict[int, Dict[str, Dict[str, Any]]]" = OrderedDict()
+        self.history_size = history_size
+        self.events: List[Dict[str, Any]] = []
+        self.dirty = False
+
+    def commit(self) -> int:
+        """현재 상태를 새 seq 스냅샷으로 확정"""
+        self.seq += 1
+        self.history[self.seq] = {k: dict(v) for k, v in self.current.items()}
+        while len(self.history) > self.history_size:
+            self.history.popitem(last=False)
+        self.dirty = False
+        return self.seq
+
+
+class FrameBatcher:
+    """
+    채널별 frame 배칭 + delta 인코딩
+
+    - publish_state(): key별 최신 상태 갱신 (window 내 여러 번 갱신되어도 1회 전송)
+    - publish_event(): window 내 이벤트를 frame의 events에 누적
+    - flush 루프가 window_ms마다 dirty 채널의 frame을 구독자 큐에 적재
+      (구독자 없는 채널은 seq/스냅샷을 만들지 않고 첫 구독 시 스냅샷)
+    - 같은 base_seq를 가진 클라이언트끼리는 delta 계산 결과를 공유
+    """
+
+    def __init__(self, connection_manager, window_ms: Optional[int] = None, history_size: int = 64):
+        self._manager = connection_manager
+        self.window_ms = window_ms or settings.ws_frame_window_ms
+        self.history_size = history_size
+
+        self._channels: Dict[str, ChannelState] = {}
+        # {client_id: {channel: acked seq}}
+        self._acked: Dict[str, Dict[str, int]] = {}
+        # {client_id: {channel: (마지막으로 보낸 seq, 그때까지 클라이언트 큐에서 버려진 메시지 수)}}
+        self._sent: Dict[str, Dict[str, Tuple[int, int]]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.frames_sent = 0
+        self.snapshots_sent = 0
+        self.updates_received = 0
+
+    async def _on_backend_message(self, channel: str, updates: List[Dict[str, Any]]):
+        """Backend("frames" namespace)에서 수신한 상태 갱신 적용"""
+        for update in updates:
+            self.publish_state(update["channels"], update["key"], update["record"])
+
+    def _channel(self, channel: str) -> ChannelState:
+        if channel not in self._channels:
+            self._channels[channel] = ChannelState(self.history_size)
+        return self._channels[channel]
+
+    # ==================== Producer API ====================
+
+    def publish_state(self, channels: Iterable[str], key: Hashable, record: Dict[str, Any]):
+        """key별 상태 갱신 (여러 채널에 동일 레코드)"""
+        record = {f: to_jsonable(v) for f, v in record.items()}
+        key = str(key)
+        self.updates_received += 1
+        for channel in channels:
+            state = self._channel(channel)
+            state.current[key] = record
+            state.dirty = True
+
+    def publish_event(self, channels: Iterable[str], event: Dict[str, Any]):
+        """window 내 이벤트 누적"""
+        event = {f: to_jsonable(v) for f, v in event.items()}
+        for channel in channels:
+            state = self._channel(channel)
+            state.events.append(event)
+            state.dirty = True
+
+    # ==================== Subscriber API ====================
+
+    def subscribe(self, client_id: str, channel: str):
+        """구독 + resync 스냅샷 전송"""
+        self._acked.setdefault(client_id, {})
+        self._send_snapshot(client_id, channel)
+
+    def unsubscribe(self, client_id: str, channel: Optional[str] = None):
+        if channel is None:
+            self._acked.pop(client_id, None)
+            self._sent.pop(client_id, None)
+        elif client_id in self._acked:
+            self._acked[client_id].pop(channel, None)
+            self._sent.get(client_id, {}).pop(channel, None)
+
+    def ack(self, client_id: str, channel: str, seq: int):
+        """클라이언트가 seq 스냅샷을 적용했음을 기록"""
+        acked = self._acked.get(client_id)
+        if acked is None or channel not in acked:
+            return
+        if seq > acked[channel]:
+            acked[channel] = seq
+
+    def resync(self, client_id: str, channel: str):
+        if client_id in self._acked:
+            self._send_snapshot(client_id, channel)
+
+    def _send_snapshot(self, client_id: str, channel: str):
+        state = self._channel(channel)
+        if state.seq == 0 or state.dirty:
+            state.commit()
+            # 대기 중인 이벤트는 다음 frame으로 전송
+            state.dirty = bool(state.events)
+        client = self._manager.clients.get(client_id)
+        if client is None:
+            return
+        self._acked[client_id].setdefault(channel, 0)
+        client.enqueue({
+            "type": "snapshot",
+            "channel": channel,
+            "seq": state.seq,
+            "data": state.history[state.seq],
+        })
+        # 스냅샷이 밀어낸 이전 메시지는 스냅샷이 대체하므로 적재 후 카운터 기준
+        self._mark_sent(client_id, channel, state.seq, client.queue.dropped)
+        self.snapshots_sent += 1
+
+    def _mark_sent(self, client_id: str, channel: str, seq: int, dropped: int):
+        self._sent.setdefault(client_id, {})[channel] = (seq, dropped)
+
+    def _base_seq(self, client_id: str, channel: str, client, state: ChannelState) -> Optional[int]:
+        """
+        frame의 기준 seq
+
+        마지막으로 보낸 frame/snapshot (그 뒤 클라이언트 큐에서 버려진 메시지가 없을 때),
+        아니면 클라이언트가 ack한 seq. 둘 다 쓸 수 없으면 None (스냅샷 재전송)
+        """
+        sent_seq, dropped = self._sent.get(client_id, {}).get(channel, (0, 0))
+        if sent_seq in state.history and client.queue.dropped == dropped:
+            return sent_seq
+        acked_seq = self._acked[client_id][channel]
+        if acked_seq in state.history:
+            return acked_seq
+        return None
+
+    # ==================== Flush Loop ====================
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run_loop(self):
+        while True:
+            await asyncio.sleep(self.window_ms / 1000)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Frame flush failed: {e}")
+
+    def flush(self):
+        """dirty 채널의 frame을 구독자별로 적재"""
+        # 끊어진 연결 정리
+        for client_id in [c for c in self._acked if c not in self._manager.clients]:
+            del self._acked[client_id]
+            self._sent.pop(client_id, None)
+
+        subscribers: Dict[str, List[str]] = {}
+        for client_id, acked in self._acked.items():
+            for channel in acked:
+                subscribers.setdefault(channel, []).append(client_id)
+
+        for channel, state in self._channels.items():
+            if not state.dirty:
+                continue
+            if channel not in subscribers:
+                # 구독자 없는 채널은 스냅샷 복사 생략 (dirty 유지 -> 첫 구독 시 _send_snapshot에서 확정)
+                state.events.clear()
+                continue
+            events, state.events = state.events, []
+            seq = state.commit()
+            current = state.history[seq]
+
+            # {base_seq: frame} - 같은 기준점은 delta 공유
+            frames: Dict[int, Optional[Dict[str, Any]]] = {}
+            for client_id in subscribers.get(channel, []):
+                client = self._manager.clients.get(client_id)
+                if client is None:
+                    continue
+                base_seq = self._base_seq(client_id, channel, client, state)
+                if base_seq is None:
+                    # 기준 스냅샷 없음/만료 -> 전체 스냅샷
+                    self._send_snapshot(client_id, channel)
+                    continue
+                if base_seq not in frames:
+                    delta, removed = compute_delta(state.history[base_seq], current)
+                    frames[base_seq] = {
+                        "type": "frame",
+                        "channel": channel,
+                        "seq": seq,
+                        "base_seq": base_seq,
+                        "delta": delta,
+                        "removed": removed,
+                        "events": events,
+                    } if (delta or removed or events) else None
+                if frames[base_seq] is not None:
+                    # 이 frame이 이전 frame을 밀어냈다면 다음 flush에서 감지되도록 적재 전 카운터 기준
+                    dropped = client.queue.dropped
+                    client.enqueue(frames[base_seq])
+                    self._mark_sent(client_id, channel, seq, dropped)
+                    self.frames_sent += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "window_ms": self.window_ms,
+            "channels": {
+                channel: {"seq": state.seq, "keys": len(state.current)}
+                for channel, state in self._channels.items()
+            },
+            "subscribers": len(self._acked),
+            "updates_received": self.updates_received,
+            "frames_sent": self.frames_sent,
+            "snapshots_sent": self.snapshots_sent,
+        }
+
+
+# Global frame batcher instance
+frame_batcher = FrameBatcher(manager)
+manager.backend.add_handler("frames", frame_batcher._on_backend_message)
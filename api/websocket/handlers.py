@@ -10,6 +10,7 @@ from uuid import uuid4
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
 
 from api.websocket.manager import manager
+from api.websocket.frames import frame_batcher, to_jsonable
 
 
 router = APIRouter(tags=["WebSocket"])
@@ -43,7 +44,10 @@ async def websocket_production(
         "client_id": client_id,
         "channel": channel,
         "timestamp": datetime.utcnow().isoformat(),
-    }, websocket)
+    }, client_id)
+
+    # Resync snapshot for delta frames
+    frame_batcher.subscribe(client_id, channel)
 
     try:
         while True:
@@ -57,21 +61,26 @@ async def websocket_production(
                 await manager.send_personal_message({
                     "type": "subscribed",
                     "channel": new_channel,
-                }, websocket)
+                }, client_id)
+                frame_batcher.subscribe(client_id, new_channel)
 
             elif data.get("type") == "unsubscribe":
                 old_channel = f"production:{data.get('line_code', 'all')}"
                 await manager.unsubscribe(client_id, old_channel)
+                frame_batcher.unsubscribe(client_id, old_channel)
                 await manager.send_personal_message({
                     "type": "unsubscribed",
                     "channel": old_channel,
-                }, websocket)
+                }, client_id)
+
+            elif data.get("type") in ("ack", "resync"):
+                handle_frame_command(client_id, channel, data)
 
             elif data.get("type") == "ping":
                 await manager.send_personal_message({
                     "type": "pong",
                     "timestamp": datetime.utcnow().isoformat(),
-                }, websocket)
+                }, client_id)
 
     except WebSocketDisconnect:
         await manager.disconnect(client_id)
@@ -112,7 +121,9 @@ async def websocket_equipment(
         "client_id": client_id,
         "channel": channel,
         "timestamp": datetime.utcnow().isoformat(),
-    }, websocket)
+    }, client_id)
+
+    frame_batcher.subscribe(client_id, channel)
 
     try:
         while True:
@@ -130,13 +141,17 @@ async def websocket_equipment(
                 await manager.send_personal_message({
                     "type": "subscribed",
                     "channel": new_channel,
-                }, websocket)
+                }, client_id)
+                frame_batcher.subscribe(client_id, new_channel)
+
+            elif data.get("type") in ("ack", "resync"):
+                handle_frame_command(client_id, channel, data)
 
             elif data.get("type") == "ping":
                 await manager.send_personal_message({
                     "type": "pong",
                     "timestamp": datetime.utcnow().isoformat(),
-                }, websocket)
+                }, client_id)
 
     except WebSocketDisconnect:
         await manager.disconnect(client_id)
@@ -176,7 +191,7 @@ async def websocket_alerts(
         "client_id": client_id,
         "channels": channels,
         "timestamp": datetime.utcnow().isoformat(),
-    }, websocket)
+    }, client_id)
 
     try:
         while True:
@@ -189,13 +204,13 @@ async def websocket_alerts(
                     "type": "acknowledged",
                     "alert_id": alert_id,
                     "timestamp": datetime.utcnow().isoformat(),
-                }, websocket)
+                }, client_id)
 
             elif data.get("type") == "ping":
                 await manager.send_personal_message({
                     "type": "pong",
                     "timestamp": datetime.utcnow().isoformat(),
-                }, websocket)
+                }, client_id)
 
     except WebSocketDisconnect:
         await manager.disconnect(client_id)
@@ -234,7 +249,10 @@ async def websocket_dashboard(websocket: WebSocket):
         "client_id": client_id,
         "channels": channels,
         "timestamp": datetime.utcnow().isoformat(),
-    }, websocket)
+    }, client_id)
+
+    for frame_channel in ("dashboard:production", "dashboard:equipment"):
+        frame_batcher.subscribe(client_id, frame_channel)
 
     try:
         while True:
@@ -244,19 +262,89 @@ async def websocket_dashboard(websocket: WebSocket):
                 await manager.send_personal_message({
                     "type": "pong",
                     "timestamp": datetime.utcnow().isoformat(),
-                }, websocket)
+                }, client_id)
+
+            elif data.get("type") in ("ack", "resync"):
+                handle_frame_command(client_id, "dashboard:production", data)
 
             elif data.get("type") == "refresh":
                 # Client requesting data refresh
                 await manager.send_personal_message({
                     "type": "refresh_ack",
                     "timestamp": datetime.utcnow().isoformat(),
-                }, websocket)
+                }, client_id)
 
     except WebSocketDisconnect:
         await manager.disconnect(client_id)
 
 
+# ==================== Queue Metrics ====================
+
+@router.get("/ws/stats")
+async def websocket_queue_stats():
+    """
+    Outbound queue metrics for all WebSocket connections.
+
+    - depth: 현재 큐에 대기 중인 메시지 수
+    - dropped: 큐 초과로 버려진 메시지 수
+    - coalesced: 최신값으로 대체된 상태 메시지 수
+    """
+    return {
+        "connections": manager.get_connection_count(),
+        "channels": {
+            channel: len(conns) for channel, conns in manager.active_connections.items()
+        },
+        "queues": manager.get_queue_stats(),
+        "frames": frame_batcher.get_stats(),
+        "backend": manager.backend.get_stats(),
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+
+
+# ==================== Delta Frames ====================
+
+def handle_frame_command(client_id: str, default_channel: str, data: dict):
+    """Handle frame ack / resync commands from a client"""
+    channel = data.get("channel", default_channel)
+    if data.get("type") == "ack":
+        frame_batcher.ack(client_id, channel, int(data.get("seq", 0)))
+    else:
+        frame_batcher.resync(client_id, channel)
+
+
+async def publish_simulation_records(generator_name: str, records: list):
+    """
+    Feed realtime simulation records into the frame batcher on every worker.
+
+    Register with SimulationEngine.add_record_listener().
+    """
+    updates = []
+    if generator_name == "realtime_production":
+        for record in records:
+            line_code = record["line_code"]
+            updates.append({
+                "channels": [f"production:{line_code}", "production:all", "dashboard:production"],
+                "key": line_code,
+                "record": {f: to_jsonable(v) for f, v in record.items()},
+            })
+
+    elif generator_name == "equipment_status":
+        for record in records:
+            equipment_code = record["equipment_code"]
+            line_code = record.get("line_code")
+            channels = [f"equipment:{equipment_code}", "equipment:all", "dashboard:equipment"]
+            if line_code:
+                channels.append(f"equipment:line:{line_code}")
+            updates.append({
+                "channels": channels,
+                "key": equipment_code,
+                "record": {f: to_jsonable(v) for f, v in record.items()},
+            })
+
+    if updates:
+        await manager.backend.publish("frames", generator_name, updates)
+
+
 # ==================== Utility Functions ====================
 
 async def broadcast_production_update(line_code: str, data: dict):
@@ -353,7 +441,7 @@ async def websocket_erp_sales(websocket: WebSocket):
         "client_id": client_id,
         "channels": channels,
         "timestamp": datetime.utcnow().isoformat(),
-    }, websocket)
+    }, client_id)
 
     try:
         while True:
@@ -363,7 +451,7 @@ async def websocket_erp_sales(websocket: WebSocket):
                 await manager.send_personal_message({
                     "type": "pong",
                     "timestamp": datetime.utcnow().isoformat(),
-                }, websocket)
+                }, client_id)
 
     except WebSocketDisconnect:
         await manager.disconnect(client_id)
@@ -390,7 +478,7 @@ async def websocket_erp_inventory(websocket: WebSocket):
         "client_id": client_id,
         "channels": channels,
         "timestamp": datetime.utcnow().isoformat(),
-    }, websocket)
+    }, client_id)
 
     try:
         while True:
@@ -400,7 +488,7 @@ async def websocket_erp_inventory(websocket: WebSocket):
                 await manager.send_personal_message({
                     "type": "pong",
                     "timestamp": datetime.utcnow().isoformat(),
-                }, websocket)
+                }, client_id)
 
     except WebSocketDisconnect:
         await manager.disconnect(client_id)
@@ -426,7 +514,7 @@ async def websocket_erp_purchase(websocket: WebSocket):
         "client_id": client_id,
         "channels": channels,
         "timestamp": datetime.utcnow().isoformat(),
-    }, websocket)
+    }, client_id)
 
     try:
         while True:
@@ -436,7 +524,7 @@ async def websocket_erp_purchase(websocket: WebSocket):
                 await manager.send_personal_message({
                     "type": "pong",
                     "timestamp": datetime.utcnow().isoformat(),
-                }, websocket)
+                }, client_id)
 
     except WebSocketDisconnect:
         await manager.disconnect(client_id)
@@ -461,7 +549,7 @@ async def websocket_erp_alerts(websocket: WebSocket):
         "client_id": client_id,
         "channels": channels,
         "timestamp": datetime.utcnow().isoformat(),
-    }, websocket)
+    }, client_id)
 
     try:
         while True:
@@ -473,13 +561,13 @@ async def websocket_erp_alerts(websocket: WebSocket):
                     "type": "acknowledged",
                     "alert_id": alert_id,
                     "timestamp": datetime.utcnow().isoformat(),
-                }, websocket)
+                }, client_id)
 
             elif data.get("type") == "ping":
                 await manager.send_personal_message({
                     "type": "pong",
                     "timestamp": datetime.utcnow().isoformat(),
-                }, websocket)
+                }, client_id)
 
     except WebSocketDisconnect:
         await manager.disconnect(client_id)
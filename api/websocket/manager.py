@@ -10,20 +10,63 @@ from uuid import UUID
 from fastapi import WebSocket
 from pydantic import BaseModel
 
+from api.config import settings
+from api.websocket.backend import BroadcastBackend, get_broadcast_backend
+from api.websocket.outbound import ClientConnection
+
+
+# State-type messages: {message type: key field}
+# 같은 채널/타입/키의 메시지는 클라이언트 큐에서 최신값만 유지됨
+STATE_MESSAGE_KEYS: Dict[str, Optional[str]] = {
+    "line_status": "line_code",
+    "production_update": "line_code",
+    "status_change": "equipment_code",
+    "oee_update": "equipment_code",
+    "kpi_update": None,
+}
+
+
+def get_coalesce_key(channel: str, data: Dict[str, Any]) -> Optional[tuple]:
+    """상태 메시지면 coalesce key 반환, 이벤트 메시지면 None"""
+    msg_type = data.get("type")
+    if msg_type not in STATE_MESSAGE_KEYS:
+        return None
+    key_field = STATE_MESSAGE_KEYS[msg_type]
+    return (channel, msg_type, data.get(key_field) if key_field else None)
+
 
 class ConnectionManager:
     """
     Manages WebSocket connections and message broadcasting.
     Supports multiple channels for different data streams.
+
+    Each connection owns a bounded outbound queue drained by its own writer
+    task, so broadcast() never awaits a socket send and a slow client cannot
+    delay the others.
+
+    Broadcasts are published through a BroadcastBackend ("ws" namespace) so
+    that clients connected to other workers receive them as well.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        queue_maxsize: Optional[int] = None,
+        send_timeout: Optional[float] = None,
+        backend: Optional[BroadcastBackend] = None,
+    ):
         # Connections by channel: {channel_name: {client_id: websocket}}
         self.active_connections: Dict[str, Dict[str, WebSocket]] = {}
         # Subscription tracking: {client_id: set of channels}
         self.subscriptions: Dict[str, Set[str]] = {}
+        # Outbound queues: {client_id: ClientConnection}
+        self.clients: Dict[str, ClientConnection] = {}
+        self.queue_maxsize = queue_maxsize or settings.ws_queue_maxsize
+        self.send_timeout = send_timeout or settings.ws_send_timeout
         # Lock for thread safety
         self._lock = asyncio.Lock()
+        # Cross-worker fan-out
+        self.backend = backend or get_broadcast_backend()
+        self.backend.add_handler("ws", self._on_backend_message)
 
     async def connect(self, websocket: WebSocket, client_id: str, channels: List[str] = None):
         """Accept a new WebSocket connection and subscribe to channels"""
@@ -33,6 +76,17 @@ class ConnectionManager:
             # Initialize subscription tracking
             self.subscriptions[client_id] = set()
 
+            # Start writer task
+            client = ClientConnection(
+                client_id,
+                websocket,
+                maxsize=self.queue_maxsize,
+                send_timeout=self.send_timeout,
+                on_close=self.disconnect,
+            )
+            self.clients[client_id] = client
+            client.start()
+
             # Subscribe to channels
             channels = channels or ["default"]
             for channel in channels:
@@ -55,6 +109,10 @@ class ConnectionManager:
                 # Remove subscription tracking
                 del self.subscriptions[client_id]
 
+            client = self.clients.pop(client_id, None)
+            if client:
+                client.close()
+
     async def subscribe(self, client_id: str, channel: str, websocket: WebSocket):
         """Subscribe a client to a specific channel"""
         async with self._lock:
@@ -77,18 +135,33 @@ class ConnectionManager:
             if client_id in self.subscriptions:
                 self.subscriptions[client_id].discard(channel)
 
-    async def send_personal_message(self, message: Any, websocket: WebSocket):
-        """Send a message to a specific connection"""
+    async def send_personal_message(self, message: Any, client_id: str):
+        """
+        Send a message to a specific connection
+
+        브로드캐스트와 같은 클라이언트 큐로 적재하므로 writer 태스크만 소켓에 쓰고
+        응답(connected, pong 등)과 프레임/브로드캐스트의 순서가 유지된다.
+        """
+        client = self.clients.get(client_id)
+        if client is None:
+            return
+
         if isinstance(message, dict):
-            await websocket.send_json(message)
-        elif isinstance(message, str):
-            await websocket.send_text(message)
+            data = message
+        elif isinstance(message, BaseModel):
+            data = message.model_dump(mode="json")
         else:
-            await websocket.send_json({"data": str(message)})
+            data = {"data": str(message)}
+        client.enqueue(data)
 
-    async def broadcast(self, channel: str, message: Any):
-        """Broadcast a message to all clients in a channel"""
-        if channel not in self.active_connections:
+    async def broadcast(self, channel: str, message: Any, coalesce_key: Optional[tuple] = None):
+        """
+        Broadcast a message to all clients in a channel (on every worker)
+
+        메시지는 각 클라이언트 큐에 적재만 하고 즉시 반환한다.
+        coalesce_key를 주지 않으면 STATE_MESSAGE_KEYS 기준으로 결정된다.
+        """
+        if not self.backend.is_distributed and channel not in self.active_connections:
             return
 
         # Prepare message
@@ -103,17 +176,29 @@ class ConnectionManager:
         data["_channel"] = channel
         data["_timestamp"] = datetime.utcnow().isoformat()
 
-        # Send to all connections in channel
-        disconnected = []
-        for client_id, websocket in self.active_connections[channel].items():
-            try:
-                await websocket.send_json(data)
-            except Exception:
-                disconnected.append(client_id)
+        await self.backend.publish("ws", channel, {
+            "message": data,
+            "coalesce_key": list(coalesce_key) if coalesce_key else None,
+        })
 
-        # Clean up disconnected clients
-        for client_id in disconnected:
-            await self.disconnect(client_id)
+    async def _on_backend_message(self, channel: str, payload: Dict[str, Any]):
+        """Backend에서 수신한 브로드캐스트를 로컬 연결로 전달"""
+        coalesce_key = payload.get("coalesce_key")
+        self.deliver_local(channel, payload["message"], tuple(coalesce_key) if coalesce_key else None)
+
+    def deliver_local(self, channel: str, data: Dict[str, Any], coalesce_key: Optional[tuple] = None):
+        """이 워커에 연결된 채널 구독자 큐에 적재"""
+        if channel not in self.active_connections:
+            return
+
+        if coalesce_key is None:
+            coalesce_key = get_coalesce_key(channel, data)
+
+        # Enqueue for all connections in channel (no await - never blocks)
+        for client_id in list(self.active_connections[channel]):
+            client = self.clients.get(client_id)
+            if client:
+                client.enqueue(data, coalesce_key)
 
     async def broadcast_to_multiple(self, channels: List[str], message: Any):
         """Broadcast a message to multiple channels"""
@@ -136,6 +221,20 @@ class ConnectionManager:
             return len(self.active_connections.get(channel, {}))
         return sum(len(conns) for conns in self.active_connections.values())
 
+    def get_queue_stats(self) -> Dict[str, Any]:
+        """Outbound queue depth / drop metrics"""
+        clients = [client.get_stats() for client in self.clients.values()]
+        return {
+            "clients": len(clients),
+            "total_depth": sum(c["depth"] for c in clients),
+            "max_depth": max((c["depth"] for c in clients), default=0),
+            "total_sent": sum(c["sent"] for c in clients),
+            "total_dropped": sum(c["dropped"] for c in clients),
+            "total_coalesced": sum(c["coalesced"] for c in clients),
+            "queue_maxsize": self.queue_maxsize,
+            "per_client": clients,
+        }
+
 
 # Global connection manager instance
 manager = ConnectionManager()
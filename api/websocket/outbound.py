@@ -0,0 +1,170 @@
+"""
+Per-client outbound queues for WebSocket connections
+
+각 연결마다 전용 writer 태스크와 bounded queue를 두어
+느린 클라이언트가 브로드캐스트 전체를 지연시키지 않도록 함
+
+- 이벤트 메시지: FIFO, 큐가 가득 차면 가장 오래된 이벤트부터 버림
+- 상태 메시지(라인 상태, 설비 상태 등): key별 최신값만 유지 (latest-value coalescing)
+"""
+import asyncio
+import itertools
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from fastapi import WebSocket
+
+logger = logging.getLogger(__name__)
+
+
+class OutboundQueue:
+    """
+    Bounded outbound queue with latest-value coalescing.
+
+    put()은 절대 블로킹하지 않음. 같은 coalesce key로 들어온 상태 메시지는
+    큐 내 기존 위치를 유지한 채 값만 최신으로 교체된다.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        # {queue_key: payload} - 삽입 순서 = 전송 순서
+        self._items: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        self._seq = itertools.count()
+        self._ready = asyncio.Event()
+
+        # Metrics
+        self.enqueued = 0
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+
+    @property
+    def depth(self) -> int:
+        return len(self._items)
+
+    def put(self, payload: Dict[str, Any], coalesce_key: Optional[Hashable] = None) -> bool:
+        """
+        메시지 적재
+
+        Returns:
+            False면 큐가 가득 차서 가장 오래된 메시지를 버린 경우
+        """
+        self.enqueued += 1
+
+        if coalesce_key is not None:
+            key = ("state", coalesce_key)
+            if key in self._items:
+                self._items[key] = payload
+                self.coalesced += 1
+                return True
+        else:
+            key = ("event", next(self._seq))
+
+        accepted = True
+        if len(self._items) >= self.maxsize:
+            self._evict_oldest()
+            self.dropped += 1
+            accepted = False
+
+        self._items[key] = payload
+        self.max_depth = max(self.max_depth, len(self._items))
+        self._ready.set()
+        return accepted
+
+    def _evict_oldest(self):
+        """가장 오래된 이벤트 메시지를 우선 제거 (상태 메시지는 최신값이므로 보존)"""
+        for key in self._items:
+            if key[0] == "event":
+                del self._items[key]
+                return
+        self._items.popitem(last=False)
+
+    async def get(self) -> Dict[str, Any]:
+        """다음 메시지 대기 후 반환"""
+        while not self._items:
+            self._ready.clear()
+            await self._ready.wait()
+        _, payload = self._items.popitem(last=False)
+        return payload
+
+    def clear(self):
+        self._items.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "maxsize": self.maxsize,
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+        }
+
+
+class ClientConnection:
+    """
+    WebSocket 연결 + 전용 writer 태스크
+
+    writer 태스크는 큐에서 메시지를 꺼내 전송하며,
+    전송 실패 또는 send_timeout 초과 시 on_close 콜백으로 정리를 요청한다.
+    """
+
+    def __init__(
+        self,
+        client_id: str,
+        websocket: WebSocket,
+        maxsize: int = 256,
+        send_timeout: float = 10.0,
+        on_close: Optional[Callable[[str], Awaitable[None]]] = None,
+    ):
+        self.client_id = client_id
+        self.websocket = websocket
+        self.queue = OutboundQueue(maxsize=maxsize)
+        self.send_timeout = send_timeout
+        self._on_close = on_close
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    @property
+    def is_closed(self) -> bool:
+        return self._closed
+
+    def start(self):
+        """writer 태스크 시작"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._writer_loop())
+
+    def enqueue(self, payload: Dict[str, Any], coalesce_key: Optional[Hashable] = None) -> bool:
+        if self._closed:
+            return False
+        return self.queue.put(payload, coalesce_key)
+
+    async def _writer_loop(self):
+        try:
+            while not self._closed:
+                payload = await self.queue.get()
+                await asyncio.wait_for(
+                    self.websocket.send_json(payload),
+                    timeout=self.send_timeout,
+                )
+                self.queue.sent += 1
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.info(f"WebSocket writer for client {self.client_id} stopped: {e!r}")
+            if self._on_close and not self._closed:
+                await self._on_close(self.client_id)
+
+    def close(self):
+        """writer 태스크 정지 (writer 자신에서 호출되어도 안전)"""
+        self._closed = True
+        self.queue.clear()
+        if self._task and self._task is not asyncio.current_task():
+            self._task.cancel()
+        self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"client_id": self.client_id, **self.queue.get_stats()}
@@ -0,0 +1,129 @@
+"""
+Local RESP pub/sub stand-in for RedisBroadcastBackend
+
+Redis 없이 멀티 워커 브로드캐스트를 확인하기 위한 최소 RESP2 서버
+(PING / AUTH / PUBLISH / PSUBSCRIBE 만 지원, 영속성/기타 명령 없음)
+
+    python -m api.websocket.resp_server --port 6379
+
+테스트에서는 LocalRESPServer를 같은 이벤트 루프에서 start()/stop() 한다.
+"""
+import argparse
+import asyncio
+import logging
+from fnmatch import fnmatchcase
+from typing import Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+def _encode_reply(*items) -> bytes:
+    """배열 응답 (int는 integer, 나머지는 bulk string)"""
+    parts = [b"*%d\r\n" % len(items)]
+    for item in items:
+        if isinstance(item, int):
+            parts.append(b":%d\r\n" % item)
+        else:
+            if isinstance(item, str):
+                item = item.encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(item), item))
+    return b"".join(parts)
+
+
+class LocalRESPServer:
+    """PUBLISH / PSUBSCRIBE만 처리하는 asyncio RESP 서버"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+        # {writer: 구독 패턴}
+        self._clients: Dict[asyncio.StreamWriter, Set[str]] = {}
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        # port=0이면 OS가 할당한 포트 (재시작 시 같은 포트 사용)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """리스너와 기존 연결을 모두 종료 (클라이언트 입장에서는 서버 장애)"""
+        if self._server:
+            self._server.close()
+        for writer in list(self._clients):
+            writer.close()
+        self._clients.clear()
+        if self._server:
+            await self._server.wait_closed()
+            self._server = None
+
+    @staticmethod
+    async def _read_command(reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+        line = await reader.readline()
+        if not line:
+            return None
+        if line[:1] != b"*":
+            # inline 명령 (redis-cli 등)
+            return line.strip().split()
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int((await reader.readline())[1:-2])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        patterns: Set[str] = set()
+        self._clients[writer] = patterns
+        try:
+            while True:
+                args = await self._read_command(reader)
+                if args is None:
+                    break
+                if not args:
+                    continue
+                command = args[0].decode().upper()
+
+                if command == "PING":
+                    writer.write(b"+PONG\r\n")
+                elif command == "AUTH":
+                    writer.write(b"+OK\r\n")
+                elif command == "PSUBSCRIBE":
+                    for pattern in args[1:]:
+                        patterns.add(pattern.decode())
+                        writer.write(_encode_reply(b"psubscribe", pattern, len(patterns)))
+                elif command == "PUBLISH":
+                    channel, payload = args[1], args[2]
+                    writer.write(b":%d\r\n" % self._publish(channel, payload))
+                else:
+                    writer.write(b"-ERR unknown command '%s'\r\n" % command.encode())
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._clients.pop(writer, None)
+            writer.close()
+
+    def _publish(self, channel: bytes, payload: bytes) -> int:
+        name = channel.decode()
+        receivers = 0
+        for writer, patterns in list(self._clients.items()):
+            for pattern in patterns:
+                if fnmatchcase(name, pattern):
+                    writer.write(_encode_reply(b"pmessage", pattern, channel, payload))
+                    receivers += 1
+        return receivers
+
+
+async def _serve(host: str, port: int):
+    server = LocalRESPServer(host, port)
+    await server.start()
+    logger.info(f"RESP stand-in listening on {host}:{server.port}")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local RESP pub/sub stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_serve(args.host, args.port))
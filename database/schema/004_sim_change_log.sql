@@ -0,0 +1,132 @@
+-- ============================================================
+-- 시뮬레이터 변경 로그 (CDC / Outbox)
+-- Version: 1.0.2
+--
+-- Generator save(), 시나리오 Modifier UPDATE 등 ETL 소스 테이블의
+-- 모든 INSERT/UPDATE/DELETE를 append-only sim_change_log에 기록
+-- ETL 소비자(etl/cdc.py)가 (txid, id) 순서로 tail 하여 RAW/FACT 증분 반영
+--
+-- - statement-level 트리거 + transition table: COPY/대량 INSERT도 문장당 1회 실행
+-- - UPDATE는 실제 값이 바뀐 컬럼만 changed_columns에 기록 (no-op UPDATE 무시)
+-- - business_date: 트리거 인자로 받은 날짜 컬럼 후보 중 첫 번째 non-null 값
+--   (UPDATE로 날짜가 바뀌면 old_business_date에 이전 날짜)
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS sim_change_log (
+    id BIGSERIAL PRIMARY KEY,
+    txid BIGINT NOT NULL DEFAULT txid_current(),
+    table_name VARCHAR(63) NOT NULL,
+    row_id UUID NOT NULL,
+    op CHAR(1) NOT NULL CHECK (op IN ('I', 'U', 'D')),
+    changed_columns TEXT[],
+    business_date DATE,
+    old_business_date DATE,
+    changed_at TIMESTAMPTZ NOT NULL DEFAULT clock_timestamp()
+);
+
+-- 소비자는 커밋 완료된 트랜잭션(txid < snapshot xmin)만 (txid, id) 순으로 읽음
+CREATE INDEX IF NOT EXISTS idx_sim_change_log_txid ON sim_change_log(txid, id);
+
+
+-- 행의 business date (TG_ARGV 후보 컬럼 중 첫 번째 non-null)
+CREATE OR REPLACE FUNCTION sim_change_business_date(row_data JSONB, date_columns TEXT[])
+RETURNS DATE AS $$
+DECLARE
+    col TEXT;
+BEGIN
+    FOREACH col IN ARRAY date_columns LOOP
+        IF row_data ? col AND row_data ->> col IS NOT NULL THEN
+            RETURN (row_data ->> col)::TIMESTAMPTZ::DATE;
+        END IF;
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+
+CREATE OR REPLACE FUNCTION sim_capture_changes()
+RETURNS TRIGGER AS $$
+DECLARE
+    date_columns TEXT[] := TG_ARGV;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO sim_change_log (table_name, row_id, op, business_date)
+        SELECT TG_TABLE_NAME, n.id, 'I', sim_change_business_date(to_jsonb(n), date_columns)
+        FROM new_rows n;
+
+    ELSIF TG_OP = 'UPDATE' THEN
+        INSERT INTO sim_change_log (
+            table_name, row_id, op, changed_columns, business_date, old_business_date
+        )
+        SELECT TG_TABLE_NAME, c.id, 'U', c.changed_columns, c.new_date, NULLIF(c.old_date, c.new_date)
+        FROM (
+            SELECT
+                n.id,
+                ARRAY(
+                    SELECT nj.key
+                    FROM jsonb_each(to_jsonb(n)) nj
+                    WHERE nj.value IS DISTINCT FROM (to_jsonb(o) -> nj.key)
+                ) AS changed_columns,
+                sim_change_business_date(to_jsonb(n), date_columns) AS new_date,
+                sim_change_business_date(to_jsonb(o), date_columns) AS old_date
+            FROM new_rows n
+            JOIN old_rows o ON o.id = n.id
+        ) c
+        WHERE cardinality(c.changed_columns) > 0;
+
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO sim_change_log (table_name, row_id, op, business_date)
+        SELECT TG_TABLE_NAME, o.id, 'D', sim_change_business_date(to_jsonb(o), date_columns)
+        FROM old_rows o;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- ETL 소스 테이블에 트리거 설치 (테이블, 날짜 컬럼 후보)
+DO $$
+DECLARE
+    t RECORD;
+BEGIN
+    FOR t IN
+        SELECT * FROM (VALUES
+            ('mes_production_result', 'production_date, result_timestamp'),
+            ('mes_defect_detail', 'detection_datetime, defect_timestamp'),
+            ('mes_inspection_result', 'inspection_datetime'),
+            ('mes_equipment_oee', 'oee_date')
+        ) AS v(table_name, date_columns)
+    LOOP
+        IF to_regclass(t.table_name) IS NULL THEN
+            CONTINUE;
+        END IF;
+
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_sim_cdc_insert ON %I', t.table_name);
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_sim_cdc_update ON %I', t.table_name);
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_sim_cdc_delete ON %I', t.table_name);
+
+        EXECUTE format(
+            'CREATE TRIGGER trg_sim_cdc_insert AFTER INSERT ON %I '
+            'REFERENCING NEW TABLE AS new_rows '
+            'FOR EACH STATEMENT EXECUTE FUNCTION sim_capture_changes(%s)',
+            t.table_name,
+            (SELECT string_agg(quote_literal(trim(c)), ', ') FROM unnest(string_to_array(t.date_columns, ',')) c)
+        );
+        EXECUTE format(
+            'CREATE TRIGGER trg_sim_cdc_update AFTER UPDATE ON %I '
+            'REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows '
+            'FOR EACH STATEMENT EXECUTE FUNCTION sim_capture_changes(%s)',
+            t.table_name,
+            (SELECT string_agg(quote_literal(trim(c)), ', ') FROM unnest(string_to_array(t.date_columns, ',')) c)
+        );
+        EXECUTE format(
+            'CREATE TRIGGER trg_sim_cdc_delete AFTER DELETE ON %I '
+            'REFERENCING OLD TABLE AS old_rows '
+            'FOR EACH STATEMENT EXECUTE FUNCTION sim_capture_changes(%s)',
+            t.table_name,
+            (SELECT string_agg(quote_literal(trim(c)), ', ') FROM unnest(string_to_array(t.date_columns, ',')) c)
+        );
+    END LOOP;
+END;
+$$;
@@ -0,0 +1,64 @@
+-- ============================================================
+-- 총계정원장 (회계연도, 회계기간, 계정) 유일 인덱스
+-- Version: 1.0.3
+--
+-- 전표 전기(api/services/ledger.py)는 원장 증분을
+-- INSERT ... ON CONFLICT (fiscal_year, fiscal_period, account_code) 로 반영하므로
+-- 해당 컬럼의 유일 인덱스가 필요 (기존 DB에는 ORM 제약이 자동 생성되지 않음)
+--
+-- 1) 같은 키의 중복 행은 최소 id 행으로 합산 후 삭제
+--    (기말잔액 = 유지 행 기초잔액 + 각 행의 (기말 - 기초) 합계)
+-- 2) 유일 인덱스 생성 (이미 있으면 건너뜀)
+-- 여러 번 실행해도 안전
+-- ============================================================
+
+DO $$
+BEGIN
+    IF to_regclass('erp_general_ledger') IS NULL THEN
+        RETURN;
+    END IF;
+
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'erp_general_ledger' AND column_name = 'debit_total'
+    ) THEN
+        -- API(ORM) 원장 레이아웃: 중복 행 합산
+        WITH dup AS (
+            SELECT
+                MIN(id) AS keep_id,
+                SUM(COALESCE(debit_total, 0)) AS debit_total,
+                SUM(COALESCE(credit_total, 0)) AS credit_total,
+                SUM(COALESCE(closing_balance, 0) - COALESCE(opening_balance, 0)) AS net_change,
+                SUM(COALESCE(transaction_count, 0)) AS transaction_count
+            FROM erp_general_ledger
+            GROUP BY fiscal_year, fiscal_period, account_code
+            HAVING COUNT(*) > 1
+        )
+        UPDATE erp_general_ledger g SET
+            debit_total = dup.debit_total,
+            credit_total = dup.credit_total,
+            closing_balance = COALESCE(g.opening_balance, 0) + dup.net_change,
+            transaction_count = dup.transaction_count,
+            updated_at = NOW()
+        FROM dup
+        WHERE g.id = dup.keep_id;
+
+        DELETE FROM erp_general_ledger g
+        USING erp_general_ledger k
+        WHERE g.fiscal_year = k.fiscal_year
+        AND g.fiscal_period = k.fiscal_period
+        AND g.account_code = k.account_code
+        AND g.id > k.id;
+    ELSIF EXISTS (
+        SELECT 1 FROM erp_general_ledger
+        GROUP BY fiscal_year, fiscal_period, account_code
+        HAVING COUNT(*) > 1
+    ) THEN
+        -- 테넌트별 원장 레이아웃(001)에 테넌트 간 중복이 있으면 합치지 않고 건너뜀
+        RAISE NOTICE 'erp_general_ledger: duplicate (fiscal_year, fiscal_period, account_code) rows across tenants, unique index not created';
+        RETURN;
+    END IF;
+
+    CREATE UNIQUE INDEX IF NOT EXISTS uq_erp_general_ledger_period_account
+        ON erp_general_ledger (fiscal_year, fiscal_period, account_code);
+END $$;
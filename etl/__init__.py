@@ -1,4 +1,6 @@
 # ETL Pipeline
 from .raw_to_fact import ETLPipeline
+from .runner import ETLRunner
+from .cdc import ChangeLogConsumer
 
-__all__ = ['ETLPipeline']
+__all__ = ['ETLPipeline', 'ETLRunner', 'ChangeLogConsumer']
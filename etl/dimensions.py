@@ -0,0 +1,326 @@
+"""
+Dimension Maintenance: SCD Type 2 for dim_line / dim_product / dim_equipment
+
+Each master row is reduced to an attribute digest (attr_hash = md5 of the
+tracked attributes, cast to the dimension column types). One set-based
+statement per dimension compares it with the current version and, for new
+or changed keys only, closes the current version (valid_to, is_current)
+and opens a new one - so a run costs O(changed rows), not O(master rows).
+
+The first version of a key is valid from -infinity, so facts for any
+history resolve to a surrogate key. version_at() picks the version valid at
+the start of the fact day: a version opened mid-day applies from the next
+day, and a day that has been built keeps its surrogate keys on rebuild.
+
+dim_time is no longer generated from a fixed calendar; ensure_dim_time()
+extends it lazily to the date range of the facts being built.
+
+SurrogateKeyCache holds every version as (tenant_id, code) → day ranges,
+so fact loads resolve surrogate keys in memory instead of joining the
+dimensions per fact statement.
+"""
+
+import threading
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+
+@dataclass(frozen=True)
+class DimensionSpec:
+    """Master table → SCD2 dimension"""
+    table: str
+    key: str                           # natural key column (with tenant_id)
+    attributes: Tuple[Tuple[str, str], ...]  # (dim column, source expression)
+    source_sql: str                    # master query; {attributes} is filled in
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        return tuple(column for column, _ in self.attributes)
+
+
+DIMENSIONS = (
+    DimensionSpec(
+        table="dim_line",
+        key="line_code",
+        attributes=(
+            ("line_name", "pl.line_name::VARCHAR(100)"),
+            ("line_type", "pl.line_type::VARCHAR(20)"),
+            ("factory_code", "pl.factory_code::VARCHAR(20)"),
+            ("capacity_per_shift", "pl.capacity_per_shift::INTEGER"),
+            ("is_active", "pl.status = 'active'"),
+        ),
+        source_sql="""
+            SELECT pl.tenant_id, pl.line_code AS key, {attributes}
+            FROM mes_production_line pl
+        """,
+    ),
+    DimensionSpec(
+        table="dim_product",
+        key="product_code",
+        attributes=(
+            ("product_name", "mm.name::VARCHAR(100)"),
+            ("product_name_en", "mm.name_en::VARCHAR(100)"),
+            ("product_family", "mm.material_group::VARCHAR(20)"),
+            ("product_category", "'PCB'::VARCHAR(30)"),
+            ("standard_cost", "mm.standard_cost::DECIMAL(15, 4)"),
+            ("is_active", "mm.is_active"),
+        ),
+        source_sql="""
+            SELECT mm.tenant_id, mm.material_code AS key, {attributes}
+            FROM erp_material_master mm
+            WHERE mm.material_type = 'finished'
+        """,
+    ),
+    DimensionSpec(
+        table="dim_equipment",
+        key="equipment_code",
+        attributes=(
+            ("equipment_name", "em.equipment_name::VARCHAR(100)"),
+            ("equipment_type", "em.equipment_type::VARCHAR(30)"),
+            ("line_code", "em.line_code::VARCHAR(20)"),
+            ("manufacturer", "em.manufacturer::VARCHAR(50)"),
+            ("model", "em.model::VARCHAR(50)"),
+            ("position_in_line", "em.position_in_line::INTEGER"),
+            ("is_active", "em.status = 'active'"),
+        ),
+        source_sql="""
+            SELECT em.tenant_id, em.equipment_code AS key, {attributes}
+            FROM mes_equipment_master em
+        """,
+    ),
+)
+
+
+def _attr_hash(alias: str, spec: DimensionSpec) -> str:
+    """md5 of the tracked attributes; NULLs and column order are significant"""
+    return f"md5(ROW({', '.join(f'{alias}.{c}' for c in spec.columns)})::TEXT)"
+
+
+def version_at(alias: str, date_expr: str) -> str:
+    """
+    Join predicate selecting the dimension version valid at the start of a day
+
+    e.g. JOIN dim_line dl ON dl.tenant_id = pr.tenant_id AND dl.line_code = pr.line_code
+         AND {version_at("dl", "pr.production_date")}
+    """
+    return (
+        f"{alias}.valid_from <= ({date_expr})::TIMESTAMPTZ "
+        f"AND ({alias}.valid_to IS NULL OR {alias}.valid_to > ({date_expr})::TIMESTAMPTZ)"
+    )
+
+
+# 버전별 적용 일자 [from_day, to_day): 해당 일자 시작 시점에 유효한 버전 (version_at과 동일)
+VERSION_DAYS_SQL = """
+    SELECT
+        tenant_id::TEXT AS tenant_id,
+        {key} AS code,
+        id::TEXT AS id,
+        CASE WHEN valid_from = '-infinity' THEN NULL
+             WHEN valid_from::DATE::TIMESTAMPTZ >= valid_from THEN valid_from::DATE
+             ELSE valid_from::DATE + 1 END AS from_day,
+        CASE WHEN valid_to IS NULL THEN NULL
+             WHEN valid_to::DATE::TIMESTAMPTZ >= valid_to THEN valid_to::DATE
+             ELSE valid_to::DATE + 1 END AS to_day
+    FROM {table}
+    ORDER BY tenant_id, {key}, valid_from
+"""
+
+
+DIM_TIME_SQL = """
+    INSERT INTO dim_time (
+        date_key, full_date, year, quarter, month, week,
+        day_of_month, day_of_week, day_of_year,
+        is_weekend, is_holiday, fiscal_year, fiscal_quarter
+    )
+    SELECT
+        TO_CHAR(d::date, 'YYYYMMDD')::INTEGER as date_key,
+        d::date as full_date,
+        EXTRACT(YEAR FROM d)::INTEGER as year,
+        EXTRACT(QUARTER FROM d)::INTEGER as quarter,
+        EXTRACT(MONTH FROM d)::INTEGER as month,
+        EXTRACT(WEEK FROM d)::INTEGER as week,
+        EXTRACT(DAY FROM d)::INTEGER as day_of_month,
+        EXTRACT(ISODOW FROM d)::INTEGER as day_of_week,
+        EXTRACT(DOY FROM d)::INTEGER as day_of_year,
+        EXTRACT(ISODOW FROM d) IN (6, 7) as is_weekend,
+        FALSE as is_holiday,
+        EXTRACT(YEAR FROM d)::INTEGER as fiscal_year,
+        EXTRACT(QUARTER FROM d)::INTEGER as fiscal_quarter
+    FROM generate_series(CAST(:start AS DATE), CAST(:end AS DATE), '1 day'::interval) d
+    ON CONFLICT (date_key) DO NOTHING
+"""
+
+
+class DimensionMaintainer:
+    """Set-based SCD2 maintenance and lazy dim_time"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._schema_ready = False
+        # dim_time 보장 범위 캐시 (fact 슬라이스 스레드 공유)
+        self._time_range: Optional[Tuple[date, date]] = None
+        self._time_lock = threading.Lock()
+
+    def ensure_schema(self, conn):
+        """attr_hash column and SCD2 indexes for tables created before them"""
+        if self._schema_ready:
+            return
+        for spec in DIMENSIONS:
+            conn.execute(text(f"ALTER TABLE {spec.table} ADD COLUMN IF NOT EXISTS attr_hash CHAR(32)"))
+            conn.execute(text(f"""
+                CREATE UNIQUE INDEX IF NOT EXISTS uq_{spec.table}_current
+                ON {spec.table}(tenant_id, {spec.key}) WHERE is_current = TRUE
+            """))
+            conn.execute(text(f"""
+                CREATE INDEX IF NOT EXISTS idx_{spec.table}_version
+                ON {spec.table}(tenant_id, {spec.key}, valid_from)
+            """))
+            # 기존(해시 없는) 단일 버전 행: 해시 백필 + 전체 이력에 유효하도록
+            conn.execute(text(f"""
+                UPDATE {spec.table} d SET
+                    attr_hash = {_attr_hash("d", spec)},
+                    valid_from = '-infinity'
+                WHERE d.attr_hash IS NULL
+                AND d.is_current = TRUE
+                AND NOT EXISTS (
+                    SELECT 1 FROM {spec.table} o
+                    WHERE o.tenant_id = d.tenant_id AND o.{spec.key} = d.{spec.key} AND o.id <> d.id
+                )
+            """))
+        self._schema_ready = True
+
+    def update_all(self) -> Dict[str, Tuple[int, int]]:
+        """Apply master changes to every SCD2 dimension; {table: (opened, closed)}"""
+        results = {}
+        with self.engine.begin() as conn:
+            self.ensure_schema(conn)
+            for spec in DIMENSIONS:
+                results[spec.table] = self.update(conn, spec)
+        return results
+
+    def update(self, conn, spec: DimensionSpec) -> Tuple[int, int]:
+        """
+        Close changed versions and open new ones in one statement
+
+        Returns:
+            (versions opened, versions closed)
+        """
+        columns = ", ".join(spec.columns)
+        source = spec.source_sql.format(
+            attributes=", ".join(f"{expr} AS {column}" for column, expr in spec.attributes)
+        )
+        # closed를 InitPlan으로 먼저 완료시켜야 부분 unique index(is_current)와 충돌하지 않음
+        result = conn.execute(text(f"""
+            WITH src AS (
+                SELECT s.*, {_attr_hash("s", spec)} AS attr_hash
+                FROM ({source}) s
+            ),
+            changed AS (
+                SELECT src.*, cur.id AS current_id
+                FROM src
+                LEFT JOIN {spec.table} cur
+                    ON cur.tenant_id = src.tenant_id
+                    AND cur.{spec.key} = src.key
+                    AND cur.is_current = TRUE
+                WHERE cur.id IS NULL OR cur.attr_hash IS DISTINCT FROM src.attr_hash
+            ),
+            closed AS (
+                UPDATE {spec.table} d SET
+                    valid_to = NOW(),
+                    is_current = FALSE
+                FROM changed c
+                WHERE d.id = c.current_id
+                RETURNING d.id
+            ),
+            opened AS (
+                INSERT INTO {spec.table} (
+                    tenant_id, {spec.key}, {columns}, attr_hash,
+                    valid_from, valid_to, is_current
+                )
+                SELECT
+                    c.tenant_id, c.key, {", ".join(f"c.{column}" for column in spec.columns)}, c.attr_hash,
+                    CASE WHEN c.current_id IS NULL THEN '-infinity'::TIMESTAMPTZ ELSE NOW() END,
+                    NULL,
+                    TRUE
+                FROM changed c
+                WHERE (SELECT COUNT(*) FROM closed) >= 0
+                RETURNING id
+            )
+            SELECT (SELECT COUNT(*) FROM opened) AS opened, (SELECT COUNT(*) FROM closed) AS closed
+        """)).one()
+        return result.opened, result.closed
+
+    def ensure_dim_time(self, start: date, end: date):
+        """Make dim_time cover [start, end] (inclusive), extending the known range only"""
+        with self._time_lock:
+            if self._time_range is None:
+                with self.engine.connect() as conn:
+                    lo, hi = conn.execute(text("SELECT MIN(full_date), MAX(full_date) FROM dim_time")).one()
+                self._time_range = (lo, hi) if lo else None
+
+            if self._time_range and self._time_range[0] <= start and end <= self._time_range[1]:
+                return
+
+            lo = min(start, self._time_range[0]) if self._time_range else start
+            hi = max(end, self._time_range[1]) if self._time_range else end
+            with self.engine.begin() as conn:
+                added = conn.execute(text(DIM_TIME_SQL), {"start": lo, "end": hi}).rowcount
+            self._time_range = (lo, hi)
+            if added:
+                print(f"  ✓ dim_time: +{added} days ({lo} ~ {hi})")
+
+
+class SurrogateKeyCache:
+    """
+    In-memory (tenant_id, code, day) → surrogate id for the SCD2 dimensions
+
+    Loaded once per ETL run (invalidate() after dimension changes); lookups
+    are a dict probe plus a bisect over the few versions of a key.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        # table -> (tenant_id, code) -> (from_days, [(to_day, id)])
+        self._keys: Optional[Dict[str, Dict[Tuple[str, str], Tuple[List[date], List[Tuple[date, str]]]]]] = None
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self._keys = None
+
+    def load(self):
+        keys = {}
+        with self.engine.connect() as conn:
+            for spec in DIMENSIONS:
+                versions: Dict[Tuple[str, str], Tuple[List[date], List[Tuple[date, str]]]] = {}
+                for row in conn.execute(text(VERSION_DAYS_SQL.format(table=spec.table, key=spec.key))):
+                    from_day, to_day = row.from_day or date.min, row.to_day or date.max
+                    if from_day >= to_day:
+                        continue   # 하루 안에 닫힌 버전은 어떤 일자에도 적용되지 않음
+                    starts, entries = versions.setdefault((row.tenant_id, row.code), ([], []))
+                    starts.append(from_day)
+                    entries.append((to_day, row.id))
+                keys[spec.table] = versions
+        self._keys = keys
+        return keys
+
+    def resolve(self, table: str, tenant_id, code: str, day: date) -> Optional[str]:
+        """Surrogate id of the version valid on day, or None"""
+        keys = self._keys
+        if keys is None:
+            with self._lock:
+                keys = self._keys or self.load()
+
+        versions = keys[table].get((str(tenant_id), code))
+        if versions is None:
+            return None
+        starts, entries = versions
+        i = bisect_right(starts, day) - 1
+        if i < 0:
+            return None
+        to_day, surrogate_id = entries[i]
+        return surrogate_id if day < to_day else None
@@ -0,0 +1,336 @@
+"""
+Judgment Engine Input Builder: facts → NDJSON (one record per line per day)
+
+Builds the inputs for the whole date range and all lines in one streamed
+query over the fact tables. Window functions over each line's daily series
+add day-over-day deltas and z-scores against the trailing 14 calendar days,
+and the JSON payload is assembled in Postgres so Python only writes lines.
+
+Output is sharded by month (judgment-YYYYMMDD-YYYYMMDD.ndjson). Shards are
+written atomically and _state.json records the last emitted date, so an
+interrupted or repeated run resumes from the following day.
+
+Usage:
+    python -m etl.judgment_input --output ./output/judgment
+    python -m etl.judgment_input --output ./output/judgment --from 2024-01-01 --to 2024-12-31
+    python -m etl.judgment_input --output ./output/judgment --restart
+"""
+
+import json
+import os
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import text
+
+from .raw_to_fact import ETLPipeline
+
+STATE_NAME = "_state.json"
+
+WORKFLOW_ID = "WF-DEFECT-DETECTION"
+JUDGMENT_CONTEXT = "quality_anomaly_detection"
+
+# 추세/이상치 지표 (daily CTE 컬럼)
+TREND_METRICS = ("total_qty", "yield_rate", "defect_rate", "achievement_rate", "oee")
+
+
+def _trend_sql(metric: str) -> str:
+    """delta vs previous day, trailing mean/std and z-score of one metric"""
+    return f"""
+        '{metric}', jsonb_build_object(
+            'value', ROUND({metric}::NUMERIC, 6),
+            'delta', ROUND(({metric} - LAG({metric}) OVER line_days)::NUMERIC, 6),
+            'mean_trailing', ROUND((AVG({metric}) OVER trailing)::NUMERIC, 6),
+            'std_trailing', ROUND((STDDEV_SAMP({metric}) OVER trailing)::NUMERIC, 6),
+            'z_score', ROUND((({metric} - AVG({metric}) OVER trailing)
+                              / NULLIF(STDDEV_SAMP({metric}) OVER trailing, 0))::NUMERIC, 4)
+        )"""
+
+
+JUDGMENT_INPUT_SQL = """
+WITH production AS (
+    SELECT
+        fp.tenant_id, fp.date_key, dl.line_code,
+        SUM(fp.total_qty) AS total_qty,
+        SUM(fp.good_qty) AS good_qty,
+        SUM(fp.defect_qty) AS defect_qty,
+        SUM(fp.target_qty) AS target_qty
+    FROM fact_daily_production fp
+    JOIN dim_line dl ON dl.id = fp.line_id
+    WHERE fp.date_key BETWEEN :warmup_key AND :to_key
+    GROUP BY 1, 2, 3
+),
+defect_codes AS (
+    SELECT
+        fd.tenant_id, fd.date_key, dl.line_code, fd.defect_code,
+        SUM(fd.defect_qty) AS defect_qty,
+        ROW_NUMBER() OVER (
+            PARTITION BY fd.tenant_id, fd.date_key, dl.line_code
+            ORDER BY SUM(fd.defect_qty) DESC, fd.defect_code
+        ) AS rank
+    FROM fact_daily_defect fd
+    JOIN dim_line dl ON dl.id = fd.line_id
+    WHERE fd.date_key BETWEEN :from_key AND :to_key
+    GROUP BY 1, 2, 3, 4
+),
+top_defects AS (
+    SELECT
+        tenant_id, date_key, line_code,
+        jsonb_agg(jsonb_build_object('defect_code', defect_code, 'defect_qty', defect_qty)
+                  ORDER BY rank) AS top_defects
+    FROM defect_codes
+    WHERE rank <= :top_defects
+    GROUP BY 1, 2, 3
+),
+inspections AS (
+    -- inspected_qty는 결함 코드별 행에 중복 기록되므로 제품별 MAX 후 합산
+    SELECT tenant_id, date_key, line_code, SUM(inspected_qty) AS inspected_qty
+    FROM (
+        SELECT fd.tenant_id, fd.date_key, dl.line_code, fd.product_id, MAX(fd.inspected_qty) AS inspected_qty
+        FROM fact_daily_defect fd
+        JOIN dim_line dl ON dl.id = fd.line_id
+        WHERE fd.date_key BETWEEN :from_key AND :to_key
+        GROUP BY 1, 2, 3, 4
+    ) p
+    GROUP BY 1, 2, 3
+),
+equipment AS (
+    SELECT
+        fo.tenant_id, fo.date_key, dl.line_code,
+        COUNT(*) AS equipment_count,
+        AVG(fo.availability) AS availability,
+        AVG(fo.performance) AS performance,
+        AVG(fo.quality) AS quality,
+        AVG(fo.oee) AS oee,
+        MIN(fo.oee) AS min_oee
+    FROM fact_daily_oee fo
+    JOIN dim_line dl ON dl.id = fo.line_id
+    WHERE fo.date_key BETWEEN :warmup_key AND :to_key
+    GROUP BY 1, 2, 3
+),
+daily AS (
+    SELECT
+        p.tenant_id,
+        t.full_date,
+        p.date_key,
+        p.line_code,
+        p.total_qty, p.good_qty, p.defect_qty, p.target_qty,
+        p.good_qty::DOUBLE PRECISION / NULLIF(p.total_qty, 0) AS yield_rate,
+        p.defect_qty::DOUBLE PRECISION / NULLIF(p.total_qty, 0) AS defect_rate,
+        p.good_qty::DOUBLE PRECISION / NULLIF(p.target_qty, 0) AS achievement_rate,
+        e.equipment_count, e.availability, e.performance, e.quality, e.min_oee,
+        e.oee::DOUBLE PRECISION AS oee
+    FROM production p
+    JOIN dim_time t ON t.date_key = p.date_key
+    LEFT JOIN equipment e
+        ON e.tenant_id = p.tenant_id AND e.date_key = p.date_key AND e.line_code = p.line_code
+)
+SELECT
+    d.full_date,
+    jsonb_build_object(
+        'workflow_id', :workflow_id,
+        'judgment_context', :judgment_context,
+        'tenant_id', d.tenant_id,
+        'input_data', jsonb_build_object(
+            'date', d.full_date,
+            'line_code', d.line_code,
+            'production_summary', jsonb_build_object(
+                'total_qty', d.total_qty,
+                'good_qty', d.good_qty,
+                'defect_qty', d.defect_qty,
+                'target_qty', d.target_qty
+            ),
+            'defect_summary', jsonb_build_object(
+                'inspected_qty', i.inspected_qty,
+                'top_defects', COALESCE(td.top_defects, '[]'::JSONB)
+            ),
+            'equipment_status', jsonb_build_object(
+                'equipment_count', COALESCE(d.equipment_count, 0),
+                'availability', ROUND(d.availability, 4),
+                'performance', ROUND(d.performance, 4),
+                'quality', ROUND(d.quality, 4),
+                'min_oee', ROUND(d.min_oee, 4)
+            ),
+            'trend', jsonb_build_object({trend})
+        )
+    )::TEXT AS payload
+FROM daily d
+LEFT JOIN top_defects td
+    ON td.tenant_id = d.tenant_id AND td.date_key = d.date_key AND td.line_code = d.line_code
+LEFT JOIN inspections i
+    ON i.tenant_id = d.tenant_id AND i.date_key = d.date_key AND i.line_code = d.line_code
+WINDOW
+    line_days AS (PARTITION BY d.tenant_id, d.line_code ORDER BY d.full_date),
+    trailing AS (
+        PARTITION BY d.tenant_id, d.line_code ORDER BY d.full_date
+        RANGE BETWEEN CAST(:trailing AS INTERVAL) PRECEDING AND INTERVAL '1 day' PRECEDING
+    )
+ORDER BY d.full_date, d.tenant_id, d.line_code
+"""
+
+
+def _date_key(d: date) -> int:
+    return int(d.strftime("%Y%m%d"))
+
+
+class JudgmentInputBuilder:
+    """Resumable NDJSON builder of Judgment Engine inputs"""
+
+    def __init__(
+        self,
+        output_dir: str,
+        pipeline: Optional[ETLPipeline] = None,
+        trailing_days: int = 14,
+        top_defects: int = 3,
+        fetch_size: int = 5000,
+    ):
+        self.output_dir = Path(output_dir)
+        self.pipeline = pipeline or ETLPipeline()
+        self.engine = self.pipeline.engine
+        self.trailing_days = trailing_days
+        self.top_defects = top_defects
+        self.fetch_size = fetch_size
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.state = self._load_state()
+        self.sql = JUDGMENT_INPUT_SQL.replace(
+            "{trend}", ",".join(_trend_sql(metric) for metric in TREND_METRICS)
+        )
+
+    # ==================== State ====================
+
+    def _load_state(self) -> Dict[str, Any]:
+        path = self.output_dir / STATE_NAME
+        if path.exists():
+            return json.loads(path.read_text(encoding="utf-8"))
+        return {"last_date": None, "records": 0, "shards": []}
+
+    def _save_state(self):
+        self.state["updated_at"] = datetime.now(timezone.utc).isoformat()
+        tmp = self.output_dir / f".{STATE_NAME}.tmp"
+        tmp.write_text(json.dumps(self.state, indent=2), encoding="utf-8")
+        os.replace(tmp, self.output_dir / STATE_NAME)
+
+    def reset(self):
+        """Forget progress and remove emitted shards"""
+        for shard in self.state.get("shards", []):
+            (self.output_dir / shard).unlink(missing_ok=True)
+        self.state = {"last_date": None, "records": 0, "shards": []}
+        self._save_state()
+
+    # ==================== Build ====================
+
+    def _fact_range(self) -> Tuple[Optional[date], Optional[date]]:
+        with self.engine.connect() as conn:
+            lo, hi = conn.execute(text("""
+                SELECT MIN(t.full_date), MAX(t.full_date)
+                FROM dim_time t
+                WHERE t.date_key BETWEEN (SELECT MIN(date_key) FROM fact_daily_production)
+                                     AND (SELECT MAX(date_key) FROM fact_daily_production)
+            """)).one()
+        return lo, hi
+
+    def build(self, date_from: Optional[date] = None, date_to: Optional[date] = None) -> int:
+        """
+        Emit inputs for [date_from, date_to], skipping dates already emitted
+
+        Returns:
+            number of records written
+        """
+        lo, hi = self._fact_range()
+        if lo is None:
+            print("  - no production facts")
+            return 0
+
+        start = max(date_from or lo, lo)
+        end = min(date_to or hi, hi)
+        if self.state.get("last_date"):
+            start = max(start, date.fromisoformat(self.state["last_date"]) + timedelta(days=1))
+        if start > end:
+            print(f"  - up to date (last emitted {self.state.get('last_date')})")
+            return 0
+
+        print(f"  Building judgment inputs {start} ~ {end}")
+        params = {
+            "warmup_key": _date_key(start - timedelta(days=self.trailing_days)),
+            "from_key": _date_key(start),
+            "to_key": _date_key(end),
+            "trailing": f"{self.trailing_days} days",
+            "top_defects": self.top_defects,
+            "workflow_id": WORKFLOW_ID,
+            "judgment_context": JUDGMENT_CONTEXT,
+        }
+
+        written = 0
+        shard = None
+        with self.engine.connect() as conn:
+            result = conn.execute(text(self.sql).execution_options(stream_results=True), params)
+            for rows in result.partitions(self.fetch_size):
+                for full_date, payload in rows:
+                    if full_date < start:
+                        continue   # trailing window warm-up
+                    month = (full_date.year, full_date.month)
+                    if shard and shard["month"] != month:
+                        self._close_shard(shard)
+                        shard = None
+                    if shard is None:
+                        shard = self._open_shard(full_date)
+                    shard["file"].write(payload)
+                    shard["file"].write("\n")
+                    shard["last"] = full_date
+                    shard["records"] += 1
+                    written += 1
+        if shard:
+            self._close_shard(shard, end)
+
+        print(f"  ✓ {written} judgment inputs ({start} ~ {end})")
+        return written
+
+    def _open_shard(self, first: date) -> Dict[str, Any]:
+        tmp = self.output_dir / f".judgment-{first.strftime('%Y%m%d')}.ndjson.tmp"
+        return {
+            "month": (first.year, first.month),
+            "first": first,
+            "last": first,
+            "records": 0,
+            "tmp": tmp,
+            "file": open(tmp, "w", encoding="utf-8"),
+        }
+
+    def _close_shard(self, shard: Dict[str, Any], last: Optional[date] = None):
+        """Publish a shard and advance last_date (days without facts count as emitted)"""
+        shard["file"].close()
+        last = last or shard["last"]
+        name = f"judgment-{shard['first'].strftime('%Y%m%d')}-{last.strftime('%Y%m%d')}.ndjson"
+        os.replace(shard["tmp"], self.output_dir / name)
+
+        self.state["last_date"] = last.isoformat()
+        self.state["records"] = self.state.get("records", 0) + shard["records"]
+        self.state.setdefault("shards", []).append(name)
+        self._save_state()
+        print(f"  ✓ {name}: {shard['records']} records")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Build Judgment Engine inputs (NDJSON)')
+    parser.add_argument('--output', type=str, default='./output/judgment', help='Output directory')
+    parser.add_argument('--from', dest='date_from', type=str, help='Start date (YYYY-MM-DD)')
+    parser.add_argument('--to', dest='date_to', type=str, help='End date, inclusive (YYYY-MM-DD)')
+    parser.add_argument('--trailing-days', type=int, default=14, help='Trailing window for z-scores')
+    parser.add_argument('--restart', action='store_true', help='Discard progress and rebuild')
+
+    args = parser.parse_args()
+
+    builder = JudgmentInputBuilder(args.output, trailing_days=args.trailing_days)
+    try:
+        if args.restart:
+            builder.reset()
+        builder.build(
+            datetime.strptime(args.date_from, '%Y-%m-%d').date() if args.date_from else None,
+            datetime.strptime(args.date_to, '%Y-%m-%d').date() if args.date_to else None,
+        )
+    finally:
+        builder.pipeline.close()
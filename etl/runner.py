@@ -0,0 +1,317 @@
+"""
+ETL Runner: partition-parallel RAW → DIM → FACT with run log
+
+Splits a date range into month partitions and runs each (step, partition)
+task in its own transaction on a pooled connection, up to `jobs` at a time.
+Every task attempt is recorded in etl_run_log (timings, row counts, errors);
+a failed run can be retried and only its unfinished tasks are executed again.
+
+Usage:
+    python -m etl.runner --from 2024-07-01 --to 2024-12-31 --jobs 8
+    python -m etl.runner --retry <run_id> --jobs 8
+"""
+
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import text
+
+from .raw_to_fact import ETLPipeline, RAW_SOURCES, _month_ranges
+
+STEPS = ("raw", "dim", "fact")
+
+ETL_RUN_LOG_DDL = """
+CREATE TABLE IF NOT EXISTS etl_run_log (
+    id BIGSERIAL PRIMARY KEY,
+    run_id UUID NOT NULL,
+    step VARCHAR(50) NOT NULL,
+    partition_key VARCHAR(20) NOT NULL,
+    attempt INTEGER NOT NULL DEFAULT 1,
+    status VARCHAR(20) NOT NULL,
+    row_count BIGINT,
+    params JSONB,
+    started_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    finished_at TIMESTAMPTZ,
+    duration_ms INTEGER,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_etl_run_log_run ON etl_run_log(run_id, step, partition_key, attempt)
+"""
+
+
+@dataclass
+class ETLTask:
+    """One (step, partition) unit of work"""
+    step: str                  # raw:<source> / dim / fact:<fact>
+    partition_key: str         # YYYY-MM or 'all'
+    start: Optional[date] = None
+    end: Optional[date] = None
+    attempt: int = 1
+
+    @property
+    def phase(self) -> str:
+        return self.step.split(":", 1)[0]
+
+    @property
+    def params(self) -> Dict[str, str]:
+        return {
+            "start": self.start.isoformat() if self.start else None,
+            "end": self.end.isoformat() if self.end else None,
+        }
+
+
+class ETLRunner:
+    """Partition-parallel ETL runner"""
+
+    def __init__(self, pipeline: Optional[ETLPipeline] = None, jobs: int = 4):
+        self.jobs = max(1, jobs)
+        self.pipeline = pipeline or ETLPipeline(jobs=self.jobs)
+        self.engine = self.pipeline.engine
+        self._ensure_log_table()
+
+    def _ensure_log_table(self):
+        with self.engine.begin() as conn:
+            for stmt in ETL_RUN_LOG_DDL.split(';'):
+                if stmt.strip():
+                    conn.execute(text(stmt))
+
+    # ==================== Planning ====================
+
+    @staticmethod
+    def plan(date_from: date, date_to: date, steps: Sequence[str] = STEPS) -> List[ETLTask]:
+        """Tasks for [date_from, date_to] split by month"""
+        end_exclusive = date_to + timedelta(days=1)
+        partitions = [
+            (start.strftime("%Y-%m"), max(start, date_from), min(end, end_exclusive))
+            for start, end in _month_ranges(date_from, date_to)
+        ]
+
+        tasks: List[ETLTask] = []
+        if "raw" in steps:
+            for source in RAW_SOURCES:
+                tasks += [ETLTask(f"raw:{source.name}", key, start, end) for key, start, end in partitions]
+        if "dim" in steps:
+            tasks.append(ETLTask("dim", "all"))
+        if "fact" in steps:
+            for fact in ETLPipeline.FACTS:
+                tasks += [ETLTask(f"fact:{fact}", key, start, end) for key, start, end in partitions]
+        return tasks
+
+    # ==================== Execution ====================
+
+    def run(self, date_from: date, date_to: date, steps: Sequence[str] = STEPS) -> str:
+        """Run ETL for a date range; returns run_id"""
+        run_id = str(uuid.uuid4())
+        tasks = self.plan(date_from, date_to, steps)
+        print(f"\nETL run {run_id}: {date_from} ~ {date_to}, {len(tasks)} tasks, jobs={self.jobs}")
+        self._execute(run_id, tasks)
+        return run_id
+
+    def retry(self, run_id: str) -> str:
+        """Re-run tasks of run_id whose latest attempt did not succeed"""
+        with self.engine.connect() as conn:
+            rows = conn.execute(text("""
+                SELECT DISTINCT ON (step, partition_key)
+                    step, partition_key, attempt, status, params
+                FROM etl_run_log
+                WHERE run_id = :run_id
+                ORDER BY step, partition_key, attempt DESC
+            """), {"run_id": run_id}).mappings().all()
+
+        if not rows:
+            raise ValueError(f"Unknown ETL run: {run_id}")
+
+        tasks = []
+        for row in rows:
+            if row["status"] == "succeeded":
+                continue
+            params = row["params"] or {}
+            tasks.append(ETLTask(
+                step=row["step"],
+                partition_key=row["partition_key"],
+                start=date.fromisoformat(params["start"]) if params.get("start") else None,
+                end=date.fromisoformat(params["end"]) if params.get("end") else None,
+                attempt=row["attempt"] + 1,
+            ))
+
+        print(f"\nRetrying ETL run {run_id}: {len(tasks)} unfinished tasks, jobs={self.jobs}")
+        if tasks:
+            self._execute(run_id, tasks)
+        return run_id
+
+    def _execute(self, run_id: str, tasks: List[ETLTask]):
+        """Run phases in order; partitions within a phase run concurrently"""
+        started = time.monotonic()
+        blocked = False
+        for phase in STEPS:
+            phase_tasks = [t for t in tasks if t.phase == phase]
+            if not phase_tasks:
+                continue
+
+            if blocked:
+                # DIM 실패 시 FACT는 실행하지 않고 retry 대상으로 기록
+                for task in phase_tasks:
+                    self._log_start(run_id, task, status="skipped")
+                print(f"\n[{phase.upper()}] skipped ({len(phase_tasks)} tasks) - previous step failed")
+                continue
+
+            print(f"\n[{phase.upper()}] {len(phase_tasks)} tasks")
+            failed = self._execute_phase(run_id, phase_tasks)
+            if failed and phase == "dim":
+                blocked = True
+
+        self.print_summary(run_id)
+        print(f"\nElapsed: {time.monotonic() - started:.1f}s")
+
+    def _execute_phase(self, run_id: str, tasks: List[ETLTask]) -> int:
+        """Returns number of failed tasks"""
+        failed = 0
+        total = len(tasks)
+        with ThreadPoolExecutor(max_workers=min(self.jobs, total)) as pool:
+            futures = {pool.submit(self._run_task, run_id, task): task for task in tasks}
+            for done, future in enumerate(as_completed(futures), 1):
+                task = futures[future]
+                status, rows, seconds, error = future.result()
+                if status == "failed":
+                    failed += 1
+                    print(f"  [{done}/{total}] {task.step} {task.partition_key} ✗ {error}")
+                elif status == "skipped":
+                    print(f"  [{done}/{total}] {task.step} {task.partition_key} ⚠ skipped ({error})")
+                else:
+                    print(f"  [{done}/{total}] {task.step} {task.partition_key} ✓ {rows} rows ({seconds:.1f}s)")
+        return failed
+
+    def _run_task(self, run_id: str, task: ETLTask):
+        """Execute one task (own transaction) and record the attempt"""
+        log_id = self._log_start(run_id, task)
+        started = time.monotonic()
+        status, rows, error = "succeeded", None, None
+        try:
+            rows = self._task_callable(task)()
+        except Exception as e:
+            error = str(e).splitlines()[0] if str(e) else type(e).__name__
+            optional = task.phase == "fact" and ETLPipeline.FACTS[task.step.split(":", 1)[1]].optional
+            status = "skipped" if optional else "failed"
+        seconds = time.monotonic() - started
+        self._log_finish(log_id, status, rows, seconds, error)
+        return status, rows, seconds, error
+
+    def _task_callable(self, task: ETLTask) -> Callable[[], Optional[int]]:
+        phase, _, name = task.step.partition(":")
+        if phase == "raw":
+            source = next(src for src in RAW_SOURCES if src.name == name)
+            return lambda: self.pipeline.extract_range(source, task.start, task.end)[0]
+        if phase == "dim":
+            return self.pipeline.update_dim_tables
+        if phase == "fact":
+            return lambda: self.pipeline.build_fact_slice(name, {"start": task.start, "end": task.end})
+        raise ValueError(f"Unknown ETL step: {task.step}")
+
+    # ==================== Run Log ====================
+
+    def _log_start(self, run_id: str, task: ETLTask, status: str = "running") -> int:
+        with self.engine.begin() as conn:
+            return conn.execute(text("""
+                INSERT INTO etl_run_log (run_id, step, partition_key, attempt, status, params)
+                VALUES (:run_id, :step, :partition_key, :attempt, :status, CAST(:params AS JSONB))
+                RETURNING id
+            """), {
+                "run_id": run_id,
+                "step": task.step,
+                "partition_key": task.partition_key,
+                "attempt": task.attempt,
+                "status": status,
+                "params": json.dumps(task.params),
+            }).scalar_one()
+
+    def _log_finish(self, log_id: int, status: str, rows: Optional[int], seconds: float, error: Optional[str]):
+        with self.engine.begin() as conn:
+            conn.execute(text("""
+                UPDATE etl_run_log SET
+                    status = :status,
+                    row_count = :rows,
+                    finished_at = NOW(),
+                    duration_ms = :duration_ms,
+                    error = :error
+                WHERE id = :id
+            """), {
+                "id": log_id,
+                "status": status,
+                "rows": rows,
+                "duration_ms": int(seconds * 1000),
+                "error": error,
+            })
+
+    def get_run_summary(self, run_id: str) -> List[dict]:
+        """Per-step totals of the latest attempt of each partition"""
+        with self.engine.connect() as conn:
+            rows = conn.execute(text("""
+                WITH latest AS (
+                    SELECT DISTINCT ON (step, partition_key) *
+                    FROM etl_run_log
+                    WHERE run_id = :run_id
+                    ORDER BY step, partition_key, attempt DESC
+                )
+                SELECT
+                    step,
+                    COUNT(*) AS partitions,
+                    COUNT(*) FILTER (WHERE status = 'succeeded') AS succeeded,
+                    COUNT(*) FILTER (WHERE status = 'failed') AS failed,
+                    COUNT(*) FILTER (WHERE status = 'skipped') AS skipped,
+                    COALESCE(SUM(row_count), 0) AS row_count,
+                    COALESCE(SUM(duration_ms), 0) AS duration_ms
+                FROM latest
+                GROUP BY step
+                ORDER BY step
+            """), {"run_id": run_id}).mappings().all()
+        return [dict(row) for row in rows]
+
+    def print_summary(self, run_id: str):
+        print("\n" + "=" * 60)
+        print(f"ETL run {run_id}")
+        print("=" * 60)
+        for row in self.get_run_summary(run_id):
+            print(
+                f"  {row['step']:<32} {row['succeeded']}/{row['partitions']} ok"
+                f"  {row['row_count']:>10} rows  {row['duration_ms'] / 1000:>7.1f}s"
+                + (f"  ({row['failed']} failed)" if row["failed"] else "")
+                + (f"  ({row['skipped']} skipped)" if row["skipped"] else "")
+            )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Partition-parallel ETL runner')
+    parser.add_argument('--from', dest='date_from', type=str, help='Start date (YYYY-MM-DD)')
+    parser.add_argument('--to', dest='date_to', type=str, help='End date, inclusive (YYYY-MM-DD)')
+    parser.add_argument('--jobs', type=int, default=4, help='Concurrent partitions (connections)')
+    parser.add_argument('--steps', type=str, default=','.join(STEPS),
+                        help='Comma separated steps to run (raw,dim,fact)')
+    parser.add_argument('--retry', type=str, metavar='RUN_ID', help='Retry unfinished tasks of a run')
+
+    args = parser.parse_args()
+
+    runner = ETLRunner(jobs=args.jobs)
+    try:
+        if args.retry:
+            runner.retry(args.retry)
+        else:
+            if not (args.date_from and args.date_to):
+                parser.error('--from and --to are required unless --retry is given')
+            steps = [s.strip() for s in args.steps.split(',') if s.strip()]
+            unknown = set(steps) - set(STEPS)
+            if unknown:
+                parser.error(f"unknown steps: {', '.join(sorted(unknown))}")
+            runner.run(
+                datetime.strptime(args.date_from, '%Y-%m-%d').date(),
+                datetime.strptime(args.date_to, '%Y-%m-%d').date(),
+                steps,
+            )
+    finally:
+        runner.pipeline.close()
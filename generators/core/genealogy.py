@@ -0,0 +1,59 @@
+"""
+Lot genealogy edges (mes_lot_genealogy)
+
+An edge links an input lot (material reel, semi-finished lot) to the lot it
+was consumed into, so forward/backward traceability is an indexed graph walk
+instead of a scan over JSON material lists.
+"""
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional, Set, Tuple
+
+
+def genealogy_edge(
+    tenant_id: str,
+    parent_lot_no: str,
+    child_lot_no: str,
+    linked_at: datetime,
+    source: str,
+    relation_type: str = 'consume',
+    parent_item_code: Optional[str] = None,
+    child_item_code: Optional[str] = None,
+    production_order_no: Optional[str] = None,
+    line_code: Optional[str] = None,
+    qty: Optional[float] = None,
+) -> Dict[str, Any]:
+    """One parent → child lot edge record"""
+    return {
+        'id': str(uuid.uuid4()),
+        'tenant_id': tenant_id,
+        'parent_lot_no': parent_lot_no,
+        'child_lot_no': child_lot_no,
+        'relation_type': relation_type,
+        'parent_item_code': parent_item_code,
+        'child_item_code': child_item_code,
+        'production_order_no': production_order_no,
+        'line_code': line_code,
+        'qty': qty,
+        'linked_at': linked_at,
+        'source': source,
+        'created_at': datetime.now()
+    }
+
+
+class GenealogyLog(list):
+    """Edge records of one generator; a parent → child link is recorded once"""
+
+    def __init__(self):
+        super().__init__()
+        self._links: Set[Tuple[str, str]] = set()
+
+    def link(self, tenant_id: str, parent_lot_no: str, child_lot_no: str, linked_at: datetime,
+             source: str, **attrs: Any) -> bool:
+        """Append the edge unless the link already exists; returns True if added"""
+        key = (parent_lot_no, child_lot_no)
+        if not parent_lot_no or not child_lot_no or key in self._links:
+            return False
+        self._links.add(key)
+        self.append(genealogy_edge(tenant_id, parent_lot_no, child_lot_no, linked_at, source, **attrs))
+        return True
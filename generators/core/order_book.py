@@ -0,0 +1,119 @@
+"""
+Open-order book shared by the order-driven generators
+
+Orders are partitioned by status and queued by due date (requested /
+delivery / plan start date), so daily processing pops only the orders that
+became due instead of filtering every order generated so far.
+
+- pending heap: (due date, seq, id) of open orders not yet due
+- ready heap:   (seq, id) of open orders already due, in creation order
+- closed orders are dropped lazily when they reach the top of a heap
+"""
+import heapq
+from collections import defaultdict
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+class OrderBook:
+    """Status-partitioned order index with a due-date queue for open statuses"""
+
+    def __init__(self, open_statuses: Iterable[str], due_key: str,
+                 id_key: str = 'id', status_key: str = 'status'):
+        self.open_statuses = frozenset(open_statuses)
+        self.due_key = due_key
+        self.id_key = id_key
+        self.status_key = status_key
+
+        self._orders: Dict[str, Dict[str, Any]] = {}
+        self._seq: Dict[str, int] = {}
+        self._by_status: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+        self._pending: List[Tuple[date, int, str]] = []
+        self._ready: List[Tuple[int, str]] = []
+        self._queued: Set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def __contains__(self, order_id: str) -> bool:
+        return order_id in self._orders
+
+    def _is_open(self, order_id: str) -> bool:
+        return self._orders[order_id][self.status_key] in self.open_statuses
+
+    def _enqueue(self, order: Dict[str, Any]):
+        order_id = order[self.id_key]
+        if order_id not in self._queued:
+            self._queued.add(order_id)
+            heapq.heappush(self._pending, (order[self.due_key], self._seq[order_id], order_id))
+
+    def add(self, order: Dict[str, Any]):
+        """Register a newly created order"""
+        order_id = order[self.id_key]
+        self._orders[order_id] = order
+        self._seq[order_id] = len(self._seq)
+        self._by_status[order[self.status_key]][order_id] = order
+        if order[self.status_key] in self.open_statuses:
+            self._enqueue(order)
+
+    def get(self, order_id: str) -> Optional[Dict[str, Any]]:
+        return self._orders.get(order_id)
+
+    def set_status(self, order: Dict[str, Any], status: str):
+        """Status transition; keeps the partitions and the due queue in sync"""
+        order_id = order[self.id_key]
+        self._by_status[order[self.status_key]].pop(order_id, None)
+        order[self.status_key] = status
+        self._by_status[status][order_id] = order
+        if status in self.open_statuses:
+            self._enqueue(order)
+
+    def with_status(self, *statuses: str) -> List[Dict[str, Any]]:
+        """Orders currently in the given statuses (creation order within a status)"""
+        return [order for status in statuses for order in self._by_status[status].values()]
+
+    def count(self, status: str) -> int:
+        return len(self._by_status[status])
+
+    def due(self, as_of: date, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Open orders due on or before as_of, oldest first (creation order),
+        i.e. the first `limit` entries of the equivalent full-list filter.
+        Returned orders stay queued until they move to a non-open status.
+        """
+        pending, ready = self._pending, self._ready
+        while pending and pending[0][0] <= as_of:
+            _, seq, order_id = heapq.heappop(pending)
+            if self._is_open(order_id):
+                heapq.heappush(ready, (seq, order_id))
+            else:
+                self._queued.discard(order_id)
+
+        taken: List[Tuple[int, str]] = []
+        while ready and (limit is None or len(taken) < limit):
+            entry = heapq.heappop(ready)
+            if self._is_open(entry[1]):
+                taken.append(entry)
+            else:
+                self._queued.discard(entry[1])
+        for entry in taken:
+            heapq.heappush(ready, entry)
+        return [self._orders[order_id] for _, order_id in taken]
+
+
+class LineIndex(dict):
+    """Child records grouped by a parent key (order lines by order id, ...)"""
+
+    def __init__(self, parent_key: str):
+        super().__init__()
+        self.parent_key = parent_key
+
+    def add(self, record: Dict[str, Any]):
+        self.setdefault(record[self.parent_key], []).append(record)
+
+    def extend(self, records: Iterable[Dict[str, Any]]):
+        for record in records:
+            self.add(record)
+
+    def lines(self, parent_id: str) -> List[Dict[str, Any]]:
+        return self.get(parent_id, [])
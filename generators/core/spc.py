@@ -0,0 +1,499 @@
+"""
+Streaming SPC (Statistical Process Control)
+Running statistics, X̄-R / X̄-S subgroup charts and Nelson rules, updated one point at a time
+
+Every structure is O(1) per measurement and serializable (to_dict/from_dict),
+so a chart can be kept in memory by the data generator or persisted between
+requests by the API. push_many() evaluates a whole batch with NumPy and
+leaves the same state as pushing the points one by one.
+"""
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+import math
+
+import numpy as np
+
+
+# Nelson rules (1, 5, 6, 2 correspond to Western Electric rules 1-4)
+NELSON_RULES = {
+    1: 'RULE_1_BEYOND_3SIGMA',        # 1 point beyond 3σ
+    2: 'RULE_2_SAME_SIDE',            # 9 points in a row on the same side of the center line
+    3: 'RULE_3_TREND',                # 6 points in a row steadily increasing or decreasing
+    4: 'RULE_4_ALTERNATING',          # 14 points in a row alternating up and down
+    5: 'RULE_5_2OF3_BEYOND_2SIGMA',   # 2 of 3 points beyond 2σ on the same side
+    6: 'RULE_6_4OF5_BEYOND_1SIGMA',   # 4 of 5 points beyond 1σ on the same side
+    7: 'RULE_7_STRATIFICATION',       # 15 points in a row within 1σ
+    8: 'RULE_8_MIXTURE',              # 8 points in a row beyond 1σ, on both sides
+}
+
+# Below this many points push_many() loops over push(); NumPy wins only on longer batches
+VECTORIZE_MIN_BATCH = 32
+
+# d2 (X̄-R), n = 2..10
+_D2 = {2: 1.128, 3: 1.693, 4: 2.059, 5: 2.326, 6: 2.534, 7: 2.704, 8: 2.847, 9: 2.970, 10: 3.078}
+# D3/D4 (R chart), n = 2..10
+_D3 = {2: 0.0, 3: 0.0, 4: 0.0, 5: 0.0, 6: 0.0, 7: 0.076, 8: 0.136, 9: 0.184, 10: 0.223}
+_D4 = {2: 3.267, 3: 2.574, 4: 2.282, 5: 2.114, 6: 2.004, 7: 1.924, 8: 1.864, 9: 1.816, 10: 1.777}
+
+
+def c4(n: int) -> float:
+    """Bias correction constant for the sample standard deviation"""
+    return math.sqrt(2.0 / (n - 1)) * math.exp(math.lgamma(n / 2.0) - math.lgamma((n - 1) / 2.0))
+
+
+@dataclass
+class RunningStats:
+    """Welford running mean / variance"""
+    n: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    min: Optional[float] = None
+    max: Optional[float] = None
+
+    def push(self, x: float) -> None:
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+        self.min = x if self.min is None else min(self.min, x)
+        self.max = x if self.max is None else max(self.max, x)
+
+    def push_many(self, values: np.ndarray) -> None:
+        """Merge a batch (Chan et al. parallel update)"""
+        if len(values) == 0:
+            return
+        n_b = len(values)
+        mean_b = float(values.mean())
+        m2_b = float(((values - mean_b) ** 2).sum())
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        self.m2 += m2_b + delta * delta * self.n * n_b / n
+        self.mean += delta * n_b / n
+        self.n = n
+        lo, hi = float(values.min()), float(values.max())
+        self.min = lo if self.min is None else min(self.min, lo)
+        self.max = hi if self.max is None else max(self.max, hi)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance"""
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+
+@dataclass
+class SubgroupStats:
+    """Rational subgroups of fixed size for X̄-R / X̄-S charts"""
+    size: int = 5
+    current: List[float] = field(default_factory=list)
+    count: int = 0          # completed subgroups
+    sum_xbar: float = 0.0
+    sum_range: float = 0.0
+    sum_std: float = 0.0
+
+    def push(self, x: float) -> bool:
+        """Add a point; True when it completed a subgroup"""
+        self.current.append(x)
+        if len(self.current) < self.size:
+            return False
+
+        values, self.current = self.current, []
+        xbar = sum(values) / len(values)
+        self.count += 1
+        self.sum_xbar += xbar
+        self.sum_range += max(values) - min(values)
+        self.sum_std += math.sqrt(sum((v - xbar) ** 2 for v in values) / (len(values) - 1))
+        return True
+
+    def push_many(self, values: np.ndarray) -> int:
+        """Add a batch; returns the number of subgroups it completed"""
+        data = np.concatenate([np.asarray(self.current, dtype=float), values])
+        count = len(data) // self.size
+        if count:
+            groups = data[:count * self.size].reshape(count, self.size)
+            xbar = groups.mean(axis=1)
+            self.count += count
+            self.sum_xbar += float(xbar.sum())
+            self.sum_range += float(np.ptp(groups, axis=1).sum())
+            self.sum_std += float(groups.std(axis=1, ddof=1).sum())
+        self.current = data[count * self.size:].tolist()
+        return count
+
+    @property
+    def grand_mean(self) -> Optional[float]:
+        return self.sum_xbar / self.count if self.count else None
+
+    @property
+    def r_bar(self) -> Optional[float]:
+        return self.sum_range / self.count if self.count else None
+
+    @property
+    def s_bar(self) -> Optional[float]:
+        return self.sum_std / self.count if self.count else None
+
+    def sigma_within(self) -> Optional[float]:
+        """Within-subgroup σ estimate (R̄/d2, or S̄/c4 for subgroups larger than 10)"""
+        if not self.count or self.size < 2:
+            return None
+        if self.size in _D2:
+            return self.r_bar / _D2[self.size]
+        return self.s_bar / c4(self.size)
+
+    def limits(self) -> Dict[str, Optional[Dict[str, float]]]:
+        """X̄-R and X̄-S control limits from the completed subgroups"""
+        if not self.count or self.size < 2:
+            return {'xbar_r': None, 'xbar_s': None}
+        n = self.size
+        x2 = self.grand_mean
+
+        xbar_r = None
+        if n in _D2:
+            a2 = 3 / (_D2[n] * math.sqrt(n))
+            xbar_r = {
+                'center': x2, 'ucl': x2 + a2 * self.r_bar, 'lcl': x2 - a2 * self.r_bar,
+                'r_bar': self.r_bar, 'r_ucl': _D4[n] * self.r_bar, 'r_lcl': _D3[n] * self.r_bar,
+            }
+
+        c = c4(n)
+        a3 = 3 / (c * math.sqrt(n))
+        b = 3 * math.sqrt(1 - c * c) / c
+        xbar_s = {
+            'center': x2, 'ucl': x2 + a3 * self.s_bar, 'lcl': x2 - a3 * self.s_bar,
+            's_bar': self.s_bar, 's_ucl': (1 + b) * self.s_bar, 's_lcl': max(0.0, 1 - b) * self.s_bar,
+        }
+        return {'xbar_r': xbar_r, 'xbar_s': xbar_s}
+
+
+def _runs(cont: np.ndarray, inc: np.ndarray, base: np.ndarray, carry: float) -> np.ndarray:
+    """
+    Vectorized run counter: run[i] = run[i-1] + inc[i] if cont[i] else base[i]
+
+    run[-1] is the carried value from the previous batch.
+    """
+    idx = np.arange(len(cont))
+    total = np.cumsum(inc)
+    last_reset = np.maximum.accumulate(np.where(cont, -1, idx))
+    reset = np.maximum(last_reset, 0)
+    return np.where(last_reset >= 0, base[reset] + total - total[reset], carry + total)
+
+
+def _window_sum(mask: np.ndarray, window: int) -> np.ndarray:
+    """Sum of mask over the trailing window ending at each position"""
+    total = np.concatenate([[0], np.cumsum(mask)])
+    start = np.maximum(np.arange(1, len(mask) + 1) - window, 0)
+    return total[1:] - total[start]
+
+
+class NelsonRules:
+    """
+    All eight Nelson rules, evaluated incrementally
+
+    Long rules (2, 3, 4, 7, 8) keep run-length counters; rules 5 and 6 look at a
+    ring buffer of the last five zone scores, so each point costs O(1).
+    """
+
+    WINDOW = 5
+
+    def __init__(self):
+        self.zones: Deque[float] = deque(maxlen=self.WINDOW)  # (x - center) / sigma
+        self.last: Optional[float] = None
+        self.last_diff: int = 0        # sign of the previous step
+        self.side_run: int = 0         # signed: +k above / -k below center
+        self.trend_run: int = 1        # points in the current monotone run
+        self.alt_run: int = 1          # points in the current alternating run
+        self.within_run: int = 0       # points in a row within 1σ
+        self.outside_run: int = 0      # points in a row beyond 1σ
+        self.outside_above: int = 0
+        self.outside_below: int = 0
+
+    def push(self, x: float, center: float, sigma: float) -> List[int]:
+        """Add a point; returns the numbers of the rules it violates"""
+        violated = []
+        if sigma <= 0:
+            self.last = x
+            return violated
+
+        z = (x - center) / sigma
+        self.zones.append(z)
+
+        # Rule 1
+        if abs(z) > 3:
+            violated.append(1)
+
+        # Rule 2: same side of the center line
+        side = (z > 0) - (z < 0)
+        if side == 0:
+            self.side_run = 0
+        elif side * self.side_run > 0:
+            self.side_run += side
+        else:
+            self.side_run = side
+        if abs(self.side_run) >= 9:
+            violated.append(2)
+
+        # Rules 3 and 4: direction of consecutive steps
+        diff = 0 if self.last is None else (x > self.last) - (x < self.last)
+        if diff == 0:
+            self.trend_run = 1
+            self.alt_run = 1
+        else:
+            self.trend_run = self.trend_run + 1 if diff == self.last_diff else 2
+            self.alt_run = self.alt_run + 1 if diff == -self.last_diff else 2
+        self.last_diff = diff
+        self.last = x
+        if self.trend_run >= 6:
+            violated.append(3)
+        if self.alt_run >= 14:
+            violated.append(4)
+
+        # Rules 5 and 6: k of the last m points beyond a zone on the same side
+        if len(self.zones) >= 3:
+            recent = list(self.zones)[-3:]
+            if sum(v > 2 for v in recent) >= 2 or sum(v < -2 for v in recent) >= 2:
+                violated.append(5)
+        if len(self.zones) >= 5:
+            if sum(v > 1 for v in self.zones) >= 4 or sum(v < -1 for v in self.zones) >= 4:
+                violated.append(6)
+
+        # Rules 7 and 8: runs inside / outside 1σ
+        if abs(z) < 1:
+            self.within_run += 1
+            self.outside_run = self.outside_above = self.outside_below = 0
+        else:
+            self.within_run = 0
+            self.outside_run += 1
+            if z > 0:
+                self.outside_above += 1
+            else:
+                self.outside_below += 1
+        if self.within_run >= 15:
+            violated.append(7)
+        if self.outside_run >= 8 and self.outside_above and self.outside_below:
+            violated.append(8)
+
+        return violated
+
+    def push_many(self, values: np.ndarray, center: float, sigma: float) -> np.ndarray:
+        """
+        Add a batch; returns an (n, 8) boolean matrix of violated rules
+
+        Run-length rules use the carried counters plus cumulative sums, the
+        windowed rules a sliding sum over the carried ring buffer + batch.
+        """
+        n = len(values)
+        flags = np.zeros((n, 8), dtype=bool)
+        if n == 0:
+            return flags
+        if sigma <= 0:
+            self.last = float(values[-1])
+            return flags
+
+        z = (values - center) / sigma
+
+        # Rule 1
+        flags[:, 0] = np.abs(z) > 3
+
+        # Rule 2
+        side = np.sign(z).astype(np.int64)
+        prev_side = np.concatenate([[np.sign(self.side_run)], side[:-1]])
+        same = (side != 0) & (side == prev_side)
+        side_run = _runs(same, np.ones(n), (side != 0).astype(float), abs(self.side_run))
+        flags[:, 1] = side_run >= 9
+
+        # Rules 3 and 4
+        previous = np.concatenate([[values[0] if self.last is None else self.last], values[:-1]])
+        diff = np.sign(values - previous).astype(np.int64)
+        prev_diff = np.concatenate([[self.last_diff], diff[:-1]])
+        base = np.where(diff != 0, 2.0, 1.0)
+        trend_run = _runs((diff != 0) & (diff == prev_diff), np.ones(n), base, self.trend_run)
+        alt_run = _runs((diff != 0) & (diff == -prev_diff), np.ones(n), base, self.alt_run)
+        flags[:, 2] = trend_run >= 6
+        flags[:, 3] = alt_run >= 14
+
+        # Rules 5 and 6 over the ring buffer + batch
+        history = np.asarray(self.zones, dtype=float)
+        full = np.concatenate([history, z])
+        offset = len(history)
+        for rule, window, zone, k in ((4, 3, 2, 2), (5, 5, 1, 4)):
+            above = _window_sum(full > zone, window)[offset:]
+            below = _window_sum(full < -zone, window)[offset:]
+            enough = np.arange(offset + 1, offset + n + 1) >= window
+            flags[:, rule] = enough & ((above >= k) | (below >= k))
+
+        # Rules 7 and 8
+        within = np.abs(z) < 1
+        outside = ~within
+        zeros = np.zeros(n)
+        within_run = _runs(within, within.astype(float), zeros, self.within_run)
+        outside_run = _runs(outside, outside.astype(float), zeros, self.outside_run)
+        outside_above = _runs(outside, (outside & (z > 0)).astype(float), zeros, self.outside_above)
+        outside_below = _runs(outside, (outside & (z < 0)).astype(float), zeros, self.outside_below)
+        flags[:, 6] = within_run >= 15
+        flags[:, 7] = (outside_run >= 8) & (outside_above > 0) & (outside_below > 0)
+
+        # 배치 마지막 시점의 상태로 갱신
+        self.zones.extend(z[-self.WINDOW:].tolist())
+        self.side_run = int(side_run[-1]) * int(side[-1])
+        self.trend_run = int(trend_run[-1])
+        self.alt_run = int(alt_run[-1])
+        self.last_diff = int(diff[-1])
+        self.last = float(values[-1])
+        self.within_run = int(within_run[-1])
+        self.outside_run = int(outside_run[-1])
+        self.outside_above = int(outside_above[-1])
+        self.outside_below = int(outside_below[-1])
+        return flags
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'zones': list(self.zones), 'last': self.last, 'last_diff': self.last_diff,
+            'side_run': self.side_run, 'trend_run': self.trend_run, 'alt_run': self.alt_run,
+            'within_run': self.within_run, 'outside_run': self.outside_run,
+            'outside_above': self.outside_above, 'outside_below': self.outside_below,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'NelsonRules':
+        rules = cls()
+        rules.zones.extend(data.get('zones', []))
+        for key in ('last', 'last_diff', 'side_run', 'trend_run', 'alt_run',
+                    'within_run', 'outside_run', 'outside_above', 'outside_below'):
+            if key in data:
+                setattr(rules, key, data[key])
+        return rules
+
+
+class SPCChart:
+    """
+    Control chart for one (line, product, parameter)
+
+    Limits follow the usual phase I / phase II split: while fewer than
+    `baseline_subgroups` subgroups exist the center line and σ are re-estimated
+    on every point; after that they are frozen and new points are judged
+    against them. A known center/σ (e.g. from the spec) can be passed instead.
+    """
+
+    def __init__(
+        self,
+        subgroup_size: int = 5,
+        baseline_subgroups: int = 25,
+        usl: Optional[float] = None,
+        lsl: Optional[float] = None,
+        target: Optional[float] = None,
+        center: Optional[float] = None,
+        sigma: Optional[float] = None,
+    ):
+        self.stats = RunningStats()
+        self.subgroups = SubgroupStats(size=subgroup_size)
+        self.rules = NelsonRules()
+        self.baseline_subgroups = baseline_subgroups
+        self.usl = usl
+        self.lsl = lsl
+        self.target = target
+        self.center = center
+        self.sigma = sigma
+        self.frozen = center is not None and sigma is not None
+        self.violations: Dict[int, int] = {}   # rule -> count
+
+    def _estimate(self):
+        """Current center line and σ (phase I)"""
+        sigma = self.subgroups.sigma_within()
+        if sigma:
+            return self.subgroups.grand_mean, sigma
+        if self.stats.n >= 2:
+            return self.stats.mean, self.stats.std
+        return None, None
+
+    def push(self, x: float) -> List[int]:
+        """Add a measurement; returns the violated Nelson rule numbers"""
+        self.stats.push(x)
+        completed = self.subgroups.push(x)
+
+        if not self.frozen:
+            self.center, self.sigma = self._estimate()
+            if completed and self.subgroups.count >= self.baseline_subgroups:
+                self.frozen = True
+
+        if self.center is None or not self.sigma:
+            self.rules.last = x
+            return []
+        violated = self.rules.push(x, self.center, self.sigma)
+        for rule in violated:
+            self.violations[rule] = self.violations.get(rule, 0) + 1
+        return violated
+
+    def push_many(self, values: np.ndarray) -> np.ndarray:
+        """
+        Add a batch; returns an (n, 8) boolean matrix of violated rules
+
+        Vectorized once the limits are fixed (known or frozen); during phase I
+        the limits move with every point, so the batch is pushed point by point.
+        Short batches are pushed point by point as well, where NumPy's per-call
+        overhead outweighs the loop.
+        """
+        values = np.asarray(values, dtype=float)
+        if not self.frozen or len(values) < VECTORIZE_MIN_BATCH:
+            flags = np.zeros((len(values), 8), dtype=bool)
+            for i, x in enumerate(values.tolist()):
+                for rule in self.push(x):
+                    flags[i, rule - 1] = True
+            return flags
+
+        self.stats.push_many(values)
+        self.subgroups.push_many(values)
+        flags = self.rules.push_many(values, self.center, self.sigma)
+        for rule, count in zip(range(1, 9), flags.sum(axis=0).tolist()):
+            if count:
+                self.violations[rule] = self.violations.get(rule, 0) + count
+        return flags
+
+    @property
+    def ucl(self) -> Optional[float]:
+        return self.center + 3 * self.sigma if self.center is not None and self.sigma else None
+
+    @property
+    def lcl(self) -> Optional[float]:
+        return self.center - 3 * self.sigma if self.center is not None and self.sigma else None
+
+    def capability(self) -> Dict[str, Optional[float]]:
+        """Cp/Cpk from within-subgroup σ, Pp/Ppk from overall σ"""
+        result = {'cp': None, 'cpk': None, 'pp': None, 'ppk': None}
+        if self.usl is None or self.lsl is None or self.stats.n < 2:
+            return result
+        mean = self.stats.mean
+        for prefix, sigma in (('c', self.subgroups.sigma_within()), ('p', self.stats.std)):
+            if sigma:
+                result[f'{prefix}p'] = (self.usl - self.lsl) / (6 * sigma)
+                result[f'{prefix}pk'] = min(self.usl - mean, mean - self.lsl) / (3 * sigma)
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'stats': vars(self.stats).copy(),
+            'subgroups': {**vars(self.subgroups), 'current': list(self.subgroups.current)},
+            'rules': self.rules.to_dict(),
+            'baseline_subgroups': self.baseline_subgroups,
+            'usl': self.usl, 'lsl': self.lsl, 'target': self.target,
+            'center': self.center, 'sigma': self.sigma, 'frozen': self.frozen,
+            'violations': {str(k): v for k, v in self.violations.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SPCChart':
+        chart = cls(
+            subgroup_size=data['subgroups']['size'],
+            baseline_subgroups=data.get('baseline_subgroups', 25),
+            usl=data.get('usl'), lsl=data.get('lsl'), target=data.get('target'),
+        )
+        chart.stats = RunningStats(**data['stats'])
+        chart.subgroups = SubgroupStats(**data['subgroups'])
+        chart.rules = NelsonRules.from_dict(data.get('rules', {}))
+        chart.center = data.get('center')
+        chart.sigma = data.get('sigma')
+        chart.frozen = data.get('frozen', False)
+        chart.violations = {int(k): v for k, v in data.get('violations', {}).items()}
+        return chart
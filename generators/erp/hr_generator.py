@@ -13,6 +13,7 @@ import numpy as np
 
 from generators.core.time_manager import TimeManager, TimeSlot, ShiftType
 from generators.core.scenario_manager import ScenarioManager
+from generators.core.columnar import ColumnarTable, MonotonicIdGenerator
 
 
 class AttendanceStatus(Enum):
@@ -33,6 +34,42 @@ class EmployeeType(Enum):
     OFFICE = "office"
 
 
+# Sampling order of attendance statuses (index = status code)
+ATTENDANCE_STATUSES = (
+    AttendanceStatus.PRESENT,
+    AttendanceStatus.LATE,
+    AttendanceStatus.ABSENT,
+    AttendanceStatus.SICK,
+    AttendanceStatus.VACATION,
+    AttendanceStatus.EARLY_LEAVE,
+)
+STATUS_CODES = {status: code for code, status in enumerate(ATTENDANCE_STATUSES)}
+
+# Employee roster columns; row = position in self.employees / monthly totals
+ROSTER_DTYPE = np.dtype([
+    ('row', np.int32),
+    ('employee_id', object),
+    ('name', object),
+    ('department', object),
+    ('position', object),
+    ('shift', object),
+    ('line_code', object),
+    ('base_salary', np.int64),
+    ('hourly_rate', np.int64),
+    ('overtime_rate', np.float64),
+])
+
+# Running per-employee totals of one pay period (YYYY-MM)
+MONTHLY_TOTALS_DTYPE = np.dtype([
+    ('work_days', np.int32),
+    ('absent_days', np.int32),
+    ('late_count', np.int32),
+    ('work_hours', np.float64),
+    ('overtime_hours', np.float64),
+    ('overtime_pay', np.float64),
+])
+
+
 class HRDataGenerator:
     """
     ERP HR/Payroll Data Generator
@@ -70,11 +107,19 @@ class HRDataGenerator:
 
         # Generate employee roster
         self.employees = self._generate_employees()
+        self.roster = self._build_roster(self.employees)
+        self.shift_rosters = {
+            shift.value: self.roster[self.roster['shift'] == shift.value] for shift in ShiftType
+        }
+        self._employee_rows = {emp['employee_id']: i for i, emp in enumerate(self.employees)}
+
+        # Pay period → per-employee running totals (payroll reads these, not attendance rows)
+        self._monthly_totals: Dict[str, np.ndarray] = {}
 
         # Generated data
         self.data = {
             'employees': self.employees,
-            'attendance_records': [],
+            'attendance_records': ColumnarTable(),
             'payroll_records': [],
             'overtime_records': [],
             'skill_records': [],
@@ -83,6 +128,7 @@ class HRDataGenerator:
         }
 
         self.sequence_counter = 10000
+        self.id_generator = MonotonicIdGenerator()
 
     def _get_next_sequence(self) -> str:
         self.sequence_counter += 1
@@ -122,73 +168,105 @@ class HRDataGenerator:
 
         return employees
 
+    def _build_roster(self, employees: List[Dict[str, Any]]) -> np.ndarray:
+        """Employee master → structured array (one row per employee)"""
+        roster = np.zeros(len(employees), dtype=ROSTER_DTYPE)
+        roster['row'] = np.arange(len(employees))
+        for field in ROSTER_DTYPE.names[1:]:
+            roster[field] = [emp[field] for emp in employees]
+        return roster
+
+    def _period_totals(self, day: date) -> np.ndarray:
+        """Running totals of the pay period containing day"""
+        year_month = day.strftime('%Y-%m')
+        totals = self._monthly_totals.get(year_month)
+        if totals is None:
+            totals = np.zeros(len(self.roster), dtype=MONTHLY_TOTALS_DTYPE)
+            self._monthly_totals[year_month] = totals
+        return totals
+
     def generate_daily_attendance(
         self,
         time_slot: TimeSlot,
         context: Dict[str, Any] = None
-    ) -> List[Dict[str, Any]]:
-        """Generate daily attendance records"""
+    ) -> int:
+        """
+        Generate daily attendance records for the shift of time_slot
+
+        Statuses and check-in/out times are sampled for the whole shift roster
+        at once and added to the pay-period totals. Returns the number of rows
+        emitted.
+        """
         context = context or {}
         scenario_data = self._apply_hr_scenarios(time_slot, context)
 
-        records = []
-        shift_employees = [e for e in self.employees if e['shift'] == time_slot.shift.value]
-
-        for emp in shift_employees:
-            # Determine attendance status
-            status = self._determine_attendance_status(time_slot, emp, scenario_data)
-
-            # Calculate times
-            shift_start = self._get_shift_start(time_slot.shift)
-            scheduled_start = datetime.combine(time_slot.date, shift_start)
-
-            if status == AttendanceStatus.PRESENT:
-                # Slight variation in check-in time
-                check_in_variance = random.randint(-10, 30)
-                check_in = scheduled_start + timedelta(minutes=check_in_variance)
-                check_out = check_in + timedelta(hours=8, minutes=random.randint(-15, 60))
-                work_hours = 8.0
-            elif status == AttendanceStatus.LATE:
-                check_in = scheduled_start + timedelta(minutes=random.randint(10, 60))
-                check_out = check_in + timedelta(hours=8)
-                work_hours = 8.0
-            elif status == AttendanceStatus.EARLY_LEAVE:
-                check_in = scheduled_start + timedelta(minutes=random.randint(-10, 10))
-                check_out = check_in + timedelta(hours=random.uniform(4, 7))
-                work_hours = (check_out - check_in).seconds / 3600
-            else:
-                check_in = None
-                check_out = None
-                work_hours = 0
-
-            record = {
-                'id': str(uuid.uuid4()),
-                'tenant_id': self.tenant_id,
-                'attendance_date': time_slot.date,
-                'employee_id': emp['employee_id'],
-                'employee_name': emp['name'],
-                'department': emp['department'],
-                'shift': time_slot.shift.value,
-                'scheduled_start': scheduled_start,
-                'scheduled_end': scheduled_start + timedelta(hours=8),
-                'check_in': check_in,
-                'check_out': check_out,
-                'status': status.value,
-                'work_hours': round(work_hours, 2),
-                'late_minutes': max(0, (check_in - scheduled_start).seconds // 60) if check_in else 0,
-                'early_leave_minutes': 0,
-                'line_code': emp.get('line_code'),
-                'active_scenarios': scenario_data.get('active_scenarios', []),
-                'created_at': datetime.now()
-            }
+        roster = self.shift_rosters.get(time_slot.shift.value)
+        if roster is None or not len(roster):
+            return 0
+        size = len(roster)
 
-            records.append(record)
+        # Determine attendance status
+        codes = np.random.choice(
+            len(ATTENDANCE_STATUSES), size=size, p=self._attendance_probabilities(scenario_data)
+        )
+        present = codes == STATUS_CODES[AttendanceStatus.PRESENT]
+        late = codes == STATUS_CODES[AttendanceStatus.LATE]
+        early_leave = codes == STATUS_CODES[AttendanceStatus.EARLY_LEAVE]
+        absent = (codes == STATUS_CODES[AttendanceStatus.ABSENT]) | (codes == STATUS_CODES[AttendanceStatus.SICK])
+        attending = present | late | early_leave
+
+        # Check-in offset from shift start and time on site (minutes)
+        check_in_offset = np.zeros(size, dtype=np.int64)
+        duration = np.zeros(size)
+        check_in_offset[present] = np.random.randint(-10, 31, int(present.sum()))
+        duration[present] = 480 + np.random.randint(-15, 61, int(present.sum()))
+        check_in_offset[late] = np.random.randint(10, 61, int(late.sum()))
+        duration[late] = 480
+        check_in_offset[early_leave] = np.random.randint(-10, 11, int(early_leave.sum()))
+        duration[early_leave] = np.random.uniform(4, 7, int(early_leave.sum())) * 60
+
+        work_hours = np.where(early_leave, duration / 60, np.where(attending, 8.0, 0.0))
+
+        shift_start = self._get_shift_start(time_slot.shift)
+        scheduled_start = datetime.combine(time_slot.date, shift_start)
+        start = np.datetime64(scheduled_start, 's')
+        check_in = start + (check_in_offset * 60).astype('timedelta64[s]')
+        check_out = check_in + np.round(duration * 60).astype(np.int64).astype('timedelta64[s]')
+        not_checked = np.datetime64('NaT', 's')
+
+        status_values = np.array([status.value for status in ATTENDANCE_STATUSES], dtype=object)
+        self.data['attendance_records'].append(size, {
+            'id': self.id_generator.next_batch(size),
+            'tenant_id': self.tenant_id,
+            'attendance_date': time_slot.date,
+            'employee_id': roster['employee_id'],
+            'employee_name': roster['name'],
+            'department': roster['department'],
+            'shift': time_slot.shift.value,
+            'scheduled_start': scheduled_start,
+            'scheduled_end': scheduled_start + timedelta(hours=8),
+            'check_in': np.where(attending, check_in, not_checked),
+            'check_out': np.where(attending, check_out, not_checked),
+            'status': status_values[codes],
+            'work_hours': np.round(work_hours, 2),
+            'late_minutes': np.where(attending, np.maximum(check_in_offset, 0), 0),
+            'early_leave_minutes': 0,
+            'line_code': roster['line_code'],
+            'active_scenarios': [scenario_data.get('active_scenarios', [])] * size,
+            'created_at': datetime.now()
+        })
 
-        self.data['attendance_records'].extend(records)
+        # Accumulate pay-period totals
+        totals = self._period_totals(time_slot.date)
+        rows = roster['row']
+        totals['work_days'][rows] += present
+        totals['absent_days'][rows] += absent
+        totals['late_count'][rows] += late
+        totals['work_hours'][rows] += work_hours
 
         # Check for high absenteeism alert
-        absent_count = sum(1 for r in records if r['status'] in ['absent', 'sick'])
-        absent_rate = absent_count / len(records) if records else 0
+        absent_count = int(absent.sum())
+        absent_rate = absent_count / size
 
         if absent_rate > 0.1:  # More than 10% absent
             self._generate_hr_alert(
@@ -196,7 +274,7 @@ class HRDataGenerator:
                 f"높은 결근율 감지: {absent_rate*100:.1f}% ({absent_count}명)"
             )
 
-        return records
+        return size
 
     def generate_overtime_record(
         self,
@@ -229,73 +307,68 @@ class HRDataGenerator:
         }
 
         self.data['overtime_records'].append(record)
+
+        totals = self._period_totals(time_slot.date)
+        row = self._employee_rows[employee['employee_id']]
+        totals['overtime_hours'][row] += overtime_hours
+        totals['overtime_pay'][row] += record['overtime_amount']
+
         return record
 
     def generate_monthly_payroll(
         self,
         year_month: str
     ) -> List[Dict[str, Any]]:
-        """Generate monthly payroll records"""
-        records = []
+        """Generate monthly payroll records from the pay-period totals"""
         year, month = map(int, year_month.split('-'))
+        totals = self._monthly_totals.get(year_month)
+        if totals is None:
+            totals = np.zeros(len(self.roster), dtype=MONTHLY_TOTALS_DTYPE)
+
+        # Calculate pay
+        base_salary = self.roster['base_salary'].astype(np.float64)
+        attendance_deduction = totals['absent_days'] * (base_salary / 30) * 0.5  # 50% deduction per absent day
+        late_deduction = totals['late_count'] * 10000.0  # 10,000 per late
+
+        gross_pay = base_salary + totals['overtime_pay']
+        deductions = attendance_deduction + late_deduction
+
+        # Standard deductions
+        income_tax = gross_pay * 0.03  # Simplified
+        social_insurance = gross_pay * 0.09  # Simplified
+
+        net_pay = gross_pay - deductions - income_tax - social_insurance
+
+        columns = {
+            'employee_id': self.roster['employee_id'].tolist(),
+            'employee_name': self.roster['name'].tolist(),
+            'department': self.roster['department'].tolist(),
+            'position': self.roster['position'].tolist(),
+            'work_days': totals['work_days'].tolist(),
+            'absent_days': totals['absent_days'].tolist(),
+            'late_count': totals['late_count'].tolist(),
+            'overtime_hours': totals['overtime_hours'].tolist(),
+            'base_salary': self.roster['base_salary'].tolist(),
+            'overtime_pay': np.round(totals['overtime_pay'], 0).tolist(),
+            'gross_pay': np.round(gross_pay, 0).tolist(),
+            'attendance_deduction': np.round(attendance_deduction, 0).tolist(),
+            'late_deduction': np.round(late_deduction, 0).tolist(),
+            'income_tax': np.round(income_tax, 0).tolist(),
+            'social_insurance': np.round(social_insurance, 0).tolist(),
+            'total_deductions': np.round(deductions + income_tax + social_insurance, 0).tolist(),
+            'net_pay': np.round(net_pay, 0).tolist(),
+        }
+        payment_date = date(year, month, 25) if month < 12 else date(year + 1, 1, 25)
 
-        for emp in self.employees:
-            # Get attendance for the month
-            emp_attendance = [a for a in self.data['attendance_records']
-                             if a['employee_id'] == emp['employee_id']
-                             and a['attendance_date'].year == year
-                             and a['attendance_date'].month == month]
-
-            work_days = sum(1 for a in emp_attendance if a['status'] == 'present')
-            absent_days = sum(1 for a in emp_attendance if a['status'] in ['absent', 'sick'])
-            late_count = sum(1 for a in emp_attendance if a['status'] == 'late')
-
-            # Get overtime
-            emp_overtime = [o for o in self.data['overtime_records']
-                           if o['employee_id'] == emp['employee_id']
-                           and o['overtime_date'].year == year
-                           and o['overtime_date'].month == month]
-
-            total_overtime_hours = sum(o['overtime_hours'] for o in emp_overtime)
-            total_overtime_pay = sum(o['overtime_amount'] for o in emp_overtime)
-
-            # Calculate pay
-            base_salary = emp['base_salary']
-            attendance_deduction = absent_days * (base_salary / 30) * 0.5  # 50% deduction per absent day
-            late_deduction = late_count * 10000  # 10,000 per late
-
-            gross_pay = base_salary + total_overtime_pay
-            deductions = attendance_deduction + late_deduction
-
-            # Standard deductions
-            income_tax = gross_pay * 0.03  # Simplified
-            social_insurance = gross_pay * 0.09  # Simplified
-
-            net_pay = gross_pay - deductions - income_tax - social_insurance
-
+        records = []
+        for i in range(len(self.roster)):
             record = {
                 'id': str(uuid.uuid4()),
                 'tenant_id': self.tenant_id,
                 'payroll_no': f"PAY-{year_month}-{self._get_next_sequence()}",
                 'pay_period': year_month,
-                'employee_id': emp['employee_id'],
-                'employee_name': emp['name'],
-                'department': emp['department'],
-                'position': emp['position'],
-                'work_days': work_days,
-                'absent_days': absent_days,
-                'late_count': late_count,
-                'overtime_hours': total_overtime_hours,
-                'base_salary': base_salary,
-                'overtime_pay': round(total_overtime_pay, 0),
-                'gross_pay': round(gross_pay, 0),
-                'attendance_deduction': round(attendance_deduction, 0),
-                'late_deduction': round(late_deduction, 0),
-                'income_tax': round(income_tax, 0),
-                'social_insurance': round(social_insurance, 0),
-                'total_deductions': round(deductions + income_tax + social_insurance, 0),
-                'net_pay': round(net_pay, 0),
-                'payment_date': date(year, month, 25) if month < 12 else date(year + 1, 1, 25),
+                **{name: values[i] for name, values in columns.items()},
+                'payment_date': payment_date,
                 'status': 'calculated',
                 'created_at': datetime.now()
             }
@@ -364,13 +437,11 @@ class HRDataGenerator:
         self.data['training_records'].append(record)
         return record
 
-    def _determine_attendance_status(
+    def _attendance_probabilities(
         self,
-        time_slot: TimeSlot,
-        employee: Dict[str, Any],
         scenario_data: Dict[str, Any]
-    ) -> AttendanceStatus:
-        """Determine attendance status for an employee"""
+    ) -> np.ndarray:
+        """Attendance status probabilities in ATTENDANCE_STATUSES order"""
         # Apply scenario effects
         absence_rate = scenario_data.get('absence_rate_increase', 0)
 
@@ -384,14 +455,9 @@ class HRDataGenerator:
             AttendanceStatus.EARLY_LEAVE: 0.01
         }
 
-        statuses = list(weights.keys())
-        probs = list(weights.values())
-
         # Normalize probabilities
-        total = sum(probs)
-        probs = [p / total for p in probs]
-
-        return random.choices(statuses, weights=probs)[0]
+        probs = np.maximum([weights[status] for status in ATTENDANCE_STATUSES], 0.0)
+        return probs / probs.sum()
 
     def _get_shift_start(self, shift: ShiftType) -> datetime.time:
         """Get shift start time"""
@@ -477,7 +543,7 @@ class HRDataGenerator:
         total_overtime = sum(o['overtime_amount'] for o in self.data['overtime_records'])
 
         attendance = self.data['attendance_records']
-        present_count = sum(1 for a in attendance if a['status'] == 'present')
+        present_count = sum(int(totals['work_days'].sum()) for totals in self._monthly_totals.values())
 
         return {
             'total_employees': len(self.employees),
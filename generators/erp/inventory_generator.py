@@ -6,11 +6,12 @@ Supports AI use case scenarios for inventory management
 import uuid
 import random
 from datetime import datetime, date, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 import numpy as np
 
+from generators.core.columnar import ColumnarTable, MonotonicIdGenerator
 from generators.core.time_manager import TimeManager, TimeSlot
 from generators.core.scenario_manager import ScenarioManager
 
@@ -53,6 +54,145 @@ class StockLevel:
         return self.unrestricted_qty - self.reserved_qty
 
 
+INBOUND_MOVEMENTS = (
+    MovementType.GOODS_RECEIPT, MovementType.PRODUCTION_RECEIPT,
+    MovementType.ADJUSTMENT_PLUS, MovementType.RETURN
+)
+
+# (material_code, warehouse_code, movement_type, qty, reference_doc, lot_no)
+Movement = Tuple[str, str, MovementType, float, str, str]
+
+
+class StockLedger:
+    """
+    Stock quantities held in (material, warehouse) arrays
+
+    Every material and warehouse gets a stable row/column index, so a movement
+    is an O(1) cell update and a batch of movements is one vectorized delta.
+    Cells touched since the last snapshot are flagged, which lets daily
+    snapshots carry only the rows that changed.
+    """
+
+    QTY_COLUMNS = ('unrestricted_qty', 'quality_qty', 'blocked_qty', 'reserved_qty')
+
+    def __init__(self, warehouse_codes: Iterable[str], capacity: int = 256):
+        self.material_codes: List[str] = []
+        self.material_index: Dict[str, int] = {}
+        self.warehouse_codes: List[str] = []
+        self.warehouse_index: Dict[str, int] = {}
+
+        self.qty = {name: np.zeros((capacity, 0)) for name in self.QTY_COLUMNS}
+        self.present = np.zeros((capacity, 0), dtype=bool)
+        self.dirty = np.zeros((capacity, 0), dtype=bool)
+        self.locations = np.empty((capacity, 0), dtype=object)
+        self.unit_cost = np.zeros(capacity)
+        self.safety_stock = np.zeros(capacity)
+
+        for code in warehouse_codes:
+            self.add_warehouse(code)
+
+    def _resize(self, rows: int, cols: int) -> None:
+        old_rows, old_cols = self.present.shape
+
+        def grow(array: np.ndarray) -> np.ndarray:
+            resized = np.zeros((rows, cols), dtype=array.dtype) if array.dtype != object \
+                else np.empty((rows, cols), dtype=object)
+            resized[:old_rows, :old_cols] = array
+            return resized
+
+        self.qty = {name: grow(values) for name, values in self.qty.items()}
+        self.present = grow(self.present)
+        self.dirty = grow(self.dirty)
+        self.locations = grow(self.locations)
+        if rows != old_rows:
+            self.unit_cost = np.concatenate([self.unit_cost, np.zeros(rows - old_rows)])
+            self.safety_stock = np.concatenate([self.safety_stock, np.zeros(rows - old_rows)])
+
+    def add_warehouse(self, warehouse_code: str) -> int:
+        index = self.warehouse_index.get(warehouse_code)
+        if index is None:
+            index = self.warehouse_index[warehouse_code] = len(self.warehouse_codes)
+            self.warehouse_codes.append(warehouse_code)
+            self._resize(self.present.shape[0], len(self.warehouse_codes))
+        return index
+
+    def add_material(self, material_code: str, unit_cost: float, safety_stock: float = 0) -> int:
+        index = self.material_index.get(material_code)
+        if index is None:
+            index = self.material_index[material_code] = len(self.material_codes)
+            self.material_codes.append(material_code)
+            if index >= self.present.shape[0]:
+                self._resize(self.present.shape[0] * 2, self.present.shape[1])
+            self.unit_cost[index] = unit_cost
+            self.safety_stock[index] = safety_stock
+        return index
+
+    def open(self, row: int, col: int, location: str, unrestricted_qty: float = 0) -> None:
+        """Start tracking a (material, warehouse) cell"""
+        self.present[row, col] = True
+        self.dirty[row, col] = True
+        self.locations[row, col] = location
+        self.qty['unrestricted_qty'][row, col] = unrestricted_qty
+
+    def apply(self, rows: np.ndarray, cols: np.ndarray, deltas: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Add signed deltas to unrestricted stock, floored at zero per movement
+
+        Returns:
+            (qty_before, qty_after) per movement, as if applied in order
+        """
+        stock = self.qty['unrestricted_qty']
+        flat = rows * stock.shape[1] + cols
+        if len(np.unique(flat)) == len(flat):
+            before = stock[rows, cols]
+            after = np.maximum(before + deltas, 0)
+            stock[rows, cols] = after
+        else:
+            # Repeated cells in one batch: the floor depends on order
+            before = np.empty(len(flat))
+            after = np.empty(len(flat))
+            for k, (row, col, delta) in enumerate(zip(rows.tolist(), cols.tolist(), deltas.tolist())):
+                before[k] = stock[row, col]
+                after[k] = stock[row, col] = max(before[k] + delta, 0)
+        self.dirty[rows, cols] = True
+        return before, after
+
+    def reserve(self, row: int, col: int, qty: float) -> None:
+        self.qty['reserved_qty'][row, col] += qty
+        self.dirty[row, col] = True
+
+    def level(self, row: int, col: int) -> StockLevel:
+        """StockLevel copy of one cell"""
+        return StockLevel(
+            material_code=self.material_codes[row],
+            warehouse_code=self.warehouse_codes[col],
+            location=self.locations[row, col],
+            **{name: float(values[row, col]) for name, values in self.qty.items()}
+        )
+
+    def cells(self, warehouse_code: Optional[str] = None, changed_only: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """Row/column indices of tracked cells in material order"""
+        size = len(self.material_codes)
+        mask = self.present[:size]
+        if changed_only:
+            mask = mask & self.dirty[:size]
+        if warehouse_code is not None:
+            col = self.warehouse_index.get(warehouse_code)
+            if col is None:
+                return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+            rows = np.flatnonzero(mask[:, col])
+            return rows, np.full(len(rows), col, dtype=np.intp)
+        return np.nonzero(mask)
+
+    def total_qty(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        return (self.qty['unrestricted_qty'][rows, cols] + self.qty['quality_qty'][rows, cols]
+                + self.qty['blocked_qty'][rows, cols])
+
+    def total_value(self) -> float:
+        rows, cols = self.cells()
+        return float((self.total_qty(rows, cols) * self.unit_cost[rows]).sum())
+
+
 class InventoryDataGenerator:
     """
     ERP Inventory Data Generator
@@ -85,7 +225,9 @@ class InventoryDataGenerator:
         company_profile: Dict[str, Any],
         master_data: Dict[str, Any],
         tenant_id: str,
-        random_seed: int = 42
+        random_seed: int = 42,
+        snapshot_mode: str = 'delta',
+        checkpoint_interval_days: int = 7
     ):
         self.time_manager = time_manager
         self.scenario_manager = scenario_manager
@@ -93,62 +235,95 @@ class InventoryDataGenerator:
         self.master_data = master_data
         self.tenant_id = tenant_id
 
+        # 'full': every tracked row daily / 'delta': changed rows, full checkpoint every N days
+        self.snapshot_mode = snapshot_mode
+        self.checkpoint_interval_days = checkpoint_interval_days
+        self._last_checkpoint: Optional[date] = None
+
         random.seed(random_seed)
         np.random.seed(random_seed)
 
         self.materials = master_data.get('materials', [])
         self.products = company_profile.get('products', [])
 
+        # Stable valuation: one standard cost per material
+        self._standard_costs = {
+            item['material_code']: item['standard_cost']
+            for item in self.materials + master_data.get('products', [])
+            if item.get('material_code') and item.get('standard_cost') is not None
+        }
+
         # Stock tracking
-        self.stock_levels: Dict[str, StockLevel] = {}
+        self.ledger = StockLedger(self.WAREHOUSES)
         self._initialize_stock()
 
         # Generated data
         self.data = {
             'inventory_transactions': [],
-            'stock_snapshots': [],
+            'stock_snapshots': ColumnarTable(),
             'stock_counts': [],
             'inventory_alerts': [],
             'reservation_records': []
         }
 
         self.sequence_counter = 10000
+        self.id_generator = MonotonicIdGenerator()
 
     def _get_next_sequence(self) -> str:
         self.sequence_counter += 1
         return str(self.sequence_counter).zfill(6)
 
-    def _get_stock_key(self, material_code: str, warehouse_code: str) -> str:
-        return f"{material_code}_{warehouse_code}"
+    def _register_material(self, material_code: str, safety_stock: float = 0) -> int:
+        """Ledger row of a material, registering it with its standard cost"""
+        row = self.ledger.material_index.get(material_code)
+        if row is None:
+            unit_cost = self._standard_costs.get(material_code)
+            if unit_cost is None:
+                # No master cost: draw once so the valuation stays stable
+                unit_cost = round(random.uniform(10, 1000), 2)
+            row = self.ledger.add_material(material_code, unit_cost, safety_stock)
+        return row
+
+    def _get_cell(self, material_code: str, warehouse_code: str) -> Tuple[int, int]:
+        """Ledger (row, col) of a stock position, opening it on first use"""
+        row = self._register_material(material_code)
+        col = self.ledger.add_warehouse(warehouse_code)
+        if not self.ledger.present[row, col]:
+            self.ledger.open(
+                row, col,
+                f"{warehouse_code[:2]}-{random.randint(1, 50):02d}-{random.randint(1, 10):02d}"
+            )
+        return row, col
 
     def _initialize_stock(self) -> None:
         """Initialize stock levels with random quantities"""
+        col = self.ledger.warehouse_index['WH-RM']
         # Initialize raw materials
         for material in self.materials:
             mat_code = material.get('material_code')
             if not mat_code:
                 continue
 
-            key = self._get_stock_key(mat_code, 'WH-RM')
             safety_stock = material.get('safety_stock', 1000)
-
-            self.stock_levels[key] = StockLevel(
-                material_code=mat_code,
-                warehouse_code='WH-RM',
+            row = self._register_material(mat_code, safety_stock)
+            if self.ledger.present[row, col]:
+                continue
+            self.ledger.open(
+                row, col,
                 location=f"RM-{random.randint(1, 50):02d}-{random.randint(1, 10):02d}",
                 unrestricted_qty=safety_stock * random.uniform(1.5, 3.0)
             )
 
         # Initialize finished goods
+        col = self.ledger.warehouse_index['WH-FG']
         for product in self.products:
             mat_code = product.get('material_code')
             if not mat_code:
                 continue
 
-            key = self._get_stock_key(mat_code, 'WH-FG')
-            self.stock_levels[key] = StockLevel(
-                material_code=mat_code,
-                warehouse_code='WH-FG',
+            row = self._register_material(mat_code)
+            self.ledger.open(
+                row, col,
                 location=f"FG-{random.randint(1, 20):02d}-{random.randint(1, 10):02d}",
                 unrestricted_qty=random.randint(100, 1000)
             )
@@ -165,102 +340,123 @@ class InventoryDataGenerator:
         context: Dict[str, Any] = None
     ) -> Dict[str, Any]:
         """Generate an inventory transaction"""
-        context = context or {}
-        scenario_data = self._apply_inventory_scenarios(time_slot, context)
-
-        key = self._get_stock_key(material_code, warehouse_code)
-        stock = self.stock_levels.get(key)
-
-        if not stock:
-            stock = StockLevel(
-                material_code=material_code,
-                warehouse_code=warehouse_code,
-                location=f"{warehouse_code[:2]}-{random.randint(1, 50):02d}-{random.randint(1, 10):02d}"
-            )
-            self.stock_levels[key] = stock
+        return self.generate_inventory_transactions(
+            time_slot,
+            [(material_code, warehouse_code, movement_type, qty, reference_doc, lot_no)],
+            context
+        )[0]
 
-        # Calculate before/after quantities
-        qty_before = stock.unrestricted_qty
+    def generate_inventory_transactions(
+        self,
+        time_slot: TimeSlot,
+        movements: List[Movement],
+        context: Dict[str, Any] = None
+    ) -> List[Dict[str, Any]]:
+        """Apply a batch of movements as one ledger delta and record a transaction per movement"""
+        if not movements:
+            return []
 
-        # Apply movement
-        if movement_type in [MovementType.GOODS_RECEIPT, MovementType.PRODUCTION_RECEIPT,
-                            MovementType.ADJUSTMENT_PLUS, MovementType.RETURN]:
-            stock.unrestricted_qty += qty
-            qty_sign = qty
-        else:
-            stock.unrestricted_qty = max(0, stock.unrestricted_qty - qty)
-            qty_sign = -qty
+        context = context or {}
+        scenario_data = self._apply_inventory_scenarios(time_slot, context)
+        active_scenarios = scenario_data.get('active_scenarios', [])
 
-        qty_after = stock.unrestricted_qty
+        n = len(movements)
+        rows = np.empty(n, dtype=np.intp)
+        cols = np.empty(n, dtype=np.intp)
+        signed = np.empty(n)
+        for k, (material_code, warehouse_code, movement_type, qty, _, _) in enumerate(movements):
+            rows[k], cols[k] = self._get_cell(material_code, warehouse_code)
+            signed[k] = qty if movement_type in INBOUND_MOVEMENTS else -qty
 
-        transaction = {
-            'id': str(uuid.uuid4()),
-            'tenant_id': self.tenant_id,
-            'transaction_no': f"IT-{time_slot.date.strftime('%Y%m%d')}-{self._get_next_sequence()}",
-            'transaction_date': time_slot.date,
-            'transaction_datetime': time_slot.timestamp,
-            'material_code': material_code,
-            'warehouse_code': warehouse_code,
-            'location': stock.location,
-            'movement_type': movement_type.value,
-            'movement_name': self._get_movement_name(movement_type),
-            'qty': qty_sign,
-            'unit': 'EA',
-            'qty_before': qty_before,
-            'qty_after': qty_after,
-            'lot_no': lot_no or f"L{time_slot.date.strftime('%Y%m%d')}{random.randint(1000, 9999)}",
-            'reference_doc': reference_doc,
-            'cost_center': f"CC{random.randint(100, 999)}",
-            'operator_id': f"WH{random.randint(1, 20):03d}",
-            'active_scenarios': scenario_data.get('active_scenarios', []),
-            'created_at': datetime.now()
-        }
+        qty_before, qty_after = self.ledger.apply(rows, cols, signed)
+        low_stock = qty_after < self.ledger.safety_stock[rows]
 
-        self.data['inventory_transactions'].append(transaction)
+        date_str = time_slot.date.strftime('%Y%m%d')
+        transactions = []
+        for k, (material_code, warehouse_code, movement_type, qty, reference_doc, lot_no) in enumerate(movements):
+            transaction = {
+                'id': str(uuid.uuid4()),
+                'tenant_id': self.tenant_id,
+                'transaction_no': f"IT-{date_str}-{self._get_next_sequence()}",
+                'transaction_date': time_slot.date,
+                'transaction_datetime': time_slot.timestamp,
+                'material_code': material_code,
+                'warehouse_code': warehouse_code,
+                'location': self.ledger.locations[rows[k], cols[k]],
+                'movement_type': movement_type.value,
+                'movement_name': self._get_movement_name(movement_type),
+                'qty': float(signed[k]),
+                'unit': 'EA',
+                'qty_before': float(qty_before[k]),
+                'qty_after': float(qty_after[k]),
+                'lot_no': lot_no or f"L{date_str}{random.randint(1000, 9999)}",
+                'reference_doc': reference_doc,
+                'cost_center': f"CC{random.randint(100, 999)}",
+                'operator_id': f"WH{random.randint(1, 20):03d}",
+                'active_scenarios': active_scenarios,
+                'created_at': datetime.now()
+            }
+            transactions.append(transaction)
 
-        # Check for low stock alert
-        material = next((m for m in self.materials if m.get('material_code') == material_code), None)
-        if material:
-            safety_stock = material.get('safety_stock', 0)
-            if qty_after < safety_stock:
+            # Check for low stock alert
+            if low_stock[k]:
+                safety_stock = self.ledger.safety_stock[rows[k]]
                 self._generate_inventory_alert(
                     time_slot, material_code, warehouse_code,
-                    'LOW_STOCK', f"재고 {qty_after}EA - 안전재고({safety_stock}EA) 미달"
+                    'LOW_STOCK', f"재고 {float(qty_after[k])}EA - 안전재고({safety_stock:g}EA) 미달"
                 )
 
-        return transaction
+        self.data['inventory_transactions'].extend(transactions)
+        return transactions
 
     def generate_stock_snapshot(
         self,
-        time_slot: TimeSlot
-    ) -> List[Dict[str, Any]]:
-        """Generate daily stock snapshot"""
-        snapshots = []
-
-        for key, stock in self.stock_levels.items():
-            snapshot = {
-                'id': str(uuid.uuid4()),
-                'tenant_id': self.tenant_id,
-                'snapshot_date': time_slot.date,
-                'material_code': stock.material_code,
-                'warehouse_code': stock.warehouse_code,
-                'location': stock.location,
-                'unrestricted_qty': stock.unrestricted_qty,
-                'quality_qty': stock.quality_qty,
-                'blocked_qty': stock.blocked_qty,
-                'reserved_qty': stock.reserved_qty,
-                'total_qty': stock.total_qty,
-                'available_qty': stock.available_qty,
-                'unit': 'EA',
-                'valuation_price': random.uniform(10, 1000),
-                'valuation_amount': stock.total_qty * random.uniform(10, 1000),
-                'created_at': datetime.now()
-            }
-
-            snapshots.append(snapshot)
-
-        self.data['stock_snapshots'].extend(snapshots)
-        return snapshots
+        time_slot: TimeSlot,
+        full: Optional[bool] = None
+    ) -> int:
+        """
+        Generate daily stock snapshot
+
+        In delta mode only positions changed since the previous snapshot are
+        emitted, with a full checkpoint on the first day and every
+        checkpoint_interval_days. Returns the number of rows emitted.
+        """
+        if full is None:
+            full = (
+                self.snapshot_mode == 'full'
+                or self._last_checkpoint is None
+                or (time_slot.date - self._last_checkpoint).days >= self.checkpoint_interval_days
+            )
+        if full:
+            self._last_checkpoint = time_slot.date
+
+        ledger = self.ledger
+        rows, cols = ledger.cells(changed_only=not full)
+        ledger.dirty[:] = False
+        size = len(rows)
+        if not size:
+            return 0
+
+        qty = {name: values[rows, cols] for name, values in ledger.qty.items()}
+        total_qty = qty['unrestricted_qty'] + qty['quality_qty'] + qty['blocked_qty']
+        unit_cost = ledger.unit_cost[rows]
+        self.data['stock_snapshots'].append(size, {
+            'id': self.id_generator.next_batch(size),
+            'tenant_id': self.tenant_id,
+            'snapshot_date': time_slot.date,
+            'snapshot_type': 'full' if full else 'delta',
+            'material_code': np.asarray(ledger.material_codes, dtype=object)[rows],
+            'warehouse_code': np.asarray(ledger.warehouse_codes, dtype=object)[cols],
+            'location': ledger.locations[rows, cols],
+            **qty,
+            'total_qty': total_qty,
+            'available_qty': qty['unrestricted_qty'] - qty['reserved_qty'],
+            'unit': 'EA',
+            'valuation_price': unit_cost,
+            'valuation_amount': np.round(total_qty * unit_cost, 2),
+            'created_at': datetime.now()
+        })
+        return size
 
     def generate_stock_count(
         self,
@@ -273,15 +469,15 @@ class InventoryDataGenerator:
         count_no = f"SC-{time_slot.date.strftime('%Y%m%d')}-{self._get_next_sequence()}"
 
         # Get stocks in warehouse
-        warehouse_stocks = [s for s in self.stock_levels.values()
-                          if s.warehouse_code == warehouse_code]
+        rows, cols = self.ledger.cells(warehouse_code)
 
         count_lines = []
         total_variance = 0
         variance_value = 0
 
-        for stock in warehouse_stocks[:random.randint(10, 50)]:
-            system_qty = stock.unrestricted_qty
+        for row, col in list(zip(rows.tolist(), cols.tolist()))[:random.randint(10, 50)]:
+            system_qty = float(self.ledger.qty['unrestricted_qty'][row, col])
+            unit_cost = float(self.ledger.unit_cost[row])
 
             # Simulate count variance (usually small)
             variance_pct = random.gauss(0, 0.02)  # ~2% standard deviation
@@ -292,15 +488,15 @@ class InventoryDataGenerator:
                 'id': str(uuid.uuid4()),
                 'tenant_id': self.tenant_id,
                 'count_id': count_id,
-                'material_code': stock.material_code,
-                'location': stock.location,
+                'material_code': self.ledger.material_codes[row],
+                'location': self.ledger.locations[row, col],
                 'system_qty': system_qty,
                 'physical_qty': round(physical_qty),
                 'variance_qty': round(variance_qty),
                 'variance_pct': round(variance_pct * 100, 2),
                 'unit': 'EA',
-                'unit_cost': random.uniform(10, 1000),
-                'variance_value': round(variance_qty * random.uniform(10, 1000), 2),
+                'unit_cost': unit_cost,
+                'variance_value': round(variance_qty * unit_cost, 2),
                 'count_by': f"WH{random.randint(1, 20):03d}",
                 'count_datetime': time_slot.timestamp,
                 'status': 'counted'
@@ -343,14 +539,18 @@ class InventoryDataGenerator:
         context: Dict[str, Any] = None
     ) -> Dict[str, Any]:
         """Generate stock reservation"""
-        key = self._get_stock_key(material_code, warehouse_code)
-        stock = self.stock_levels.get(key)
+        row = self.ledger.material_index.get(material_code)
+        col = self.ledger.warehouse_index.get(warehouse_code)
+        if row is None or col is None or not self.ledger.present[row, col]:
+            # Insufficient stock
+            return None
 
-        if not stock or stock.available_qty < qty:
+        available = self.ledger.qty['unrestricted_qty'][row, col] - self.ledger.qty['reserved_qty'][row, col]
+        if available < qty:
             # Insufficient stock
             return None
 
-        stock.reserved_qty += qty
+        self.ledger.reserve(row, col, qty)
 
         reservation = {
             'id': str(uuid.uuid4()),
@@ -449,22 +649,13 @@ class InventoryDataGenerator:
         receipt_data: List[Dict[str, Any]]
     ) -> List[Dict[str, Any]]:
         """Process goods receipts into inventory"""
-        transactions = []
-
-        for receipt in receipt_data:
-            for line in receipt.get('lines', []):
-                tx = self.generate_inventory_transaction(
-                    time_slot,
-                    line['material_code'],
-                    receipt.get('warehouse_code', 'WH-RM'),
-                    MovementType.GOODS_RECEIPT,
-                    line['received_qty'],
-                    reference_doc=receipt['gr_no'],
-                    lot_no=line.get('lot_no', '')
-                )
-                transactions.append(tx)
-
-        return transactions
+        movements = [
+            (line['material_code'], receipt.get('warehouse_code', 'WH-RM'), MovementType.GOODS_RECEIPT,
+             line['received_qty'], receipt['gr_no'], line.get('lot_no', ''))
+            for receipt in receipt_data
+            for line in receipt.get('lines', [])
+        ]
+        return self.generate_inventory_transactions(time_slot, movements)
 
     def process_goods_issues(
         self,
@@ -472,21 +663,12 @@ class InventoryDataGenerator:
         issue_data: List[Dict[str, Any]]
     ) -> List[Dict[str, Any]]:
         """Process goods issues from inventory"""
-        transactions = []
-
-        for issue in issue_data:
-            tx = self.generate_inventory_transaction(
-                time_slot,
-                issue['material_code'],
-                issue.get('warehouse_code', 'WH-RM'),
-                MovementType.GOODS_ISSUE,
-                issue['qty'],
-                reference_doc=issue.get('reference_doc', ''),
-                lot_no=issue.get('lot_no', '')
-            )
-            transactions.append(tx)
-
-        return transactions
+        movements = [
+            (issue['material_code'], issue.get('warehouse_code', 'WH-RM'), MovementType.GOODS_ISSUE,
+             issue['qty'], issue.get('reference_doc', ''), issue.get('lot_no', ''))
+            for issue in issue_data
+        ]
+        return self.generate_inventory_transactions(time_slot, movements)
 
     def process_production_receipts(
         self,
@@ -494,26 +676,20 @@ class InventoryDataGenerator:
         production_data: List[Dict[str, Any]]
     ) -> List[Dict[str, Any]]:
         """Process production completions into inventory"""
-        transactions = []
-
-        for prod in production_data:
-            tx = self.generate_inventory_transaction(
-                time_slot,
-                prod['product_code'],
-                'WH-FG',
-                MovementType.PRODUCTION_RECEIPT,
-                prod['good_qty'],
-                reference_doc=prod.get('production_order_no', ''),
-                lot_no=prod.get('lot_no', '')
-            )
-            transactions.append(tx)
-
-        return transactions
+        movements = [
+            (prod['product_code'], 'WH-FG', MovementType.PRODUCTION_RECEIPT,
+             prod['good_qty'], prod.get('production_order_no', ''), prod.get('lot_no', ''))
+            for prod in production_data
+        ]
+        return self.generate_inventory_transactions(time_slot, movements)
 
     def get_stock_level(self, material_code: str, warehouse_code: str) -> Optional[StockLevel]:
         """Get current stock level"""
-        key = self._get_stock_key(material_code, warehouse_code)
-        return self.stock_levels.get(key)
+        row = self.ledger.material_index.get(material_code)
+        col = self.ledger.warehouse_index.get(warehouse_code)
+        if row is None or col is None or not self.ledger.present[row, col]:
+            return None
+        return self.ledger.level(row, col)
 
     def get_data(self) -> Dict[str, List]:
         """Get all generated data"""
@@ -521,10 +697,7 @@ class InventoryDataGenerator:
 
     def get_summary(self) -> Dict[str, Any]:
         """Get generation summary"""
-        total_stock_value = sum(
-            s.unrestricted_qty * 100  # Simplified valuation
-            for s in self.stock_levels.values()
-        )
+        total_stock_value = self.ledger.total_value()
 
         return {
             'total_transactions': len(self.data['inventory_transactions']),
@@ -532,6 +705,6 @@ class InventoryDataGenerator:
             'total_stock_counts': len(self.data['stock_counts']),
             'total_alerts': len(self.data['inventory_alerts']),
             'total_reservations': len(self.data['reservation_records']),
-            'unique_materials': len(self.stock_levels),
+            'unique_materials': int(self.ledger.present.sum()),
             'estimated_stock_value': round(total_stock_value, 2)
         }
@@ -13,6 +13,7 @@ import numpy as np
 
 from generators.core.time_manager import TimeManager, TimeSlot
 from generators.core.scenario_manager import ScenarioManager
+from generators.core.order_book import LineIndex, OrderBook
 
 
 class POStatus(Enum):
@@ -32,6 +33,10 @@ class ReceiptStatus(Enum):
     POSTED = "posted"
 
 
+# POs waiting for (further) receipts
+OPEN_PO_STATUSES = (POStatus.ORDERED.value, POStatus.PARTIAL.value)
+
+
 class PurchaseDataGenerator:
     """
     ERP Purchase Data Generator
@@ -84,6 +89,10 @@ class PurchaseDataGenerator:
 
         self.sequence_counter = 10000
 
+        # Open-PO book and line index (no rescans of the growing lists)
+        self.order_book = OrderBook(OPEN_PO_STATUSES, due_key='delivery_date')
+        self._po_lines = LineIndex('po_id')
+
     def _get_next_sequence(self) -> str:
         self.sequence_counter += 1
         return str(self.sequence_counter).zfill(6)
@@ -188,6 +197,8 @@ class PurchaseDataGenerator:
 
         self.data['purchase_orders'].append(po)
         self.data['purchase_order_lines'].extend(lines)
+        self.order_book.add(po)
+        self._po_lines.extend(lines)
 
         return po
 
@@ -201,8 +212,8 @@ class PurchaseDataGenerator:
         context = context or {}
         scenario_data = self._apply_purchase_scenarios(time_slot, context)
 
-        po_lines = [l for l in self.data['purchase_order_lines']
-                    if l['po_id'] == purchase_order['id'] and l['remaining_qty'] > 0]
+        po_lines = [l for l in self._po_lines.lines(purchase_order['id'])
+                    if l['remaining_qty'] > 0]
 
         if not po_lines:
             return None
@@ -299,9 +310,9 @@ class PurchaseDataGenerator:
         # Update PO status
         all_received = all(l['remaining_qty'] <= 0 for l in po_lines)
         if all_received:
-            purchase_order['status'] = POStatus.RECEIVED.value
+            self.order_book.set_status(purchase_order, POStatus.RECEIVED.value)
         else:
-            purchase_order['status'] = POStatus.PARTIAL.value
+            self.order_book.set_status(purchase_order, POStatus.PARTIAL.value)
 
         # Generate vendor evaluation
         self._generate_vendor_evaluation(time_slot, purchase_order, gr, gr_lines)
@@ -337,8 +348,7 @@ class PurchaseDataGenerator:
             delivery_score = 50
 
         # Quantity accuracy
-        ordered_qty = sum(l['order_qty'] for l in self.data['purchase_order_lines']
-                        if l['po_id'] == po['id'])
+        ordered_qty = sum(l['order_qty'] for l in self._po_lines.lines(po['id']))
         qty_accuracy = (total_received / ordered_qty * 100) if ordered_qty > 0 else 100
 
         evaluation = {
@@ -444,14 +454,10 @@ class PurchaseDataGenerator:
         receipts = []
         context = {}
 
-        # Find POs due for delivery
-        due_pos = [
-            po for po in self.data['purchase_orders']
-            if po['status'] in [POStatus.ORDERED.value, POStatus.PARTIAL.value]
-            and po['delivery_date'] <= time_slot.date
-        ]
+        # Find POs due for delivery (oldest first)
+        due_pos = self.order_book.due(time_slot.date, limit=random.randint(5, 15))
 
-        for po in due_pos[:random.randint(5, 15)]:
+        for po in due_pos:
             gr = self.generate_goods_receipt(time_slot, po, context)
             if gr:
                 receipts.append(gr)
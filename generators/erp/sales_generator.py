@@ -13,6 +13,7 @@ import numpy as np
 
 from generators.core.time_manager import TimeManager, TimeSlot
 from generators.core.scenario_manager import ScenarioManager, AIUseCase
+from generators.core.order_book import LineIndex, OrderBook
 
 
 class OrderType(Enum):
@@ -31,6 +32,13 @@ class OrderStatus(Enum):
     CANCELLED = "cancelled"
 
 
+# Orders waiting for shipment
+OPEN_ORDER_STATUSES = (OrderStatus.CONFIRMED.value, OrderStatus.IN_PRODUCTION.value)
+
+# Orders are shipped up to this many days before the requested date
+SHIPMENT_LEAD_DAYS = 3
+
+
 class SalesDataGenerator:
     """
     ERP Sales Data Generator
@@ -85,6 +93,12 @@ class SalesDataGenerator:
 
         self.sequence_counter = 10000
 
+        # Open-order book and line indexes (no rescans of the growing lists)
+        self.order_book = OrderBook(OPEN_ORDER_STATUSES, due_key='requested_date')
+        self._order_lines = LineIndex('order_id')
+        self._order_lines_by_id: Dict[str, Dict[str, Any]] = {}
+        self._shipment_lines = LineIndex('shipment_id')
+
     def _get_next_sequence(self) -> str:
         self.sequence_counter += 1
         return str(self.sequence_counter).zfill(6)
@@ -194,6 +208,9 @@ class SalesDataGenerator:
 
         self.data['sales_orders'].append(order)
         self.data['sales_order_lines'].extend(lines)
+        self.order_book.add(order)
+        self._order_lines.extend(lines)
+        self._order_lines_by_id.update((l['id'], l) for l in lines)
 
         # Check for demand surge alert
         if scenario_data.get('demand_surge'):
@@ -208,8 +225,8 @@ class SalesDataGenerator:
         context: Dict[str, Any]
     ) -> Optional[Dict[str, Any]]:
         """Generate shipment for a sales order"""
-        order_lines = [l for l in self.data['sales_order_lines']
-                       if l['order_id'] == sales_order['id'] and l['remaining_qty'] > 0]
+        order_lines = [l for l in self._order_lines.lines(sales_order['id'])
+                       if l['remaining_qty'] > 0]
 
         if not order_lines:
             return None
@@ -286,11 +303,12 @@ class SalesDataGenerator:
 
         self.data['shipments'].append(shipment)
         self.data['shipment_lines'].extend(shipment_lines)
+        self._shipment_lines.extend(shipment_lines)
 
         # Update order status
         remaining = sum(l['remaining_qty'] for l in order_lines)
         if remaining <= 0:
-            sales_order['status'] = OrderStatus.SHIPPED.value
+            self.order_book.set_status(sales_order, OrderStatus.SHIPPED.value)
 
         return shipment
 
@@ -301,14 +319,12 @@ class SalesDataGenerator:
         context: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Generate sales invoice for shipment"""
-        order = next((o for o in self.data['sales_orders']
-                      if o['id'] == shipment['order_id']), None)
+        order = self.order_book.get(shipment['order_id'])
 
         if not order:
             return None
 
-        shipment_lines = [l for l in self.data['shipment_lines']
-                          if l['shipment_id'] == shipment['id']]
+        shipment_lines = self._shipment_lines.lines(shipment['id'])
 
         invoice_id = str(uuid.uuid4())
         invoice_no = f"INV-{time_slot.date.strftime('%Y%m%d')}-{self._get_next_sequence()}"
@@ -318,8 +334,7 @@ class SalesDataGenerator:
         invoice_lines = []
 
         for ship_line in shipment_lines:
-            order_line = next((l for l in self.data['sales_order_lines']
-                              if l['id'] == ship_line['order_line_id']), None)
+            order_line = self._order_lines_by_id.get(ship_line['order_line_id'])
             if not order_line:
                 continue
 
@@ -373,7 +388,7 @@ class SalesDataGenerator:
         self.data['invoice_lines'].extend(invoice_lines)
 
         # Update order status
-        order['status'] = OrderStatus.INVOICED.value
+        self.order_book.set_status(order, OrderStatus.INVOICED.value)
 
         return invoice
 
@@ -385,8 +400,7 @@ class SalesDataGenerator:
         context: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Generate customer claim/return"""
-        shipment_lines = [l for l in self.data['shipment_lines']
-                          if l['shipment_id'] == shipment['id']]
+        shipment_lines = self._shipment_lines.lines(shipment['id'])
 
         claim_line = random.choice(shipment_lines) if shipment_lines else None
 
@@ -496,14 +510,13 @@ class SalesDataGenerator:
         shipments = []
         context = {'environment': {}}
 
-        # Find orders ready for shipment
-        ready_orders = [
-            o for o in self.data['sales_orders']
-            if o['status'] in [OrderStatus.CONFIRMED.value, OrderStatus.IN_PRODUCTION.value]
-            and o['requested_date'] <= time_slot.date + timedelta(days=3)
-        ]
+        # Find orders ready for shipment (oldest first)
+        ready_orders = self.order_book.due(
+            time_slot.date + timedelta(days=SHIPMENT_LEAD_DAYS),
+            limit=random.randint(5, 15)
+        )
 
-        for order in ready_orders[:random.randint(5, 15)]:
+        for order in ready_orders:
             shipment = self.generate_shipment(time_slot, order, context)
             if shipment:
                 shipments.append(shipment)
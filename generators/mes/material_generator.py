@@ -13,6 +13,7 @@ import numpy as np
 
 from generators.core.time_manager import TimeManager, TimeSlot, ShiftType
 from generators.core.scenario_manager import ScenarioManager, AIUseCase
+from generators.core.genealogy import GenealogyLog
 
 
 class MaterialMovementType(Enum):
@@ -94,7 +95,8 @@ class MaterialDataGenerator:
             'material_requests': [],
             'material_movements': [],
             'material_alerts': [],
-            'reel_changes': []
+            'reel_changes': [],
+            'lot_genealogy': GenealogyLog()
         }
 
         self.sequence_counter = 10000
@@ -147,7 +149,7 @@ class MaterialDataGenerator:
                 'product_code': production_result.get('product_code'),
                 'line_code': line_code,
                 'material_code': material_code,
-                'material_lot_no': f"ML{time_slot.date.strftime('%Y%m%d')}{random.randint(1000, 9999)}",
+                'material_lot_no': self._get_loaded_lot(line_code, material_code, time_slot),
                 'consumption_datetime': time_slot.timestamp,
                 'shift': time_slot.shift.value,
                 'consumption_type': 'backflush',
@@ -163,6 +165,18 @@ class MaterialDataGenerator:
             }
 
             consumptions.append(consumption)
+            self.data['lot_genealogy'].link(
+                self.tenant_id,
+                parent_lot_no=consumption['material_lot_no'],
+                child_lot_no=consumption['lot_no'],
+                linked_at=time_slot.timestamp,
+                source='material_consumption',
+                parent_item_code=material_code,
+                child_item_code=consumption['product_code'],
+                production_order_no=consumption['production_order_id'],
+                line_code=line_code,
+                qty=actual_qty
+            )
 
             # Check for high variance alert
             if abs(variance_qty / planned_qty) > 0.1 if planned_qty > 0 else False:
@@ -174,6 +188,13 @@ class MaterialDataGenerator:
         self.data['material_consumption'].extend(consumptions)
         return consumptions
 
+    def _get_loaded_lot(self, line_code: str, material_code: str, time_slot: TimeSlot) -> str:
+        """Lot of the reel currently loaded for the material (shared by every lot it feeds)"""
+        for state in self.material_states.get(line_code, []):
+            if state.material_code == material_code:
+                return state.lot_no
+        return f"ML{time_slot.date.strftime('%Y%m%d')}{random.randint(1000, 9999)}"
+
     def generate_feeder_setup(
         self,
         time_slot: TimeSlot,
@@ -6,13 +6,16 @@ Supports AI use case scenarios for quality management
 import uuid
 import random
 from datetime import datetime, date, timedelta
-from typing import Dict, Any, List, Optional, Generator
+from typing import Dict, Any, List, Optional, Generator, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 import numpy as np
 
 from generators.core.time_manager import TimeManager, TimeSlot, ShiftType
 from generators.core.scenario_manager import ScenarioManager, AIUseCase
+from generators.core.columnar import ColumnarTable, MonotonicIdGenerator
+from generators.core.genealogy import GenealogyLog
+from generators.core.spc import NELSON_RULES, SPCChart
 
 
 class InspectionType(Enum):
@@ -117,14 +120,22 @@ class QualityDataGenerator:
         self.data = {
             'inspection_results': [],
             'defect_details': [],
-            'spc_data': [],
+            'spc_data': ColumnarTable(),
             'traceability': [],
             'quality_alerts': [],
-            'quality_holds': []
+            'quality_holds': [],
+            'lot_genealogy': GenealogyLog()
         }
 
         self.sequence_counter = 10000
 
+        # SPC control charts per (line, product, parameter)
+        self.spc_charts: Dict[tuple, SPCChart] = {}
+        self.id_generator = MonotonicIdGenerator()
+
+        # Material lots currently feeding each line
+        self.line_input_lots: Dict[str, List[str]] = {}
+
     def _get_next_sequence(self) -> str:
         self.sequence_counter += 1
         return str(self.sequence_counter).zfill(6)
@@ -134,9 +145,15 @@ class QualityDataGenerator:
         time_slot: TimeSlot,
         production_result: Dict[str, Any],
         inspection_type: InspectionType,
-        context: Dict[str, Any]
+        context: Dict[str, Any],
+        spc_batch: Optional[List[Tuple[Dict[str, Any], Dict[str, Any]]]] = None
     ) -> Dict[str, Any]:
-        """Generate inspection result for a production batch"""
+        """
+        Generate inspection result for a production batch
+
+        With spc_batch the SPC samples are deferred: (inspection, scenario_data)
+        is appended and the caller generates the whole batch at once.
+        """
         # Apply scenarios
         scenario_data = self._apply_quality_scenarios(time_slot, context, production_result)
 
@@ -187,7 +204,10 @@ class QualityDataGenerator:
 
         # Generate SPC data for applicable inspection types
         if inspection_type in [InspectionType.SPI, InspectionType.AOI]:
-            self._generate_spc_data(time_slot, inspection, scenario_data)
+            if spc_batch is not None:
+                spc_batch.append((inspection, scenario_data))
+            else:
+                self._generate_spc_data(time_slot, [(inspection, scenario_data)])
 
         # Generate traceability record
         self._generate_traceability(time_slot, inspection, production_result)
@@ -264,88 +284,92 @@ class QualityDataGenerator:
     def _generate_spc_data(
         self,
         time_slot: TimeSlot,
-        inspection: Dict[str, Any],
-        scenario_data: Dict[str, Any]
-    ) -> List[Dict[str, Any]]:
-        """Generate SPC measurement data"""
-        spc_records = []
-
-        # Get scenario effects on SPC
-        spc_drift = scenario_data.get('spc_drift', {})
-
-        for param_name, param_spec in self.SPC_PARAMETERS.items():
-            # Skip if not relevant to inspection type
-            if inspection['inspection_type'] == 'SPI' and 'solder_paste' not in param_name:
-                if 'reflow' not in param_name:
+        inspections: List[Tuple[Dict[str, Any], Dict[str, Any]]]
+    ) -> int:
+        """
+        Generate SPC measurement data for (inspection, scenario_data) pairs
+
+        All samples of the batch come from one normal draw, Nelson rules are
+        evaluated per control chart on its whole segment, and the records are
+        appended to the columnar spc_data table as a single batch.
+        Returns the number of samples generated.
+        """
+        segments = []
+        for inspection, scenario_data in inspections:
+            # Get scenario effects on SPC
+            spc_drift = scenario_data.get('spc_drift', {})
+
+            for param_name, param_spec in self.SPC_PARAMETERS.items():
+                # Skip if not relevant to inspection type
+                if inspection['inspection_type'] == 'SPI' and 'solder_paste' not in param_name:
+                    if 'reflow' not in param_name:
+                        continue
+                elif inspection['inspection_type'] == 'AOI' and 'solder_paste' in param_name:
                     continue
-            elif inspection['inspection_type'] == 'AOI' and 'solder_paste' in param_name:
-                continue
-
-            # Generate measurements (typically 5-10 samples)
-            num_samples = random.randint(5, 10)
-            target = param_spec['target']
-            usl = param_spec['usl']
-            lsl = param_spec['lsl']
-
-            # Apply drift from scenarios
-            drift = spc_drift.get(param_name, 0)
-            mean = target + drift
-
-            # Calculate sigma (assume Cp=1.33 normally)
-            sigma = (usl - lsl) / 8
-
-            # Generate sample values
-            for i in range(num_samples):
-                value = np.random.normal(mean, sigma)
-
-                # Determine if out of spec
-                out_of_spec = value > usl or value < lsl
-
-                record = {
-                    'id': str(uuid.uuid4()),
-                    'tenant_id': self.tenant_id,
-                    'inspection_id': inspection['id'],
-                    'lot_no': inspection['lot_no'],
-                    'product_code': inspection['product_code'],
-                    'line_code': inspection['line_code'],
-                    'measurement_datetime': time_slot.timestamp + timedelta(seconds=i * 10),
-                    'parameter_name': param_name,
-                    'sample_no': i + 1,
-                    'measured_value': round(value, 3),
-                    'target_value': target,
-                    'usl': usl,
-                    'lsl': lsl,
-                    'unit': param_spec['unit'],
-                    'out_of_spec': out_of_spec,
-                    'rule_violation': self._check_spc_rules(value, target, sigma, usl, lsl),
-                    'created_at': datetime.now()
-                }
+                segments.append((inspection, param_name, param_spec, spc_drift.get(param_name, 0)))
+        if not segments:
+            return 0
+
+        # Generate measurements (typically 5-10 samples per parameter)
+        counts = np.random.randint(5, 11, size=len(segments))
+        targets = np.array([spec['target'] for _, _, spec, _ in segments], dtype=float)
+        usls = np.array([spec['usl'] for _, _, spec, _ in segments], dtype=float)
+        lsls = np.array([spec['lsl'] for _, _, spec, _ in segments], dtype=float)
+        # Apply drift from scenarios
+        means = targets + np.array([drift for _, _, _, drift in segments], dtype=float)
+        # Calculate sigma (assume Cp=1.33 normally)
+        sigmas = (usls - lsls) / 8
+
+        values = np.random.normal(np.repeat(means, counts), np.repeat(sigmas, counts))
+        usl_col = np.repeat(usls, counts)
+        lsl_col = np.repeat(lsls, counts)
+        out_of_spec = (values > usl_col) | (values < lsl_col)
+
+        # Nelson rules are judged against the in-control process (target ± sigma)
+        flags = np.zeros((len(values), 8), dtype=bool)
+        offset = 0
+        for (inspection, param_name, param_spec, _), count, sigma in zip(segments, counts.tolist(), sigmas.tolist()):
+            chart_key = (inspection['line_code'], inspection['product_code'], param_name)
+            chart = self.spc_charts.get(chart_key)
+            if chart is None:
+                chart = SPCChart(
+                    usl=param_spec['usl'], lsl=param_spec['lsl'], target=param_spec['target'],
+                    center=param_spec['target'], sigma=sigma
+                )
+                self.spc_charts[chart_key] = chart
+            flags[offset:offset + count] = chart.push_many(values[offset:offset + count])
+            offset += count
 
-                spc_records.append(record)
+        rule_violations: List[List[str]] = [[] for _ in range(len(values))]
+        for i, rule in zip(*np.nonzero(flags)):
+            rule_violations[i].append(NELSON_RULES[rule + 1])
 
-        self.data['spc_data'].extend(spc_records)
-        return spc_records
+        def per_sample(getter) -> np.ndarray:
+            return np.repeat(np.array([getter(segment) for segment in segments], dtype=object), counts)
 
-    def _check_spc_rules(
-        self,
-        value: float,
-        target: float,
-        sigma: float,
-        usl: float,
-        lsl: float
-    ) -> Optional[str]:
-        """Check Western Electric SPC rules"""
-        # Rule 1: Point beyond 3 sigma
-        if value > target + 3 * sigma or value < target - 3 * sigma:
-            return 'RULE_1_BEYOND_3SIGMA'
-
-        # Rule 2: Would need historical data for runs
-        # Simplified: check if beyond 2 sigma
-        if value > target + 2 * sigma or value < target - 2 * sigma:
-            if random.random() < 0.3:  # Simulate occasional rule 2 violation
-                return 'RULE_2_WARNING'
-
-        return None
+        sample_no = np.concatenate([np.arange(count) for count in counts.tolist()])
+        size = len(values)
+        self.data['spc_data'].append(size, {
+            'id': self.id_generator.next_batch(size),
+            'tenant_id': self.tenant_id,
+            'inspection_id': per_sample(lambda segment: segment[0]['id']),
+            'lot_no': per_sample(lambda segment: segment[0]['lot_no']),
+            'product_code': per_sample(lambda segment: segment[0]['product_code']),
+            'line_code': per_sample(lambda segment: segment[0]['line_code']),
+            'measurement_datetime': [time_slot.timestamp + timedelta(seconds=s) for s in (sample_no * 10).tolist()],
+            'parameter_name': per_sample(lambda segment: segment[1]),
+            'sample_no': sample_no + 1,
+            'measured_value': np.round(values, 3),
+            'target_value': np.repeat(targets, counts),
+            'usl': usl_col,
+            'lsl': lsl_col,
+            'unit': per_sample(lambda segment: segment[2]['unit']),
+            'out_of_spec': out_of_spec,
+            'rule_violation': [violations[0] if violations else None for violations in rule_violations],
+            'rule_violations': rule_violations,
+            'created_at': datetime.now()
+        })
+        return size
 
     def _generate_traceability(
         self,
@@ -366,7 +390,7 @@ class QualityDataGenerator:
             'step_datetime': time_slot.timestamp,
             'operator_id': inspection.get('inspector_id'),
             'equipment_code': inspection.get('equipment_code'),
-            'input_lot_nos': [f"MAT-{random.randint(10000, 99999)}" for _ in range(random.randint(3, 8))],
+            'input_lot_nos': self._get_input_lots(inspection['line_code']),
             'output_qty': inspection['pass_qty'],
             'scrap_qty': inspection['fail_qty'],
             'quality_result': inspection['result'],
@@ -379,8 +403,31 @@ class QualityDataGenerator:
         }
 
         self.data['traceability'].append(record)
+        for input_lot_no in record['input_lot_nos']:
+            self.data['lot_genealogy'].link(
+                self.tenant_id,
+                parent_lot_no=input_lot_no,
+                child_lot_no=record['lot_no'],
+                linked_at=time_slot.timestamp,
+                source='traceability',
+                child_item_code=record['product_code'],
+                production_order_no=record['production_order_id'],
+                line_code=record['line_code']
+            )
         return record
 
+    def _get_input_lots(self, line_code: str) -> List[str]:
+        """
+        Material lots feeding the line; the same lots feed many product lots
+        until they are replaced, which is what makes genealogy fan out
+        """
+        lots = self.line_input_lots.setdefault(
+            line_code, [f"MAT-{random.randint(10000, 99999)}" for _ in range(8)]
+        )
+        if random.random() < 0.2:
+            lots[random.randrange(len(lots))] = f"MAT-{random.randint(10000, 99999)}"
+        return random.sample(lots, random.randint(3, 8))
+
     def _generate_quality_alert(
         self,
         time_slot: TimeSlot,
@@ -559,28 +606,31 @@ class QualityDataGenerator:
     ) -> List[Dict[str, Any]]:
         """Generate quality data for production results"""
         inspections = []
+        # SPC samples of the whole time slot are generated as one batch
+        spc_batch: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
 
         for result in production_results:
             # SPI inspection (after printing)
             if random.random() < 0.8:  # 80% coverage
                 insp = self.generate_inspection_result(
-                    time_slot, result, InspectionType.SPI, context
+                    time_slot, result, InspectionType.SPI, context, spc_batch
                 )
                 inspections.append(insp)
 
             # AOI inspection (after reflow)
             insp = self.generate_inspection_result(
-                time_slot, result, InspectionType.AOI, context
+                time_slot, result, InspectionType.AOI, context, spc_batch
             )
             inspections.append(insp)
 
             # ICT inspection (sampling)
             if random.random() < 0.5:
                 insp = self.generate_inspection_result(
-                    time_slot, result, InspectionType.ICT, context
+                    time_slot, result, InspectionType.ICT, context, spc_batch
                 )
                 inspections.append(insp)
 
+        self._generate_spc_data(time_slot, spc_batch)
         return inspections
 
     def generate_time_range(
@@ -621,6 +671,14 @@ class QualityDataGenerator:
                                       if a['alert_datetime'].date() == time_slot.date])
                     }
 
+    def _spc_violation_counts(self) -> Dict[str, int]:
+        """Nelson rule violations across all SPC charts"""
+        counts: Dict[str, int] = {}
+        for chart in self.spc_charts.values():
+            for rule, count in chart.violations.items():
+                counts[NELSON_RULES[rule]] = counts.get(NELSON_RULES[rule], 0) + count
+        return dict(sorted(counts.items()))
+
     def get_data(self) -> Dict[str, List]:
         """Get all generated data"""
         return self.data
@@ -643,6 +701,7 @@ class QualityDataGenerator:
             'total_defect_qty': total_defects,
             'overall_defect_rate': total_defects / total_inspected if total_inspected > 0 else 0,
             'total_spc_records': len(self.data['spc_data']),
+            'spc_rule_violations': self._spc_violation_counts(),
             'total_traceability_records': len(self.data['traceability']),
             'total_alerts': len(self.data['quality_alerts']),
             'total_holds': len(self.data['quality_holds']),
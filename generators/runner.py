@@ -17,6 +17,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from generators.core.time_manager import TimeManager
 from generators.core.scenario_manager import ScenarioManager
 from generators.core.correlation_engine import ManufacturingCorrelations
+from generators.core.columnar import ColumnarTable
 
 from generators.mes.production_generator import ProductionDataGenerator
 from generators.mes.equipment_generator import EquipmentDataGenerator
@@ -368,6 +369,8 @@ class DataGeneratorRunner:
         for module, data in self.all_data['mes'].items():
             for table, records in data.items():
                 filepath = mes_path / f'{module}_{table}.json'
+                if isinstance(records, ColumnarTable):
+                    records = records.to_records()
                 with open(filepath, 'w', encoding='utf-8') as f:
                     json.dump(records, f, ensure_ascii=False, indent=2, default=str)
                 print(f"Saved: {filepath} ({len(records)} records)")
@@ -378,6 +381,8 @@ class DataGeneratorRunner:
         for module, data in self.all_data['erp'].items():
             for table, records in data.items():
                 filepath = erp_path / f'{module}_{table}.json'
+                if isinstance(records, ColumnarTable):
+                    records = records.to_records()
                 with open(filepath, 'w', encoding='utf-8') as f:
                     json.dump(records, f, ensure_ascii=False, indent=2, default=str)
                 print(f"Saved: {filepath} ({len(records)} records)")
@@ -14,6 +14,8 @@ import numpy as np
 from faker import Faker
 from tqdm import tqdm
 
+from generators.core.order_book import LineIndex, OrderBook
+
 
 class TransactionDataGenerator:
     """Transaction Data Generator for GreenBoard Electronics"""
@@ -91,6 +93,12 @@ class TransactionDataGenerator:
             'lot': 1000,
         }
 
+        # Open-order books and indexes (daily steps touch only due / today's records)
+        self.production_book = OrderBook(['scheduled', 'in_progress'], due_key='plan_start_date')
+        self.purchase_book = OrderBook(['open'], due_key='delivery_date')
+        self._po_lines = LineIndex('po_id')
+        self._day_start: dict[str, int] = {}
+
         # Working day calendar
         self.working_days = self._generate_working_days()
 
@@ -185,8 +193,14 @@ class TransactionDataGenerator:
 
         return self.data
 
+    def _today(self, key: str) -> list:
+        """Records of self.data[key] appended during the current day"""
+        return self.data[key][self._day_start[key]:]
+
     def _generate_daily_transactions(self, current_date: date):
         """Generate all transactions for a single day"""
+        self._day_start = {key: len(self.data[key]) for key in ('work_orders', 'production_results')}
+
         # 1. Sales Orders (demand generation)
         self._generate_sales_orders(current_date)
 
@@ -321,6 +335,7 @@ class TransactionDataGenerator:
             }
 
             self.data['production_orders'].append(mes_order)
+            self.production_book.add(mes_order)
 
     def _generate_purchase_orders(self, current_date: date):
         """Generate purchase orders for materials"""
@@ -371,20 +386,19 @@ class TransactionDataGenerator:
                 }
 
                 self.data['purchase_order_lines'].append(line)
+                self._po_lines.add(line)
                 total_amount += line_amount
 
             order['total_amount'] = round(total_amount, 2)
             self.data['purchase_orders'].append(order)
+            self.purchase_book.add(order)
 
     def _generate_goods_receipts(self, current_date: date):
         """Generate goods receipts for due POs"""
-        # Find POs due on or before current date
-        due_pos = [
-            po for po in self.data['purchase_orders']
-            if po['status'] == 'open' and po['delivery_date'] <= current_date
-        ]
+        # Find POs due on or before current date (oldest first)
+        due_pos = self.purchase_book.due(current_date, limit=random.randint(5, 15))
 
-        for po in due_pos[:random.randint(5, 15)]:  # Process some due POs
+        for po in due_pos:  # Process some due POs
             gr_no = f"GR-{current_date.strftime('%Y%m%d')}-{self._get_next_sequence('goods_receipt')}"
 
             receipt = {
@@ -401,7 +415,7 @@ class TransactionDataGenerator:
             }
 
             # Get PO lines
-            po_lines = [l for l in self.data['purchase_order_lines'] if l['po_id'] == po['id']]
+            po_lines = self._po_lines.lines(po['id'])
 
             for po_line in po_lines:
                 received_qty = po_line['order_qty']  # Full receipt
@@ -426,17 +440,14 @@ class TransactionDataGenerator:
                 po_line['status'] = 'received'
 
             self.data['goods_receipts'].append(receipt)
-            po['status'] = 'received'
+            self.purchase_book.set_status(po, 'received')
 
     def _generate_production_results(self, current_date: date):
         """Generate production results from MES"""
         # Get scheduled production orders
-        scheduled_orders = [
-            po for po in self.data['production_orders']
-            if po['status'] in ['scheduled', 'in_progress'] and po['plan_start_date'] <= current_date
-        ]
+        scheduled_orders = self.production_book.due(current_date, limit=random.randint(10, 30))
 
-        for order in scheduled_orders[:random.randint(10, 30)]:
+        for order in scheduled_orders:
             line_code = order['line_code']
             defect_rate = self._get_defect_rate(current_date, line_code)
 
@@ -485,15 +496,14 @@ class TransactionDataGenerator:
             order['defect_qty'] += defect_qty
 
             if order['good_qty'] >= order['order_qty']:
-                order['status'] = 'completed'
+                self.production_book.set_status(order, 'completed')
             else:
-                order['status'] = 'in_progress'
+                self.production_book.set_status(order, 'in_progress')
 
     def _generate_quality_data(self, current_date: date):
         """Generate quality inspection and defect data"""
         # Generate inspection results based on production results
-        today_results = [r for r in self.data['production_results']
-                        if r['production_date'] == current_date]
+        today_results = self._today('production_results')
 
         defect_types = ['BRIDGE', 'OPEN', 'MISSING', 'TOMBSTONE', 'SHIFT', 'COLD', 'INSUFFICIENT']
 
@@ -616,8 +626,7 @@ class TransactionDataGenerator:
 
     def _generate_material_consumption(self, current_date: date):
         """Generate material consumption records"""
-        today_results = [r for r in self.data['production_results']
-                        if r['production_date'] == current_date]
+        today_results = self._today('production_results')
 
         for result in today_results:
             # Find BOM for product
@@ -659,8 +668,7 @@ class TransactionDataGenerator:
     def _generate_interface_data(self, current_date: date):
         """Generate ERP-MES interface data"""
         # Work Order Interface (ERP → MES)
-        today_work_orders = [wo for wo in self.data['work_orders']
-                           if wo['plan_start_date'] == current_date]
+        today_work_orders = self._today('work_orders')
 
         for wo in today_work_orders:
             interface = {
@@ -683,13 +691,11 @@ class TransactionDataGenerator:
             self.data['erp_mes_work_order_if'].append(interface)
 
         # Production Result Interface (MES → ERP)
-        today_results = [r for r in self.data['production_results']
-                        if r['production_date'] == current_date]
+        today_results = self._today('production_results')
 
         for result in today_results:
             # Find work order
-            prod_order = next((po for po in self.data['production_orders']
-                              if po['id'] == result['production_order_id']), None)
+            prod_order = self.production_book.get(result['production_order_id'])
 
             if not prod_order:
                 continue
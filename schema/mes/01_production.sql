@@ -509,6 +509,29 @@ CREATE INDEX idx_mes_trace_order ON mes_traceability(production_order_no, operat
 CREATE INDEX idx_mes_trace_product ON mes_traceability(product_code, trace_timestamp DESC);
 CREATE INDEX idx_mes_trace_material ON mes_traceability USING GIN (material_lots);
 
+-- ============================================================
+-- 10. MES Lot Genealogy (로트 계보 - 투입 로트 → 산출 로트)
+-- ============================================================
+CREATE TABLE IF NOT EXISTS mes_lot_genealogy (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    tenant_id UUID NOT NULL REFERENCES tenants(id),
+    parent_lot_no VARCHAR(50) NOT NULL,  -- 투입 로트 (자재 릴, 반제품 로트)
+    child_lot_no VARCHAR(50) NOT NULL,   -- 산출 로트 (제품 로트)
+    relation_type VARCHAR(20) NOT NULL DEFAULT 'consume' CHECK (relation_type IN ('consume', 'split', 'merge', 'rework')),
+    parent_item_code VARCHAR(30),
+    child_item_code VARCHAR(30),
+    production_order_no VARCHAR(50),
+    line_code VARCHAR(20),
+    qty DECIMAL(15, 4),
+    linked_at TIMESTAMPTZ NOT NULL,
+    source VARCHAR(30),  -- material_consumption, traceability, realtime
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    UNIQUE (tenant_id, parent_lot_no, child_lot_no)
+);
+
+-- 정전개(하위 로트)는 UNIQUE 인덱스, 역전개(상위 로트)는 아래 인덱스로 탐색
+CREATE INDEX idx_mes_genealogy_child ON mes_lot_genealogy(tenant_id, child_lot_no, parent_lot_no);
+
 -- ============================================================
 -- Comments
 -- ============================================================
@@ -519,3 +542,4 @@ COMMENT ON TABLE mes_equipment_oee IS 'MES 설비 OEE - 일별/교대별 OEE 지
 COMMENT ON TABLE mes_downtime_event IS 'MES 비가동 이벤트 - 다운타임 상세 기록';
 COMMENT ON TABLE mes_defect_detail IS 'MES 불량 상세 - 개별 불량 건 기록';
 COMMENT ON TABLE mes_traceability IS 'MES 추적성 - 로트/시리얼 기반 이력 추적';
+COMMENT ON TABLE mes_lot_genealogy IS 'MES 로트 계보 - 투입/산출 로트 연결 (정/역 추적)';
@@ -186,12 +186,53 @@ CREATE TABLE IF NOT EXISTS mes_quality_hold (
     created_at TIMESTAMPTZ DEFAULT NOW()
 );
 
+-- 7. SPC 관리도 상태 (라인/제품/측정항목별 running 통계, 측정 저장 시 갱신)
+CREATE TABLE IF NOT EXISTS mes_spc_chart_state (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    tenant_id UUID NOT NULL REFERENCES tenants(id),
+    line_code VARCHAR(20) NOT NULL,
+    product_code VARCHAR(30) NOT NULL,
+    measurement_type VARCHAR(30) NOT NULL,
+    subgroup_size INTEGER NOT NULL,
+    sample_count BIGINT NOT NULL DEFAULT 0,
+    mean DECIMAL(15, 6),
+    std_dev DECIMAL(15, 6),
+    center_line DECIMAL(15, 6),
+    control_lower DECIMAL(15, 6),  -- LCL
+    control_upper DECIMAL(15, 6),  -- UCL
+    limits_frozen BOOLEAN DEFAULT FALSE,
+    cpk_value DECIMAL(8, 4),
+    ppk_value DECIMAL(8, 4),
+    state JSONB NOT NULL,  -- Welford / 부분군 / Nelson 규칙 링버퍼 상태
+    last_measurement_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    UNIQUE(tenant_id, line_code, product_code, measurement_type)
+);
+
+-- 8. SPC 규칙 위반 (Nelson rule 1~8)
+CREATE TABLE IF NOT EXISTS mes_spc_violation (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    tenant_id UUID NOT NULL REFERENCES tenants(id),
+    spc_data_id UUID,
+    line_code VARCHAR(20) NOT NULL,
+    product_code VARCHAR(30) NOT NULL,
+    measurement_type VARCHAR(30) NOT NULL,
+    measurement_datetime TIMESTAMPTZ NOT NULL,
+    rule_no INTEGER NOT NULL CHECK (rule_no BETWEEN 1 AND 8),
+    rule_code VARCHAR(40) NOT NULL,
+    measured_value DECIMAL(15, 6) NOT NULL,
+    center_line DECIMAL(15, 6),
+    sigma DECIMAL(15, 6),
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
 -- 인덱스
 CREATE INDEX idx_mes_inspection_lot ON mes_inspection_result(lot_no, inspection_datetime);
 CREATE INDEX idx_mes_inspection_product ON mes_inspection_result(product_code, inspection_datetime);
 CREATE INDEX idx_mes_inspection_type ON mes_inspection_result(inspection_type, result);
 CREATE INDEX idx_mes_spc_product ON mes_spc_data(product_code, measurement_type, measurement_datetime);
 CREATE INDEX idx_mes_spc_equipment ON mes_spc_data(equipment_id, measurement_datetime);
+CREATE INDEX idx_mes_spc_violation_chart ON mes_spc_violation(line_code, product_code, measurement_type, measurement_datetime);
 CREATE INDEX idx_mes_defect_analysis_lot ON mes_defect_analysis(lot_no, defect_code);
 CREATE INDEX idx_mes_rework_lot ON mes_rework_record(lot_no, rework_datetime);
 CREATE INDEX idx_mes_hold_status ON mes_quality_hold(status, hold_datetime);
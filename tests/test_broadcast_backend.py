@@ -0,0 +1,68 @@
+"""
+RedisBroadcastBackend against the local RESP stand-in (api.websocket.resp_server)
+
+두 백엔드 인스턴스 = 두 워커. 서버 장애 동안 publish는 예외 없이 버리고,
+서버가 돌아오면 발행/구독 연결 모두 재연결되어야 함
+"""
+import asyncio
+
+from api.websocket.backend import RedisBroadcastBackend
+from api.websocket.resp_server import LocalRESPServer
+
+
+async def _wait_for(predicate, timeout: float = 10.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate():
+        assert loop.time() < deadline, "timed out"
+        await asyncio.sleep(0.05)
+
+
+async def _cross_worker_delivery_and_reconnect():
+    server = LocalRESPServer()
+    await server.start()
+    url = f"redis://127.0.0.1:{server.port}/0"
+
+    worker_a = RedisBroadcastBackend(url, prefix="test", connect_timeout=1.0)
+    worker_b = RedisBroadcastBackend(url, prefix="test", connect_timeout=1.0)
+    received = []
+
+    async def on_message(channel, data):
+        received.append((channel, data))
+
+    worker_b.add_handler("ws", on_message)
+    await worker_a.start()
+    await worker_b.start()
+    try:
+        # 워커 A 발행 → 워커 B 수신
+        await worker_a.publish("ws", "production:all", {"seq": 1})
+        await _wait_for(lambda: ("production:all", {"seq": 1}) in received)
+        assert worker_a.published == 1
+
+        # 장애 중 발행은 예외 없이 버려짐
+        await server.stop()
+        await worker_a.publish("ws", "production:all", {"seq": 2})
+        assert worker_a.failed == 1
+
+        # 같은 포트로 재기동 → 구독 연결 재연결 후 다시 전달
+        server = LocalRESPServer(port=server.port)
+        await server.start()
+
+        async def republish():
+            seq = 100
+            while not any(data.get("seq", 0) >= 100 for _, data in received):
+                await worker_a.publish("ws", "production:all", {"seq": seq})
+                seq += 1
+                await asyncio.sleep(0.1)
+
+        await asyncio.wait_for(republish(), timeout=15)
+        assert worker_b.reconnects >= 1
+        assert ("production:all", {"seq": 2}) not in received
+    finally:
+        await worker_a.stop()
+        await worker_b.stop()
+        await server.stop()
+
+
+def test_cross_worker_delivery_and_reconnect():
+    asyncio.run(_cross_worker_delivery_and_reconnect())